@@ -0,0 +1,231 @@
+"""
+app/catalog.py
+--------------
+정책 카탈로그 메모리 인덱스 (/recommendations 용)
+- policies 전체를 상태/최신순으로 한 번 읽어 정규화된 텍스트(blob)와 함께 보관
+- 글자 1-gram / 2-gram → 정책 위치 inverted index 로 키워드 후보를 찾고, 후보만 substring 검증
+- catalog_meta.catalog_version 이 바뀌면(수집/수정) 다시 만든다. 버전 확인은 CATALOG_CHECK_INTERVAL_SEC 마다 1회
+"""
+
+import os
+import time
+import threading
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from app.db import db_conn, get_catalog_version
+
+CATALOG_CHECK_INTERVAL_SEC = float(os.getenv("CATALOG_CHECK_INTERVAL_SEC", "5"))
+KEYWORD_MEMO_SIZE = 4096
+
+STUDENT_TOKENS = ["대학생", "재학생", "학부", "대학원", "학생"]
+STATUS_SCORE = {"진행중": 30, "예정": 10, "마감": -50}
+EMPTY = np.zeros(0, dtype=np.int32)
+
+POLICY_FIELDS = [
+    "id", "policy_key", "name", "category", "provider",
+    "period", "start_date", "end_date", "status",
+    "link", "condition", "benefit",
+    "source", "source_id", "fetched_at",
+]
+
+
+def _norm(s: Optional[str]) -> str:
+    return (s or "").strip()
+
+
+class CatalogSnapshot:
+    """
+    특정 catalog_version 시점의 정책 목록 + 인덱스 (읽기 전용, 요청 간 공유)
+    position = 기존 SQL 정렬(상태 → start_date DESC → id DESC) 기준 순번
+    """
+
+    def __init__(self, version: int, rows: List[Any]):
+        self.version = version
+        self.policies: List[Dict[str, Any]] = [dict(zip(POLICY_FIELDS, r)) for r in rows]
+
+        self.names: List[str] = []
+        self.categories: List[str] = []
+        self.providers: List[str] = []
+        self.statuses: List[str] = []
+        self.conditions: List[str] = []
+        self.benefits: List[str] = []
+        self.blobs: List[str] = []
+
+        by_category: Dict[str, List[int]] = defaultdict(list)
+        postings: Dict[str, List[int]] = defaultdict(list)
+
+        for pos, p in enumerate(self.policies):
+            name = _norm(p["name"])
+            category = _norm(p["category"])
+            provider = _norm(p["provider"])
+            status = _norm(p["status"])
+            condition = _norm(p["condition"])
+            benefit = _norm(p["benefit"])
+            blob = " ".join([name, category, provider, status, condition, benefit])
+
+            self.names.append(name)
+            self.categories.append(category)
+            self.providers.append(provider)
+            self.statuses.append(status)
+            self.conditions.append(condition)
+            self.benefits.append(benefit)
+            self.blobs.append(blob)
+
+            by_category[category].append(pos)
+
+            grams = set(blob)
+            grams.update(blob[i:i + 2] for i in range(len(blob) - 1))
+            for g in grams:
+                postings[g].append(pos)
+
+        # 위치는 오름차순으로 추가됐으므로 모두 정렬된 배열
+        self.by_category = {c: np.asarray(v, dtype=np.int32) for c, v in by_category.items()}
+        self.status_score = np.array([STATUS_SCORE.get(st, 0) for st in self.statuses], dtype=np.int32)
+        self.closed = np.array([st == "마감" for st in self.statuses], dtype=bool)
+        self._postings = {g: np.asarray(v, dtype=np.int32) for g, v in postings.items()}
+        self._memo: Dict[tuple, np.ndarray] = {}
+        self._memo_lock = threading.Lock()
+
+        # 요청마다 같은 고정 토큰 검사는 미리 계산
+        self.nationwide = self.find("전국")
+        self.youth = self.find("청년")  # "청년층" 은 "청년" 을 포함
+        self.student = np.unique(np.concatenate([self.find(t) for t in STUDENT_TOKENS]))
+
+    def __len__(self) -> int:
+        return len(self.policies)
+
+    def find(self, keyword: str) -> np.ndarray:
+        """blob 에 keyword 가 부분문자열로 들어있는 정책 위치 (정렬된 int32 배열)"""
+        return self._memoized(("blob", keyword), self._find_blob)
+
+    def find_in_name(self, keyword: str) -> np.ndarray:
+        """정책명에 keyword 가 들어있는 정책 위치 (name 은 blob 의 앞부분이라 find() 의 부분집합)"""
+        return self._memoized(("name", keyword), self._find_name)
+
+    @staticmethod
+    def contains(positions: np.ndarray, pos: int) -> bool:
+        i = np.searchsorted(positions, pos)
+        return bool(i < len(positions) and positions[i] == pos)
+
+    def _memoized(self, key: tuple, fn) -> np.ndarray:
+        hit = self._memo.get(key)
+        if hit is None:
+            hit = fn(key[1])
+            with self._memo_lock:
+                if len(self._memo) >= KEYWORD_MEMO_SIZE:
+                    self._memo.clear()
+                self._memo[key] = hit
+        return hit
+
+    def _find_blob(self, keyword: str) -> np.ndarray:
+        if not keyword:
+            return EMPTY
+        if len(keyword) == 1:
+            grams = [keyword]
+        else:
+            grams = {keyword[i:i + 2] for i in range(len(keyword) - 1)}
+        lists = []
+        for g in grams:
+            arr = self._postings.get(g)
+            if arr is None:
+                return EMPTY
+            lists.append(arr)
+
+        lists.sort(key=len)
+        cand = lists[0]
+        for arr in lists[1:]:
+            if len(cand) == 0:
+                break
+            cand = np.intersect1d(cand, arr, assume_unique=True)
+        if len(keyword) <= 2:
+            return cand
+        # 2-gram 이 모두 있어도 연속으로 이어진다는 보장은 없으므로 후보만 실제 검증
+        blobs = self.blobs
+        return np.asarray([pos for pos in cand.tolist() if keyword in blobs[pos]], dtype=np.int32)
+
+    def _find_name(self, keyword: str) -> np.ndarray:
+        names = self.names
+        cand = self.find(keyword)
+        return np.asarray([pos for pos in cand.tolist() if keyword in names[pos]], dtype=np.int32)
+
+
+class PolicyCatalog:
+    """
+    프로세스 전역 카탈로그. get() 은 현재 snapshot 을 돌려주고,
+    버전이 바뀐 경우에만 DB 에서 다시 읽는다 (재빌드 중에는 기존 snapshot 으로 응답).
+    """
+
+    def __init__(self, check_interval: float = CATALOG_CHECK_INTERVAL_SEC):
+        self.check_interval = check_interval
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.build_ms = 0.0
+
+    def get(self) -> CatalogSnapshot:
+        snap = self._snapshot
+        if snap is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return snap
+        if snap is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._refresh()
+            return self._snapshot
+        # 이미 다른 스레드가 확인/재빌드 중이면 기다리지 않고 기존 snapshot 사용
+        if self._lock.acquire(blocking=False):
+            try:
+                self._refresh()
+            finally:
+                self._lock.release()
+        return self._snapshot
+
+    def invalidate(self) -> None:
+        # 같은 프로세스에서 정책을 수정한 직후 → 다음 get() 에서 바로 버전 확인
+        self._checked_at = 0.0
+
+    def _refresh(self) -> None:
+        with db_conn() as conn:
+            version = get_catalog_version(conn)
+            self._checked_at = time.monotonic()
+            if self._snapshot is not None and self._snapshot.version == version:
+                return
+            cur = conn.cursor()
+            cur.execute(
+                f"""
+                SELECT {", ".join(POLICY_FIELDS)}
+                FROM policies
+                WHERE removed_at IS NULL
+                ORDER BY
+                    CASE status
+                        WHEN '진행중' THEN 1
+                        WHEN '예정' THEN 2
+                        WHEN '마감' THEN 3
+                        ELSE 4
+                    END,
+                    start_date DESC,
+                    id DESC
+                """
+            )
+            rows = cur.fetchall()
+
+        t0 = time.perf_counter()
+        self._snapshot = CatalogSnapshot(version, rows)
+        self.build_ms = round((time.perf_counter() - t0) * 1000, 2)
+        self.builds += 1
+
+    def stats(self) -> Dict[str, Any]:
+        snap = self._snapshot
+        return {
+            "loaded": snap is not None,
+            "version": snap.version if snap is not None else None,
+            "policies": len(snap) if snap is not None else 0,
+            "builds": self.builds,
+            "build_ms": self.build_ms,
+        }
+
+
+policy_catalog = PolicyCatalog()
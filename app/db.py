@@ -1,20 +1,190 @@
 import os
+import time
+import queue
 import sqlite3
+import threading
+from contextlib import contextmanager
 from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional
 
 # DB 경로 통일 (루트/data/kosaf_scholarships.db)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DATA_DIR = os.path.join(BASE_DIR, "data")
 DB_PATH = os.path.join(DATA_DIR, "kosaf_scholarships.db")
 
+# 커넥션 풀 / PRAGMA 설정 (환경변수로 조정 가능)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "8"))
+DB_POOL_TIMEOUT_SEC = float(os.getenv("DB_POOL_TIMEOUT_SEC", "10"))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", "5000"))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", str(256 * 1024 * 1024)))   # 256MB
+DB_CACHE_SIZE_KB = int(os.getenv("DB_CACHE_SIZE_KB", str(64 * 1024)))   # 커넥션당 64MB
 
-def get_conn():
-    os.makedirs(DATA_DIR, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+
+def _connect(path: str) -> sqlite3.Connection:
+    """
+    PRAGMA 튜닝된 커넥션 생성
+    - WAL: 수집(쓰기) 중에도 /policies 같은 읽기가 막히지 않음
+    - synchronous=NORMAL: WAL 에서는 커밋마다 fsync 하지 않아도 DB 는 깨지지 않음
+    - mmap_size / cache_size: 읽기 위주 카탈로그 조회 가속
+    """
+    conn = sqlite3.connect(path, timeout=DB_BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    try:
+        # WAL 은 DB 파일에 저장되는 설정이라 init_db 에서 한 번 바뀌면 이후엔 no-op
+        conn.execute("PRAGMA journal_mode=WAL;")
+    except sqlite3.OperationalError:
+        pass  # 다른 프로세스가 쓰기 중이라 전환 못 하면 기존 모드로 계속
+    conn.execute("PRAGMA synchronous=NORMAL;")
+    conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS};")
+    conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE};")
+    conn.execute(f"PRAGMA cache_size=-{DB_CACHE_SIZE_KB};")  # 음수 = KiB 단위
+    conn.execute("PRAGMA temp_store=MEMORY;")
     return conn
 
 
+class ConnectionPool:
+    """
+    thread-safe SQLite 커넥션 풀 (bounded LIFO queue)
+    - 최대 max_size 개까지 필요할 때 생성하고, 반납된 커넥션은 재사용
+    - 모두 사용 중이면 timeout 까지 대기 후 TimeoutError
+    - 반납 시 열린 트랜잭션은 rollback (commit 은 호출하는 쪽 책임)
+    """
+
+    def __init__(self, path: Optional[str] = None, max_size: int = DB_POOL_SIZE, timeout: float = DB_POOL_TIMEOUT_SEC):
+        self.path = path or DB_PATH
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._in_use = 0
+        self._acquired = 0
+        self._waits = 0
+        self._wait_ms = 0.0
+        self._discarded = 0
+
+    def acquire(self) -> sqlite3.Connection:
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = None
+
+        if conn is None:
+            with self._lock:
+                can_create = self._created < self.max_size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    conn = _connect(self.path)
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            else:
+                t0 = time.perf_counter()
+                try:
+                    conn = self._idle.get(timeout=self.timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"DB 커넥션 풀 대기 시간 초과 ({self.timeout}s, size={self.max_size})")
+                finally:
+                    with self._lock:
+                        self._waits += 1
+                        self._wait_ms += (time.perf_counter() - t0) * 1000
+
+        with self._lock:
+            self._in_use += 1
+            self._acquired += 1
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        with self._lock:
+            self._in_use -= 1
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # 깨진 커넥션은 버리고 자리만 비워둠 (다음 acquire 때 새로 생성)
+            with self._lock:
+                self._created -= 1
+                self._discarded += 1
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close_all(self) -> None:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            conn.close()
+            with self._lock:
+                self._created -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "created": self._created,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "acquired": self._acquired,
+                "waits": self._waits,
+                "wait_ms_total": round(self._wait_ms, 2),
+                "discarded": self._discarded,
+            }
+
+
+_pool: Optional[ConnectionPool] = None
+_pool_pid: Optional[int] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ConnectionPool:
+    # uvicorn --workers 는 프로세스를 fork 하므로 프로세스마다 자기 풀을 만든다
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                os.makedirs(DATA_DIR, exist_ok=True)
+                _pool = ConnectionPool()
+                _pool_pid = pid
+    return _pool
+
+
+@contextmanager
+def db_conn() -> Iterator[sqlite3.Connection]:
+    """
+    라우터용: with db_conn() as conn: ...
+    블록이 끝나면 풀에 반납된다 (쓰기는 블록 안에서 conn.commit() 필요).
+    """
+    with get_pool().connection() as conn:
+        yield conn
+
+
+def pool_stats() -> Dict[str, Any]:
+    return get_pool().stats()
+
+
+def get_conn():
+    # 스크립트(수집/마이그레이션)용 단독 커넥션. 사용 후 conn.close() 필요
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return _connect(DB_PATH)
+
+
 def _column_exists(conn: sqlite3.Connection, table: str, column: str) -> bool:
     cur = conn.cursor()
     cur.execute(f"PRAGMA table_info({table});")
@@ -101,6 +271,13 @@ def init_db():
         cur.execute("ALTER TABLE policies ADD COLUMN source_meta TEXT;")
         print("[db] policies.source_meta 컬럼 추가 완료 (마이그레이션)")
 
+    # 증분 수집: content_hash = 수집 내용 hash (같으면 다시 쓰지 않음), removed_at = 소스 목록에서 사라진 시각
+    for col in ("content_hash", "removed_at"):
+        if not _column_exists(conn, "policies", col):
+            cur.execute(f"ALTER TABLE policies ADD COLUMN {col} TEXT;")
+            print(f"[db] policies.{col} 컬럼 추가 완료 (마이그레이션)")
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_policies_source_removed ON policies(source, removed_at);")
+
     # =========================================================
     # 3) users 테이블
     # =========================================================
@@ -160,9 +337,305 @@ def init_db():
     cur.execute("CREATE INDEX IF NOT EXISTS ix_elig_age ON policy_eligibility(min_age, max_age);")
     cur.execute("CREATE INDEX IF NOT EXISTS ix_elig_student ON policy_eligibility(student_required);")
 
+    # 기존 DB 마이그레이션: 정책 텍스트에서 뽑은 구조화 정보 (오프라인 enrichment 단계에서 계산, 추천 시 조회만)
+    enrichment_cols = {
+        "region_sido": "TEXT",
+        "region_sigungu": "TEXT",
+        "region_mentions_json": "TEXT",
+        "region_text": "TEXT",
+        "restricted_group": "TEXT",
+        "target_groups_json": "TEXT",
+        "term_offsets_json": "TEXT",
+        "text_min_age": "INTEGER",
+        "text_max_age": "INTEGER",
+        "text_student_required": "INTEGER",
+        "text_evidence_json": "TEXT",
+        "enriched_at": "TEXT",
+    }
+    added = False
+    for col, col_type in enrichment_cols.items():
+        if not _column_exists(conn, "policy_eligibility", col):
+            cur.execute(f"ALTER TABLE policy_eligibility ADD COLUMN {col} {col_type};")
+            added = True
+    if added:
+        # 새 컬럼은 이미 계산된 정책에도 비어 있으므로 전체 다시 계산
+        n = enrich_policies(conn)
+        print(f"[db] policy_eligibility enrichment 컬럼 추가 + {n}건 계산 (마이그레이션)")
+
+    # =========================================================
+    # 5) catalog_meta — 정책 카탈로그 버전 (수집/수정 시 증가 → 메모리 캐시 갱신)
+    # =========================================================
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS catalog_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """)
+    cur.execute("INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('catalog_version', 0);")
+
+    # 수집 변경 로그 — 어떤 카탈로그 버전에서 어떤 정책이 추가/변경/제거됐는지 (하위 인덱스 증분 갱신용)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS policy_changes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            catalog_version INTEGER NOT NULL,
+            source TEXT,
+            policy_id INTEGER NOT NULL,
+            policy_key TEXT,
+            change TEXT NOT NULL,    -- inserted | updated | removed
+            changed_at TEXT
+        );
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_policy_changes_version ON policy_changes(catalog_version);")
+
+    # =========================================================
+    # 6) 전문검색(FTS5) 인덱스 — /policies, /scholarships 의 q 검색용
+    # =========================================================
+    _init_fts(conn)
+
+    # =========================================================
+    # 6-1) status_rank — 목록 정렬(상태 → start_date DESC → id DESC)을 인덱스로 (keyset 페이지네이션, app/pagination.py)
+    # =========================================================
+    _init_status_rank(conn)
+
+    # =========================================================
+    # 7) transactions / user_fhi_state — 유저별 거래 저장 + FHI 롤링 집계 (app/fhi_store.py)
+    # =========================================================
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS transactions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            datetime TEXT NOT NULL,  -- YYYY-MM-DDTHH:MM:SS.ffffff (고정 폭, 문자열 순서 = 시간 순서)
+            amount REAL NOT NULL,
+            category TEXT,
+            merchant TEXT,
+            source TEXT,
+            payment_method TEXT,
+            created_at TEXT,
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+        );
+    """)
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_transactions_user_datetime ON transactions(user_id, datetime);")
+
+    # 충동 점수는 전체 이력 누적값이라 따로 저장 (재시작 후에는 최근 30일 거래만 다시 읽으면 됨)
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS user_fhi_state (
+            user_id INTEGER PRIMARY KEY,
+            tx_count INTEGER NOT NULL,
+            last_datetime TEXT,
+            impulsive_score_sum REAL NOT NULL,
+            impulsive_n_scored INTEGER NOT NULL,
+            impulsive_small_count INTEGER NOT NULL,
+            impulsive_max_datetime TEXT,  -- 충동 탐지기 24h 윈도우 기준 (마지막 채점 거래)
+            updated_at TEXT,
+            FOREIGN KEY(user_id) REFERENCES users(id) ON DELETE CASCADE
+        );
+    """)
+
     conn.commit()
     conn.close()
 
 
+# FTS5 검색 대상 컬럼 (external content: 본문은 원본 테이블에만 저장, 인덱스만 따로 유지)
+FTS_TABLES = {
+    "policies": ("policies_fts", ["name", "provider", "condition", "benefit"]),
+    "scholarships": ("scholarships_fts", ["name", "type", "condition", "grant"]),
+}
+# trigram 토크나이저는 3글자 이상 질의만 인덱스로 처리 가능 → 더 짧으면 LIKE 로 fallback
+FTS_MIN_QUERY_LEN = 3
+
+_fts_enabled = False
+
+
+def _init_fts(conn: sqlite3.Connection) -> None:
+    """
+    trigram 토크나이저 FTS5 테이블 + 동기화 트리거 생성
+    - trigram = 부분문자열 검색이라 기존 LIKE '%q%' 와 결과가 같고, 한국어 형태소 분석기 없이도 동작
+    - 테이블을 새로 만든 경우에만 기존 데이터로 rebuild
+    - SQLite 빌드에 FTS5/trigram 이 없으면 건너뛰고 LIKE 검색 유지
+    """
+    global _fts_enabled
+    cur = conn.cursor()
+    try:
+        for table, (fts, cols) in FTS_TABLES.items():
+            cur.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (fts,))
+            created = cur.fetchone() is None
+
+            col_sql = ", ".join(cols)
+            new_sql = ", ".join(f"new.{c}" for c in cols)
+            old_sql = ", ".join(f"old.{c}" for c in cols)
+            cur.execute(f"""
+                CREATE VIRTUAL TABLE IF NOT EXISTS {fts}
+                USING fts5({col_sql}, content='{table}', content_rowid='id', tokenize='trigram');
+            """)
+            cur.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN
+                    INSERT INTO {fts}(rowid, {col_sql}) VALUES (new.id, {new_sql});
+                END;
+            """)
+            cur.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {col_sql}) VALUES ('delete', old.id, {old_sql});
+                END;
+            """)
+            cur.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {col_sql} ON {table} BEGIN
+                    INSERT INTO {fts}({fts}, rowid, {col_sql}) VALUES ('delete', old.id, {old_sql});
+                    INSERT INTO {fts}(rowid, {col_sql}) VALUES (new.id, {new_sql});
+                END;
+            """)
+            if created:
+                cur.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild');")
+                print(f"[db] {fts} 생성 + 기존 데이터 인덱싱 완료")
+    except sqlite3.OperationalError as e:
+        print(f"[db] FTS5(trigram) 사용 불가 → LIKE 검색 유지: {e}")
+        _fts_enabled = False
+        return
+    _fts_enabled = True
+
+
+# 목록 정렬 순위: 진행중 → 예정 → 마감 → 나머지 (큰 값이 먼저, status_rank DESC)
+STATUS_RANK_SQL = "CASE {col} WHEN '진행중' THEN 3 WHEN '예정' THEN 2 WHEN '마감' THEN 1 ELSE 0 END"
+STATUS_RANK_TABLES = ["policies", "scholarships"]
+
+
+def _init_status_rank(conn: sqlite3.Connection) -> None:
+    """
+    status_rank 컬럼 + (status_rank, start_date, id) 인덱스 + 동기화 트리거
+    - 기존 ORDER BY CASE status ... 는 인덱스를 못 타서 매 페이지 정렬 → 저장된 순위 컬럼으로 인덱스 순서 그대로 읽음
+    - 쓰는 쪽(수집 스크립트 등)은 status 만 넣으면 트리거가 status_rank 를 맞춤
+    """
+    cur = conn.cursor()
+    for table in STATUS_RANK_TABLES:
+        if not _column_exists(conn, table, "status_rank"):
+            cur.execute(f"ALTER TABLE {table} ADD COLUMN status_rank INTEGER;")
+            cur.execute(f"UPDATE {table} SET status_rank = {STATUS_RANK_SQL.format(col='status')};")
+            print(f"[db] {table}.status_rank 컬럼 추가 + 기존 데이터 계산 완료 (마이그레이션)")
+        cur.execute(f"CREATE INDEX IF NOT EXISTS ix_{table}_keyset ON {table}(status_rank, start_date, id);")
+        rank_sql = STATUS_RANK_SQL.format(col="new.status")
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_status_rank_ai AFTER INSERT ON {table} BEGIN
+                UPDATE {table} SET status_rank = {rank_sql} WHERE id = new.id;
+            END;
+        """)
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS {table}_status_rank_au AFTER UPDATE OF status ON {table}
+            WHEN new.status IS NOT old.status OR new.status_rank IS NULL BEGIN
+                UPDATE {table} SET status_rank = {rank_sql} WHERE id = new.id;
+            END;
+        """)
+
+
+def fts_match_query(q: Optional[str]) -> Optional[str]:
+    """
+    검색어 → FTS5 MATCH 문자열 (전체를 하나의 phrase 로: LIKE '%q%' 와 같은 부분문자열 의미)
+    FTS 를 쓸 수 없으면 None (호출하는 쪽에서 LIKE 로 처리)
+    """
+    q = (q or "").strip()
+    if not _fts_enabled or len(q) < FTS_MIN_QUERY_LEN:
+        return None
+    return '"' + q.replace('"', '""') + '"'
+
+
+def get_catalog_version(conn: sqlite3.Connection) -> int:
+    cur = conn.cursor()
+    cur.execute("SELECT value FROM catalog_meta WHERE key = 'catalog_version';")
+    r = cur.fetchone()
+    return int(r[0]) if r else 0
+
+
+def bump_catalog_version(conn: sqlite3.Connection) -> None:
+    """
+    policies / policy_eligibility 를 바꾼 쪽(수집 스크립트, 수정 API)에서 commit 전에 호출.
+    서버 프로세스들은 이 값이 바뀐 걸 보고 메모리 카탈로그를 다시 만든다.
+    """
+    conn.execute("""
+        INSERT INTO catalog_meta (key, value) VALUES ('catalog_version', 1)
+        ON CONFLICT(key) DO UPDATE SET value = value + 1;
+    """)
+
+
+def record_policy_changes(
+    conn: sqlite3.Connection,
+    source: str,
+    changes: Dict[str, Dict[str, int]],
+) -> None:
+    """
+    수집 변경분을 policy_changes 에 기록 (bump_catalog_version 다음, commit 전에 호출)
+    changes: {"inserted" | "updated" | "removed": {policy_key: policy_id}}
+    """
+    version = get_catalog_version(conn)
+    ts = now_iso()
+    conn.executemany(
+        "INSERT INTO policy_changes (catalog_version, source, policy_id, policy_key, change, changed_at) "
+        "VALUES (?, ?, ?, ?, ?, ?);",
+        ((version, source, pid, key, change, ts)
+         for change, ids in changes.items() for key, pid in ids.items()),
+    )
+
+
+def get_policy_changes(conn: sqlite3.Connection, since_version: int) -> Dict[str, Any]:
+    """
+    since_version 이후 바뀐 정책 → {"version": 현재 버전, "inserted": [id], "updated": [id], "removed": [id]}
+    같은 정책이 여러 번 바뀌었으면 마지막 변경 기준, 단 추가 후 변경은 추가 (하위 인덱스는 이 id 들만 다시 읽으면 됨)
+    """
+    rows = conn.execute(
+        "SELECT policy_id, change FROM policy_changes WHERE catalog_version > ? ORDER BY id;",
+        (since_version,),
+    ).fetchall()
+    last: Dict[int, str] = {}
+    for pid, change in rows:
+        if change == "updated" and last.get(pid) == "inserted":
+            continue
+        last[pid] = change
+    out: Dict[str, Any] = {"version": get_catalog_version(conn), "inserted": [], "updated": [], "removed": []}
+    for pid, change in last.items():
+        out[change].append(pid)
+    return out
+
+
+def enrich_policies(
+    conn: sqlite3.Connection,
+    policy_ids: Optional[Iterable[int]] = None,
+    only_missing: bool = False,
+) -> int:
+    """
+    정책 텍스트 → policy_eligibility enrichment 컬럼 (utils/policy_enricher) 계산/저장. commit 은 호출하는 쪽에서
+    - policy_ids: 이 정책들만 (수집 직후), None 이면 전체
+    - only_missing: 아직 계산 안 된 정책만 (enriched_at IS NULL)
+    자격 조건 row 가 없는 정책은 enrichment 컬럼만 채운 row 를 만든다 (나머지 NULL = 제한 없음)
+    """
+    from utils.policy_enricher import ENRICHMENT_COLUMNS, enrich_policy
+
+    sql = """
+        SELECT p.id, p.name, p.provider, p.condition, p.benefit
+        FROM policies p LEFT JOIN policy_eligibility e ON e.policy_id = p.id
+        WHERE (? = 0 OR e.enriched_at IS NULL)
+    """
+    if policy_ids is None:
+        rows = conn.execute(sql, (int(only_missing),)).fetchall()
+    else:
+        ids = list(policy_ids)
+        rows = []
+        for i in range(0, len(ids), 500):
+            chunk = ids[i:i + 500]
+            rows += conn.execute(
+                sql + f" AND p.id IN ({','.join('?' * len(chunk))})", (int(only_missing), *chunk)
+            ).fetchall()
+
+    ts = now_iso()
+    cols = ENRICHMENT_COLUMNS + ["enriched_at"]
+    conn.executemany(f"""
+        INSERT INTO policy_eligibility (policy_id, {", ".join(cols)}, updated_at)
+        VALUES (?, {", ".join("?" * len(cols))}, ?)
+        ON CONFLICT(policy_id) DO UPDATE SET
+            {", ".join(f"{c}=excluded.{c}" for c in cols)};
+    """, (
+        (r[0], *[e[c] for c in ENRICHMENT_COLUMNS], ts, ts)
+        for r in rows
+        for e in [enrich_policy(r[1], r[2], r[3], r[4])]
+    ))
+    return len(rows)
+
+
 def now_iso():
     return datetime.now().isoformat(timespec="seconds")
\ No newline at end of file
@@ -0,0 +1,449 @@
+"""
+app/fhi_store.py
+----------------
+유저별 거래 저장 + FHI 롤링 집계 (POST /users/{id}/transactions, GET /users/{id}/fhi)
+- 거래는 transactions 테이블 (user_id, datetime) 인덱스에 쌓고, 유저별 7d/30d 윈도우 집계는 메모리에서 증분 유지
+- 시간순으로 들어온 거래: 윈도우에 push + ImpulsiveDetector 상태를 이어서 채점 (거래당 O(1))
+- 기준 시각(asof)이 지나 윈도우 밖으로 나간 거래는 왼쪽에서 pop (거래당 1회)
+- 기존 마지막 거래보다 과거 시각 거래가 늦게 도착하면 그 유저만 DB 에서 전체 재생 (충동 점수가 순서에 의존)
+- 충동 점수 누적값은 user_fhi_state 에 저장 → 재시작/캐시 밀림 후에는 최근 30일 거래만 다시 읽는다
+- user_fhi_state.tx_count 를 버전으로 사용: 다른 worker 가 거래를 넣었으면 다음 조회 때 다시 읽음
+
+집계 규칙은 /fhi/analyze 와 같다 (build_features_from_transactions / detect_impulsive / detect_spending_spike).
+"""
+
+import os
+import math
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import sqlite3
+
+from app.db import now_iso
+from ml.ml_runtime.feature_builder import CATEGORY_COLS
+from utils.fhi_calculator import calculate_fhi
+from utils.impulsive_detector import ImpulsiveDetector, WINDOW as IMPULSIVE_WINDOW
+from utils.spending_spike import spike_from_sums
+from utils.transaction_batch import DAY_US, epoch_us, parse_datetime, resolve_asof
+
+# 메모리에 집계 상태를 들고 있는 최대 유저 수 (LRU). 밀려난 유저는 다음 조회 때 최근 30일만 다시 읽음
+FHI_STATE_CACHE_SIZE = int(os.getenv("FHI_STATE_CACHE_SIZE", "10000"))
+LOCK_STRIPES = 64
+
+SPAN_7D = 7 * DAY_US
+SPAN_30D = 30 * DAY_US
+
+
+def _naive(dt: datetime) -> datetime:
+    # aware 는 로컬 벽시계 naive 로 저장 (resolve_asof 와 같은 기준, datetime 문자열 정렬 = 시간 정렬)
+    if dt.tzinfo is not None:
+        dt = dt.astimezone().replace(tzinfo=None)
+    return dt
+
+
+def _dt_key(dt: datetime) -> str:
+    return dt.isoformat(timespec="microseconds")
+
+
+class RollingWindow:
+    """
+    [asof - span, ∞) 구간 거래의 집계 (feature builder / spike 탐지기와 같은 윈도우)
+    - 합계, 건수, 분산용 shift 합·제곱합, spike 용 원 단위 정수 합·건수
+    - 최대값: 금액 내림차순 monotonic deque
+    - 카테고리별 합·건수, 날짜별 건수 (0 이 되면 key 삭제 → len 이 고유 개수)
+    push 는 시간순, expire 경계는 단조 증가 → 거래당 push 1회 + pop 1회 (amortized O(1))
+    """
+
+    __slots__ = ("span", "entries", "maxq", "total", "count", "shift", "dsum", "dsq",
+                 "int_sum", "int_count", "cat_sum", "cat_count", "days")
+
+    def __init__(self, span: int):
+        self.span = span
+        self.entries: deque = deque()  # (ts, amount, day, category)
+        self.maxq: deque = deque()     # (ts, amount), amount 내림차순
+        self._reset()
+
+    def _reset(self) -> None:
+        self.total = 0.0
+        self.count = 0
+        self.shift = 0.0
+        self.dsum = 0.0
+        self.dsq = 0.0
+        self.int_sum = 0
+        self.int_count = 0
+        self.cat_sum: Dict[str, float] = {}
+        self.cat_count: Dict[str, int] = {}
+        self.days: Dict[int, int] = {}
+
+    def push(self, ts: int, amount: float, day: int, category: str) -> None:
+        if not self.count:
+            self.shift = amount  # 분산 계산 시 큰 금액끼리의 상쇄 오차를 줄이기 위한 기준값
+        self.entries.append((ts, amount, day, category))
+        self.total += amount
+        self.count += 1
+        d = amount - self.shift
+        self.dsum += d
+        self.dsq += d * d
+        amt_int = int(amount)
+        if amt_int > 0:
+            self.int_sum += amt_int
+            self.int_count += 1
+        self.cat_sum[category] = self.cat_sum.get(category, 0.0) + amount
+        self.cat_count[category] = self.cat_count.get(category, 0) + 1
+        self.days[day] = self.days.get(day, 0) + 1
+
+        maxq = self.maxq
+        while maxq and maxq[-1][1] <= amount:
+            maxq.pop()
+        maxq.append((ts, amount))
+
+    def expire(self, asof_us: int) -> None:
+        horizon = asof_us - self.span
+        entries = self.entries
+        while entries and entries[0][0] < horizon:
+            _, amount, day, category = entries.popleft()
+            self.total -= amount
+            self.count -= 1
+            d = amount - self.shift
+            self.dsum -= d
+            self.dsq -= d * d
+            amt_int = int(amount)
+            if amt_int > 0:
+                self.int_sum -= amt_int
+                self.int_count -= 1
+            left = self.cat_count[category] - 1
+            if left:
+                self.cat_count[category] = left
+                self.cat_sum[category] -= amount
+            else:
+                del self.cat_count[category]
+                del self.cat_sum[category]
+            left = self.days[day] - 1
+            if left:
+                self.days[day] = left
+            else:
+                del self.days[day]
+        if not entries:
+            self._reset()  # 비면 누적 부동소수 오차도 같이 초기화
+        maxq = self.maxq
+        while maxq and maxq[0][0] < horizon:
+            maxq.popleft()
+
+    def stats(self) -> Tuple[float, float, float, float]:
+        # returns: (sum, mean, std, max) — feature_builder._window_stats 와 같은 정의
+        n = self.count
+        if not n:
+            return 0.0, 0.0, 0.0, 0.0
+        mean = self.total / n
+        std = 0.0
+        if n > 1:
+            m = self.dsum / n
+            std = math.sqrt(max(self.dsq / n - m * m, 0.0))
+        return self.total, mean, std, self.maxq[0][1]
+
+
+class UserFHIState:
+    """
+    유저 1명의 롤링 집계. version = 반영된 거래 수 (user_fhi_state.tx_count)
+    asof_us 보다 과거 시점은 이미 pop 된 거래가 있어서 조회할 수 없다 (→ 스토어가 다시 읽음)
+    """
+
+    __slots__ = ("version", "last_dt", "asof_us", "impulsive", "w7", "w30")
+
+    def __init__(self, asof_us: int):
+        self.version = 0
+        self.last_dt: Optional[datetime] = None
+        self.asof_us = asof_us
+        self.impulsive = ImpulsiveDetector()
+        self.w7 = RollingWindow(SPAN_7D)
+        self.w30 = RollingWindow(SPAN_30D)
+
+    def push(self, dt: datetime, amount: float, category: str) -> None:
+        # detect_impulsive 와 같이 원 단위 정수 금액이 0 이하면 충동 점수에서 제외
+        amt_int = int(amount)
+        if amt_int > 0:
+            self.impulsive.compute_score(dt, amt_int)
+        ts = epoch_us(dt)
+        day = dt.toordinal()
+        self.w7.push(ts, amount, day, category)
+        self.w30.push(ts, amount, day, category)
+        self.last_dt = dt
+
+    def expire(self, asof_us: int) -> None:
+        self.asof_us = max(self.asof_us, asof_us)
+        self.w7.expire(self.asof_us)
+        self.w30.expire(self.asof_us)
+
+    def features(self) -> Dict[str, Any]:
+        # build_features_from_transactions(전체 거래, asof) 와 같은 key / 값
+        if not self.version:
+            return {}
+        spend_sum_7d, spend_mean_7d, spend_std_7d, spend_max_7d = self.w7.stats()
+        spend_sum_30d, spend_mean_30d, spend_std_30d, spend_max_30d = self.w30.stats()
+        total_30 = spend_sum_30d if spend_sum_30d > 0 else 1.0
+        cat_sum = self.w30.cat_sum
+        return {
+            "spend_sum_7d":   spend_sum_7d,
+            "spend_mean_7d":  spend_mean_7d,
+            "spend_std_7d":   spend_std_7d,
+            "spend_max_7d":   spend_max_7d,
+            "day_count_7d":   float(len(self.w7.days)),
+            "spend_sum_30d":  spend_sum_30d,
+            "spend_mean_30d": spend_mean_30d,
+            "spend_std_30d":  spend_std_30d,
+            "spend_max_30d":  spend_max_30d,
+            "day_count_30d":  float(len(self.w30.days)),
+            "unique_category_count_30d": float(len(self.w30.cat_count)),
+            **{col: cat_sum.get(cat, 0.0) / total_30 for col, cat in CATEGORY_COLS.items()},
+        }
+
+    def spike(self) -> Dict[str, Any]:
+        # detect_spending_spike: 최근 7일 vs (30일 - 7일) 구간 평균 금액
+        w7, w30 = self.w7, self.w30
+        return spike_from_sums(w7.int_sum, w7.int_count, w30.int_sum - w7.int_sum, w30.int_count - w7.int_count)
+
+
+def _normalize_rows(transactions: List[Dict[str, Any]]) -> Tuple[List[tuple], int]:
+    """
+    TransactionBatch 와 같은 검증 (datetime 파싱 가능 + amount > 0) 후 시간순 안정 정렬
+    returns: ([(datetime, amount, category, merchant, source, payment_method)], 무효 건수)
+    """
+    rows = []
+    skipped = 0
+    for tx in transactions:
+        if not isinstance(tx, dict):
+            skipped += 1
+            continue
+        dt = parse_datetime(tx.get("datetime"))
+        try:
+            amt = float(tx.get("amount", 0))
+        except Exception:
+            amt = 0.0
+        if dt is None or not amt > 0:
+            skipped += 1
+            continue
+        category = (tx.get("category") or "other").lower().strip()
+        rows.append((_naive(dt), amt, category, tx.get("merchant"), tx.get("source"), tx.get("payment_method")))
+    rows.sort(key=lambda r: r[0])
+    return rows, skipped
+
+
+class UserFHIStore:
+    """
+    프로세스 전역 유저별 집계 캐시 (LRU). DB 가 원본이고 메모리 상태는 언제든 다시 만들 수 있다.
+    같은 유저의 쓰기/조회는 lock stripe 로 직렬화 (다른 유저끼리는 병렬).
+    """
+
+    def __init__(self, max_users: int = FHI_STATE_CACHE_SIZE):
+        self.max_users = max_users
+        self._states: "OrderedDict[int, UserFHIState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._user_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self.hits = 0
+        self.loads = 0
+        self.replays = 0
+
+    # ── 메모리 캐시 ──
+
+    def _cached(self, user_id: int) -> Optional[UserFHIState]:
+        with self._lock:
+            state = self._states.get(user_id)
+            if state is not None:
+                self._states.move_to_end(user_id)
+            return state
+
+    def _put(self, user_id: int, state: UserFHIState) -> None:
+        with self._lock:
+            self._states[user_id] = state
+            self._states.move_to_end(user_id)
+            while len(self._states) > self.max_users:
+                self._states.popitem(last=False)
+
+    def _drop(self, user_id: int) -> None:
+        with self._lock:
+            self._states.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._states.clear()
+
+    # ── DB ↔ 상태 ──
+
+    def _state(self, conn: sqlite3.Connection, user_id: int, asof_us: int) -> UserFHIState:
+        """저장된 상태 row(PK 조회 1회)와 버전이 같으면 메모리 상태, 아니면 최근 윈도우만 다시 읽음"""
+        r = conn.execute("""
+            SELECT tx_count, last_datetime, impulsive_score_sum, impulsive_n_scored,
+                   impulsive_small_count, impulsive_max_datetime
+            FROM user_fhi_state WHERE user_id = ?
+        """, (user_id,)).fetchone()
+        version = r[0] if r else 0
+
+        state = self._cached(user_id)
+        if state is not None and state.version == version and state.asof_us <= asof_us:
+            self.hits += 1
+            return state
+
+        state = UserFHIState(asof_us)
+        self.loads += 1
+        if not version:
+            return state
+
+        state.version = version
+        state.last_dt = datetime.fromisoformat(r[1])
+        detector = state.impulsive
+        detector.score_sum = r[2]
+        detector.n_scored = r[3]
+        detector.small_count = r[4]
+        bound = asof_us - SPAN_30D
+        impulsive_horizon = None
+        if r[5] is not None:
+            detector.max_dt = datetime.fromisoformat(r[5])
+            impulsive_horizon = detector.max_dt - IMPULSIVE_WINDOW
+            bound = min(bound, epoch_us(impulsive_horizon))
+        bound_dt = datetime(1970, 1, 1) + timedelta(microseconds=bound)
+
+        rows = conn.execute("""
+            SELECT datetime, amount, category FROM transactions
+            WHERE user_id = ? AND datetime >= ?
+            ORDER BY datetime, id
+        """, (user_id, _dt_key(bound_dt))).fetchall()
+        for dt_s, amount, category in rows:
+            dt = datetime.fromisoformat(dt_s)
+            # 충동 탐지기의 24h 윈도우 = 마지막 채점 거래 기준 24h 안의 채점 거래
+            if impulsive_horizon is not None and dt >= impulsive_horizon and int(amount) > 0:
+                detector.window.append(dt)
+            ts = epoch_us(dt)
+            day = dt.toordinal()
+            state.w7.push(ts, amount, day, category)
+            state.w30.push(ts, amount, day, category)
+        state.expire(asof_us)
+        return state
+
+    def _replay(self, conn: sqlite3.Connection, user_id: int, asof_us: int) -> UserFHIState:
+        # 과거 시각 거래가 끼어든 경우: 전체 이력을 시간순으로 다시 채점 (그 유저만, 드묾)
+        self.replays += 1
+        state = UserFHIState(asof_us)
+        for dt_s, amount, category in conn.execute("""
+            SELECT datetime, amount, category FROM transactions
+            WHERE user_id = ? ORDER BY datetime, id
+        """, (user_id,)):
+            state.push(datetime.fromisoformat(dt_s), amount, category)
+            state.version += 1
+        state.expire(asof_us)
+        return state
+
+    def _save_state(self, conn: sqlite3.Connection, user_id: int, state: UserFHIState) -> None:
+        detector = state.impulsive
+        conn.execute("""
+            INSERT INTO user_fhi_state (
+                user_id, tx_count, last_datetime, impulsive_score_sum, impulsive_n_scored,
+                impulsive_small_count, impulsive_max_datetime, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                tx_count = excluded.tx_count,
+                last_datetime = excluded.last_datetime,
+                impulsive_score_sum = excluded.impulsive_score_sum,
+                impulsive_n_scored = excluded.impulsive_n_scored,
+                impulsive_small_count = excluded.impulsive_small_count,
+                impulsive_max_datetime = excluded.impulsive_max_datetime,
+                updated_at = excluded.updated_at
+        """, (
+            user_id,
+            state.version,
+            _dt_key(state.last_dt) if state.last_dt is not None else None,
+            detector.score_sum,
+            detector.n_scored,
+            detector.small_count,
+            _dt_key(detector.max_dt) if detector.max_dt is not None else None,
+            now_iso(),
+        ))
+
+    # ── API ──
+
+    def add_transactions(self, conn: sqlite3.Connection, user_id: int, transactions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """거래 저장 + 집계 갱신 (commit 포함). 시간순 추가는 증분, 과거 시각이 섞이면 그 유저만 재생"""
+        rows, skipped = _normalize_rows(transactions)
+        if not rows:
+            return {"user_id": user_id, "inserted": 0, "skipped": skipped, "replayed": False}
+
+        asof_us = epoch_us(resolve_asof())
+        with self._user_locks[user_id % LOCK_STRIPES]:
+            try:
+                # 다른 worker 와 같은 유저를 동시에 쓰지 않도록 상태 row 를 읽기 전에 쓰기 잠금
+                conn.execute("BEGIN IMMEDIATE")
+                state = self._state(conn, user_id, asof_us)
+                ts = now_iso()
+                conn.executemany("""
+                    INSERT INTO transactions (user_id, datetime, amount, category, merchant, source, payment_method, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, [(user_id, _dt_key(dt), amt, cat, merchant, source, method, ts)
+                      for dt, amt, cat, merchant, source, method in rows])
+
+                replayed = state.last_dt is not None and rows[0][0] < state.last_dt
+                if replayed:
+                    state = self._replay(conn, user_id, asof_us)
+                else:
+                    for dt, amt, cat, *_ in rows:
+                        state.push(dt, amt, cat)
+                    state.version += len(rows)
+                    state.expire(asof_us)
+                self._save_state(conn, user_id, state)
+                conn.commit()
+            except BaseException:
+                self._drop(user_id)
+                raise
+            self._put(user_id, state)
+
+        return {
+            "user_id": user_id,
+            "inserted": len(rows),
+            "skipped": skipped,
+            "replayed": replayed,
+            "transaction_count": state.version,
+        }
+
+    def snapshot(self, conn: sqlite3.Connection, user_id: int, asof: Optional[datetime] = None) -> Dict[str, Any]:
+        """
+        asof(기본: resolve_asof — 현재 시각 내림) 기준 rule FHI + ML feature.
+        저장 상태 PK 조회 1회 + 만료된 거래 pop 만 수행 (거래 이력 길이와 무관)
+        """
+        asof = resolve_asof(asof)
+        asof_us = epoch_us(asof)
+        with self._user_locks[user_id % LOCK_STRIPES]:
+            state = self._state(conn, user_id, asof_us)
+            state.expire(asof_us)
+            self._put(user_id, state)
+
+            if not state.version:
+                impulsive_score, spike_score, fhi = 0.0, 0.0, 0.0
+            else:
+                impulsive_score = state.impulsive.impulsive_score
+                spike_score = state.spike()["spike_score"]
+                fhi = calculate_fhi(max(0.0, min(1.0, impulsive_score)), max(0.0, spike_score))
+            return {
+                "user_id": user_id,
+                "asof": asof.isoformat(),
+                "transaction_count": state.version,
+                "last_transaction_at": state.last_dt.isoformat() if state.last_dt is not None else None,
+                "fhi": fhi,
+                "impulsive_score": impulsive_score,
+                "spike_score": spike_score,
+                "features": state.features(),
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            cached = len(self._states)
+        return {
+            "cached_users": cached,
+            "max_users": self.max_users,
+            "hits": self.hits,
+            "loads": self.loads,
+            "replays": self.replays,
+        }
+
+
+user_fhi_store = UserFHIStore()
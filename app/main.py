@@ -1,6 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.db import init_db
+from app.db import init_db, pool_stats
+from app.catalog import policy_catalog
+from app.pagination import count_cache
+from app.response_cache import ResponseCacheMiddleware, response_cache
+from app.fhi_store import user_fhi_store
+from ml.ml_runtime.model_loader import registry as model_registry
+from utils.fhi_calculator import result_cache as fhi_result_cache
 from app.routers.scholarships import router as scholarships_router
 from app.routers.policies import router as policies_router
 from app.routers.recommendations import router as recommendations_router
@@ -15,6 +21,9 @@ app = FastAPI(
     version="2.0.0",
 )
 
+# 카탈로그 조회 응답 캐시 + ETag/304 (CORS 보다 안쪽이어야 해서 먼저 추가)
+app.add_middleware(ResponseCacheMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -25,10 +34,25 @@ app.add_middleware(
 # 서버 시작 시 DB 초기화 (테이블 생성 + 마이그레이션)
 init_db()
 
+# 서버 시작 시 정책 카탈로그 메모리 인덱스 빌드 (/recommendations 는 DB 조회 없이 채점)
+policy_catalog.get()
+
+# 서버 시작 시 LightGBM 모델 미리 로드 (요청마다 재파싱 방지)
+model_registry.warm()
+
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "models": model_registry.stats(),
+        "db_pool": pool_stats(),
+        "catalog": policy_catalog.stats(),
+        "count_cache": count_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "fhi_store": user_fhi_store.stats(),
+        "fhi_result_cache": fhi_result_cache.stats(),
+    }
 
 
 # 정책/장학금 관련
@@ -0,0 +1,152 @@
+"""
+app/pagination.py
+-----------------
+/policies, /scholarships 목록 페이지네이션
+- keyset(cursor): 마지막 row 의 정렬 키 (status_rank, start_date, id) 를 opaque cursor 로 돌려주고,
+  다음 페이지는 (status_rank, start_date, id) 인덱스에서 그 위치부터 LIMIT 건만 읽음
+  → OFFSET 처럼 앞 row 들을 건너뛰며 세지 않아서 몇 번째 페이지든 비용이 같음
+- FTS 검색(bm25 순)은 인덱스 순서가 아니라서 cursor 에 offset 을 담음 (검색 결과는 보통 짧음)
+- total_count: include_total=false 면 생략, 아니면 필터별 COUNT 캐시
+  (catalog_version 이 바뀌거나 COUNT_CACHE_TTL_SEC 가 지나면 다시 셈)
+"""
+
+import os
+import json
+import time
+import base64
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.db import get_catalog_version
+
+COUNT_CACHE_SIZE = int(os.getenv("COUNT_CACHE_SIZE", "1024"))
+# scholarships 처럼 catalog_version 을 올리지 않는 쓰기도 있어서 버전과 함께 TTL 로도 만료
+COUNT_CACHE_TTL_SEC = float(os.getenv("COUNT_CACHE_TTL_SEC", "60"))
+
+
+def encode_cursor(state: Dict[str, Any]) -> str:
+    raw = json.dumps(state, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """잘못된 cursor 면 ValueError"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        state = json.loads(raw.decode("utf-8"))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("invalid cursor") from e
+    if not isinstance(state, dict):
+        raise ValueError("invalid cursor")
+    if "o" in state:
+        if not isinstance(state["o"], int) or state["o"] < 0:
+            raise ValueError("invalid cursor")
+    elif not (isinstance(state.get("r"), int) and isinstance(state.get("i"), int)
+              and (state.get("d") is None or isinstance(state.get("d"), str))):
+        raise ValueError("invalid cursor")
+    return state
+
+
+def keyset_cursor(status_rank: int, start_date: Optional[str], row_id: int) -> str:
+    return encode_cursor({"r": status_rank, "d": start_date, "i": row_id})
+
+
+def order_sql(alias: str) -> str:
+    # ORDER BY CASE status(진행중→예정→마감→나머지), start_date DESC, id DESC 와 같은 순서
+    return f"{alias}.status_rank DESC, {alias}.start_date DESC, {alias}.id DESC"
+
+
+def _segments(alias: str, state: Optional[Dict[str, Any]]) -> List[Tuple[List[str], List[Any]]]:
+    """
+    cursor 다음 row 들을 인덱스 range 검색 몇 개로 나눔 (순서대로 이어 붙이면 전체 정렬 순서)
+    start_date 가 NULL 인 row 는 같은 status_rank 안에서 맨 뒤라 (row value 비교는 NULL 에서 멈추므로) 따로 읽음
+    """
+    if state is None:
+        return [([], [])]
+    a = alias
+    r, d, i = state["r"], state["d"], state["i"]
+    if d is None:
+        return [
+            ([f"{a}.status_rank = ?", f"{a}.start_date IS NULL", f"{a}.id < ?"], [r, i]),
+            ([f"{a}.status_rank < ?"], [r]),
+        ]
+    return [
+        ([f"{a}.status_rank = ?", f"({a}.start_date, {a}.id) < (?, ?)"], [r, d, i]),
+        ([f"{a}.status_rank = ?", f"{a}.start_date IS NULL"], [r]),
+        ([f"{a}.status_rank < ?"], [r]),
+    ]
+
+
+def keyset_page(
+    conn,
+    select_sql: str,
+    from_sql: str,
+    where: List[str],
+    params: List[Any],
+    alias: str,
+    state: Optional[Dict[str, Any]],
+    limit: int,
+) -> List[Any]:
+    """
+    정렬 순서(status_rank DESC, start_date DESC, id DESC)로 cursor 다음 limit 건
+    select_sql 마지막 세 컬럼은 status_rank, start_date, id 여야 next_cursor 를 만들 수 있음
+    """
+    rows: List[Any] = []
+    for cond, cond_params in _segments(alias, state):
+        conds = where + cond
+        where_sql = (" WHERE " + " AND ".join(conds)) if conds else ""
+        rows += conn.execute(
+            f"SELECT {select_sql} FROM {from_sql}{where_sql} ORDER BY {order_sql(alias)} LIMIT ?",
+            params + cond_params + [limit - len(rows)],
+        ).fetchall()
+        if len(rows) >= limit:
+            break
+    return rows
+
+
+class CountCache:
+    """
+    (FROM, WHERE, 파라미터) → COUNT(*) LRU 캐시 (thread-safe, hit/miss 카운터)
+    스크롤하는 클라이언트가 페이지마다 같은 필터로 COUNT 를 다시 돌리지 않도록
+    """
+
+    def __init__(self, maxsize: int = COUNT_CACHE_SIZE, ttl: float = COUNT_CACHE_TTL_SEC):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Any, Tuple[int, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def count(self, conn, from_sql: str, where_sql: str, params: List[Any]) -> int:
+        version = get_catalog_version(conn)
+        key = (from_sql, where_sql, tuple(params))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] == version and now - entry[1] < self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        n = conn.execute(f"SELECT COUNT(*) FROM {from_sql}{where_sql}", params).fetchone()[0]
+        if self.maxsize > 0:
+            with self._lock:
+                self._data[key] = (version, now, n)
+                self._data.move_to_end(key)
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return n
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._data), "maxsize": self.maxsize, "ttl_sec": self.ttl,
+                "hits": self.hits, "misses": self.misses}
+
+
+count_cache = CountCache()
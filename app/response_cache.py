@@ -0,0 +1,263 @@
+"""
+app/response_cache.py
+---------------------
+카탈로그 조회 응답 캐시 (GET /policies, /policies/{id}, /scholarships, /scholarships/{id})
+- 경로 + 정규화한 쿼리 파라미터 → 직렬화된 JSON 바이트 LRU 캐시
+  hit 이면 라우터를 거치지 않으므로 DB 조회도 JSON 직렬화도 없음
+- catalog_meta.catalog_version 이 바뀌면(수집 스크립트, eligibility 수정) 전부 버림.
+  버전 확인은 RESPONSE_CACHE_CHECK_INTERVAL_SEC 마다 1회 (같은 프로세스의 수정은 invalidate() 로 바로)
+  SQLite 조회라서 threadpool 에서 실행 (이벤트 루프가 풀 커넥션을 기다리며 멈추지 않도록)
+- 강한 ETag(본문 sha1) + Cache-Control: no-cache → 클라이언트는 If-None-Match 로 재검증, 같으면 304 (본문 없음)
+"""
+
+import os
+import re
+import time
+import hashlib
+import inspect
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl
+
+from starlette.concurrency import run_in_threadpool
+
+from app.db import db_conn, get_catalog_version
+from app.routers.policies import list_policies
+from app.routers.scholarships import list_scholarships
+
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "2048"))
+RESPONSE_CACHE_MAX_MB = float(os.getenv("RESPONSE_CACHE_MAX_MB", "64"))
+RESPONSE_CACHE_CHECK_INTERVAL_SEC = float(os.getenv("RESPONSE_CACHE_CHECK_INTERVAL_SEC", "1"))
+# scholarships 처럼 catalog_version 을 올리지 않는 쓰기도 있어서 버전과 함께 TTL 로도 만료 (본문이 같으면 ETag 도 같음)
+RESPONSE_CACHE_TTL_SEC = float(os.getenv("RESPONSE_CACHE_TTL_SEC", "60"))
+
+CACHE_CONTROL = b"no-cache"
+DETAIL_PATH = re.compile(r"^/(policies|scholarships)/\d+$")
+TRUE_VALUES = {"1", "true", "on", "yes", "y", "t"}
+FALSE_VALUES = {"0", "false", "off", "no", "n", "f"}
+
+
+def _query_defaults(endpoint: Callable) -> Dict[str, Any]:
+    """라우터 함수 시그니처의 Query 기본값 (요청 값이 기본값과 같으면 캐시 키에서 뺌)"""
+    out = {}
+    for name, param in inspect.signature(endpoint).parameters.items():
+        default = param.default
+        out[name] = getattr(default, "default", default)
+    return out
+
+
+LIST_ROUTES = {
+    "/policies": _query_defaults(list_policies),
+    "/scholarships": _query_defaults(list_scholarships),
+}
+
+
+def _norm_value(value: str, default: Any) -> Any:
+    """FastAPI 가 같은 값으로 파싱하는 입력은 같은 키로 (앞뒤 공백, 020 == 20, yes == true)"""
+    value = value.strip()
+    if isinstance(default, bool):
+        low = value.lower()
+        return True if low in TRUE_VALUES else False if low in FALSE_VALUES else value
+    if isinstance(default, int):
+        try:
+            return int(value)
+        except ValueError:
+            return value
+    return value or None
+
+
+def cache_key(path: str, query_string: bytes) -> Optional[Tuple[Any, ...]]:
+    """캐시 대상이 아니면 None. 모르는 파라미터(?_=timestamp 등)는 라우터도 무시하므로 키에서도 뺌"""
+    if DETAIL_PATH.match(path):
+        return (path,)
+    defaults = LIST_ROUTES.get(path)
+    if defaults is None:
+        return None
+    # 같은 이름이 여러 번 오면 FastAPI 처럼 마지막 값
+    query = dict(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True))
+    items = []
+    for name, default in defaults.items():
+        if name in query:
+            value = _norm_value(query[name], default)
+            if value != default:
+                items.append((name, value))
+    return (path, tuple(items))
+
+
+def make_etag(body: bytes) -> bytes:
+    return b'"' + hashlib.sha1(body).hexdigest().encode("ascii") + b'"'
+
+
+def etag_matches(if_none_match: Optional[bytes], etag: bytes) -> bool:
+    # If-None-Match 는 weak 비교 (W/ 접두어 무시), "*" 는 항상 일치
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(b","):
+        tag = tag.strip()
+        if tag == b"*" or (tag[2:] if tag.startswith(b"W/") else tag) == etag:
+            return True
+    return False
+
+
+class CachedResponse:
+    __slots__ = ("version", "created_at", "headers", "body", "etag")
+
+    def __init__(self, version: int, headers: List[Tuple[bytes, bytes]], body: bytes):
+        self.version = version
+        self.created_at = time.monotonic()
+        self.etag = make_etag(body)
+        self.headers = [(k, v) for k, v in headers if k.lower() not in (b"etag", b"cache-control")]
+        self.headers += [(b"etag", self.etag), (b"cache-control", CACHE_CONTROL)]
+        self.body = body
+
+
+class ResponseCache:
+    """
+    cache_key → CachedResponse LRU 캐시 (thread-safe, hit/miss 카운터)
+    건수(RESPONSE_CACHE_SIZE)와 본문 총 크기(RESPONSE_CACHE_MAX_MB) 둘 다 넘지 않게 오래된 것부터 버림
+    """
+
+    def __init__(
+        self,
+        maxsize: int = RESPONSE_CACHE_SIZE,
+        max_bytes: int = int(RESPONSE_CACHE_MAX_MB * 1e6),
+        ttl: float = RESPONSE_CACHE_TTL_SEC,
+        check_interval: float = RESPONSE_CACHE_CHECK_INTERVAL_SEC,
+    ):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+        self._bytes = 0
+        self._version: Optional[int] = None
+        self._checked_at = 0.0
+        self._data: "OrderedDict[Any, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check_due(self) -> bool:
+        return self._version is None or time.monotonic() - self._checked_at >= self.check_interval
+
+    def version(self) -> int:
+        """
+        현재 catalog_version (check_interval 안에서는 DB 를 다시 보지 않음). 바뀌었으면 캐시 비움
+        DB 를 볼 수 있으므로 이벤트 루프에서는 run_in_threadpool 로 호출
+        """
+        now = time.monotonic()
+        if not self.check_due():
+            return self._version
+        with db_conn() as conn:
+            version = get_catalog_version(conn)
+        with self._lock:
+            self._checked_at = now
+            if version != self._version:
+                if self._version is not None:
+                    self.invalidations += 1
+                self._data.clear()
+                self._bytes = 0
+                self._version = version
+        return version
+
+    def get(self, key: Any) -> Optional[CachedResponse]:
+        # 마지막으로 확인한 버전 기준 (DB 조회 없음 — 확인은 version())
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry.version == self._version and time.monotonic() - entry.created_at < self.ttl:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+            return None
+
+    def put(self, key: Any, entry: CachedResponse) -> None:
+        size = len(entry.body)
+        if self.maxsize <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            # 응답을 만드는 사이 버전이 바뀌었으면 저장하지 않음
+            if entry.version != self._version:
+                return
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._data[key] = entry
+            self._bytes += size
+            while len(self._data) > self.maxsize or self._bytes > self.max_bytes:
+                _, dropped = self._data.popitem(last=False)
+                self._bytes -= len(dropped.body)
+
+    def invalidate(self) -> None:
+        # 같은 프로세스에서 카탈로그를 수정한 직후 → 다음 요청에서 바로 버전 확인
+        self._checked_at = 0.0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._data), "maxsize": self.maxsize,
+                "mb": round(self._bytes / 1e6, 2), "max_mb": round(self.max_bytes / 1e6, 2),
+                "ttl_sec": self.ttl, "version": self._version,
+                "hits": self.hits, "misses": self.misses, "not_modified": self.not_modified,
+                "invalidations": self.invalidations}
+
+
+response_cache = ResponseCache()
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI 미들웨어: 캐시 대상 GET 이면 캐시에서 바로 응답 / 아니면 라우터 응답(200)을 받아 저장
+    CORSMiddleware 보다 안쪽에 둬야 캐시 응답·304 에도 CORS 헤더가 붙음 (main.py 에서 먼저 add_middleware)
+    """
+
+    def __init__(self, app, cache: ResponseCache = response_cache):
+        self.app = app
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+        key = cache_key(scope["path"], scope["query_string"])
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = dict(scope["headers"]).get(b"if-none-match")
+        # 확인 주기가 됐을 때만 DB 조회 → threadpool, 아니면 마지막으로 확인한 버전
+        version = await run_in_threadpool(self.cache.version) if self.cache.check_due() else self.cache.version()
+        entry = self.cache.get(key)
+        if entry is None:
+            start, chunks = None, []
+
+            async def capture(message):
+                nonlocal start
+                if message["type"] == "http.response.start":
+                    start = message
+                elif message["type"] == "http.response.body":
+                    chunks.append(message.get("body", b""))
+
+            await self.app(scope, receive, capture)
+            if start is None or start["status"] != 200:
+                # 오류(400/404/422 ...)는 캐시하지 않고 그대로 전달
+                if start is not None:
+                    await send(start)
+                    await send({"type": "http.response.body", "body": b"".join(chunks)})
+                return
+            entry = CachedResponse(version, start.get("headers", []), b"".join(chunks))
+            self.cache.put(key, entry)
+
+        if etag_matches(if_none_match, entry.etag):
+            self.cache.not_modified += 1
+            await send({"type": "http.response.start", "status": 304,
+                        "headers": [(b"etag", entry.etag), (b"cache-control", CACHE_CONTROL)]})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send({"type": "http.response.start", "status": 200, "headers": entry.headers})
+        await send({"type": "http.response.body", "body": entry.body})
@@ -2,7 +2,9 @@ import json
 from typing import Optional, List, Any, Dict
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
-from app.db import get_conn, now_iso
+from app.db import db_conn, now_iso, bump_catalog_version
+from app.catalog import policy_catalog
+from app.response_cache import response_cache
 
 router = APIRouter(tags=["eligibility"])
 
@@ -26,11 +28,10 @@ def _bool_to_int(v: Optional[bool]) -> Optional[int]:
 
 @router.get("/policies/{policy_id}/eligibility")
 def get_eligibility(policy_id: int) -> Dict[str, Any]:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM policy_eligibility WHERE policy_id = ?", (policy_id,))
-    r = cur.fetchone()
-    conn.close()
+    with db_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM policy_eligibility WHERE policy_id = ?", (policy_id,))
+        r = cur.fetchone()
 
     if not r:
         raise HTTPException(status_code=404, detail="Eligibility not found")
@@ -51,49 +52,51 @@ def get_eligibility(policy_id: int) -> Dict[str, Any]:
 
 @router.put("/policies/{policy_id}/eligibility")
 def upsert_eligibility(policy_id: int, payload: EligibilityUpsert) -> Dict[str, Any]:
-    conn = get_conn()
-    cur = conn.cursor()
+    with db_conn() as conn:
+        cur = conn.cursor()
 
-    # 정책 존재 확인
-    cur.execute("SELECT id FROM policies WHERE id = ?", (policy_id,))
-    if not cur.fetchone():
-        conn.close()
-        raise HTTPException(status_code=404, detail="Policy not found")
+        # 정책 존재 확인
+        cur.execute("SELECT id FROM policies WHERE id = ?", (policy_id,))
+        if not cur.fetchone():
+            raise HTTPException(status_code=404, detail="Policy not found")
 
-    ts = now_iso()
+        ts = now_iso()
 
-    cur.execute("""
-        INSERT INTO policy_eligibility
-        (policy_id, min_age, max_age, region, student_required,
-         income_type, income_max_percent, income_max_quintile,
-         keywords_json, evidence_json, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ON CONFLICT(policy_id)
-        DO UPDATE SET
-            min_age=excluded.min_age,
-            max_age=excluded.max_age,
-            region=excluded.region,
-            student_required=excluded.student_required,
-            income_type=excluded.income_type,
-            income_max_percent=excluded.income_max_percent,
-            income_max_quintile=excluded.income_max_quintile,
-            keywords_json=excluded.keywords_json,
-            evidence_json=excluded.evidence_json,
-            updated_at=excluded.updated_at;
-    """, (
-        policy_id,
-        payload.min_age,
-        payload.max_age,
-        payload.region,
-        _bool_to_int(payload.student_required),
-        payload.income_type,
-        payload.income_max_percent,
-        payload.income_max_quintile,
-        json.dumps(payload.keywords, ensure_ascii=False),
-        json.dumps(payload.evidence, ensure_ascii=False),
-        ts,
-    ))
+        cur.execute("""
+            INSERT INTO policy_eligibility
+            (policy_id, min_age, max_age, region, student_required,
+             income_type, income_max_percent, income_max_quintile,
+             keywords_json, evidence_json, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(policy_id)
+            DO UPDATE SET
+                min_age=excluded.min_age,
+                max_age=excluded.max_age,
+                region=excluded.region,
+                student_required=excluded.student_required,
+                income_type=excluded.income_type,
+                income_max_percent=excluded.income_max_percent,
+                income_max_quintile=excluded.income_max_quintile,
+                keywords_json=excluded.keywords_json,
+                evidence_json=excluded.evidence_json,
+                updated_at=excluded.updated_at;
+        """, (
+            policy_id,
+            payload.min_age,
+            payload.max_age,
+            payload.region,
+            _bool_to_int(payload.student_required),
+            payload.income_type,
+            payload.income_max_percent,
+            payload.income_max_quintile,
+            json.dumps(payload.keywords, ensure_ascii=False),
+            json.dumps(payload.evidence, ensure_ascii=False),
+            ts,
+        ))
 
-    conn.commit()
-    conn.close()
+        # 카탈로그(추천 인덱스, 조회 응답 캐시)가 다음 요청에서 바로 새 버전을 보도록
+        bump_catalog_version(conn)
+        conn.commit()
+    policy_catalog.invalidate()
+    response_cache.invalidate()
     return {"policy_id": policy_id, "updated_at": ts}
\ No newline at end of file
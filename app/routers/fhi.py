@@ -4,16 +4,24 @@ app/routers/fhi.py
 FHI(금융건강지수) 분석 및 코칭카드 라우터
 """
 
-import random
-from typing import List, Dict, Any
-from fastapi import APIRouter
+import os
+import json
+import time
+from datetime import datetime
+from typing import List, Dict, Any, AsyncIterator, Iterable, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from mock.push_emulator import get_random_push
 from utils.parser import parse_push_notification
 from utils.category_rules import categorize_store
-from utils.fhi_calculator import calculate_fhi_from_transactions
+from utils.fhi_calculator import calculate_fhi_from_transactions, calculate_fhi_rule_and_ml, result_cache
+from utils.transaction_batch import TransactionBatch, resolve_asof
 from ml.ml_runtime.feature_builder import build_features_from_transactions
+from ml.ml_runtime.model_loader import registry as model_registry
+from ml.ml_runtime.card_engine import card_engine
 
 router = APIRouter(tags=["fhi"])
 
@@ -22,38 +30,9 @@ VALID_CATEGORIES = {
     "housing", "entertainment", "subscription", "other"
 }
 
-FALLBACK_CARDS = [
-    {
-        "title": "텀블러 챙기기",
-        "diagnosis": "카페 지출을 조금만 줄여도 차이가 생겨요.",
-        "coaching": "오늘은 음료를 사기 전에 집에서 물이나 커피를 챙겨보세요.",
-        "mission": "오늘 카페 음료 1회 참기",
-    },
-    {
-        "title": "간식 쉬어가기",
-        "diagnosis": "소액 지출이 반복되면 생각보다 크게 쌓여요.",
-        "coaching": "편의점 간식을 바로 사기보다 집에 있는 음식부터 확인해보세요.",
-        "mission": "오늘 편의점 방문 1번 줄이기",
-    },
-    {
-        "title": "배달 대신 한 끼",
-        "diagnosis": "식비가 새는 순간은 생각보다 자주 와요.",
-        "coaching": "배달 대신 간단한 집밥이나 학교 식당을 선택해보면 부담이 줄어요.",
-        "mission": "오늘 한 끼는 배달 대신 다른 선택하기",
-    },
-    {
-        "title": "이동비 아끼기",
-        "diagnosis": "짧은 거리 이동도 쌓이면 부담이 돼요.",
-        "coaching": "가까운 거리는 걷거나 자전거를 타면 지출도 줄고 기분도 환기돼요.",
-        "mission": "오늘 1회는 걸어서 이동하기",
-    },
-    {
-        "title": "오늘 지출 멈춤",
-        "diagnosis": "지출 흐름을 잠깐 끊는 것만으로도 조절감이 생겨요.",
-        "coaching": "오늘은 꼭 필요한 것 외에는 결제하지 않는 하루를 만들어보세요.",
-        "mission": "오늘 충동 결제 0회 도전",
-    },
-]
+# /fhi/parse/batch: 한 번에 threadpool 로 넘기는 항목 수
+PARSE_BATCH_CHUNK = int(os.getenv("PARSE_BATCH_CHUNK", "500"))
+EMPTY_TEXT_ERROR = "text 필드가 비어있습니다"
 
 
 class RefreshRequest(BaseModel):
@@ -66,6 +45,18 @@ class RefreshRequest(BaseModel):
 
 class TransactionRequest(BaseModel):
     transactions: List[Dict[str, Any]]
+    # 분석 기준 시각. 없으면 서버 현재 시각(FHI_ASOF_GRANULARITY_SEC 단위 내림)
+    asof: Optional[datetime] = None
+
+
+class BatchUserTransactions(BaseModel):
+    user_id: Any
+    transactions: List[Dict[str, Any]]
+
+
+class BatchAnalyzeRequest(BaseModel):
+    users: List[BatchUserTransactions]
+    asof: Optional[datetime] = None
 
 
 def _fhi_grade(fhi: float) -> str:
@@ -84,108 +75,268 @@ def _build_demo_transactions() -> List[Dict[str, Any]]:
     return txs
 
 
-def _safe_generate_card(
-    fhi: float,
-    features: Dict[str, Any],
-    impulsive_score: float,
-    spike_score: float,
-    current_titles: List[str] = None,
-) -> Dict[str, Any]:
-    current_titles = current_titles or []
-    try:
-        from ml.src.coaching_card import generate_coaching_card
-        card = generate_coaching_card(
-            fhi=fhi,
-            features=features,
-            impulsive_score=impulsive_score,
-            spike_score=spike_score,
-            current_titles=current_titles,
-        )
-        if not card.get("title"):
-            raise ValueError("빈 카드")
-        return card
-    except Exception:
-        candidates = [c for c in FALLBACK_CARDS if c["title"] not in current_titles]
-        if not candidates:
-            candidates = FALLBACK_CARDS
-        card = random.choice(candidates).copy()
-        card["fhi"] = fhi
-        card["grade"] = _fhi_grade(fhi)
-        card["raw"] = "fallback"
-        return card
-
-
-def _analyze_transactions(txs: List[Dict[str, Any]]) -> Dict[str, Any]:
-    rule_result = calculate_fhi_from_transactions(txs, mode="rule")
-    ml_result = calculate_fhi_from_transactions(txs, mode="ml")
-    from datetime import datetime
-    features = build_features_from_transactions(txs, asof=datetime.now())
-
-    fhi = rule_result["fhi"]
-    fhi_predicted = ml_result["fhi"]
-    impulsive_score = rule_result["impulsive"].get("impulsive_score", 0.0)
-    spike_score = rule_result["spike"].get("spike_score", 0.0)
-
-    cards = []
-    current_titles = []
-    for _ in range(3):
-        card = _safe_generate_card(
-            fhi=fhi,
-            features=features,
-            impulsive_score=impulsive_score,
-            spike_score=spike_score,
-            current_titles=current_titles,
-        )
-        current_titles.append(card["title"])
-        cards.append(card)
+def _categorize_transactions(txs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    for tx in txs:
+        existing = tx.get("category", "")
+        # 이미 유효한 영어 카테고리면 유지, 아니면 merchant명으로 재분류
+        if existing not in VALID_CATEGORIES:
+            tx["category"] = categorize_store(tx.get("merchant", ""))
+    return txs
 
-    return {
-        "fhi": fhi,
-        "fhi_predicted": fhi_predicted,
-        "grade": _fhi_grade(fhi),
-        "impulsive_score": impulsive_score,
-        "spike_score": spike_score,
-        "features": features,
-        "cards": cards,
-    }
+
+def _score_transactions(txs: List[Dict[str, Any]], asof: datetime) -> Dict[str, Any]:
+    # 파싱/검증은 한 번만 하고 rule·ml·feature 계산이 같은 batch 와 같은 asof 를 공유
+    batch = TransactionBatch.from_transactions(txs)
+    key = result_cache.key(batch, asof)
+    result = result_cache.get(key)
+    if result is None:
+        rule_result, ml_result = calculate_fhi_rule_and_ml(batch, asof=asof)
+        features = build_features_from_transactions(batch, asof=asof)
+
+        fhi = rule_result["fhi"]
+        result = {
+            "asof": asof.isoformat(),
+            "fhi": fhi,
+            "fhi_predicted": ml_result["fhi"],
+            "grade": _fhi_grade(fhi),
+            "impulsive_score": rule_result["impulsive"].get("impulsive_score", 0.0),
+            "spike_score": rule_result["spike"].get("spike_score", 0.0),
+            "features": features,
+        }
+        result_cache.set(key, result)
+    # 캐시된 dict 는 공유되므로 응답용 사본 (cards 등을 덧붙임)
+    return {**result, "features": dict(result["features"])}
+
+
+async def _analyze_transactions(txs: List[Dict[str, Any]], asof: Optional[datetime] = None) -> Dict[str, Any]:
+    # CPU 계산은 threadpool 에서, 코칭카드 3장은 event loop 에서 동시에 생성
+    result = await run_in_threadpool(_score_transactions, txs, resolve_asof(asof))
+    result["cards"] = await card_engine.generate_cards(
+        fhi=result["fhi"],
+        features=result["features"],
+        impulsive_score=result["impulsive_score"],
+        spike_score=result["spike_score"],
+        n=3,
+    )
+    return result
 
 
 @router.post("/fhi/demo")
-def fhi_demo() -> Dict[str, Any]:
+async def fhi_demo() -> Dict[str, Any]:
     txs = _build_demo_transactions()
-    return _analyze_transactions(txs)
+    return await _analyze_transactions(txs)
 
 
 @router.post("/fhi/analyze")
-def fhi_analyze(req: TransactionRequest) -> Dict[str, Any]:
-    txs = req.transactions
+async def fhi_analyze(req: TransactionRequest) -> Dict[str, Any]:
+    txs = _categorize_transactions(req.transactions)
+    return await _analyze_transactions(txs, req.asof)
+
+
+@router.post("/fhi/analyze/batch")
+def fhi_analyze_batch(req: BatchAnalyzeRequest) -> Dict[str, Any]:
+    """
+    여러 유저 일괄 재채점 (야간 배치용). 코칭카드는 생성하지 않음.
+    ML 예측은 전체 유저의 feature 를 모아 booster.predict 1회로 처리한다.
+    모든 유저가 같은 asof 기준으로 채점된다.
+    """
+    asof = resolve_asof(req.asof)
+    rows = []
+    features_list = []
+    for u in req.users:
+        txs = _categorize_transactions(u.transactions)
+        batch = TransactionBatch.from_transactions(txs)
+        rule_result = calculate_fhi_from_transactions(batch, mode="rule", asof=asof)
+        features = build_features_from_transactions(batch, asof=asof)
+        rows.append((u.user_id, txs, rule_result))
+        features_list.append(features)
+
+    try:
+        preds = model_registry.get().predict_many(features_list)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    results = []
+    for (user_id, txs, rule_result), pred in zip(rows, preds):
+        fhi = rule_result["fhi"]
+        results.append({
+            "user_id": user_id,
+            "fhi": fhi,
+            # calculate_fhi_from_transactions 와 동일하게 거래가 없으면 0.0
+            "fhi_predicted": round(float(pred), 2) if txs else 0.0,
+            "grade": _fhi_grade(fhi),
+            "impulsive_score": rule_result["impulsive"].get("impulsive_score", 0.0),
+            "spike_score": rule_result["spike"].get("spike_score", 0.0),
+        })
+
+    return {"asof": asof.isoformat(), "count": len(results), "results": results}
+
+
+def _parse_and_categorize(text: str) -> List[Dict[str, Any]]:
+    # 파싱 실패는 예외로 올림 (호출하는 쪽에서 항목별 오류로 보고)
+    txs = parse_push_notification(text, raise_errors=True)
     for tx in txs:
-        existing = tx.get("category", "")
-        # 이미 유효한 영어 카테고리면 유지, 아니면 merchant명으로 재분류
-        if existing not in VALID_CATEGORIES:
-            tx["category"] = categorize_store(tx.get("merchant", ""))
-    return _analyze_transactions(txs)
+        tx["category"] = categorize_store(tx.get("merchant", ""))
+        if hasattr(tx.get("datetime"), "isoformat"):
+            tx["datetime"] = tx["datetime"].isoformat()
+    return txs
 
 
 @router.post("/fhi/parse")
 def fhi_parse_push(body: Dict[str, str]) -> Dict[str, Any]:
     text = body.get("text", "")
     if not text:
-        return {"transactions": [], "error": "text 필드가 비어있습니다"}
-    txs = parse_push_notification(text)
-    for tx in txs:
-        tx["category"] = categorize_store(tx.get("merchant", ""))
-        if hasattr(tx.get("datetime"), "isoformat"):
-            tx["datetime"] = tx["datetime"].isoformat()
-    return {"transactions": txs}
+        return {"transactions": [], "error": EMPTY_TEXT_ERROR}
+    try:
+        return {"transactions": _parse_and_categorize(text)}
+    except Exception as e:
+        return {"transactions": [], "error": f"{type(e).__name__}: {e}"}
+
+
+def _parse_batch_item(index: int, item: Any) -> Dict[str, Any]:
+    """
+    item: 푸시 문자열 | {"id": ..., "text": ...} | NDJSON 줄 디코딩 실패(ValueError)
+    → {"index", ("id"), "transactions"} 또는 {"index", ("id"), "error"}
+    """
+    out: Dict[str, Any] = {"index": index}
+    if isinstance(item, ValueError):
+        out["error"] = f"invalid JSON line: {item}"
+        return out
+    if isinstance(item, dict):
+        if "id" in item:
+            out["id"] = item["id"]
+        text = item.get("text")
+    else:
+        text = item
+    if not isinstance(text, str):
+        out["error"] = "text 는 문자열이어야 합니다"
+    elif not text:
+        out["error"] = EMPTY_TEXT_ERROR
+    else:
+        try:
+            out["transactions"] = _parse_and_categorize(text)
+        except Exception as e:
+            out["error"] = f"{type(e).__name__}: {e}"
+    return out
+
+
+def _parse_batch_chunk(chunk: List[Tuple[int, Any]]) -> Tuple[bytes, int, int]:
+    # chunk 전체를 threadpool 에서 처리 → (NDJSON bytes, 성공 수, 거래 수)
+    lines = []
+    ok = n_tx = 0
+    for index, item in chunk:
+        res = _parse_batch_item(index, item)
+        if "error" not in res:
+            ok += 1
+            n_tx += len(res["transactions"])
+        lines.append(json.dumps(res, ensure_ascii=False))
+    return ("\n".join(lines) + "\n").encode("utf-8"), ok, n_tx
+
+
+async def _ndjson_items(stream: AsyncIterator[bytes]) -> AsyncIterator[Any]:
+    # 요청 본문을 받는 대로 줄 단위로 디코딩 (전체 본문 bytes 를 한 번에 올리지 않음)
+    buf = b""
+    async for data in stream:
+        buf += data
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield _decode_line(line)
+    if buf.strip():
+        yield _decode_line(buf)
+
+
+def _decode_line(line: bytes) -> Any:
+    try:
+        return json.loads(line)
+    except ValueError as e:
+        return ValueError(str(e))
+
+
+async def _iter_items(items: Iterable[Any]) -> AsyncIterator[Any]:
+    for item in items:
+        yield item
+
+
+async def _stream_parse_results(items: AsyncIterator[Any]) -> AsyncIterator[bytes]:
+    t0 = time.perf_counter()
+    count = ok = n_tx = 0
+    chunk: List[Tuple[int, Any]] = []
+
+    async def flush():
+        nonlocal ok, n_tx
+        body, c_ok, c_tx = await run_in_threadpool(_parse_batch_chunk, chunk)
+        ok += c_ok
+        n_tx += c_tx
+        return body
+
+    async for item in items:
+        chunk.append((count, item))
+        count += 1
+        if len(chunk) >= PARSE_BATCH_CHUNK:
+            yield await flush()
+            chunk = []
+    if chunk:
+        yield await flush()
+
+    summary = {
+        "count": count,
+        "ok": ok,
+        "errors": count - ok,
+        "transactions": n_tx,
+        "elapsed_ms": round((time.perf_counter() - t0) * 1000, 2),
+    }
+    yield (json.dumps({"summary": summary}, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+@router.post("/fhi/parse/batch")
+async def fhi_parse_push_batch(request: Request) -> StreamingResponse:
+    """
+    푸시 알림 일괄 파싱 (한 달치 푸시 재처리 등)
+    - 본문: JSON 배열 또는 NDJSON (Content-Type: application/x-ndjson, 한 줄에 항목 하나)
+      항목은 푸시 문자열 또는 {"id": ..., "text": ...}
+    - 응답: NDJSON 스트림. 항목마다 {"index", "id"?, "transactions"} 또는 {"index", "id"?, "error"},
+      마지막 줄은 {"summary": {count, ok, errors, transactions, elapsed_ms}}
+    """
+    content_type = request.headers.get("content-type", "")
+    if "ndjson" in content_type or "jsonl" in content_type:
+        # 본문은 도착하는 대로 줄 단위 디코딩. 응답 스트리밍이 시작되면 (ASGI < 2.4 서버에서)
+        # receive 채널을 연결 끊김 감지가 가져가므로 본문은 응답 전에 모두 읽어 둔다
+        items = _iter_items([item async for item in _ndjson_items(request.stream())])
+    else:
+        try:
+            body = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="JSON 배열 또는 NDJSON 본문이 필요합니다")
+        if not isinstance(body, list):
+            raise HTTPException(status_code=400, detail="JSON 배열 또는 NDJSON 본문이 필요합니다")
+        items = _iter_items(body)
+    return StreamingResponse(_stream_parse_results(items), media_type="application/x-ndjson")
 
 
 @router.post("/fhi/refresh-card")
-def fhi_refresh_card(req: RefreshRequest) -> Dict[str, Any]:
-    return _safe_generate_card(
+async def fhi_refresh_card(req: RefreshRequest) -> Dict[str, Any]:
+    return await card_engine.generate_card(
         fhi=req.fhi,
         features=req.features,
         impulsive_score=req.impulsive_score,
         spike_score=req.spike_score,
         current_titles=req.current_titles,
-    )
\ No newline at end of file
+    )
+
+
+@router.post("/fhi/model/reload")
+def fhi_model_reload() -> Dict[str, Any]:
+    # 모델 파일 교체 후 명시적으로 재로드 (실패하면 기존 모델 유지)
+    try:
+        model = model_registry.reload()
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    # 캐시된 fhi_predicted 는 이전 모델 기준
+    result_cache.clear()
+    return {
+        "model_path": model.model_path,
+        "load_time_ms": model.load_time_ms,
+        "size_bytes": model.size_bytes,
+        "num_trees": model.num_trees,
+    }
@@ -1,12 +1,17 @@
 from typing import Optional, List, Dict, Any
 from fastapi import APIRouter, Query, HTTPException
-from app.db import get_conn
+from app.db import db_conn, fts_match_query
+from app.pagination import count_cache, decode_cursor, encode_cursor, keyset_cursor, keyset_page, order_sql
 
 router = APIRouter(tags=["policies"])
 
 # category는 일단 자유롭게 두고, status만 제한(오타 방지)
 ALLOWED_STATUS = {"진행중", "예정", "마감", "정보없음"}
 
+# 검색 랭킹: name, provider, condition, benefit 순 bm25 가중치
+BM25_WEIGHTS = "10.0, 3.0, 1.0, 1.0"
+SNIPPET_TOKENS = 32  # trigram 토큰 ≒ 글자 수
+
 
 @router.get("/policies")
 def list_policies(
@@ -15,61 +20,82 @@ def list_policies(
     status: Optional[str] = Query(default=None, description="진행중/예정/마감/정보없음"),
     limit: int = Query(default=20, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="이전 응답의 next_cursor (offset 대신, 깊은 페이지도 일정한 속도)"),
+    include_total: bool = Query(default=True, description="false 면 total_count 계산 생략 (null)"),
 ) -> Dict[str, Any]:
 
-    where = []
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="cursor 와 offset 은 함께 쓸 수 없습니다")
+    try:
+        state = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # 소스 목록에서 사라진 정책(removed_at)은 목록에서 제외 (상세 조회는 가능)
+    where = ["p.removed_at IS NULL"]
     params: List[Any] = []
+    match = fts_match_query(q)
 
-    if q:
+    if match:
+        where.append("policies_fts MATCH ?")
+        params.append(match)
+    elif q:
         kw = f"%{q.strip()}%"
-        where.append("(name LIKE ? OR provider LIKE ? OR condition LIKE ? OR benefit LIKE ?)")
+        where.append("(p.name LIKE ? OR p.provider LIKE ? OR p.condition LIKE ? OR p.benefit LIKE ?)")
         params += [kw, kw, kw, kw]
 
     if category:
-        where.append("category = ?")
+        where.append("p.category = ?")
         params.append(category.strip())
 
     if status:
         s = status.strip()
         if s in ALLOWED_STATUS:
-            where.append("status = ?")
+            where.append("p.status = ?")
             params.append(s)
 
-    where_sql = (" WHERE " + " AND ".join(where)) if where else ""
-
-    conn = get_conn()
-    cur = conn.cursor()
-
-    # total_count
-    cur.execute(f"SELECT COUNT(*) FROM policies{where_sql}", params)
-    total_count = cur.fetchone()[0]
-
-    # items
-    cur.execute(
-        f"""
-        SELECT
-            id, policy_key, name, category, provider,
-            period, start_date, end_date, status,
-            link, condition, benefit,
-            source, source_id, fetched_at
-        FROM policies
-        {where_sql}
-        ORDER BY
-            CASE status
-                WHEN '진행중' THEN 1
-                WHEN '예정' THEN 2
-                WHEN '마감' THEN 3
-                ELSE 4
-            END,
-            start_date DESC,
-            id DESC
-        LIMIT ? OFFSET ?
-        """,
-        params + [limit, offset],
-    )
-
-    rows = cur.fetchall()
-    conn.close()
+    where_sql = " WHERE " + " AND ".join(where)
+
+    # FTS 검색이면 인덱스에서 후보를 찾고 bm25(이름 가중) 순 + snippet, 아니면 상태/최신순 (status_rank 인덱스)
+    if match:
+        from_sql = "policies p JOIN policies_fts ON policies_fts.rowid = p.id"
+        snippet_sql = f"snippet(policies_fts, -1, '', '', '…', {SNIPPET_TOKENS})"
+    else:
+        from_sql = "policies p"
+        snippet_sql = "NULL"
+
+    select_sql = f"""
+        p.id, p.policy_key, p.name, p.category, p.provider,
+        p.period, p.start_date, p.end_date, p.status,
+        p.link, p.condition, p.benefit,
+        p.source, p.source_id, p.fetched_at,
+        {snippet_sql}, p.status_rank, p.start_date, p.id
+    """
+
+    with db_conn() as conn:
+        total_count = count_cache.count(conn, from_sql, where_sql, params) if include_total else None
+
+        if match or (state is None and offset):
+            # bm25 순 / offset 요청: LIMIT OFFSET (FTS cursor 는 offset 을 담고 있음)
+            if state is not None:
+                if "o" not in state:
+                    raise HTTPException(status_code=400, detail="Invalid cursor")
+                offset = state["o"]
+            rank_sql = f"bm25(policies_fts, {BM25_WEIGHTS})," if match else ""
+            rows = conn.execute(
+                f"SELECT {select_sql} FROM {from_sql}{where_sql} ORDER BY {rank_sql} {order_sql('p')} LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        else:
+            if state is not None and "o" in state:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            rows = keyset_page(conn, select_sql, from_sql, where, params, "p", state, limit)
+
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = (encode_cursor({"o": offset + len(rows)}) if match
+                       else keyset_cursor(last[16], last[17], last[18]))
 
     items = [
         {
@@ -88,6 +114,7 @@ def list_policies(
             "source": r[12],
             "source_id": r[13],
             "fetched_at": r[14],
+            **({"snippet": r[15]} if match else {}),
         }
         for r in rows
     ]
@@ -96,31 +123,31 @@ def list_policies(
         "total_count": total_count,
         "limit": limit,
         "offset": offset,
+        "next_cursor": next_cursor,
         "items": items,
     }
 
 
 @router.get("/policies/{policy_id}")
 def get_policy(policy_id: int) -> Dict[str, Any]:
-    conn = get_conn()
-    cur = conn.cursor()
-
-    cur.execute(
-        """
-        SELECT
-            id, policy_key, name, category, provider,
-            period, start_date, end_date, status,
-            link, condition, benefit,
-            source, source_id, fetched_at,
-            raw_json
-        FROM policies
-        WHERE id = ?
-        """,
-        (policy_id,),
-    )
-
-    r = cur.fetchone()
-    conn.close()
+    with db_conn() as conn:
+        cur = conn.cursor()
+
+        cur.execute(
+            """
+            SELECT
+                id, policy_key, name, category, provider,
+                period, start_date, end_date, status,
+                link, condition, benefit,
+                source, source_id, fetched_at,
+                raw_json, removed_at
+            FROM policies
+            WHERE id = ?
+            """,
+            (policy_id,),
+        )
+
+        r = cur.fetchone()
 
     if not r:
         raise HTTPException(status_code=404, detail="Policy not found")
@@ -142,4 +169,5 @@ def get_policy(policy_id: int) -> Dict[str, Any]:
         "source_id": r[13],
         "fetched_at": r[14],
         "raw_json": r[15],
+        "removed_at": r[16],
     }
\ No newline at end of file
@@ -1,7 +1,8 @@
 from typing import List, Optional, Dict, Any, Tuple
+import numpy as np
 from fastapi import APIRouter
 from pydantic import BaseModel, Field
-from app.db import get_conn
+from app.catalog import CatalogSnapshot, policy_catalog
 
 router = APIRouter(tags=["recommendations"])
 
@@ -75,25 +76,20 @@ def _find_snippet(text: str, keyword: str, window: int) -> Optional[str]:
     return snippet
 
 
-def _collect_snippets(policy: Dict[str, Any], req: RecommendationRequest) -> List[Dict[str, str]]:
+def _collect_snippets(snap: CatalogSnapshot, pos: int, req: RecommendationRequest) -> List[Dict[str, str]]:
     if not req.include_snippets:
         return []
 
-    condition = _norm(policy.get("condition"))
-    benefit = _norm(policy.get("benefit"))
-    name = _norm(policy.get("name"))
-    provider = _norm(policy.get("provider"))
-
     window = req.snippet_window
     kws = _all_keywords(req)
 
     snippets: List[Dict[str, str]] = []
     # 우선순위: name -> condition -> benefit -> provider
     sources: List[Tuple[str, str]] = [
-        ("name", name),
-        ("condition", condition),
-        ("benefit", benefit),
-        ("provider", provider),
+        ("name", snap.names[pos]),
+        ("condition", snap.conditions[pos]),
+        ("benefit", snap.benefits[pos]),
+        ("provider", snap.providers[pos]),
     ]
 
     for kw in kws:
@@ -109,15 +105,10 @@ def _collect_snippets(policy: Dict[str, Any], req: RecommendationRequest) -> Lis
     return snippets
 
 
-def _score_policy(p: Dict[str, Any], req: RecommendationRequest) -> Dict[str, Any]:
-    name = _norm(p.get("name"))
-    category = _norm(p.get("category"))
-    provider = _norm(p.get("provider"))
-    status = _norm(p.get("status"))
-    condition = _norm(p.get("condition"))
-    benefit = _norm(p.get("benefit"))
-
-    blob = " ".join([name, category, provider, status, condition, benefit])
+def _score_policy(snap: CatalogSnapshot, pos: int, req: RecommendationRequest) -> Dict[str, Any]:
+    # 텍스트 조건은 카탈로그 인덱스로 판정 — blob 에 대한 `in` 과 동일
+    category = snap.categories[pos]
+    status = snap.statuses[pos]
 
     score = 0
     reasons: List[str] = []
@@ -143,20 +134,19 @@ def _score_policy(p: Dict[str, Any], req: RecommendationRequest) -> Dict[str, An
     # 지역(텍스트 매칭)
     if req.region:
         r = req.region.strip()
-        if r and (r in blob or ("전국" in blob)):
+        if r and (snap.contains(snap.find(r), pos) or snap.contains(snap.nationwide, pos)):
             score += 15
             reasons.append(f"지역 관련 키워드 매칭({r}/전국)")
 
     # 학생 여부(텍스트 매칭)
     if req.student is True:
-        student_tokens = ["대학생", "재학생", "학부", "대학원", "학생"]
-        if any(t in blob for t in student_tokens):
+        if snap.contains(snap.student, pos):
             score += 20
             reasons.append("대학생/학생 대상 키워드 매칭")
 
     # 나이 기반(아주 단순: '청년' 키워드)
     if req.age is not None:
-        if 19 <= req.age <= 34 and ("청년" in blob or "청년층" in blob):
+        if 19 <= req.age <= 34 and snap.contains(snap.youth, pos):
             score += 10
             reasons.append("청년 대상 키워드 매칭")
 
@@ -165,10 +155,10 @@ def _score_policy(p: Dict[str, Any], req: RecommendationRequest) -> Dict[str, An
         k = _norm(kw)
         if not k:
             continue
-        if k in name:
+        if snap.contains(snap.find_in_name(k), pos):
             score += 10
             reasons.append(f"키워드 '{k}'가 정책명에 포함")
-        elif k in blob:
+        elif snap.contains(snap.find(k), pos):
             score += 5
             reasons.append(f"키워드 '{k}'가 조건/혜택/기관에 포함")
 
@@ -178,73 +168,65 @@ def _score_policy(p: Dict[str, Any], req: RecommendationRequest) -> Dict[str, An
     }
 
 
+def _score_all(snap: CatalogSnapshot, req: RecommendationRequest) -> np.ndarray:
+    """
+    전체 정책 점수 벡터 (_score_policy 와 같은 점수).
+    상태 점수는 미리 계산돼 있고, 가점은 인덱스가 찾은 후보 위치에만 더한다.
+    """
+    scores = snap.status_score.copy()
+
+    if req.category_preference:
+        idx = snap.by_category.get(req.category_preference.strip())
+        if idx is not None:
+            scores[idx] += 40
+
+    if req.region:
+        r = req.region.strip()
+        if r:
+            scores[np.union1d(snap.find(r), snap.nationwide)] += 15
+
+    if req.student is True:
+        scores[snap.student] += 20
+
+    if req.age is not None and 19 <= req.age <= 34:
+        scores[snap.youth] += 10
+
+    for kw in req.keywords:
+        k = _norm(kw)
+        if not k:
+            continue
+        # 정책명 매칭 +10, 그 외 blob 매칭 +5 (정책명 ⊂ blob 이므로 5 + 5)
+        scores[snap.find(k)] += 5
+        scores[snap.find_in_name(k)] += 5
+
+    return scores
+
+
 @router.post("/recommendations")
 def recommend(req: RecommendationRequest) -> Dict[str, Any]:
-    conn = get_conn()
-    cur = conn.cursor()
-
-    # 후보군 제한(최대 800) + status 우선 정렬
-    cur.execute(
-        """
-        SELECT
-            id, policy_key, name, category, provider,
-            period, start_date, end_date, status,
-            link, condition, benefit,
-            source, source_id, fetched_at
-        FROM policies
-        ORDER BY
-            CASE status
-                WHEN '진행중' THEN 1
-                WHEN '예정' THEN 2
-                WHEN '마감' THEN 3
-                ELSE 4
-            END,
-            start_date DESC,
-            id DESC
-        LIMIT 800
-        """
-    )
-    rows = cur.fetchall()
-    conn.close()
-
-    candidates: List[Dict[str, Any]] = []
-
-    for r in rows:
-        p = {
-            "id": r[0],
-            "policy_key": r[1],
-            "name": r[2],
-            "category": r[3],
-            "provider": r[4],
-            "period": r[5],
-            "start_date": r[6],
-            "end_date": r[7],
-            "status": r[8],
-            "link": r[9],
-            "condition": r[10],
-            "benefit": r[11],
-            "source": r[12],
-            "source_id": r[13],
-            "fetched_at": r[14],
-        }
-
-        status = _norm(p.get("status"))
-        if req.exclude_closed and status == "마감":
-            continue  # ✅ (A) 마감 제외
-
-        sc = _score_policy(p, req)
+    # DB 조회 없이 메모리 카탈로그에서 채점 (카탈로그는 버전이 바뀔 때만 재빌드)
+    snap = policy_catalog.get()
+    scores = _score_all(snap, req)
+
+    # 너무 낮은 점수는 컷(마감 제외여도 품질용)
+    keep = scores > -20
+    if req.exclude_closed:
+        keep &= ~snap.closed  # ✅ (A) 마감 제외
+    positions = np.flatnonzero(keep)
+
+    # 점수 내림차순, 동점이면 카탈로그(상태/최신) 순서
+    order = np.lexsort((positions, -scores[positions]))[: req.top_n]
+
+    top: List[Dict[str, Any]] = []
+    for pos in positions[order].tolist():
+        sc = _score_policy(snap, pos, req)
+        p = dict(snap.policies[pos])
         p["score"] = sc["score"]
         p["reasons"] = sc["reasons"]
 
         # ✅ (B) 근거 snippet
-        p["snippets"] = _collect_snippets(p, req)
-
-        candidates.append(p)
-
-    candidates.sort(key=lambda x: x["score"], reverse=True)
-
-    # 너무 낮은 점수는 컷(마감 제외여도 품질용)
-    top = [p for p in candidates if p["score"] > -20][: req.top_n]
+        p["snippets"] = _collect_snippets(snap, pos, req)
+        top.append(p)
 
     return {
         "top_n": req.top_n,
@@ -252,4 +234,4 @@ def recommend(req: RecommendationRequest) -> Dict[str, Any]:
         "exclude_closed": req.exclude_closed,
         "include_snippets": req.include_snippets,
         "items": top,
-    }
\ No newline at end of file
+    }
@@ -1,11 +1,16 @@
 from typing import Optional, List, Dict, Any
 from fastapi import APIRouter, Query, HTTPException
-from app.db import get_conn
+from app.db import db_conn, fts_match_query
+from app.pagination import count_cache, decode_cursor, encode_cursor, keyset_cursor, keyset_page, order_sql
 
 router = APIRouter(tags=["scholarships"])
 
 ALLOWED_STATUS = {"진행중", "예정", "마감", "정보없음"}
 
+# 검색 랭킹: name, type, condition, grant 순 bm25 가중치
+BM25_WEIGHTS = "10.0, 3.0, 1.0, 1.0"
+SNIPPET_TOKENS = 32  # trigram 토큰 ≒ 글자 수
+
 
 @router.get("/scholarships")
 def list_scholarships(
@@ -13,52 +18,73 @@ def list_scholarships(
     status: Optional[str] = Query(default=None, description="진행중/예정/마감"),
     limit: int = Query(default=20, ge=1, le=200),
     offset: int = Query(default=0, ge=0),
+    cursor: Optional[str] = Query(default=None, description="이전 응답의 next_cursor (offset 대신, 깊은 페이지도 일정한 속도)"),
+    include_total: bool = Query(default=True, description="false 면 total_count 계산 생략 (null)"),
 ) -> Dict[str, Any]:
 
+    if cursor and offset:
+        raise HTTPException(status_code=400, detail="cursor 와 offset 은 함께 쓸 수 없습니다")
+    try:
+        state = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
     where = []
     params: List[Any] = []
+    match = fts_match_query(q)
 
-    if q:
+    if match:
+        where.append("scholarships_fts MATCH ?")
+        params.append(match)
+    elif q:
         keyword = f"%{q.strip()}%"
-        where.append("(name LIKE ? OR type LIKE ? OR condition LIKE ? OR grant LIKE ?)")
+        where.append("(s.name LIKE ? OR s.type LIKE ? OR s.condition LIKE ? OR s.grant LIKE ?)")
         params += [keyword, keyword, keyword, keyword]
 
     if status:
         s = status.strip()
         if s in ALLOWED_STATUS:
-            where.append("status = ?")
+            where.append("s.status = ?")
             params.append(s)
 
     where_sql = (" WHERE " + " AND ".join(where)) if where else ""
 
-    conn = get_conn()
-    cur = conn.cursor()
-
-    cur.execute(f"SELECT COUNT(*) FROM scholarships{where_sql}", params)
-    total_count = cur.fetchone()[0]
-
-    cur.execute(
-        f"""
-        SELECT
-            id, name, type, period, start_date, end_date, status, link, condition, grant
-        FROM scholarships
-        {where_sql}
-        ORDER BY
-            CASE status
-                WHEN '진행중' THEN 1
-                WHEN '예정' THEN 2
-                WHEN '마감' THEN 3
-                ELSE 4
-            END,
-            start_date DESC,
-            id DESC
-        LIMIT ? OFFSET ?
-        """,
-        params + [limit, offset],
-    )
-
-    rows = cur.fetchall()
-    conn.close()
+    if match:
+        from_sql = "scholarships s JOIN scholarships_fts ON scholarships_fts.rowid = s.id"
+        snippet_sql = f"snippet(scholarships_fts, -1, '', '', '…', {SNIPPET_TOKENS})"
+    else:
+        from_sql = "scholarships s"
+        snippet_sql = "NULL"
+
+    select_sql = f"""
+        s.id, s.name, s.type, s.period, s.start_date, s.end_date, s.status, s.link, s.condition, s.grant,
+        {snippet_sql}, s.status_rank, s.start_date, s.id
+    """
+
+    with db_conn() as conn:
+        total_count = count_cache.count(conn, from_sql, where_sql, params) if include_total else None
+
+        if match or (state is None and offset):
+            # bm25 순 / offset 요청: LIMIT OFFSET (FTS cursor 는 offset 을 담고 있음)
+            if state is not None:
+                if "o" not in state:
+                    raise HTTPException(status_code=400, detail="Invalid cursor")
+                offset = state["o"]
+            rank_sql = f"bm25(scholarships_fts, {BM25_WEIGHTS})," if match else ""
+            rows = conn.execute(
+                f"SELECT {select_sql} FROM {from_sql}{where_sql} ORDER BY {rank_sql} {order_sql('s')} LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        else:
+            if state is not None and "o" in state:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            rows = keyset_page(conn, select_sql, from_sql, where, params, "s", state, limit)
+
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1]
+        next_cursor = (encode_cursor({"o": offset + len(rows)}) if match
+                       else keyset_cursor(last[11], last[12], last[13]))
 
     items = [
         {
@@ -72,6 +98,7 @@ def list_scholarships(
             "link": r[7],
             "condition": r[8],
             "grant": r[9],
+            **({"snippet": r[10]} if match else {}),
         }
         for r in rows
     ]
@@ -80,6 +107,7 @@ def list_scholarships(
         "total_count": total_count,
         "limit": limit,
         "offset": offset,
+        "next_cursor": next_cursor,
         "items": items,
     }
 
@@ -87,20 +115,19 @@ def list_scholarships(
 @router.get("/scholarships/{scholarship_id}")
 def get_scholarship(scholarship_id: int):
 
-    conn = get_conn()
-    cur = conn.cursor()
+    with db_conn() as conn:
+        cur = conn.cursor()
 
-    cur.execute(
-        """
-        SELECT id, name, type, period, start_date, end_date, status, link, condition, grant
-        FROM scholarships
-        WHERE id = ?
-        """,
-        (scholarship_id,),
-    )
+        cur.execute(
+            """
+            SELECT id, name, type, period, start_date, end_date, status, link, condition, grant
+            FROM scholarships
+            WHERE id = ?
+            """,
+            (scholarship_id,),
+        )
 
-    row = cur.fetchone()
-    conn.close()
+        row = cur.fetchone()
 
     if not row:
         raise HTTPException(status_code=404, detail="Scholarship not found")
@@ -1,13 +1,20 @@
 import json
+import heapq
 from datetime import date
 from typing import List, Optional, Dict, Any, Tuple
 from fastapi import APIRouter, Query, HTTPException
-from app.db import get_conn
+from app.db import db_conn
+from utils.region_matcher import region_conflict
+from utils.policy_enricher import TERMS, ONLINE_COLUMNS, enrichment_from_row, enrichment_for_policy, offsets_of
 
 router = APIRouter(tags=["recommendations"])
 
 ALLOWED_STATUS = {"진행중", "예정", "마감", "정보없음"}
 
+# enrichment 단계에서 위치를 미리 계산해 두는 용어 (대상 제한/학생/청년) → 요청 시 텍스트 검색 없이 판단
+ENRICHED_TERMS = frozenset(TERMS)
+
+
 def _norm(s: Optional[str]) -> str:
     return (s or "").strip()
 
@@ -21,12 +28,7 @@ def _calc_age(birthdate_str: Optional[str]) -> Optional[int]:
     except:
         return None
 
-def _find_snippet(text: str, keyword: str, window: int) -> Optional[str]:
-    if not text or not keyword:
-        return None
-    idx = text.find(keyword)
-    if idx == -1:
-        return None
+def _snippet_at(text: str, idx: int, keyword: str, window: int) -> str:
     start = max(0, idx - window)
     end = min(len(text), idx + len(keyword) + window)
     snippet = text[start:end].replace("\n", " ").strip()
@@ -36,7 +38,27 @@ def _find_snippet(text: str, keyword: str, window: int) -> Optional[str]:
         snippet = snippet + "…"
     return snippet
 
-def _collect_snippets(policy: Dict[str, Any], keywords: List[str], window: int) -> List[Dict[str, str]]:
+def _find_snippet(text: str, keyword: str, window: int) -> Optional[str]:
+    if not text or not keyword:
+        return None
+    idx = text.find(keyword)
+    if idx == -1:
+        return None
+    return _snippet_at(text, idx, keyword, window)
+
+def _enrichment(policy: Dict[str, Any], enrichment: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if enrichment is None:
+        enrichment = enrichment_for_policy(
+            policy.get("name"), policy.get("provider"), policy.get("condition"), policy.get("benefit")
+        )
+    return enrichment
+
+def _collect_snippets(
+    policy: Dict[str, Any],
+    keywords: List[str],
+    window: int,
+    enrichment: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, str]]:
     name = _norm(policy.get("name"))
     provider = _norm(policy.get("provider"))
     condition = _norm(policy.get("condition"))
@@ -54,18 +76,38 @@ def _collect_snippets(policy: Dict[str, Any], keywords: List[str], window: int)
         k = _norm(kw)
         if not k:
             continue
-        for source_name, text in sources:
-            snip = _find_snippet(text, k, window)
-            if snip:
-                out.append({"keyword": k, "source": source_name, "snippet": snip})
-                break
+        if k in ENRICHED_TERMS:
+            # 대상 키워드는 enrichment 에 저장된 (필드, 위치) 로 바로 스니펫 생성
+            hit = offsets_of(_enrichment(policy, enrichment)).get(k, {})
+            for source_name, text in sources:
+                if source_name in hit:
+                    out.append({"keyword": k, "source": source_name,
+                                "snippet": _snippet_at(text, hit[source_name], k, window)})
+                    break
+        else:
+            for source_name, text in sources:
+                snip = _find_snippet(text, k, window)
+                if snip:
+                    out.append({"keyword": k, "source": source_name, "snippet": snip})
+                    break
         if len(out) >= 6:
             break
     return out
 
-def _score(policy: Dict[str, Any], user: Dict[str, Any], keywords: List[str]) -> Tuple[int, List[str]]:
+def _score(
+    policy: Dict[str, Any],
+    user: Dict[str, Any],
+    keywords: List[str],
+    enrichment: Optional[Dict[str, Any]] = None,
+) -> Tuple[int, List[str]]:
+    """
+    enrichment: policy_eligibility 의 enrichment 컬럼 (enrichment_from_row). None 이면 요청 시 계산
+    대상 제한 / 지역 / 대상 키워드(학생·청년) 는 저장된 값으로만 판단하고,
+    사용자가 직접 넣은 키워드만 텍스트에서 찾는다
+    """
     score = 0
     reasons: List[str] = []
+    enrichment = _enrichment(policy, enrichment)
 
     status = _norm(policy.get("status"))
     if status == "진행중":
@@ -78,117 +120,75 @@ def _score(policy: Dict[str, Any], user: Dict[str, Any], keywords: List[str]) ->
         score -= 50
         reasons.append("현재 마감")
 
-    blob = " ".join([
-        _norm(policy.get("name")),
-        _norm(policy.get("provider")),
-        _norm(policy.get("condition")),
-        _norm(policy.get("benefit")),
-    ])
+    blob = None
     for k in keywords:
         k = _norm(k)
         if not k:
             continue
-        if k in _norm(policy.get("name")):
+        if k in ENRICHED_TERMS:
+            hit = offsets_of(enrichment).get(k)
+            in_name, in_blob = bool(hit) and "name" in hit, bool(hit)
+        else:
+            if blob is None:
+                blob = " ".join([
+                    _norm(policy.get("name")),
+                    _norm(policy.get("provider")),
+                    _norm(policy.get("condition")),
+                    _norm(policy.get("benefit")),
+                ])
+            in_name, in_blob = k in _norm(policy.get("name")), k in blob
+        if in_name:
             score += 10
             reasons.append(f"키워드 '{k}'가 정책명에 포함")
-        elif k in blob:
+        elif in_blob:
             score += 5
             reasons.append(f"키워드 '{k}'가 조건/혜택/기관에 포함")
-    
+
     # 특정 대상 제한 정책 페널티
-    restricted_keywords = ["북한이탈주민", "탈북", "다문화", "장애인", "한부모"]
-    blob_text = " ".join([
-        _norm(policy.get("name")),
-        _norm(policy.get("condition")),
-    ])
-    for rk in restricted_keywords:
-        if rk in blob_text:
-            score -= 100
-            reasons.append(f"대상 제한({rk}) → 제외")
-            break
+    rk = enrichment["restricted"]
+    if rk:
+        score -= 100
+        reasons.append(f"대상 제한({rk}) → 제외")
 
-# provider 지역 완전 제외
+    # provider 지역 완전 제외
     if user.get("region"):
-        provider = _norm(policy.get("provider"))
-        name = _norm(policy.get("name"))
-        condition = _norm(policy.get("condition"))
-        blob_region = f"{provider} {name} {condition}"
-        user_region = user.get("region", "")
-
-        sido_list = [
-            "서울", "부산", "대구", "인천", "광주", "대전", "울산", "세종",
-            "경기", "강원", "충북", "충남", "전북", "전남", "경북", "경남", "제주",
-            "경상남도", "경상북도", "전라남도", "전라북도", "충청남도", "충청북도",
-            "강원도", "경기도", "제주도", "제주특별자치도"
-        ] 
-        
-        sigungu_list = [
-    # 서울
-    "강남구", "강동구", "강북구", "강서구", "관악구", "광진구", "구로구", "금천구",
-    "노원구", "도봉구", "동대문구", "동작구", "마포구", "서대문구", "서초구",
-    "성동구", "성북구", "송파구", "양천구", "영등포구", "용산구", "은평구",
-    "종로구", "중구", "중랑구",
-    # 경기
-    "수원시", "성남시", "의정부시", "안양시", "부천시", "광명시", "평택시",
-    "동두천시", "안산시", "고양시", "과천시", "구리시", "남양주시", "오산시",
-    "시흥시", "군포시", "의왕시", "하남시", "용인시", "파주시", "이천시",
-    "안성시", "김포시", "화성시", "광주시", "양주시", "포천시", "여주시",
-    # 부산
-    "중구", "서구", "동구", "영도구", "부산진구", "동래구", "남구", "북구",
-    "해운대구", "사하구", "금정구", "강서구", "연제구", "수영구", "사상구", "기장군",
-    # 대구
-    "수성구", "달서구", "달성군",
-    # 인천
-    "미추홀구", "연수구", "남동구", "부평구", "계양구", "강화군", "옹진군",
-    # 광주
-    "광산구",
-    # 대전
-    "유성구", "대덕구",
-    # 울산
-    "울주군",
-    # 경남
-    "창원시", "진주시", "통영시", "사천시", "김해시", "밀양시", "거제시", "양산시",
-    "의령군", "함안군", "창녕군", "고성군", "남해군", "하동군", "산청군", "함양군",
-    "거창군", "합천군",
-    # 경북
-    "포항시", "경주시", "김천시", "안동시", "구미시", "영주시", "영천시",
-    "상주시", "문경시", "경산시",
-    # 전남
-    "목포시", "여수시", "순천시", "나주시", "광양시",
-    # 전북
-    "전주시", "군산시", "익산시", "정읍시", "남원시", "김제시",
-    # 충남
-    "천안시", "공주시", "보령시", "아산시", "서산시", "논산시", "계룡시", "당진시",
-    # 충북
-    "청주시", "충주시", "제천시",
-    # 강원
-    "춘천시", "원주시", "강릉시", "동해시", "태백시", "속초시", "삼척시",
-    # 제주
-    "제주시", "서귀포시",
+        conflict = region_conflict(enrichment, user.get("region", ""))
+        if conflict:
+            score -= 100
+            reasons.append(f"지역 불일치({conflict}) → 제외")
+
+    return score, reasons[:6]
+
+POLICY_FIELDS = [
+    "id", "policy_key", "name", "category", "provider",
+    "period", "start_date", "end_date", "status",
+    "link", "condition", "benefit",
+    "source", "source_id", "fetched_at",
 ]
+STATUS_RANK = {"진행중": 1, "예정": 2, "마감": 3}
 
-    # 시군구 먼저 체크 (더 구체적)
-        matched = False
-        for sigungu in sigungu_list:
-            if sigungu in blob_region:
-                matched = True
-                # 시군구가 user_region에 있거나, user_region의 시도가 blob_region에 있으면 통과
-                user_sido = user_region.split()[0] if user_region else ""
-                if sigungu not in user_region and user_sido not in blob_region:
-                    score -= 100
-                    reasons.append(f"지역 불일치({sigungu}) → 제외")
-                break
-
-        # 시군구 매칭 없으면 시도 체크
-        if not matched:
-            for sido in sido_list:
-                if sido in blob_region:
-                    if sido not in user_region:
-                        score -= 100
-                        reasons.append(f"지역 불일치({sido}) → 제외")
-                    break
 
-    return score, reasons[:6]
+def _row_to_policy(r) -> Dict[str, Any]:
+    return dict(zip(POLICY_FIELDS, r))
+
+
+def _row_enrichment(r) -> Optional[Dict[str, Any]]:
+    # POLICY_FIELDS 뒤에 붙인 e.{ONLINE_COLUMNS}
+    n = len(POLICY_FIELDS)
+    return enrichment_from_row(*r[n:n + len(ONLINE_COLUMNS)])
+
+
+def _order_key(r) -> tuple:
+    """
+    ORDER BY (상태 순위, start_date DESC, id DESC) 와 같은 순서를 주는 key (클수록 앞)
+    - SQLite DESC 정렬에서 NULL 은 맨 뒤
+    """
+    start_date = r[6]
+    return (
+        -STATUS_RANK.get(r[8], 4),
+        (0, "") if start_date is None else (1, start_date),
+        r[0],
+    )
 
 @router.get("/users/{user_id}/recommendations")
 def recommend_for_user(
@@ -199,116 +199,97 @@ def recommend_for_user(
     snippet_window: int = Query(default=40, ge=10, le=120),
     keyword: List[str] = Query(default_factory=list, description="추가 검색 키워드(여러 개 가능)"),
 ) -> Dict[str, Any]:
-    conn = get_conn()
-    cur = conn.cursor()
-
-    cur.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-    u = cur.fetchone()
-    if not u:
-        conn.close()
-        raise HTTPException(status_code=404, detail="User not found")
-
-    user = {
-        "id": u["id"],
-        "age": _calc_age(u["birthdate"]),
-        "student": (None if u["student"] is None else bool(u["student"])),
-        "region": u["region"],
-        "keywords": json.loads(u["keywords_json"] or "[]"),
-    }
-
-    keywords = []
-    for k in (user["keywords"] + keyword):
-        k = _norm(k)
-        if k and k not in keywords:
-            keywords.append(k)
-
-    if user["student"] is True:
-        for t in ["대학생", "재학생", "학부", "대학원", "학생"]:
-            if t not in keywords:
-                keywords.append(t)
-    if user["age"] is not None and 19 <= user["age"] <= 34:
-        for t in ["청년", "청년층"]:
-            if t not in keywords:
-                keywords.append(t)
-
-    where = []
-    params: List[Any] = []
-
-    if exclude_closed:
-        where.append("(p.status IS NULL OR p.status != '마감')")
-
-    if user["region"]:
-        where.append("(e.region IS NULL OR e.region='전국' OR e.region=?)")
-        params.append(user["region"])
-
-    if user["age"] is not None:
-        where.append("(e.min_age IS NULL OR e.min_age <= ?)")
-        where.append("(e.max_age IS NULL OR e.max_age >= ?)")
-        params += [user["age"], user["age"]]
-
-    if user["student"] is not None:
-        where.append("(e.student_required IS NULL OR e.student_required = ?)")
-        params.append(1 if user["student"] else 0)
-
-    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
-
-    cur.execute(f"""
-        SELECT
-            p.id, p.policy_key, p.name, p.category, p.provider,
-            p.period, p.start_date, p.end_date, p.status,
-            p.link, p.condition, p.benefit,
-            p.source, p.source_id, p.fetched_at
-        FROM policies p
-        LEFT JOIN policy_eligibility e ON e.policy_id = p.id
-        {where_sql}
-        ORDER BY
-            CASE p.status
-                WHEN '진행중' THEN 1
-                WHEN '예정' THEN 2
-                WHEN '마감' THEN 3
-                ELSE 4
-            END,
-            p.start_date DESC,
-            p.id DESC
-        LIMIT 800
-    """, params)
-
-    rows = cur.fetchall()
-    conn.close()
-
-    items: List[Dict[str, Any]] = []
-    for r in rows:
-        p = {
-            "id": r[0],
-            "policy_key": r[1],
-            "name": r[2],
-            "category": r[3],
-            "provider": r[4],
-            "period": r[5],
-            "start_date": r[6],
-            "end_date": r[7],
-            "status": r[8],
-            "link": r[9],
-            "condition": r[10],
-            "benefit": r[11],
-            "source": r[12],
-            "source_id": r[13],
-            "fetched_at": r[14],
+    with db_conn() as conn:
+        cur = conn.cursor()
+
+        cur.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+        u = cur.fetchone()
+        if not u:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        user = {
+            "id": u["id"],
+            "age": _calc_age(u["birthdate"]),
+            "student": (None if u["student"] is None else bool(u["student"])),
+            "region": u["region"],
+            "keywords": json.loads(u["keywords_json"] or "[]"),
         }
 
-        sc, reasons = _score(p, user, keywords)
+        keywords = []
+        for k in (user["keywords"] + keyword):
+            k = _norm(k)
+            if k and k not in keywords:
+                keywords.append(k)
+
+        if user["student"] is True:
+            for t in ["대학생", "재학생", "학부", "대학원", "학생"]:
+                if t not in keywords:
+                    keywords.append(t)
+        if user["age"] is not None and 19 <= user["age"] <= 34:
+            for t in ["청년", "청년층"]:
+                if t not in keywords:
+                    keywords.append(t)
+
+        where = ["p.removed_at IS NULL"]
+        params: List[Any] = []
+
+        if exclude_closed:
+            where.append("(p.status IS NULL OR p.status != '마감')")
+
+        if user["region"]:
+            where.append("(e.region IS NULL OR e.region='전국' OR e.region=?)")
+            params.append(user["region"])
+
+        if user["age"] is not None:
+            where.append("(e.min_age IS NULL OR e.min_age <= ?)")
+            where.append("(e.max_age IS NULL OR e.max_age >= ?)")
+            params += [user["age"], user["age"]]
+
+        if user["student"] is not None:
+            where.append("(e.student_required IS NULL OR e.student_required = ?)")
+            params.append(1 if user["student"] else 0)
+
+        where_sql = ("WHERE " + " AND ".join(where)) if where else ""
+
+        # 자격 조건(지역/나이/학생/마감)은 SQL 에서 전부 걸러내고, 결과는 정렬 없이 커서로 스트리밍
+        # (LIMIT 으로 후보를 자르지 않으므로 정책 수가 늘어도 뒤쪽 정책이 누락되지 않음)
+        cur.execute(f"""
+            SELECT
+                p.id, p.policy_key, p.name, p.category, p.provider,
+                p.period, p.start_date, p.end_date, p.status,
+                p.link, p.condition, p.benefit,
+                p.source, p.source_id, p.fetched_at,
+                {", ".join("e." + c for c in ONLINE_COLUMNS)}
+            FROM policies p
+            LEFT JOIN policy_eligibility e ON e.policy_id = p.id
+            {where_sql}
+        """, params)
+
+        # 점수 상위 top_n 만 heap 으로 유지 (동점은 기존 정렬: 상태 → start_date DESC → id DESC)
+        top_rows = heapq.nlargest(
+            top_n,
+            (
+                (sc, reasons, r)
+                for r in cur
+                for sc, reasons in [_score(_row_to_policy(r), user, keywords, _row_enrichment(r))]
+                # 너무 낮은 점수는 컷
+                if sc > -20
+            ),
+            key=lambda x: (x[0], _order_key(x[2])),
+        )
+
+    top: List[Dict[str, Any]] = []
+    for sc, reasons, r in top_rows:
+        p = _row_to_policy(r)
         p["score"] = sc
         p["reasons"] = reasons
 
         if include_snippets:
-            p["snippets"] = _collect_snippets(p, keywords, snippet_window)
+            p["snippets"] = _collect_snippets(p, keywords, snippet_window, _row_enrichment(r))
         else:
             p["snippets"] = []
 
-        items.append(p)
-
-    items.sort(key=lambda x: x["score"], reverse=True)
-    top = [p for p in items if p["score"] > -20][:top_n]
+        top.append(p)
 
     return {
         "user": user,
@@ -1,9 +1,12 @@
 import json
-from datetime import date
+from datetime import date, datetime
 from typing import Optional, List, Any, Dict
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
-from app.db import get_conn, now_iso
+from app.db import db_conn, now_iso
+from app.fhi_store import user_fhi_store
+from app.routers.fhi import TransactionRequest, _categorize_transactions, _fhi_grade
+from ml.ml_runtime.model_loader import registry as model_registry
 
 router = APIRouter(tags=["users"])
 
@@ -77,44 +80,42 @@ def _row_to_dict(r) -> Dict[str, Any]:
 
 @router.post("/users")
 def create_user(payload: UserCreate) -> Dict[str, Any]:
-    conn = get_conn()
-    cur = conn.cursor()
-    ts = now_iso()
-
-    cur.execute("""
-        INSERT INTO users (
-            nickname, gender, birthdate, income_level,
-            region, school, student, keywords_json,
-            created_at, updated_at
-        )
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        payload.nickname,
-        payload.gender,
-        payload.birthdate,
-        payload.income_level,
-        payload.region,
-        payload.school,
-        _bool_to_int(payload.student),
-        json.dumps(payload.keywords, ensure_ascii=False),
-        ts,
-        ts,
-    ))
-    user_id = cur.lastrowid
-    conn.commit()
-    conn.close()
+    with db_conn() as conn:
+        cur = conn.cursor()
+        ts = now_iso()
+
+        cur.execute("""
+            INSERT INTO users (
+                nickname, gender, birthdate, income_level,
+                region, school, student, keywords_json,
+                created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            payload.nickname,
+            payload.gender,
+            payload.birthdate,
+            payload.income_level,
+            payload.region,
+            payload.school,
+            _bool_to_int(payload.student),
+            json.dumps(payload.keywords, ensure_ascii=False),
+            ts,
+            ts,
+        ))
+        user_id = cur.lastrowid
+        conn.commit()
 
     return {"id": user_id, "created_at": ts}
 
 
 @router.get("/users/{user_id}")
 def get_user(user_id: int) -> Dict[str, Any]:
-    conn = get_conn()
-    cur = conn.cursor()
+    with db_conn() as conn:
+        cur = conn.cursor()
 
-    cur.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-    r = cur.fetchone()
-    conn.close()
+        cur.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+        r = cur.fetchone()
 
     if not r:
         raise HTTPException(status_code=404, detail="User not found")
@@ -124,47 +125,89 @@ def get_user(user_id: int) -> Dict[str, Any]:
 
 @router.patch("/users/{user_id}")
 def update_user(user_id: int, payload: UserUpdate) -> Dict[str, Any]:
-    conn = get_conn()
-    cur = conn.cursor()
+    with db_conn() as conn:
+        cur = conn.cursor()
+
+        cur.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+        r = cur.fetchone()
+        if not r:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        ts = now_iso()
+
+        # 값이 넘어오면 업데이트, 없으면 기존값 유지
+        nickname     = payload.nickname      if payload.nickname      is not None else r["nickname"]
+        gender       = payload.gender        if payload.gender        is not None else r["gender"]
+        birthdate    = payload.birthdate     if payload.birthdate     is not None else r["birthdate"]
+        income_level = payload.income_level  if payload.income_level  is not None else r["income_level"]
+        region       = payload.region        if payload.region        is not None else r["region"]
+        school       = payload.school        if payload.school        is not None else r["school"]
+        student      = _bool_to_int(payload.student) if payload.student is not None else r["student"]
+        keywords_json = (
+            json.dumps(payload.keywords, ensure_ascii=False)
+            if payload.keywords is not None
+            else r["keywords_json"]
+        )
 
-    cur.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-    r = cur.fetchone()
-    if not r:
-        conn.close()
-        raise HTTPException(status_code=404, detail="User not found")
+        cur.execute("""
+            UPDATE users
+            SET nickname=?, gender=?, birthdate=?, income_level=?,
+                region=?, school=?, student=?, keywords_json=?, updated_at=?
+            WHERE id=?
+        """, (nickname, gender, birthdate, income_level,
+              region, school, student, keywords_json, ts, user_id))
 
-    ts = now_iso()
-
-    # 값이 넘어오면 업데이트, 없으면 기존값 유지
-    nickname     = payload.nickname      if payload.nickname      is not None else r["nickname"]
-    gender       = payload.gender        if payload.gender        is not None else r["gender"]
-    birthdate    = payload.birthdate     if payload.birthdate     is not None else r["birthdate"]
-    income_level = payload.income_level  if payload.income_level  is not None else r["income_level"]
-    region       = payload.region        if payload.region        is not None else r["region"]
-    school       = payload.school        if payload.school        is not None else r["school"]
-    student      = _bool_to_int(payload.student) if payload.student is not None else r["student"]
-    keywords_json = (
-        json.dumps(payload.keywords, ensure_ascii=False)
-        if payload.keywords is not None
-        else r["keywords_json"]
-    )
-
-    cur.execute("""
-        UPDATE users
-        SET nickname=?, gender=?, birthdate=?, income_level=?,
-            region=?, school=?, student=?, keywords_json=?, updated_at=?
-        WHERE id=?
-    """, (nickname, gender, birthdate, income_level,
-          region, school, student, keywords_json, ts, user_id))
-
-    conn.commit()
-    conn.close()
+        conn.commit()
 
     # 수정된 유저 정보 전체 반환
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-    updated = cur.fetchone()
-    conn.close()
+    with db_conn() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT * FROM users WHERE id = ?", (user_id,))
+        updated = cur.fetchone()
+
+    return _row_to_dict(updated)
+
+
+# ──────────────────────────────
+# 유저 거래 / FHI
+# ──────────────────────────────
+
+def _require_user(conn, user_id: int) -> None:
+    if conn.execute("SELECT 1 FROM users WHERE id = ?", (user_id,)).fetchone() is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
 
-    return _row_to_dict(updated)
\ No newline at end of file
+@router.post("/users/{user_id}/transactions")
+def add_user_transactions(user_id: int, req: TransactionRequest) -> Dict[str, Any]:
+    """
+    유저 거래 저장 (parser 정규화 스키마, /fhi/analyze 와 같은 입력).
+    저장과 동시에 유저별 7d/30d 롤링 집계·충동 점수를 증분 갱신한다.
+    """
+    txs = _categorize_transactions(req.transactions)
+    with db_conn() as conn:
+        _require_user(conn, user_id)
+        return user_fhi_store.add_transactions(conn, user_id, txs)
+
+
+@router.get("/users/{user_id}/fhi")
+def get_user_fhi(user_id: int, asof: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    저장된 거래 기준 asof(기본: 현재 시각 내림) 시점 FHI. 거래 이력을 다시 읽지 않고 롤링 집계만 조회 (이력 길이와 무관).
+    코칭카드는 생성하지 않음 (features 로 /fhi/refresh-card 호출).
+    """
+    with db_conn() as conn:
+        _require_user(conn, user_id)
+        result = user_fhi_store.snapshot(conn, user_id, asof=asof)
+
+    features = result["features"]
+    fhi_predicted = 0.0
+    if features:
+        # ML 입력도 같은 asof 기준 feature. 모델 파일이 없으면 rule 결과만 반환
+        try:
+            # predict_many 가 이미 0~100 으로 clamp
+            fhi_predicted = round(model_registry.get().predict_one(features), 2)
+        except FileNotFoundError:
+            fhi_predicted = None
+    result["fhi_predicted"] = fhi_predicted
+    result["grade"] = _fhi_grade(result["fhi"])
+    return result
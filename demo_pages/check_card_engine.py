@@ -0,0 +1,125 @@
+import os
+import sys
+import time
+import random
+import asyncio
+from types import SimpleNamespace
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from ml.ml_runtime.card_engine import CardEngine, TTLCache, FALLBACK_CARDS
+
+
+class StubLLMClient:
+    """
+    AsyncOpenAI 호환 로컬 stub: client.chat.completions.create(...) 만 흉내낸다.
+    - delay: 응답 지연(초)
+    - slow_topics: 이 주제는 delay_slow 만큼 지연 (timeout 테스트용)
+    - fail_topics: 이 주제는 예외
+    - vary_titles: 호출마다 다른 제목 (주제 이름이 안 들어간 실제 LLM 제목처럼)
+    """
+
+    def __init__(self, delay=0.2, slow_topics=(), delay_slow=5.0, fail_topics=(), vary_titles=False):
+        self.delay = delay
+        self.vary_titles = vary_titles
+        self.slow_topics = set(slow_topics)
+        self.delay_slow = delay_slow
+        self.fail_topics = set(fail_topics)
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    async def _create(self, **request):
+        self.calls += 1
+        prompt = request["messages"][-1]["content"]
+        topic = prompt.split("반드시 **", 1)[1].split("**", 1)[0]
+        if topic in self.fail_topics:
+            raise RuntimeError("stub failure")
+        await asyncio.sleep(self.delay_slow if topic in self.slow_topics else self.delay)
+        title = f"오늘의 코칭 {self.calls}" if self.vary_titles else f"{topic} 코칭"
+        content = f"제목: {title}\n진단: 테스트 진단\n코칭: 테스트 코칭\n미션: 테스트 미션"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+FEATURES = {"spend_sum_7d": 50000, "spend_mean_30d": 8000, "cat_spend_ratio_cafe_30d": 0.6}
+FALLBACK_TITLES = {c["title"] for c in FALLBACK_CARDS}
+
+
+def check_concurrent():
+    client = StubLLMClient(delay=0.3)
+    engine = CardEngine(client=client, timeout=2.0, cache=TTLCache())
+    t0 = time.perf_counter()
+    cards = asyncio.run(engine.generate_cards(72.5, FEATURES, 0.4, 0.1, n=3))
+    elapsed = time.perf_counter() - t0
+    titles = [c["title"] for c in cards]
+    assert len(cards) == 3 and len(set(titles)) == 3, titles
+    assert all(c["fhi"] == 72.5 and c["raw"] != "fallback" for c in cards)
+    # 순차였다면 0.9초 이상
+    assert elapsed < 0.6, elapsed
+    print(f"[OK] concurrent | 3 cards in {elapsed:.2f}s | {titles}")
+
+
+def check_timeout_and_failure():
+    from ml.src.coaching_card import CARD_TOPICS
+    client = StubLLMClient(delay=0.05, slow_topics=CARD_TOPICS[:2], fail_topics=CARD_TOPICS[2:3])
+    engine = CardEngine(client=client, timeout=0.3, cache=TTLCache())
+    t0 = time.perf_counter()
+    cards = asyncio.run(engine.generate_cards(40.0, FEATURES, 0.9, 1.2, n=5))
+    elapsed = time.perf_counter() - t0
+    fallback = [c for c in cards if c["raw"] == "fallback"]
+    titles = [c["title"] for c in cards]
+    assert len(fallback) == 3, titles
+    assert all(c["title"] in FALLBACK_TITLES for c in fallback)
+    assert len(set(titles)) == 5, titles
+    assert elapsed < 1.0, elapsed
+    print(f"[OK] timeout/failure | {len(fallback)} fallback slots in {elapsed:.2f}s")
+
+
+def check_cache():
+    client = StubLLMClient(delay=0.05)
+    engine = CardEngine(client=client, timeout=2.0, cache=TTLCache(maxsize=2, ttl=60))
+
+    asyncio.run(engine.generate_card(71.0, FEATURES, 0.4, 0.1, current_titles=["카페/음료", "교통", "배달/식비", "쇼핑/충동구매"]))
+    calls = client.calls
+    # 같은 구간 (FHI 70대, cafe, 충동 0.25~0.5, 급증 0~0.5) + 같은 주제 → 캐시 hit
+    card = asyncio.run(engine.generate_card(78.9, FEATURES, 0.3, 0.2, current_titles=["카페/음료", "교통", "배달/식비", "쇼핑/충동구매"]))
+    assert client.calls == calls, (client.calls, calls)
+    assert card["fhi"] == 78.9
+    assert engine.cache.hits == 1
+
+    # LRU: maxsize=2 를 넘기면 가장 오래된 항목 제거
+    asyncio.run(engine.generate_cards(10.0, FEATURES, 1.0, 2.0, n=3))
+    assert engine.cache.stats()["size"] == 2
+
+    # TTL 만료
+    engine.cache.ttl = 0.0
+    engine.cache.set("k", {"title": "x"})
+    time.sleep(0.01)
+    assert engine.cache.get("k") is None
+    print(f"[OK] cache | {engine.cache.stats()}")
+
+
+def check_refresh():
+    # /fhi/refresh-card 를 연달아 호출: 같은 구간·같은 주제라도 지금 카드(캐시된 카드)를 돌려주면 안 됨
+    client = StubLLMClient(delay=0.01, vary_titles=True)
+    engine = CardEngine(client=client, timeout=2.0, cache=TTLCache(ttl=60))
+    random.seed(7)
+    first = asyncio.run(engine.generate_card(71.0, FEATURES, 0.4, 0.1, current_titles=[]))
+    random.seed(7)  # 같은 주제 슬롯 → 같은 캐시 키
+    second = asyncio.run(engine.generate_card(72.0, FEATURES, 0.4, 0.1, current_titles=[first["title"]]))
+    assert first["raw"] != "fallback" and second["raw"] != "fallback", (first, second)
+    assert second["title"] != first["title"], (first, second)
+    assert client.calls == 2, client.calls
+    # 다른 사용자(현재 카드 제목이 다름)는 그대로 캐시 hit
+    random.seed(7)
+    third = asyncio.run(engine.generate_card(73.0, FEATURES, 0.4, 0.1, current_titles=["다른 카드"]))
+    assert third["title"] == second["title"] and client.calls == 2
+    print(f"[OK] refresh | {first['title']} → {second['title']} (fallback 아님, 캐시 재사용은 유지)")
+
+
+if __name__ == "__main__":
+    check_concurrent()
+    check_timeout_and_failure()
+    check_cache()
+    check_refresh()
+    print("\nCARD ENGINE TEST PASS")
@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import random
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import utils.category_rules as cr
+from utils.category_rules import CATEGORY_KEYWORDS, categorize_store
+
+N_TX = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+
+AFFIXES = ["", " 강남점", "이대점", " 홍대입구역점", "(주)", " 2호점", "센터", "마트", " STORE", "몰"]
+FILLER = ["가게", "상사", "코리아", "주식회사", "서울", "부산", "1", "A", "플러스", "월드"]
+
+
+def reference_categorize(merchant):
+    """기존 구현: 카테고리 → 키워드 순서로 substring 검사 (parity 비교용)"""
+    norm = cr._norm(merchant)
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        for kw in keywords:
+            if kw in norm:
+                return category
+    return "other"
+
+
+def all_keyword_merchants():
+    rng = random.Random(0)
+    keywords = [kw for kws in CATEGORY_KEYWORDS.values() for kw in kws]
+    out = []
+    for kw in keywords:
+        out += [kw, kw.upper(), f" {kw} ", kw + rng.choice(AFFIXES), rng.choice(FILLER) + kw + rng.choice(AFFIXES)]
+    # 두 카테고리 키워드가 섞인 경우 → 앞 카테고리가 이겨야 함
+    for _ in range(3000):
+        a, b = rng.sample(keywords, 2)
+        out.append(rng.choice(["", rng.choice(FILLER)]) + a + rng.choice(["", " "]) + b + rng.choice(AFFIXES))
+    out += ["", "   ", "알수없는가게", "점", "지점", "스토어", "ABC상사"]
+    return out
+
+
+def check_parity():
+    merchants = all_keyword_merchants()
+    cr._categorize_normalized.cache_clear()
+    fail = 0
+    for m in merchants:
+        if categorize_store(m) != reference_categorize(m):
+            fail += 1
+            if fail <= 5:
+                print(f"[FAIL] {m!r}: got={categorize_store(m)} expect={reference_categorize(m)}")
+    print(f"[{'OK' if not fail else 'FAIL'}] parity: {len(merchants) - fail:,}/{len(merchants):,} merchants "
+          f"(키워드 {sum(map(len, CATEGORY_KEYWORDS.values()))}개 전부 + 조합)")
+    return fail == 0
+
+
+def make_transactions(n):
+    # 실제 거래처럼 자주 쓰는 가맹점이 반복됨 (상위 가맹점 편중)
+    rng = random.Random(1)
+    keywords = [kw for kws in CATEGORY_KEYWORDS.values() for kw in kws]
+    stores = [rng.choice(keywords) + rng.choice(AFFIXES) for _ in range(800)] + \
+             [rng.choice(FILLER) + rng.choice(FILLER) + str(i) for i in range(400)]
+    weights = [1 / (i + 1) for i in range(len(stores))]
+    return rng.choices(stores, weights=weights, k=n)
+
+
+def bench():
+    txs = make_transactions(N_TX)
+
+    t0 = time.perf_counter()
+    for m in txs:
+        reference_categorize(m)
+    t_ref = time.perf_counter() - t0
+
+    cr._categorize_normalized.cache_clear()
+    t0 = time.perf_counter()
+    for m in txs:
+        cr._categorize_normalized.__wrapped__(cr._norm(m))
+    t_ac = time.perf_counter() - t0
+
+    cr._categorize_normalized.cache_clear()
+    t0 = time.perf_counter()
+    for m in txs:
+        categorize_store(m)
+    t_new = time.perf_counter() - t0
+    info = cr._categorize_normalized.cache_info()
+
+    print(f"\n{N_TX:,} transactions (고유 가맹점 {len(set(txs)):,})")
+    print(f"기존 nested loop       | {N_TX / t_ref:12,.0f} tx/s")
+    print(f"Aho-Corasick           | {N_TX / t_ac:12,.0f} tx/s")
+    print(f"Aho-Corasick + LRU     | {N_TX / t_new:12,.0f} tx/s | hit {info.hits:,} / miss {info.misses:,} (max {info.maxsize})")
+
+
+def main():
+    passed = check_parity()
+    bench()
+    print("\nCATEGORY MATCHER TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
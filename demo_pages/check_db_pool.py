@@ -0,0 +1,134 @@
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+import threading
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.db import ConnectionPool
+
+N_ROWS = 20_000
+N_READERS = 8
+READS_PER_THREAD = 1000
+READ_SQL = "SELECT id, name, status FROM policies WHERE status = ? ORDER BY start_date DESC LIMIT 20"
+
+
+def make_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE policies (id INTEGER PRIMARY KEY, name TEXT, status TEXT, start_date TEXT)")
+    conn.execute("CREATE INDEX ix_policies_status ON policies(status, start_date)")
+    conn.executemany(
+        "INSERT INTO policies (name, status, start_date) VALUES (?, ?, ?)",
+        [(f"정책 {i}", ["진행중", "예정", "마감"][i % 3], f"2025-{i % 12 + 1:02d}-01") for i in range(N_ROWS)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def writer(path, stop, busy_sec):
+    # 수집 스크립트처럼 긴 쓰기 트랜잭션을 반복
+    conn = sqlite3.connect(path, timeout=30)
+    while not stop.is_set():
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("UPDATE policies SET name = name || '' WHERE id % 50 = 0")
+        time.sleep(busy_sec)
+        conn.commit()
+    conn.close()
+
+
+def run_readers(read_once):
+    errors = []
+
+    def worker():
+        try:
+            for i in range(READS_PER_THREAD):
+                read_once(["진행중", "예정", "마감"][i % 3])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(N_READERS)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0, errors
+
+
+def bench(label, path, read_once):
+    stop = threading.Event()
+    w = threading.Thread(target=writer, args=(path, stop, 0.02))
+    w.start()
+    try:
+        elapsed, errors = run_readers(read_once)
+    finally:
+        stop.set()
+        w.join()
+    total = N_READERS * READS_PER_THREAD
+    if errors:
+        print(f"  first error: {errors[0]!r}")
+    print(f"{label:<28} | {total / elapsed:8.0f} reads/s | {elapsed:5.2f}s | errors={len(errors)}")
+    return errors
+
+
+def check_pool_basics(path):
+    pool = ConnectionPool(path, max_size=2, timeout=0.2)
+    with pool.connection() as a:
+        assert a.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert a.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        with pool.connection() as b:
+            assert a is not b
+            # 최대 2개 → 세 번째는 timeout
+            try:
+                pool.acquire()
+                raise AssertionError("pool should be exhausted")
+            except TimeoutError:
+                pass
+        # 열린 트랜잭션은 반납 시 rollback
+        b.execute("BEGIN")
+        b.execute("UPDATE policies SET name = 'x' WHERE id = 1")
+    with pool.connection() as c:
+        assert c.execute("SELECT name FROM policies WHERE id = 1").fetchone()[0] != "x"
+        assert not c.in_transaction
+    stats = pool.stats()
+    assert stats["created"] == 2 and stats["in_use"] == 0 and stats["waits"] == 1, stats
+    pool.close_all()
+    print(f"[OK] pool basics | {stats}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        make_db(path)
+        check_pool_basics(path)
+
+        # 1) 기존 방식: 요청마다 connect (rollback journal)
+        sqlite3.connect(path).execute("PRAGMA journal_mode=DELETE").fetchone()
+
+        def read_per_request(status):
+            conn = sqlite3.connect(path, timeout=30)
+            conn.execute(READ_SQL, (status,)).fetchall()
+            conn.close()
+
+        errors = bench("connect-per-request (DELETE)", path, read_per_request)
+
+        # 2) 풀 + WAL (서버 시작 시 init_db 처럼 쓰기 전에 WAL 전환)
+        pool = ConnectionPool(path, max_size=N_READERS)
+        pool.release(pool.acquire())
+
+        def read_pooled(status):
+            with pool.connection() as conn:
+                conn.execute(READ_SQL, (status,)).fetchall()
+
+        errors += bench("pool (WAL)", path, read_pooled)
+        print(f"pool stats: {pool.stats()}")
+        pool.close_all()
+
+    print("\nDB POOL TEST", "PASS" if not errors else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import os
+import sys
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from ml.ml_runtime.feature_builder import build_features_from_transactions, CATEGORY_COLS
+from utils.transaction_batch import TransactionBatch
+
+
+def _to_dt(x):
+    if isinstance(x, datetime):
+        return x
+    try:
+        return pd.to_datetime(x).to_pydatetime()
+    except Exception:
+        return None
+
+
+def reference_build_features(transactions, asof=None):
+    """기존 list/dict 기반 구현 — parity 비교용"""
+    if not transactions:
+        return {}
+    txs = []
+    for tx in transactions:
+        if not isinstance(tx, dict):
+            continue
+        dt = _to_dt(tx.get("datetime"))
+        if dt is None:
+            continue
+        try:
+            amt = float(tx.get("amount", 0))
+        except Exception:
+            continue
+        if amt <= 0:
+            continue
+        txs.append({"dt": dt, "amt": amt, "category": (tx.get("category") or "other").lower().strip()})
+    if not txs:
+        return {}
+
+    asof = asof or max(t["dt"] for t in txs)
+    w7 = asof - timedelta(days=7)
+    w30 = asof - timedelta(days=30)
+    amt_7 = [t["amt"] for t in txs if t["dt"] >= w7]
+    amt_30 = [t["amt"] for t in txs if t["dt"] >= w30]
+    days_7 = list({t["dt"].date() for t in txs if t["dt"] >= w7})
+    days_30 = list({t["dt"].date() for t in txs if t["dt"] >= w30})
+
+    spend_sum_30d = float(sum(amt_30))
+    cat_sum = defaultdict(float)
+    for t in txs:
+        if t["dt"] >= w30:
+            cat_sum[t["category"]] += t["amt"]
+    total_30 = spend_sum_30d if spend_sum_30d > 0 else 1.0
+
+    return {
+        "spend_sum_7d": float(sum(amt_7)),
+        "spend_mean_7d": float(np.mean(amt_7)) if amt_7 else 0.0,
+        "spend_std_7d": float(np.std(amt_7)) if len(amt_7) > 1 else 0.0,
+        "spend_max_7d": float(max(amt_7)) if amt_7 else 0.0,
+        "day_count_7d": float(len(days_7)),
+        "spend_sum_30d": spend_sum_30d,
+        "spend_mean_30d": float(np.mean(amt_30)) if amt_30 else 0.0,
+        "spend_std_30d": float(np.std(amt_30)) if len(amt_30) > 1 else 0.0,
+        "spend_max_30d": float(max(amt_30)) if amt_30 else 0.0,
+        "day_count_30d": float(len(days_30)),
+        "unique_category_count_30d": float(len(set(t["category"] for t in txs if t["dt"] >= w30))),
+        **{col: cat_sum.get(cat, 0.0) / total_30 for col, cat in CATEGORY_COLS.items()},
+    }
+
+
+CATS = ["cafe", "food", "Convenience", " shopping", "other", "etc", None, ""]
+
+
+def make_transactions(n, seed, fractional=False, as_str=False):
+    rng = random.Random(seed)
+    t = datetime(2025, 1, 1)
+    txs = []
+    for _ in range(n):
+        t += timedelta(minutes=rng.randint(1, 900), microseconds=rng.randint(0, 999_999))
+        amt = rng.randint(100, 80_000)
+        if fractional:
+            amt = amt + rng.random()
+        txs.append({
+            "datetime": t.isoformat() if as_str else t,
+            "amount": rng.choice([amt, amt, amt, -10, "bad", 0]),
+            "category": rng.choice(CATS),
+        })
+    return txs
+
+
+def check_parity():
+    ok = 0
+    fail = 0
+    for seed in range(40):
+        txs = make_transactions(random.Random(seed).randint(0, 400), seed,
+                                fractional=seed % 2 == 0, as_str=seed % 3 == 0)
+        last = max((tx["datetime"] for tx in txs if isinstance(tx["datetime"], datetime)), default=None)
+        for asof in (None, last, datetime(2025, 2, 1, 12, 0, 0, 1)):
+            got = build_features_from_transactions(txs, asof=asof)
+            expect = reference_build_features(txs, asof=asof)
+            if got != expect:
+                diff = {k: (got.get(k), expect.get(k)) for k in expect if got.get(k) != expect.get(k)}
+                print(f"[FAIL] seed={seed} asof={asof} diff={diff}")
+                fail += 1
+            else:
+                ok += 1
+    print(f"parity OK: {ok} FAIL: {fail}")
+    return fail == 0
+
+
+def bench():
+    for n in [1_000, 10_000, 50_000]:
+        txs = make_transactions(n, seed=0)
+        t0 = time.perf_counter()
+        batch = TransactionBatch.from_transactions(txs)
+        t_batch = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        build_features_from_transactions(batch)
+        t_feat = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        reference_build_features(txs)
+        t_ref = time.perf_counter() - t0
+        print(f"n={n:>6,} | batch {t_batch * 1000:7.1f} ms + features {t_feat * 1000:6.2f} ms"
+              f" | reference {t_ref * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    passed = check_parity()
+    bench()
+    print("\nFEATURE BUILDER PARITY TEST", "PASS" if passed else "FAIL")
@@ -0,0 +1,143 @@
+import os
+import sys
+import time
+import random
+import statistics
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import app.routers.fhi as fhi
+import utils.fhi_calculator as fc
+from ml.ml_runtime.feature_builder import build_features_from_transactions
+from ml.ml_runtime.model_loader import DEFAULT_MODEL_PATH, FHIModel, registry as model_registry
+from utils.transaction_batch import FHI_ASOF_GRANULARITY_SEC, TransactionBatch, resolve_asof
+
+N_TX = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+BASELINE_MODEL_PATH = "ml/artifacts/models/lgbm_fhi_v2_baseline.txt"
+
+CATEGORIES = ["cafe", "food", "transport", "shopping", "convenience", "subscription", "other"]
+
+
+def ensure_model():
+    # grid 튜닝 모델이 없는 환경에서는 저장소에 포함된 baseline 모델로 ML 경로를 확인
+    try:
+        return model_registry.get()
+    except FileNotFoundError:
+        model = FHIModel(model_path=os.path.join(ROOT_DIR, BASELINE_MODEL_PATH))
+        model_registry._models[DEFAULT_MODEL_PATH] = model
+        print(f"(기본 모델 없음 → {BASELINE_MODEL_PATH} 사용)")
+        return model
+
+
+def make_txs(rng, n, end):
+    return [{
+        "datetime": (end - timedelta(seconds=rng.random() * 40 * 86400)).isoformat(),
+        "amount": rng.choice([rng.randint(1, 200) * 100, round(rng.random() * 30000, 2)]),
+        "merchant": f"가게{rng.randint(0, 50)}",
+        "category": rng.choice(CATEGORIES),
+    } for _ in range(n)]
+
+
+def check_determinism(model):
+    rng = random.Random(0)
+    ok = True
+    for _ in range(30):
+        # 마지막 거래가 asof 보다 며칠 전 → 예전 ML 경로(마지막 거래일 기준 feature)와 달라지는 경우
+        asof = datetime(2025, 3, 1, 12) + timedelta(hours=rng.randint(0, 2000))
+        txs = make_txs(rng, rng.randint(1, 300), asof - timedelta(days=rng.randint(0, 5)))
+        rule, ml = fc.calculate_fhi_rule_and_ml(txs, asof=asof)
+        rule2, ml2 = fc.calculate_fhi_rule_and_ml(list(reversed(txs)), asof=asof)
+        features = build_features_from_transactions(txs, asof=asof)
+        expect_ml = round(max(0.0, min(100.0, float(model.predict_one(features)))), 2)
+        ok &= (rule["fhi"], rule["spike"], ml["fhi"]) == (rule2["fhi"], rule2["spike"], ml2["fhi"])
+        ok &= ml["fhi"] == expect_ml
+        ok &= fc.calculate_fhi_from_transactions(txs, mode="ml", asof=asof)["fhi"] == expect_ml
+
+    # aware asof 는 로컬 벽시계 기준으로 변환
+    aware = datetime(2025, 3, 1, 12).astimezone()
+    ok &= resolve_asof(aware) == datetime(2025, 3, 1, 12)
+    print(f"[{'OK' if ok else 'FAIL'}] determinism: 같은 거래 + 같은 asof → rule/spike/ML 동일, ML 입력 feature == 응답 feature(asof 기준)")
+    return ok
+
+
+def check_cache():
+    rng = random.Random(1)
+    cache = fhi.result_cache
+    cache.clear()
+    asof = datetime(2025, 6, 1, 9)
+    txs = make_txs(rng, 200, asof)
+
+    h0, m0 = cache.hits, cache.misses
+    a = fhi._score_transactions(txs, asof)
+    b = fhi._score_transactions([dict(t) for t in txs], asof)
+    ok = a == b and (cache.hits - h0, cache.misses - m0) == (1, 1)
+
+    # 응답에 덧붙인 값이 캐시에 새지 않음
+    b["cards"] = []
+    b["features"]["spend_sum_7d"] = -1
+    ok &= fhi._score_transactions(txs, asof) == a
+
+    # merchant 만 다름 → hit / 금액·asof 가 다름 → miss
+    renamed = [{**t, "merchant": "다른이름"} for t in txs]
+    changed = [dict(t) for t in txs]
+    changed[0]["amount"] += 1
+    h0, m0 = cache.hits, cache.misses
+    fhi._score_transactions(renamed, asof)
+    fhi._score_transactions(changed, asof)
+    fhi._score_transactions(txs, asof + timedelta(minutes=1))
+    ok &= (cache.hits - h0, cache.misses - m0) == (1, 2)
+
+    # asof 를 안 주면 같은 구간(FHI_ASOF_GRANULARITY_SEC) 안의 요청은 같은 asof
+    ok &= resolve_asof() == resolve_asof()
+    ok &= FHI_ASOF_GRANULARITY_SEC <= 0 or resolve_asof().timestamp() % FHI_ASOF_GRANULARITY_SEC == 0
+
+    # LRU: maxsize 초과 시 가장 오래 안 쓴 항목부터 제거
+    small = fc.FHIResultCache(maxsize=2)
+    small.set("a", {"v": 1})
+    small.set("b", {"v": 2})
+    small.get("a")
+    small.set("c", {"v": 3})
+    ok &= small.get("b") is None and small.get("a") is not None and small.stats()["size"] == 2
+    print(f"[{'OK' if ok else 'FAIL'}] cache: (batch 해시, asof) 키 hit/miss, 응답 사본 분리, LRU 제거 | {cache.stats()}")
+    return ok
+
+
+def bench():
+    rng = random.Random(2)
+    asof = resolve_asof()
+    txs = make_txs(rng, N_TX, asof)
+    fhi.result_cache.clear()
+
+    def run(reps, clear):
+        times = []
+        for _ in range(reps):
+            if clear:
+                fhi.result_cache.clear()
+            t0 = time.perf_counter()
+            fhi._score_transactions(txs, asof)
+            times.append((time.perf_counter() - t0) * 1000)
+        return statistics.median(times)
+
+    t_miss = run(10, clear=True)
+    fhi._score_transactions(txs, asof)
+    t_hit = run(30, clear=False)
+    batch = TransactionBatch.from_transactions(txs)
+    t0 = time.perf_counter()
+    TransactionBatch.from_transactions(txs).fingerprint()
+    t_key = (time.perf_counter() - t0) * 1000
+    print(f"\n대시보드 새로고침 ({N_TX:,} 거래, 같은 asof) p50 | 매번 계산 {t_miss:7.2f} ms | 캐시 hit {t_hit:7.2f} ms "
+          f"(batch 파싱+해시 {t_key:.2f} ms, 거래 {len(batch):,}건)")
+
+
+def main():
+    model = ensure_model()
+    passed = check_determinism(model)
+    passed = check_cache() and passed
+    bench()
+    print("\nFHI ASOF CACHE TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import statistics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import app.db as db
+from app.routers.policies import list_policies
+
+N_POLICIES = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+REPEAT = 5
+
+REGIONS = ["서울", "부산", "대구", "인천", "광주", "대전", "울산", "세종", "경기", "강원", "충북", "전남", "제주"]
+TOPICS = ["월세", "전세자금", "취업준비", "창업", "교통비", "학자금", "마음건강", "자산형성", "문화예술", "주거안정", "일경험", "역량강화"]
+KINDS = ["지원사업", "바우처", "장려금", "대출", "수당", "프로그램"]
+TARGETS = ["만 19~34세 청년", "대학 재학생", "미취업 청년", "중위소득 150% 이하 가구", "신혼부부", "사회초년생", "구직 중인 졸업생"]
+PHRASES = [
+    "신청일 현재 해당 지역에 주민등록을 두고 거주하는",
+    "소득 및 재산 기준을 충족하는",
+    "타 기관의 유사 사업에 참여하지 않은",
+    "온라인 신청 후 서류 심사를 거쳐 선정하며",
+    "예산 소진 시 조기 마감될 수 있으며",
+    "지원 기간 동안 월 1회 활동 보고서를 제출해야 하며",
+    "최대 12개월까지 지원하고",
+    "자세한 내용은 공고문을 참고",
+]
+
+
+def make_policy(i, rng):
+    region = rng.choice(REGIONS)
+    topic = rng.choice(TOPICS)
+    name = f"{region} 청년 {topic} {rng.choice(KINDS)} {i}"
+    condition = " ".join([rng.choice(TARGETS)] + rng.sample(PHRASES, 4))
+    benefit = f"{topic} 월 최대 {rng.randint(5, 50) * 10_000:,}원 지원, " + " ".join(rng.sample(PHRASES, 2))
+    status = rng.choice(["진행중", "예정", "마감", "정보없음"])
+    start = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    return (f"bench:{i}", name, "subsidy", f"{region}시청", start, status, condition, benefit, "bench")
+
+
+def build_corpus(n):
+    rng = random.Random(0)
+    conn = db.get_conn()
+    t0 = time.perf_counter()
+    conn.executemany(
+        """
+        INSERT INTO policies (policy_key, name, category, provider, start_date, status, condition, benefit, source)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (make_policy(i, rng) for i in range(n)),
+    )
+    conn.commit()
+    conn.close()
+    return time.perf_counter() - t0
+
+
+def like_search(q, limit=20, offset=0):
+    """기존 LIKE 구현 — parity/속도 비교용"""
+    kw = f"%{q}%"
+    params = [kw, kw, kw, kw]
+    where_sql = " WHERE (name LIKE ? OR provider LIKE ? OR condition LIKE ? OR benefit LIKE ?)"
+    with db.db_conn() as conn:
+        total = conn.execute(f"SELECT COUNT(*) FROM policies{where_sql}", params).fetchone()[0]
+        rows = conn.execute(
+            f"""
+            SELECT id FROM policies{where_sql}
+            ORDER BY CASE status WHEN '진행중' THEN 1 WHEN '예정' THEN 2 WHEN '마감' THEN 3 ELSE 4 END,
+                     start_date DESC, id DESC
+            LIMIT ? OFFSET ?
+            """,
+            params + [limit, offset],
+        ).fetchall()
+    return total, [r[0] for r in rows]
+
+
+def like_ids(q):
+    kw = f"%{q}%"
+    with db.db_conn() as conn:
+        rows = conn.execute(
+            "SELECT id FROM policies WHERE name LIKE ? OR provider LIKE ? OR condition LIKE ? OR benefit LIKE ?",
+            [kw, kw, kw, kw],
+        ).fetchall()
+    return {r[0] for r in rows}
+
+
+def fts_ids(q):
+    with db.db_conn() as conn:
+        rows = conn.execute(
+            "SELECT rowid FROM policies_fts WHERE policies_fts MATCH ?", (db.fts_match_query(q),)
+        ).fetchall()
+    return {r[0] for r in rows}
+
+
+def fts_search(q, limit=20, offset=0):
+    res = list_policies(q=q, category=None, status=None, limit=limit, offset=offset, cursor=None, include_total=True)
+    return res["total_count"], [it["id"] for it in res["items"]]
+
+
+def timed(fn, q):
+    times = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn(q)
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def check_parity(queries):
+    ok = True
+    for q in queries:
+        a, b = like_ids(q), fts_ids(q)
+        if a != b:
+            ok = False
+            print(f"[FAIL] q={q!r} like={len(a)} fts={len(b)}")
+    print(f"[{'OK' if ok else 'FAIL'}] parity: FTS 매칭 집합 == LIKE 매칭 집합 ({len(queries)} queries)")
+    return ok
+
+
+def check_triggers():
+    conn = db.get_conn()
+    cur = conn.cursor()
+    cur.execute(
+        "INSERT INTO policies (policy_key, name, category, condition) VALUES ('t:1', '트리거검증 정책', 'x', '가나다라')"
+    )
+    pid = cur.lastrowid
+    conn.commit()
+    assert pid in fts_ids("트리거검증")
+    cur.execute("UPDATE policies SET name = '이름변경됨 정책' WHERE id = ?", (pid,))
+    conn.commit()
+    assert pid not in fts_ids("트리거검증") and pid in fts_ids("이름변경됨")
+    cur.execute("DELETE FROM policies WHERE id = ?", (pid,))
+    conn.commit()
+    conn.close()
+    assert pid not in fts_ids("이름변경됨")
+    print("[OK] triggers: insert/update/delete 가 FTS 인덱스에 반영됨")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "bench.db")
+        db.init_db()
+
+        t_load = build_corpus(N_POLICIES)
+        print(f"corpus: {N_POLICIES:,} policies (트리거로 FTS 동시 인덱싱) in {t_load:.1f}s")
+
+        passed = check_parity(["청년 월세", "전세자금", "서울시청", "중위소득 150%", "바우처 12", "없는검색어", "1,000원"])
+        check_triggers()
+
+        res = list_policies(q="마음건강", category=None, status=None, limit=3, offset=0, cursor=None,
+                            include_total=True)
+        print(f"sample: total={res['total_count']} | {res['items'][0]['name']} | {res['items'][0]['snippet']}")
+
+        print(f"\n{'query':<16} | {'LIKE (ms)':>10} | {'FTS5 (ms)':>10} | speedup")
+        for q in ["마음건강", "전세자금 바우처", "제주 청년", "구직 중인 졸업생", "없는검색어"]:
+            t_like = timed(like_search, q)
+            t_fts = timed(fts_search, q)
+            print(f"{q:<16} | {t_like:10.1f} | {t_fts:10.1f} | x{t_like / max(t_fts, 1e-6):.1f}")
+
+        db.get_pool().close_all()
+
+    print("\nFTS SEARCH TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import os
+import sys
+import random
+import time
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from utils.impulsive_detector import ImpulsiveDetector, detect_impulsive
+
+
+class QuadraticDetector:
+    """기존 구현 (history 전체 재스캔) — parity 비교용"""
+
+    def __init__(self):
+        self.history = []
+
+    def compute_score(self, current_dt, amount):
+        self.history.append((current_dt, amount))
+        hour = current_dt.hour
+        night_score = 1.0 if (hour >= 21 or hour <= 2) else 0.0
+        recent = [t for t, a in self.history if current_dt - t <= timedelta(hours=24)]
+        freq_score = 1.0 if len(recent) >= 2 else 0.0
+        small = [a for t, a in self.history if a <= 10000]
+        small_score = 1.0 if len(small) >= 3 else 0.0
+        return round(0.4 * freq_score + 0.3 * night_score + 0.3 * small_score, 2)
+
+
+def make_transactions(n: int, seed: int, shuffle: bool = False):
+    rng = random.Random(seed)
+    t = datetime(2025, 1, 1)
+    txs = []
+    for _ in range(n):
+        t += timedelta(minutes=rng.choice([5, 30, 90, 600, 1500, 3000]))
+        txs.append({
+            "datetime": t,
+            "amount": rng.choice([1200, 4500, 9800, 10000, 15000, 52000]),
+            "merchant": "GS25",
+        })
+    if shuffle:
+        rng.shuffle(txs)
+    return txs
+
+
+def check_parity():
+    ok = 0
+    fail = 0
+    for seed in range(30):
+        for shuffle in (False, True):
+            txs = make_transactions(300, seed, shuffle=shuffle)
+            got = detect_impulsive(txs)
+            expect = detect_impulsive(txs, detector=QuadraticDetector())
+
+            # 스트리밍(push)은 도착 순서 그대로 — 시간 역순 거래 포함
+            quad = QuadraticDetector()
+            expect_stream = [quad.compute_score(tx["datetime"], tx["amount"]) for tx in txs]
+            stream = ImpulsiveDetector()
+            got_stream = [stream.push(tx) for tx in txs]
+
+            if got != expect or got_stream != expect_stream:
+                print(f"[FAIL] seed={seed} shuffle={shuffle}")
+                fail += 1
+            else:
+                ok += 1
+    print(f"parity OK: {ok} FAIL: {fail}")
+    return fail == 0
+
+
+def bench():
+    for n in [1_000, 10_000, 100_000]:
+        txs = make_transactions(n, seed=0)
+        t0 = time.perf_counter()
+        res = detect_impulsive(txs)
+        dt = time.perf_counter() - t0
+        print(f"n={n:>7,} | {dt * 1000:8.1f} ms | {dt / n * 1e6:5.2f} us/tx | score={res['impulsive_score']}")
+
+    # 기존 구현은 작은 n 에서만 (O(n^2))
+    for n in [500, 2_000]:
+        txs = make_transactions(n, seed=0)
+        t0 = time.perf_counter()
+        detect_impulsive(txs, detector=QuadraticDetector())
+        dt = time.perf_counter() - t0
+        print(f"[quadratic] n={n:>7,} | {dt * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    passed = check_parity()
+    bench()
+    print("\nIMPULSIVE SCALING TEST", "PASS" if passed else "FAIL")
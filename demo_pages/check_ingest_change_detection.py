@@ -0,0 +1,327 @@
+import os
+import io
+import sys
+import json
+import time
+import random
+import sqlite3
+import tempfile
+import threading
+import contextlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# 실제 키 없이 로컬 stub 서버로만 요청
+os.environ.setdefault("YOUTHCENTER_API_KEY", "stub-key")
+os.environ.setdefault("SERVICE_KEY", "stub-key")
+os.environ["INGEST_BACKOFF_SEC"] = "0.01"
+
+import app.db as db
+import utils.ingest_engine as engine
+from scripts import ingest_youthcenter as yc
+from scripts import ingest_scholarships as sch
+
+sys.path.insert(0, os.path.join(ROOT_DIR, "demo_pages"))
+from check_youthcenter_ingest import StubAPI, make_records  # noqa: E402
+
+N_RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 2_350
+
+
+# ──────────────────────────────
+# KOSAF(odcloud) stub: uddi 별 행 목록, page/perPage 페이징
+# ──────────────────────────────
+
+def make_kosaf_rows(n, seed=0, prefix="장학"):
+    rng = random.Random(seed)
+    return [{
+        "상품명": f"{prefix} {i}",
+        "운영기관명": rng.choice(["한국장학재단", "서울장학재단", "OO대학교"]),
+        "홈페이지 주소": f"https://kosaf.example/{prefix}/{i}",
+        "모집시작일": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "모집종료일": f"2026-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+        "신청대상": rng.choice(["대학생", "대학원생", "-"]),
+        "소득기준 상세내용": rng.choice(["소득 8구간 이하", "-", ""]),
+        "지원내역 상세내용": rng.choice(["등록금 전액", "생활비 200만원", "-"]),
+    } for i in range(n)]
+
+
+class KosafStub:
+    """
+    odcloud 모양 응답: tables[uddi] = rows, page/perPage 페이징
+    latency = (요청당, row 당) 지연 초, faults[(uddi, page)] = [상태코드, ...] 순서대로 먼저 실패 ("always" 면 계속 500)
+    """
+
+    def __init__(self, tables, latency=(0.0, 0.0)):
+        self.tables = tables
+        self.latency = latency
+        self.faults = {}
+        self.calls = Counter()
+        self.bodies = {}
+        self._lock = threading.Lock()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                qs = parse_qs(url.query)
+                uddi = url.path.rsplit("/", 1)[-1]
+                rows = api.tables[uddi]
+                page, per = int(qs.get("page", ["1"])[0]), int(qs.get("perPage", ["10"])[0])
+                with api._lock:
+                    api.calls[(uddi, page)] += 1
+                    fault = api.faults.get((uddi, page))
+                    status = None
+                    if fault == "always":
+                        status = 500
+                    elif fault:
+                        status = fault.pop(0)
+                data = rows[(page - 1) * per: page * per]
+                time.sleep(api.latency[0] + api.latency[1] * len(data))
+                if status:
+                    self.send_response(status)
+                    self.end_headers()
+                    return
+                body = api.bodies.get((uddi, page, per)) or api.body(uddi, page, per)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/api/15028252/v1"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def body(self, uddi, page, per):
+        rows = self.tables[uddi]
+        data = rows[(page - 1) * per: page * per]
+        return json.dumps({"page": page, "perPage": per, "totalCount": len(rows),
+                           "currentCount": len(data), "matchCount": len(rows), "data": data},
+                          ensure_ascii=False).encode("utf-8")
+
+    def preload(self, per_pages):
+        """응답 body 를 미리 만들어 둠 (클라이언트 쪽 메모리만 재려고)"""
+        for uddi, rows in self.tables.items():
+            for per in per_pages:
+                for page in range(1, max(1, -(-len(rows) // per)) + 1):
+                    self.bodies[(uddi, page, per)] = self.body(uddi, page, per)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ──────────────────────────────
+# 기대값: 수집 전후 원본을 변환해서 key/hash 로 직접 비교
+# ──────────────────────────────
+
+def key_hashes(policies):
+    return {p["policy_key"]: p["content_hash"] for p in policies}
+
+
+def expected_counts(before, after):
+    inserted = after.keys() - before.keys()
+    removed = before.keys() - after.keys()
+    same = {k for k in after.keys() & before.keys() if after[k] == before[k]}
+    return {
+        "inserted": len(inserted),
+        "updated": len(after) - len(inserted) - len(same),
+        "unchanged": len(same),
+        "removed": len(removed),
+    }
+
+
+def yc_policies(records):
+    return [yc._convert_row(r, "ts") for r in records]
+
+
+def mutate(records, seed=1):
+    """내용 변경 40건, 목록에서 사라짐 30건, 새 정책 25건"""
+    rng = random.Random(seed)
+    out = [dict(r) for r in records]
+    for r in rng.sample(out, 40):
+        r["plcySprtCn"] = f"지원 내용 변경 {rng.random():.6f}"
+    drop = set(rng.sample(range(len(out)), 30))
+    out = [r for i, r in enumerate(out) if i not in drop]
+    extra = make_records(25, seed=99)
+    for i, r in enumerate(extra):
+        r["plcyNo"] = f"2099{i:08d}"
+    return out + extra
+
+
+def snapshot(path):
+    """활성 정책 내용 (removed_at 제외), 쓰기 흔적 (fetched_at / enriched_at / catalog_version / 변경 로그 수)"""
+    conn = sqlite3.connect(path)
+    cols = [c for c in yc.POLICY_COLUMNS if c != "fetched_at"]
+    active = conn.execute(f"SELECT {', '.join(cols)} FROM policies WHERE removed_at IS NULL "
+                          f"ORDER BY policy_key").fetchall()
+    elig_cols = [r[1] for r in conn.execute("PRAGMA table_info(policy_eligibility)")
+                 if r[1] not in ("policy_id", "updated_at", "enriched_at")]
+    elig = conn.execute(f"SELECT p.policy_key, {', '.join('e.' + c for c in elig_cols)} "
+                        f"FROM policy_eligibility e JOIN policies p ON p.id = e.policy_id "
+                        f"WHERE p.removed_at IS NULL ORDER BY p.policy_key").fetchall()
+    trace = conn.execute("SELECT group_concat(fetched_at || e.enriched_at || e.updated_at) "
+                         "FROM policies p LEFT JOIN policy_eligibility e ON e.policy_id = p.id").fetchone()[0]
+    removed = conn.execute("SELECT COUNT(*) FROM policies WHERE removed_at IS NOT NULL").fetchone()[0]
+    conn.close()
+    return active, elig, trace, removed
+
+
+def catalog_state(path):
+    conn = sqlite3.connect(path)
+    version = db.get_catalog_version(conn)
+    n_log = conn.execute("SELECT COUNT(*) FROM policy_changes").fetchone()[0]
+    conn.close()
+    return version, n_log
+
+
+def changes_since(path, version):
+    conn = sqlite3.connect(path)
+    out = db.get_policy_changes(conn, version)
+    conn.close()
+    return out
+
+
+def write_marks(path):
+    """정책별 (fetched_at, updated_at, enriched_at) — 다시 쓰인 정책은 값이 바뀜"""
+    conn = sqlite3.connect(path)
+    marks = dict((r[0], r[1:]) for r in conn.execute(
+        "SELECT p.id, p.fetched_at, e.updated_at, e.enriched_at "
+        "FROM policies p LEFT JOIN policy_eligibility e ON e.policy_id = p.id"))
+    conn.close()
+    return marks
+
+
+def quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def use_db(tmp, name):
+    db.DB_PATH = os.path.join(tmp, f"{name}.db")
+    return db.DB_PATH
+
+
+def rewrite_all(conn, table, key_col, columns, rows, hash_col="content_hash", removed_col="removed_at"):
+    """비교용: 증분 이전처럼 매번 모든 정책을 upsert"""
+    ids = engine.upsert_returning_ids(conn, table, key_col, columns + [removed_col],
+                                      [{**r, removed_col: None} for r in rows])
+    return {"inserted": {}, "updated": ids, "unchanged": {}}
+
+
+def main():
+    passed = True
+    # 한 목록 안에서 같은 정책이 다른 내용으로 두 번 나오면 매 수집마다 (마지막 값으로) 다시 쓰이므로 key 당 하나만
+    records = list({yc._build_policy_key(r): r for r in make_records(N_RECORDS)}.values())
+    api = StubAPI(records)
+    yc.BASE_URL = api.url
+    yc.RATE_PER_SEC = 0
+    yc.WORKERS = 4
+
+    with tempfile.TemporaryDirectory() as tmp:
+        yc.CHECKPOINT_PATH = os.path.join(tmp, "youthcenter.checkpoint.json")
+        path = use_db(tmp, "inc")
+
+        # 1) 첫 수집: 전부 inserted
+        first = quiet(yc.run, fresh=True)
+        before = key_hashes(yc_policies(records))
+        ok = first["counts"] == {"inserted": len(before), "updated": 0, "unchanged": 0, "removed": 0}
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] 첫 수집: {first['counts']}")
+
+        # 2) 같은 내용 재수집: 아무것도 쓰지 않음 (fetched_at/enriched_at 그대로, 카탈로그 버전·변경 로그 그대로)
+        snap0, state0 = snapshot(path), catalog_state(path)
+        again = quiet(yc.run, fresh=True)
+        ok = again["counts"] == {"inserted": 0, "updated": 0, "unchanged": len(before), "removed": 0}
+        ok &= snapshot(path) == snap0 and catalog_state(path) == state0
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] 재수집(변경 없음): {again['counts']}, row/카탈로그 버전/변경 로그 그대로 "
+              f"(version={state0[0]})")
+
+        # 3) 변경/제거/추가 → 변경분만 기록, 결과는 새 원본을 처음부터 수집한 것과 같음
+        changed_records = mutate(records)
+        after = key_hashes(yc_policies(changed_records))
+        expect = expected_counts(before, after)
+        api.records = changed_records
+        v0 = catalog_state(path)[0]
+        diff = quiet(yc.run, fresh=True)
+        log = changes_since(path, v0)
+        fresh_path = use_db(tmp, "fresh")
+        quiet(yc.run, fresh=True)
+        got, full = snapshot(path), snapshot(fresh_path)
+        ok = diff["counts"] == expect
+        ok &= got[:2] == full[:2] and got[3] == expect["removed"]
+        ok &= all(sorted(log[k]) == diff[k] for k in ("inserted", "updated", "removed"))
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] 원본 변경: {diff['counts']} (기대 {expect}) | "
+              f"활성 정책 == 새 원본 전체 수집, policy_changes(version>{v0}) == 변경 내역 id")
+
+        # 4) 사라졌던 정책이 다시 나오면 updated + removed_at 해제, 목록 일부만 받으면 제거 표시 안 함
+        use_db(tmp, "inc")
+        api.records = records
+        back = quiet(yc.run, fresh=True)
+        ok = back["counts"]["updated"] == expect["removed"] + expect["updated"]
+        ok &= back["counts"]["removed"] == expect["inserted"] and snapshot(path)[3] == expect["inserted"]
+        api.records = changed_records
+        yc.MAX_PAGES, max_pages = 5, yc.MAX_PAGES
+        try:
+            partial = quiet(yc.run, fresh=True)
+        finally:
+            yc.MAX_PAGES = max_pages
+        ok &= partial["counts"]["removed"] == 0 and snapshot(path)[3] == expect["inserted"]
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] 복귀: {back['counts']} | MAX_PAGES=5 (목록 일부): 제거 표시 "
+              f"{partial['counts']['removed']}건")
+
+        # 5) 장학금 수집 (UDDI 2개): 재수집 unchanged, 변경/제거 반영
+        tables = {"uddi:a": make_kosaf_rows(900, seed=1, prefix="A"), "uddi:b": make_kosaf_rows(600, seed=2, prefix="B")}
+        kosaf = KosafStub(tables)
+        sch.BASE_URL = kosaf.url
+        sch.KOSAF_UDDIS = list(tables)
+        use_db(tmp, "kosaf")
+        first = quiet(sch.run)
+        again = quiet(sch.run)
+        tables["uddi:a"][3]["지원내역 상세내용"] = "등록금 절반"
+        del tables["uddi:b"][10:15]
+        diff = quiet(sch.run)
+        kosaf.close()
+        ok = first["counts"]["inserted"] == 1500 and again["counts"]["unchanged"] == 1500
+        ok &= diff["counts"] == {"inserted": 0, "updated": 1, "unchanged": 1494, "removed": 5}
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] 장학금: 첫 수집 {first['counts']['inserted']}건, 재수집 unchanged "
+              f"{again['counts']['unchanged']}건, 변경 후 {diff['counts']}")
+
+        # 6) 재수집 비용: 매번 전체 upsert vs 증분 (원본 변화 없음)
+        print(f"\n재수집 {len(records):,}건 (원본 변화 없음)")
+        api.records = records
+        for label, fn in [("기존 (매번 전체 upsert + 자격 조건/enrichment)", rewrite_all),
+                          ("증분 (content_hash diff)", engine.diff_upsert)]:
+            path = use_db(tmp, f"bench_{fn.__name__}")
+            quiet(yc.run, fresh=True)
+            marks, v0 = write_marks(path), catalog_state(path)[0]
+            time.sleep(1.0)  # now_iso 는 초 단위
+            yc.diff_upsert = fn
+            try:
+                t0 = time.perf_counter()
+                quiet(yc.run, fresh=True)
+                t = time.perf_counter() - t0
+            finally:
+                yc.diff_upsert = engine.diff_upsert
+            rewritten = sum(m != marks.get(pid) for pid, m in write_marks(path).items())
+            print(f"{label:<44} | {t:6.2f} s | 다시 쓴 정책 {rewritten:5,}건 | "
+                  f"카탈로그 버전 +{catalog_state(path)[0] - v0}")
+
+    api.close()
+    db.get_pool().close_all()
+    print("\nINGEST CHANGE DETECTION TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import statistics
+
+from fastapi import HTTPException
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import app.db as db
+from app.pagination import count_cache, keyset_cursor
+from app.routers.policies import list_policies
+from app.routers.scholarships import list_scholarships
+
+N_POLICIES = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+N_SCHOLARSHIPS = N_POLICIES // 4
+REPEAT = 5
+
+STATUSES = ["진행중", "예정", "마감", "정보없음", None]
+CATEGORIES = ["housing", "employment", "education", "welfare", "scholarship"]
+TOPICS = ["월세", "전세자금", "취업준비", "창업", "교통비", "학자금", "마음건강", "자산형성"]
+
+
+def make_date(rng):
+    # start_date 없는 정책 10%, 같은 날짜 여러 건 (id 로 순서 결정)
+    if rng.random() < 0.1:
+        return None
+    return f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+
+
+def build_corpus(n_policies, n_scholarships):
+    rng = random.Random(0)
+    conn = db.get_conn()
+    conn.executemany(
+        "INSERT INTO policies (policy_key, name, category, provider, start_date, status, condition, benefit, source) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ((f"bench:{i}", f"청년 {rng.choice(TOPICS)} 지원 {i}", rng.choice(CATEGORIES), "시청", make_date(rng),
+          rng.choice(STATUSES), "만 19~34세", "월 최대 20만원", "bench") for i in range(n_policies)),
+    )
+    conn.executemany(
+        "INSERT INTO scholarships (policy_key, name, type, start_date, status, condition, grant) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+        ((f"sch:{i}", f"{rng.choice(TOPICS)} 장학금 {i}", "장학", make_date(rng), rng.choice(STATUSES),
+          "대학 재학생", "등록금") for i in range(n_scholarships)),
+    )
+    # 제거 표시된 정책은 목록에서 빠짐
+    conn.execute("UPDATE policies SET removed_at = '2025-01-01' WHERE id % 97 = 0")
+    conn.commit()
+    conn.close()
+
+
+# ──────────────────────────────
+# 기준값: 기존 구현 (ORDER BY CASE status ... + LIMIT OFFSET, 페이지마다 COUNT(*))
+# ──────────────────────────────
+
+OLD_ORDER = """
+    CASE {a}.status WHEN '진행중' THEN 1 WHEN '예정' THEN 2 WHEN '마감' THEN 3 ELSE 4 END,
+    {a}.start_date DESC, {a}.id DESC
+"""
+TABLES = {
+    "policies": ("p", "p.removed_at IS NULL", ["category", "status"], list_policies),
+    "scholarships": ("s", None, ["status"], list_scholarships),
+}
+
+
+def old_where(table, filters):
+    a, base, _, _ = TABLES[table]
+    where, params = ([base] if base else []), []
+    for col, value in filters.items():
+        if col == "q":
+            cols = ["name", "provider", "condition", "benefit"] if table == "policies" else ["name", "type", "condition", "grant"]
+            where.append("(" + " OR ".join(f"{a}.{c} LIKE ?" for c in cols) + ")")
+            params += [f"%{value}%"] * 4
+        else:
+            where.append(f"{a}.{col} = ?")
+            params.append(value)
+    return (" WHERE " + " AND ".join(where)) if where else "", params
+
+
+def old_page(conn, table, filters, limit=None, offset=0):
+    a = TABLES[table][0]
+    where_sql, params = old_where(table, filters)
+    total = conn.execute(f"SELECT COUNT(*) FROM {table} {a}{where_sql}", params).fetchone()[0]
+    sql = f"SELECT {a}.id, {a}.status, {a}.start_date FROM {table} {a}{where_sql} ORDER BY {OLD_ORDER.format(a=a)}"
+    if limit is not None:
+        sql += " LIMIT ? OFFSET ?"
+        params = params + [limit, offset]
+    return total, conn.execute(sql, params).fetchall()
+
+
+def call(table, **kwargs):
+    fn = TABLES[table][3]
+    args = {"q": None, "status": None, "limit": 20, "offset": 0, "cursor": None, "include_total": True}
+    if table == "policies":
+        args["category"] = None
+    args.update(kwargs)
+    return fn(**args)
+
+
+def walk(table, filters, limit):
+    """cursor 로 끝까지 → id 목록, 페이지 수"""
+    ids, cursor, pages = [], None, 0
+    while True:
+        res = call(table, limit=limit, cursor=cursor, include_total=False, **filters)
+        ids += [item["id"] for item in res["items"]]
+        pages += 1
+        cursor = res["next_cursor"]
+        if cursor is None:
+            return ids, pages
+
+
+def check_status_rank(conn):
+    rng = random.Random(1)
+    ids = [r[0] for r in conn.execute("SELECT id FROM policies ORDER BY random() LIMIT 500")]
+    for pid in ids:
+        conn.execute("UPDATE policies SET status = ? WHERE id = ?", (rng.choice(STATUSES), pid))
+    conn.execute("""
+        INSERT INTO policies (policy_key, name, category, status) VALUES ('bench:0', 'upsert', 'x', '예정')
+        ON CONFLICT(policy_key) DO UPDATE SET status = excluded.status
+    """)
+    conn.commit()
+    bad = 0
+    for table in db.STATUS_RANK_TABLES:
+        bad += conn.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE status_rank IS NOT {db.STATUS_RANK_SQL.format(col='status')}"
+        ).fetchone()[0]
+    return bad == 0
+
+
+def timed(fn):
+    times = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    passed = True
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "bench.db")
+        db.init_db()
+        build_corpus(N_POLICIES, N_SCHOLARSHIPS)
+        conn = db.get_conn()
+
+        ok = check_status_rank(conn)
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] status_rank: insert / status update / upsert 후 모든 row 가 CASE status 와 같음")
+
+        # 1) cursor 로 끝까지 넘긴 결과 == 기존 정렬 전체 (필터별)
+        cases = [
+            ("policies", {}, 500),
+            ("policies", {"category": "housing"}, 37),
+            ("policies", {"status": "정보없음"}, 37),
+            ("policies", {"q": "마음건강", "category": "welfare"}, 50),
+            ("policies", {"q": "월세"}, 200),
+            ("scholarships", {}, 200),
+            ("scholarships", {"status": "예정"}, 37),
+        ]
+        for table, filters, limit in cases:
+            total, expect = old_page(conn, table, filters)
+            ids, pages = walk(table, filters, limit)
+            if db.fts_match_query(filters.get("q")):
+                # FTS 검색은 bm25 순 → 집합 비교 + 중복/누락 없음
+                ok = sorted(ids) == sorted(r[0] for r in expect) and len(set(ids)) == len(ids)
+                label = "검색 결과 (bm25 순, offset cursor)"
+            else:
+                ok = ids == [r[0] for r in expect]
+                label = "ORDER BY CASE 순서"
+            first = call(table, limit=limit, **filters)
+            ok &= first["total_count"] == total
+            passed &= ok
+            print(f"[{'OK' if ok else 'FAIL'}] cursor {table} {filters or '전체'}: {pages}페이지 × {limit} → "
+                  f"{len(ids):,}건 == 기존 {label}, total_count {total:,}")
+
+        # 2) offset 요청도 기존과 같은 페이지
+        ok = True
+        for offset in [0, 19, 1_000, 40_001]:
+            _, expect = old_page(conn, "policies", {"category": "education"}, limit=25, offset=offset)
+            res = call("policies", category="education", limit=25, offset=offset)
+            ok &= [i["id"] for i in res["items"]] == [r[0] for r in expect]
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] offset 요청: 기존 LIMIT/OFFSET 페이지와 같음")
+
+        # 3) 잘못된 cursor / cursor+offset → 400, COUNT 캐시는 catalog_version 이 바뀌면 다시 셈
+        errors = 0
+        for kwargs in [{"cursor": "not-a-cursor"}, {"cursor": keyset_cursor(1, None, 5), "offset": 3},
+                       {"cursor": keyset_cursor(1, None, 5), "q": "마음건강"}]:
+            try:
+                call("policies", **kwargs)
+            except HTTPException as e:
+                errors += e.status_code == 400
+        hits = count_cache.hits
+        call("policies", category="housing")
+        cached = count_cache.hits == hits + 1
+        conn.execute("UPDATE policies SET category = 'housing' WHERE id = 2")
+        db.bump_catalog_version(conn)
+        conn.commit()
+        n_new = call("policies", category="housing")["total_count"]
+        ok = errors == 3 and cached and n_new == old_page(conn, "policies", {"category": "housing"})[0]
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] 잘못된 cursor 400 ×{errors}, total_count 캐시 hit, "
+              f"catalog_version 증가 후 다시 계산 ({n_new:,})")
+
+        # 4) 페이지 깊이별 응답 시간
+        _, order = old_page(conn, "policies", {})
+        ranks = {r[0]: r[1] for r in conn.execute("SELECT id, status_rank FROM policies")}
+        print(f"\n/policies 전체 {len(order):,}건, limit=20 (ms, median of {REPEAT})")
+        print(f"{'offset':>8} | {'기존 OFFSET+COUNT':>17} | {'OFFSET (인덱스)':>15} | {'cursor':>8} | {'cursor+total(캐시)':>17}")
+        for offset in [0, 1_000, 10_000, 100_000, len(order) - 20]:
+            prev = order[offset - 1] if offset else None
+            cursor = keyset_cursor(ranks[prev[0]], prev[2], prev[0]) if prev else None
+            expect = [r[0] for r in order[offset:offset + 20]]
+            ok = [i["id"] for i in call("policies", cursor=cursor, include_total=False)["items"]] == expect
+            passed &= ok
+            t_old = timed(lambda: old_page(conn, "policies", {}, limit=20, offset=offset))
+            t_offset = timed(lambda: call("policies", offset=offset, include_total=False))
+            t_cursor = timed(lambda: call("policies", cursor=cursor, include_total=False))
+            t_total = timed(lambda: call("policies", cursor=cursor))
+            print(f"{offset:>8,} | {t_old:17.2f} | {t_offset:15.2f} | {t_cursor:8.2f} | {t_total:17.2f}"
+                  f"{'' if ok else '  FAIL'}")
+
+        conn.close()
+        db.get_pool().close_all()
+
+    print("\nKEYSET PAGINATION TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
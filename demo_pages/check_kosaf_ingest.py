@@ -0,0 +1,192 @@
+import os
+import io
+import sys
+import time
+import sqlite3
+import tempfile
+import tracemalloc
+import contextlib
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# 실제 키 없이 로컬 stub 서버로만 요청, 재시도 대기는 짧게
+os.environ.setdefault("SERVICE_KEY", "stub-key")
+os.environ["INGEST_BACKOFF_SEC"] = "0.01"
+os.environ["INGEST_MAX_RETRIES"] = "3"
+
+import app.db as db
+from scripts import ingest_scholarships as sch
+
+sys.path.insert(0, os.path.join(ROOT_DIR, "demo_pages"))
+from check_ingest_change_detection import KosafStub, make_kosaf_rows  # noqa: E402
+
+# UDDI 별 건수 (1500건 넘는 UDDI 포함)
+SIZES = {"uddi:a": 2_600, "uddi:b": 1_700, "uddi:c": 400}
+BENCH_SIZES = {f"uddi:bench{i}": 4_000 for i in range(4)}
+LATENCY = (0.05, 0.0002)  # 요청당 50ms + row 당 0.2ms (응답 크기에 비례하는 전송 시간)
+
+
+def make_tables(sizes):
+    tables = {}
+    for i, (uddi, n) in enumerate(sizes.items()):
+        rows = make_kosaf_rows(n, seed=i, prefix=uddi)
+        rows += rows[:10]  # 같은 장학금이 뒤 페이지에 다시 나옴
+        tables[uddi] = rows
+    return tables
+
+
+# ──────────────────────────────
+# 기준값: 기존 구현 (UDDI 순차, page=1 한 번에 perPage 건, 정책마다 INSERT + SELECT id)
+# ──────────────────────────────
+
+def reference_ingest(url, uddis, per_page=1500):
+    import requests
+    db.init_db()
+    fetched_at = db.now_iso()
+    cols = sch.POLICY_COLUMNS
+    saved = set()
+    for uddi in uddis:
+        r = requests.get(f"{url}/{uddi}", params={"page": 1, "perPage": per_page, "serviceKey": "k"}, timeout=30)
+        r.raise_for_status()
+        rows = r.json().get("data", [])
+        policies = sch.convert_to_policies(rows, source_uddi=uddi, fetched_at=fetched_at)
+        conn = db.get_conn()
+        cur = conn.cursor()
+        for p in policies:
+            cur.execute(f"""
+                INSERT INTO policies ({", ".join(cols)}) VALUES ({", ".join("?" * len(cols))})
+                ON CONFLICT(policy_key) DO UPDATE SET {", ".join(f"{c}=excluded.{c}" for c in cols[1:])};
+            """, [p[c] for c in cols])
+        saved_ids = []
+        for p in policies:
+            cur.execute("SELECT id FROM policies WHERE policy_key=?", (p["policy_key"],))
+            saved_ids.append(cur.fetchone()[0])
+        db.enrich_policies(conn, saved_ids)
+        db.bump_catalog_version(conn)
+        conn.commit()
+        conn.close()
+        saved.update(p["policy_key"] for p in policies)
+    return len(saved)
+
+
+def dump(path):
+    """policy_key 기준 내용 비교 (id / fetched_at / 계산 시각 제외)"""
+    conn = sqlite3.connect(path)
+    policies = conn.execute(f"SELECT {', '.join(c for c in sch.POLICY_COLUMNS if c != 'fetched_at')} "
+                            f"FROM policies ORDER BY policy_key").fetchall()
+    elig_cols = [r[1] for r in conn.execute("PRAGMA table_info(policy_eligibility)")
+                 if r[1] not in ("policy_id", "updated_at", "enriched_at")]
+    elig = conn.execute(f"SELECT p.policy_key, {', '.join('e.' + c for c in elig_cols)} "
+                        f"FROM policy_eligibility e JOIN policies p ON p.id = e.policy_id "
+                        f"ORDER BY p.policy_key").fetchall()
+    conn.close()
+    return policies, elig
+
+
+def use_db(tmp, name):
+    db.DB_PATH = os.path.join(tmp, f"{name}.db")
+    return db.DB_PATH
+
+
+def quiet(fn, *args, **kwargs):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        result = fn(*args, **kwargs)
+    return result, out.getvalue()
+
+
+def measured(fn, *args, **kwargs):
+    """returns: (결과, 시간) — 시간은 tracemalloc 없이 (메모리는 peak_mb 로 따로 한 번 더 실행)"""
+    t0 = time.perf_counter()
+    result, _ = quiet(fn, *args, **kwargs)
+    t = time.perf_counter() - t0
+    return result, t
+
+
+def peak_mb(fn, *args, **kwargs):
+    tracemalloc.start()
+    try:
+        quiet(fn, *args, **kwargs)
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    passed = True
+    tables = make_tables(SIZES)
+    n_total = len({p["policy_key"] for uddi, rows in tables.items()
+                   for p in sch.convert_to_policies(rows, uddi, "ts")})
+    api = KosafStub(tables)
+    sch.BASE_URL = api.url
+    sch.KOSAF_UDDIS = list(tables)
+    sch.RATE_PER_SEC = 0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # 1) 기존: perPage=1500 한 번 → 1500건 넘는 UDDI 는 잘림 / 새 수집: 전 페이지
+        use_db(tmp, "ref_1500")
+        quiet(reference_ingest, api.url, list(tables))
+        truncated = len(dump(db.DB_PATH)[0])
+        use_db(tmp, "ref_full")
+        quiet(reference_ingest, api.url, list(tables), per_page=10**6)
+        expect = dump(db.DB_PATH)
+
+        use_db(tmp, "new")
+        api.faults = {("uddi:b", 2): [500, 503], ("uddi:a", 4): [429]}
+        api.calls.clear()
+        summary, log = quiet(sch.run)
+        got = dump(db.DB_PATH)
+        n_pages = {u: -(-len(rows) // sch.PER_PAGE) for u, rows in tables.items()}
+        expect_calls = sum(n_pages.values()) + 3
+        ok = got == expect and len(got[0]) == n_total and summary["counts"]["inserted"] == n_total
+        ok &= sum(api.calls.values()) == expect_calls and set(api.calls) == {
+            (u, p) for u, n in n_pages.items() for p in range(1, n + 1)}
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] 전체 페이지 수집: {len(got[0]):,}건 == 기준(perPage 제한 없음) "
+              f"| 기존 perPage=1500 은 {truncated:,}건에서 잘림 | 요청 {sum(api.calls.values())}회 "
+              f"(페이지 {sum(n_pages.values())} + 일시 실패 재시도 3)")
+
+        # 2) 재시도로도 안 되는 페이지 → 나머지 페이지는 저장, 제거 표시는 생략
+        use_db(tmp, "outage")
+        quiet(sch.run)
+        api.faults = {("uddi:a", 3): "always"}
+        summary, log = quiet(sch.run)
+        api.faults = {}
+        conn = sqlite3.connect(db.DB_PATH)
+        n_removed = conn.execute("SELECT COUNT(*) FROM policies WHERE removed_at IS NOT NULL").fetchone()[0]
+        conn.close()
+        ok = "uddi:a 3페이지 실패" in log and summary["counts"]["removed"] == 0 and n_removed == 0
+        ok &= summary["counts"]["unchanged"] == n_total - sch.PER_PAGE
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] 페이지 실패: uddi:a 3페이지 계속 500 → 나머지 "
+              f"{summary['counts']['unchanged']:,}건 처리, 제거 표시 {n_removed}건 (목록 불완전)")
+
+        # 3) 처리 시간 / 메모리 (요청마다 지연 + 응답 크기에 비례하는 전송 시간)
+        bench = make_tables(BENCH_SIZES)
+        api.tables = bench
+        api.latency = LATENCY
+        api.preload([1500, 10**6, sch.PER_PAGE])
+        sch.KOSAF_UDDIS = list(bench)
+        n_bench = sum(len(r) for r in bench.values())
+        print(f"\nUDDI {len(bench)}개 × {n_bench // len(bench):,}건, 요청당 지연 {LATENCY[0] * 1000:.0f}ms "
+              f"+ row 당 {LATENCY[1] * 1000:.1f}ms")
+        runs = [
+            ("기존 (순차, perPage=1500 한 번 — 잘림)", lambda: reference_ingest(api.url, list(bench))),
+            ("기존 (순차, perPage 제한 없음)", lambda: reference_ingest(api.url, list(bench), per_page=10**6)),
+            (f"페이지 수집 (perPage={sch.PER_PAGE}, 동시 {sch.WORKERS})", lambda: sch.run()["counts"]["inserted"]),
+        ]
+        for i, (label, fn) in enumerate(runs):
+            use_db(tmp, f"bench_{i}")
+            n, t = measured(fn)
+            use_db(tmp, f"bench_mem_{i}")
+            mb = peak_mb(fn)
+            print(f"{label:<40} | {n:6,}건 | {t:6.2f} s | {n / t:6.0f}건/s | 최대 메모리 {mb:6.1f} MB")
+
+    api.close()
+    db.get_pool().close_all()
+    print("\nKOSAF INGEST TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
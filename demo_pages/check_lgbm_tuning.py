@@ -0,0 +1,151 @@
+import os
+import sys
+import math
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "ml", "src"))
+
+import lightgbm as lgb
+from lightgbm import LGBMRegressor
+from sklearn.metrics import mean_absolute_error, mean_squared_error
+
+import tune_lgbm_grid as tg
+
+warnings.filterwarnings("ignore", category=lgb.basic.LGBMDeprecationWarning)
+
+N_TRAIN = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+# 작은 grid (parity 는 trial 전부를 기존 방식으로 다시 학습해서 비교)
+SMALL_GRID = {
+    "num_leaves": [15, 31],
+    "learning_rate": [0.05, 0.1],
+    "subsample": [0.7, 0.9],
+    "colsample_bytree": [0.7, 0.9],
+    "min_child_samples": [20],
+    "n_estimators": [60, 150],
+}
+
+
+def make_data(n, seed):
+    # feature 모양은 FHI feature 와 비슷하게 (합계/건수/비율 + 노이즈 컬럼)
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({
+        "spend_sum_7d": rng.gamma(2.0, 50000, n),
+        "spend_sum_30d": rng.gamma(4.0, 80000, n),
+        "tx_count_7d": rng.poisson(12, n).astype(float),
+        "night_ratio": rng.random(n),
+        "small_ratio": rng.random(n),
+        "cafe_ratio": rng.random(n),
+        "spike": rng.normal(0, 1, n),
+        **{f"noise_{i}": rng.normal(0, 1, n) for i in range(8)},
+    })
+    y = (60 - 20 * X["night_ratio"] - 15 * X["small_ratio"] * X["cafe_ratio"]
+         - 8 * np.tanh(X["spike"]) - X["spend_sum_7d"] / X["spend_sum_30d"].clip(lower=1) * 10
+         + rng.normal(0, 3, n)).clip(0, 100)
+    return X, y.astype(float)
+
+
+def reference_trial(params, X_train, y_train, X_val, y_val, patience):
+    """기존 방식: LGBMRegressor 로 trial 하나씩 학습 (early stopping 은 sklearn callback)"""
+    model = LGBMRegressor(random_state=tg.SEED, n_jobs=tg.THREADS_PER_TRIAL, verbose=-1, **params)
+    callbacks = [lgb.early_stopping(patience, first_metric_only=True, verbose=False)] if patience else []
+    model.fit(X_train, y_train, eval_set=[(X_val, y_val)], eval_metric="l1", callbacks=callbacks)
+    pred = model.predict(X_val)
+    return float(mean_absolute_error(y_val, pred)), float(np.sqrt(mean_squared_error(y_val, pred)))
+
+
+def close(a, b):
+    return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+
+
+def check_parity(data):
+    X_train, y_train, X_val, y_val = data
+    ok = True
+    trials = tg.grid_trials(SMALL_GRID)
+    for patience in (0, 10):
+        results, best, booster, stats = tg.run_search(
+            X_train, y_train, X_val, y_val, grid=SMALL_GRID, workers=1, patience=patience)
+        fail = 0
+        for row, params in zip(results, trials):
+            mae, rmse = reference_trial(params, X_train, y_train, X_val, y_val, patience)
+            if not (close(row["mae"], mae) and close(row["rmse"], rmse)):
+                fail += 1
+                if fail <= 3:
+                    print(f"[FAIL] {params} got=({row['mae']}, {row['rmse']}) expect=({mae}, {rmse})")
+        # 저장용으로 다시 학습한 best 모델 == best trial
+        final_mae = float(mean_absolute_error(y_val, booster.predict(X_val)))
+        ok &= fail == 0 and close(final_mae, best["mae"])
+        print(f"[{'OK' if not fail else 'FAIL'}] parity (early stopping={patience or 'off'}): "
+              f"{len(trials) - fail}/{len(trials)} trial == LGBMRegressor 순차 학습 | "
+              f"실제 학습 {stats['n_trained']}회, best 모델 재학습 MAE {'일치' if close(final_mae, best['mae']) else '불일치'}")
+    return ok
+
+
+def check_pool(data):
+    # process pool 결과 == 단일 프로세스 결과 (trial 순서 포함)
+    X_train, y_train, X_val, y_val = data
+    single, _, _, _ = tg.run_search(X_train, y_train, X_val, y_val, grid=SMALL_GRID, workers=1, threads=1)
+    pooled, _, _, stats = tg.run_search(X_train, y_train, X_val, y_val, grid=SMALL_GRID, workers=2, threads=1)
+    ok = single == pooled
+    print(f"[{'OK' if ok else 'FAIL'}] pool: workers=2 결과 == workers=1 결과 ({len(pooled)} trials)")
+    return ok
+
+
+def check_strategies(data):
+    X_train, y_train, X_val, y_val = data
+    grid_rows, grid_best, _, _ = tg.run_search(X_train, y_train, X_val, y_val, grid=SMALL_GRID, workers=1)
+    rnd_rows, rnd_best, _, _ = tg.run_search(X_train, y_train, X_val, y_val, search="random", grid=SMALL_GRID,
+                                             workers=1, n_trials=10)
+    halving_rows, halving_best, _, stats = tg.run_search(X_train, y_train, X_val, y_val, search="halving",
+                                                        grid=SMALL_GRID, workers=1)
+    all_keys = {tuple(sorted(p.items())) for p in tg.grid_trials(SMALL_GRID)}
+    ok = len(rnd_rows) == 10 and len({tuple(sorted({k: r[k] for k in SMALL_GRID}.items())) for r in rnd_rows}) == 10
+    ok &= all(tuple(sorted(r["params"].items())) in all_keys for r in (rnd_best, grid_best))
+    ok &= halving_best["params"]["n_estimators"] == max(SMALL_GRID["n_estimators"])
+    ok &= rnd_best["mae"] >= grid_best["mae"]
+    print(f"[{'OK' if ok else 'FAIL'}] strategies: grid best MAE={grid_best['mae']:.4f} | "
+          f"random(10) {rnd_best['mae']:.4f} | halving {halving_best['mae']:.4f} ({len(halving_rows)} 평가, "
+          f"학습 {stats['n_trained']}회)")
+    return ok
+
+
+def bench(data):
+    X_train, y_train, X_val, y_val = data
+    # 실제 GRID 에서 learning_rate / num_leaves 만 하나로 줄인 구간
+    grid = {**tg.GRID, "num_leaves": [63], "learning_rate": [0.05]}
+    trials = tg.grid_trials(grid)
+
+    t0 = time.perf_counter()
+    for params in trials:
+        reference_trial(params, X_train, y_train, X_val, y_val, patience=0)
+    t_ref = time.perf_counter() - t0
+
+    print(f"\n{len(trials)} trials, train {len(X_train):,} rows, cpu {os.cpu_count()}")
+    print(f"기존 순차 LGBMRegressor         | {t_ref:7.2f} s")
+    for label, kwargs in [("trial 재사용 (early stop 끔)", dict(patience=0)),
+                          ("trial 재사용 + early stopping", dict(patience=tg.EARLY_STOPPING_ROUNDS)),
+                          ("successive halving", dict(search="halving"))]:
+        rows, best, _, stats = tg.run_search(X_train, y_train, X_val, y_val, grid=grid, **kwargs)
+        print(f"{label:<30} | {stats['elapsed_sec']:7.2f} s | 학습 {stats['n_trained']:>2}회, "
+              f"workers {stats['workers']}x{stats['threads_per_trial']} | best MAE {best['mae']:.4f} "
+              f"(iter {best['best_iteration']})")
+
+
+def main():
+    X_train, y_train = make_data(N_TRAIN, seed=0)
+    X_val, y_val = make_data(N_TRAIN // 4, seed=1)
+    data = (X_train, y_train, X_val, y_val)
+    passed = check_parity(data)
+    passed = check_pool(data) and passed
+    passed = check_strategies(data) and passed
+    bench(data)
+    print("\nLGBM TUNING TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
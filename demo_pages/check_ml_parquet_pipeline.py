@@ -0,0 +1,174 @@
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT_DIR, "ml", "src"))
+
+import table_io
+import normalize
+import feature_engineering
+import feature_category_mix
+import merge_features
+import make_labels
+import split_train_val
+
+N_USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+
+KAGGLE_CATEGORIES = list(normalize.KAGGLE_CATEGORY_MAP) + ["unknown_cat"]
+
+
+def make_raw_csv(path, n_users, seed=0):
+    """Kaggle fraud_detection 모양의 원본 (쓰지 않는 컬럼 포함, cc_num 자릿수 제각각)"""
+    rng = np.random.default_rng(seed)
+    per_user = rng.integers(1, 80, n_users)
+    n = int(per_user.sum())
+    digits = rng.integers(11, 20, n_users)
+    # 19자리 cc_num 도 int64 범위 안 (Kaggle 원본 최대 4.99e18)
+    cc = np.unique([int(rng.integers(10 ** (int(d) - 1), min(10 ** int(d) - 1, 4_999_999_999_999_999_999)))
+                    for d in digits])
+    cc_num = np.repeat(rng.permutation(cc), per_user[:len(cc)])
+    n = len(cc_num)
+    seconds = rng.integers(0, 540 * 86400, n)
+    dt = pd.Timestamp("2019-01-01") + pd.to_timedelta(seconds, unit="s")
+    df = pd.DataFrame({
+        "Unnamed: 0": np.arange(n),
+        "trans_date_trans_time": dt.strftime("%Y-%m-%d %H:%M:%S"),
+        "cc_num": cc_num,
+        "merchant": np.char.add("fraud_Merchant ", rng.integers(0, 700, n).astype(str)),
+        "category": rng.choice(KAGGLE_CATEGORIES, n),
+        "amt": np.round(rng.gamma(1.3, 50.0, n), 2),
+        "first": "Jennifer", "last": "Banks", "gender": rng.choice(["F", "M"], n),
+        "street": "561 Perry Cove", "city": "Moravian Falls", "state": "NC", "zip": 28654,
+        "lat": rng.normal(36, 3, n), "long": rng.normal(-81, 5, n), "city_pop": 3495,
+        "job": "Psychologist, counselling", "dob": "1988-03-09",
+        "trans_num": [f"{i:032x}" for i in rng.integers(0, 2**62, n)],
+        "unix_time": seconds + 1325376018,
+        "merch_lat": rng.normal(36, 3, n), "merch_long": rng.normal(-81, 5, n),
+        "is_fraud": 0,
+    })
+    df.loc[rng.choice(n, n // 300, replace=False), "amt"] = 0.0
+    df.to_csv(path, index=False)
+    return n
+
+
+def run_pipeline(raw_path, out_dir, fmt, export_csv=False):
+    """normalize → feature × 2 → merge → label → split 를 fmt 로 실행. returns: 단계별 시간, 중간 파일 크기"""
+    table_io.TABLE_FORMAT = fmt
+    table_io.EXPORT_CSV = export_csv
+    p = lambda name: os.path.join(out_dir, f"{name}.parquet")
+
+    normalized = p("normalized")
+    feature_engineering.NORMALIZED_PATH = feature_category_mix.NORMALIZED_PATH = normalized
+    feature_engineering.FEATURES_OUT = merge_features.BASIC_PATH = p("features_basic")
+    feature_category_mix.OUT_PATH = merge_features.CAT_PATH = p("features_category_mix_30d")
+    merge_features.OUT_PATH = make_labels.IN_PATH = p("features")
+    make_labels.OUT_PATH = split_train_val.IN_PATH = p("features_labeled")
+    split_train_val.TRAIN_OUT = p("train")
+    split_train_val.VAL_OUT = p("val")
+
+    stages = [
+        ("normalize", lambda: normalize.normalize_raw_dataset(raw_path, normalized, "kaggle_fraud_detection")),
+        ("feature_engineering", feature_engineering.main),
+        ("feature_category_mix", feature_category_mix.main),
+        ("merge_features", merge_features.main),
+        ("make_labels", make_labels.main),
+        ("split_train_val", split_train_val.main),
+    ]
+    times = {}
+    devnull = open(os.devnull, "w")
+    for name, fn in stages:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            t0 = time.perf_counter()
+            fn()
+            times[name] = time.perf_counter() - t0
+        finally:
+            sys.stdout = stdout
+    devnull.close()
+    sizes = {f: os.path.getsize(os.path.join(out_dir, f)) for f in os.listdir(out_dir)}
+    return times, sizes
+
+
+def load_split(out_dir, fmt):
+    table_io.TABLE_FORMAT = fmt
+    out = {}
+    for name in ("train", "val"):
+        df = table_io.read_table(os.path.join(out_dir, f"{name}.parquet"))
+        df["user_id"] = df["user_id"].astype(str)
+        df["date"] = pd.to_datetime(df["date"])
+        out[name] = df.reset_index(drop=True)
+    return out
+
+
+def same_frames(a, b):
+    if list(a.columns) != list(b.columns) or len(a) != len(b):
+        return False, "columns/rows"
+    for c in a.columns:
+        x, y = a[c], b[c]
+        if x.dtype.kind == "f" or y.dtype.kind == "f":
+            # CSV 는 float 를 텍스트로 왕복하므로 마지막 자리 오차까지만 허용
+            if not np.allclose(x.to_numpy(float), y.to_numpy(float), rtol=1e-12, atol=0.0):
+                return False, c
+        elif not (x.astype(str).to_numpy() == y.astype(str).to_numpy()).all():
+            return False, c
+    return True, ""
+
+
+def main():
+    passed = True
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = os.path.join(tmp, "transactions.csv")
+        n_tx = make_raw_csv(raw, N_USERS)
+        print(f"raw: {n_tx:,} transactions, {os.path.getsize(raw) / 1e6:.1f} MB (Kaggle 컬럼 22개)\n")
+
+        results = {}
+        for fmt in ("csv", "parquet"):
+            out_dir = os.path.join(tmp, fmt)
+            os.makedirs(out_dir)
+            results[fmt] = run_pipeline(raw, out_dir, fmt)
+
+        csv_split = load_split(os.path.join(tmp, "csv"), "csv")
+        pq_split = load_split(os.path.join(tmp, "parquet"), "parquet")
+        for name in ("train", "val"):
+            ok, col = same_frames(csv_split[name], pq_split[name])
+            passed &= ok
+            print(f"[{'OK' if ok else 'FAIL'}] {name}: parquet 파이프라인 == CSV 파이프라인 "
+                  f"(rows={len(pq_split[name]):,}, users={pq_split[name]['user_id'].nunique():,}){' ' + col if col else ''}")
+
+        # 타입 유지 + column projection + CSV 내보내기 옵션
+        table_io.TABLE_FORMAT = "parquet"
+        normalized = os.path.join(tmp, "parquet", "normalized.parquet")
+        proj = table_io.read_table(normalized, columns=["user_id", "datetime", "amount"])
+        ok = list(proj.columns) == ["user_id", "datetime", "amount"]
+        ok &= isinstance(proj["user_id"].dtype, pd.CategoricalDtype) and proj["datetime"].dtype.kind == "M"
+        ok &= isinstance(table_io.read_table(normalized, columns=["category"])["category"].dtype, pd.CategoricalDtype)
+        export_dir = os.path.join(tmp, "export")
+        os.makedirs(export_dir)
+        run_pipeline(raw, export_dir, "parquet", export_csv=True)
+        ok &= all(os.path.exists(os.path.join(export_dir, f"{n}.{e}")) for n in ("normalized", "train", "val")
+                  for e in ("parquet", "csv"))
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] types: user_id/category categorical, datetime 타입 유지, "
+              f"필요한 컬럼만 읽기, ML_EXPORT_CSV=1 → .csv 함께 저장")
+
+        t_csv, s_csv = results["csv"]
+        t_pq, s_pq = results["parquet"]
+        print(f"\n{'stage':<22} | {'csv':>8} | {'parquet':>8} | {'csv size':>9} | {'parquet size':>12}")
+        for (stage, t1), out in zip(t_csv.items(), ["normalized", "features_basic", "features_category_mix_30d",
+                                                     "features", "features_labeled", "train"]):
+            print(f"{stage:<22} | {t1:7.2f}s | {t_pq[stage]:7.2f}s | {s_csv[out + '.csv'] / 1e6:7.1f}MB | "
+                  f"{s_pq[out + '.parquet'] / 1e6:10.1f}MB")
+        total_csv, total_pq = sum(s_csv.values()), sum(s_pq.values())
+        print(f"{'total':<22} | {sum(t_csv.values()):7.2f}s | {sum(t_pq.values()):7.2f}s | "
+              f"{total_csv / 1e6:7.1f}MB | {total_pq / 1e6:10.1f}MB (x{total_csv / total_pq:.1f} 작음)")
+
+    print("\nML PARQUET PIPELINE TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import os
+import sys
+import json
+import time
+import random
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.routers.fhi as fhi
+
+sys.path.insert(0, os.path.join(ROOT_DIR, "demo_pages"))
+from check_parser_specs import make_text  # noqa: E402
+
+N_TEXTS = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+
+app = FastAPI()
+app.include_router(fhi.router)
+client = TestClient(app)
+
+NDJSON = {"Content-Type": "application/x-ndjson"}
+
+
+def read_ndjson(resp):
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in resp.text.splitlines() if line]
+    return lines[:-1], lines[-1]["summary"]
+
+
+def strip_now(txs):
+    # 일시가 없는 푸시는 datetime.now() → 비교에서 제외
+    return [{k: v for k, v in tx.items() if k != "datetime"} for tx in txs]
+
+
+def check_parity(texts):
+    single = [client.post("/fhi/parse", json={"text": t}).json() for t in texts]
+
+    results, summary = read_ndjson(client.post("/fhi/parse/batch", json=texts))
+    body = "\n".join(json.dumps({"id": f"push-{i}", "text": t}, ensure_ascii=False) for i, t in enumerate(texts))
+    nd_results, nd_summary = read_ndjson(client.post("/fhi/parse/batch", content=body.encode("utf-8"), headers=NDJSON))
+
+    fail = 0
+    for i, (s, r, n) in enumerate(zip(single, results, nd_results)):
+        ok = r["index"] == n["index"] == i and n["id"] == f"push-{i}"
+        if "error" in s:
+            ok &= r.get("error") == n.get("error") == s["error"]
+        else:
+            ok &= strip_now(r["transactions"]) == strip_now(n["transactions"]) == strip_now(s["transactions"])
+        if not ok:
+            fail += 1
+            if fail <= 3:
+                print(f"[FAIL] {texts[i]!r}\n  single={s}\n  batch={r}\n  ndjson={n}")
+    ok = fail == 0 and len(results) == len(nd_results) == len(texts) and summary["count"] == nd_summary["count"] == len(texts)
+    ok &= summary["transactions"] == sum(len(r.get("transactions", [])) for r in results)
+    print(f"[{'OK' if ok else 'FAIL'}] parity: {len(texts) - fail:,}/{len(texts):,} texts, /fhi/parse == batch(JSON 배열) == batch(NDJSON) "
+          f"| summary {summary}")
+    return ok
+
+
+def check_errors():
+    items = ["신한카드 승인 5,800원\nGS25\n2025-01-01 12:30", "", None, 123, {"id": 7, "text": ""}, {"id": 8}]
+    results, summary = read_ndjson(client.post("/fhi/parse/batch", json=items))
+    ok = "transactions" in results[0] and all("error" in r for r in results[1:])
+    ok &= results[4]["id"] == 7 and results[1]["error"] == fhi.EMPTY_TEXT_ERROR
+    ok &= summary["ok"] == 1 and summary["errors"] == 5
+
+    # NDJSON 의 깨진 줄은 그 줄만 오류, 나머지는 계속 처리
+    body = b'"\xec\xb9\xb4\xec\xb9\xb4\xec\xbd\x98\xed\x8e\x98\xec\x9d\xb4 3,000\xec\x9b\x90"\n{broken\n\n{"id": "x", "text": "KB\xea\xb5\xad\xeb\xaf\xbc\xec\xb9\xb4\xeb\x93\x9c 1,000\xec\x9b\x90"}'
+    nd, nd_summary = read_ndjson(client.post("/fhi/parse/batch", content=body, headers=NDJSON))
+    ok &= [("error" in r) for r in nd] == [False, True, False] and nd[1]["error"].startswith("invalid JSON line")
+    ok &= nd[2]["id"] == "x" and nd_summary["count"] == 3
+
+    # 파서 예외는 항목별 오류로 (기존처럼 [] 로 숨기지 않음)
+    saved = fhi.parse_push_notification
+    fhi.parse_push_notification = lambda text, raise_errors=False: (_ for _ in ()).throw(ValueError("boom"))
+    try:
+        results, _ = read_ndjson(client.post("/fhi/parse/batch", json=["카카오페이 1원"]))
+        single = client.post("/fhi/parse", json={"text": "카카오페이 1원"}).json()
+    finally:
+        fhi.parse_push_notification = saved
+    ok &= results[0]["error"] == single["error"] == "ValueError: boom"
+
+    ok &= client.post("/fhi/parse/batch", json={"text": "x"}).status_code == 400
+    ok &= client.post("/fhi/parse/batch", content=b"{not json", headers={"Content-Type": "application/json"}).status_code == 400
+    print(f"[{'OK' if ok else 'FAIL'}] errors: 빈 text / 문자열 아님 / 깨진 NDJSON 줄 / 파서 예외 → 항목별 error, 배열 아닌 본문 → 400")
+    return ok
+
+
+def bench(texts):
+    t0 = time.perf_counter()
+    for t in texts:
+        client.post("/fhi/parse", json={"text": t})
+    t_single = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    read_ndjson(client.post("/fhi/parse/batch", json=texts))
+    t_batch = time.perf_counter() - t0
+
+    body = "\n".join(json.dumps(t, ensure_ascii=False) for t in texts).encode("utf-8")
+    t0 = time.perf_counter()
+    read_ndjson(client.post("/fhi/parse/batch", content=body, headers=NDJSON))
+    t_nd = time.perf_counter() - t0
+
+    print(f"\n{len(texts):,} push texts (chunk {fhi.PARSE_BATCH_CHUNK})")
+    print(f"/fhi/parse x {len(texts):<6,}  | {len(texts) / t_single:10,.0f} texts/s")
+    print(f"/fhi/parse/batch JSON  | {len(texts) / t_batch:10,.0f} texts/s")
+    print(f"/fhi/parse/batch NDJSON| {len(texts) / t_nd:10,.0f} texts/s")
+
+
+def main():
+    rng = random.Random(0)
+    texts = [make_text(rng) for _ in range(2000)]
+    passed = check_parity(texts)
+    passed = check_errors() and passed
+    bench([make_text(rng) for _ in range(N_TEXTS)])
+    print("\nPARSE BATCH TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
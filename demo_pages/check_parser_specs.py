@@ -0,0 +1,290 @@
+import os
+import sys
+import re
+import time
+import random
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import utils.parser as p
+from utils.parser import parse_push_notification
+
+N_TEXTS = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+
+# ──────────────────────────────
+# 기존 구현 (카드사별 _parse_* 함수 + 매번 re.search) — parity 비교용
+# ──────────────────────────────
+
+def ref_detect_source(text: str) -> str:
+    t = text.lower()
+    if "카카오페이" in text or "kakaopay" in t:
+        return "kakaopay"
+    if "신한" in text:
+        return "shinhan"
+    if "kb" in t or "국민" in text:
+        return "kb"
+    if "현대" in text:
+        return "hyundai"
+    if "삼성" in text:
+        return "samsung"
+    return "unknown"
+
+
+def ref_parse_unknown(text: str) -> dict:
+    # 기존 기본 파싱 로직을 unknown fallback으로 사용
+    amount_pattern = r"([\d,]+)\s*원"
+    amount_match = re.search(amount_pattern, text)
+    amount = int(amount_match.group(1).replace(",", "")) if amount_match else 0
+
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    store = lines[1] if len(lines) >= 2 else "알수없음"
+
+    datetime_pattern = r"(\d{4}-\d{2}-\d{2})\s*(\d{2}:\d{2})"
+    dt_match = re.search(datetime_pattern, text)
+    if dt_match:
+        dt_str = f"{dt_match.group(1)} {dt_match.group(2)}"
+        dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
+    else:
+        dt = datetime.now()
+
+    return {"store": store, "amount": amount, "datetime": dt}
+
+
+def ref_parse_shinhan(text: str) -> dict:
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+
+    # 1) amount: 어디 있든 "숫자원" 패턴으로 검색 (1줄째에 붙는 경우 대응)
+    amount = 0
+    m = re.search(r"([\d,]+)\s*원", text)
+    if m:
+        amount = int(m.group(1).replace(",", ""))
+
+    # 2) datetime: 보통 마지막 줄에 있음 (없으면 현재시간)
+    dt = datetime.now()
+    mdt = re.search(r"(\d{4}-\d{2}-\d{2})\s*(\d{2}:\d{2})", text)
+    if mdt:
+        dt = datetime.strptime(f"{mdt.group(1)} {mdt.group(2)}", "%Y-%m-%d %H:%M")
+
+    # 3) store/merchant: 보통 2번째 줄이 매장명
+    store = "알수없음"
+    if len(lines) >= 2:
+        store = lines[1]
+    else:
+        # fallback: 그래도 없으면 unknown 로직 사용
+        fallback = ref_parse_unknown(text)
+        store = fallback.get("store", store)
+
+    return {
+        "store": store,
+        "amount": amount,
+        "datetime": dt,
+        "payment_method": "card",  # 신한카드 푸시는 카드 결제로 간주
+    }
+
+def ref_parse_kakaopay(text: str) -> dict:
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+
+    # amount
+    amount = 0
+    m = re.search(r"([\d,]+)\s*원", text)
+    if m:
+        amount = int(m.group(1).replace(",", ""))
+
+    # datetime (있는 경우만)
+    dt = datetime.now()
+    mdt = re.search(r"(\d{4}-\d{2}-\d{2})\s*(\d{2}:\d{2})", text)
+    if mdt:
+        dt = datetime.strptime(f"{mdt.group(1)} {mdt.group(2)}", "%Y-%m-%d %H:%M")
+
+    # merchant: 보통 2번째 줄
+    store = "알수없음"
+    if len(lines) >= 2:
+        store = lines[1]
+
+    return {
+        "store": store,
+        "amount": amount,
+        "datetime": dt,
+        "payment_method": "wallet",  # 카카오페이는 지갑/간편결제로
+    }
+
+
+def ref_parse_kb(text: str) -> dict:
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+
+    # amount
+    amount = 0
+    m = re.search(r"([\d,]+)\s*원", text)
+    if m:
+        amount = int(m.group(1).replace(",", ""))
+
+    # datetime
+    dt = datetime.now()
+    mdt = re.search(r"(\d{4}[./-]\d{2}[./-]\d{2})\s*(\d{2}:\d{2})", text)
+    if mdt:
+        date_str = mdt.group(1).replace(".", "-").replace("/", "-")
+        dt = datetime.strptime(f"{date_str} {mdt.group(2)}", "%Y-%m-%d %H:%M")
+
+    # merchant: 보통 2번째 줄이거나, "가맹점" 라벨 뒤에 올 수도 있어서 fallback
+    store = "알수없음"
+    if len(lines) >= 2:
+        store = lines[1]
+    # 라벨 패턴 fallback
+    mstore = re.search(r"(가맹점|사용처)[:\s]*([^\n]+)", text)
+    if mstore:
+        store = mstore.group(2).strip()
+
+    return {
+        "store": store,
+        "amount": amount,
+        "datetime": dt,
+        "payment_method": "card",
+    }
+
+
+def ref_parse_samsung(text: str) -> dict:
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+
+    # amount
+    amount = 0
+    m = re.search(r"([\d,]+)\s*원", text)
+    if m:
+        amount = int(m.group(1).replace(",", ""))
+
+    # datetime (YYYY-MM-DD HH:MM 또는 YYYY.MM.DD HH:MM 등)
+    dt = datetime.now()
+    mdt = re.search(r"(\d{4}[./-]\d{2}[./-]\d{2})\s*(\d{2}:\d{2})", text)
+    if mdt:
+        date_str = mdt.group(1).replace(".", "-").replace("/", "-")
+        dt = datetime.strptime(f"{date_str} {mdt.group(2)}", "%Y-%m-%d %H:%M")
+
+    # merchant: 보통 2번째 줄 / 또는 "가맹점:" 라벨 뒤
+    store = "알수없음"
+    if len(lines) >= 2:
+        store = lines[1]
+
+    mstore = re.search(r"(가맹점|사용처)[:\s]*([^\n]+)", text)
+    if mstore:
+        store = mstore.group(2).strip()
+
+    # 삼성페이면 wallet, 삼성카드면 card로(초간단 휴리스틱)
+    payment_method = "wallet" if "삼성페이" in text else "card"
+
+    return {
+        "store": store,
+        "amount": amount,
+        "datetime": dt,
+        "payment_method": payment_method,
+    }
+
+
+def reference_parse(text):
+    try:
+        source = ref_detect_source(text)
+        if source == "shinhan":
+            tx = ref_parse_shinhan(text)
+        elif source == "kakaopay":
+            tx = ref_parse_kakaopay(text)
+        elif source == "kb":
+            tx = ref_parse_kb(text)
+        elif source == "samsung":
+            tx = ref_parse_samsung(text)
+        else:
+            tx = ref_parse_unknown(text)
+        if not tx:
+            return []
+        tx["source"] = source
+        return [p._normalize_tx(tx, raw_text=text)]
+    except Exception:
+        return []
+
+
+HEADERS = ["[신한카드 승인]", "신한카드", "카카오페이", "KakaoPay 결제", "KB국민카드", "[KB] 승인", "국민카드",
+           "현대카드", "삼성카드 승인", "삼성페이", "승인", "결제 알림", "", "현대카드 카카오페이", "삼성 KB"]
+MERCHANTS = ["GS25 이대점", "스타벅스(강남역)", "무신사", "  ", "현대백화점", "삼성전자서비스", "신한은행 ATM", "쿠팡"]
+DATES = ["2025-01-01 12:30", "2025.02.03 09:05", "2025/12/31 23:59", "2025-1-1 12:30", "2025-13-40 10:00",
+         "2025-01-0112:30", "", "2024.11.21 25:10"]
+AMOUNTS = ["5,800원", "5800 원", "1,234,567원", ",,원", "원", "0원", "12,000", ""]
+LABELS = ["", "가맹점: 올리브영 강남점", "사용처 배달의민족", "가맹점:", "가맹점\n이마트24"]
+
+
+def make_text(rng):
+    parts = [rng.choice(HEADERS) + rng.choice(["", " " + rng.choice(AMOUNTS)]), rng.choice(MERCHANTS),
+             rng.choice(LABELS), rng.choice(["일시불 승인", "", "체크"]), rng.choice(DATES), rng.choice(AMOUNTS)]
+    rng.shuffle(parts[2:])
+    return rng.choice(["\n", "\n\n", "\r\n"]).join(parts)
+
+
+def same(a, b):
+    if len(a) != len(b):
+        return False
+    for x, y in zip(a, b):
+        x, y = dict(x), dict(y)
+        dx, dy = x.pop("datetime"), y.pop("datetime")
+        # 일시가 없으면 둘 다 datetime.now() → 몇 초 차이는 허용
+        if x != y or abs((dx - dy).total_seconds()) > 5:
+            return False
+    return True
+
+
+def check_parity():
+    rng = random.Random(0)
+    texts = [make_text(rng) for _ in range(5000)] + [None, "", "카카오페이", "신한\n"]
+    fail = 0
+    for t in texts:
+        if not same(parse_push_notification(t), reference_parse(t)):
+            fail += 1
+            if fail <= 3:
+                print(f"[FAIL] {t!r}\n  got={parse_push_notification(t)}\n  ref={reference_parse(t)}")
+    sources = sorted({tx["source"] for t in texts for tx in parse_push_notification(t)})
+    print(f"[{'OK' if not fail else 'FAIL'}] parity: {len(texts) - fail:,}/{len(texts):,} texts identical (sources: {sources})")
+    return fail == 0
+
+
+def check_new_issuer():
+    # 새 카드사 = 스펙 표에 한 줄 추가
+    spec = {"source": "woori", "detect": ["우리카드"], "date": p.DATE_ANY_SEP, "merchant_label": p.MERCHANT_LABEL,
+            "payment_method": "card"}
+    saved = p._DISPATCH
+    try:
+        p._DISPATCH = [(("우리카드",), p._compile_spec(spec))] + saved
+        tx = parse_push_notification("우리카드 승인 9,900원\n가맹점: 넷플릭스\n2025.03.01 10:00")[0]
+    finally:
+        p._DISPATCH = saved
+    assert (tx["source"], tx["merchant"], tx["amount"], tx["payment_method"]) == ("woori", "넷플릭스", 9900, "card")
+    assert tx["datetime"] == datetime(2025, 3, 1, 10, 0)
+    print("[OK] new issuer: 스펙 1줄 추가로 우리카드 파싱")
+
+
+def bench():
+    rng = random.Random(1)
+    texts = [make_text(rng) for _ in range(N_TEXTS)]
+    stdout = sys.stdout
+    results = {}
+    for label, fn in [("기존 _parse_*", reference_parse), ("spec table", parse_push_notification)]:
+        sys.stdout = open(os.devnull, "w")  # ParserError 출력은 측정에서 제외
+        try:
+            t0 = time.perf_counter()
+            for t in texts:
+                fn(t)
+            results[label] = time.perf_counter() - t0
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+    print(f"\n{N_TEXTS:,} push texts")
+    for label, sec in results.items():
+        print(f"{label:<14} | {N_TEXTS / sec:10,.0f} texts/s")
+
+
+def main():
+    passed = check_parity()
+    check_new_issuer()
+    bench()
+    print("\nPARSER SPEC TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import statistics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import app.db as db
+import app.routers.user_recommendations as ur
+from utils.policy_enricher import TERMS, FIELDS, RESTRICTED_GROUPS, enrich_policy
+from utils.region_matcher import SIDO_LIST, SIGUNGU_LIST
+
+sys.path.insert(0, os.path.join(ROOT_DIR, "demo_pages"))
+from check_user_recommendations_topk import build_corpus, TOPICS  # noqa: E402
+
+N_POLICIES = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+SAMPLE_CONDITIONS = [
+    "신청대상: 만 19세 ~ 34세 청년, 서울 마포구 거주",
+    "지원대상: 대학 재학 중인 학생 (19~29세)",
+    "특정자격: 한부모 가정 자녀, 만 39세 이하",
+    "자격제한: 북한이탈주민 대상 / 만 18세 이상",
+]
+
+
+# ──────────────────────────────
+# 기존 구현 (요청마다 name/condition/provider 텍스트를 직접 검사) — parity 비교용
+# ──────────────────────────────
+
+def reference_score(policy, user, keywords):
+    score = 0
+    reasons = []
+    status = ur._norm(policy.get("status"))
+    if status == "진행중":
+        score += 30
+        reasons.append("현재 신청 가능(진행중)")
+    elif status == "예정":
+        score += 10
+        reasons.append("곧 신청 시작(예정)")
+    elif status == "마감":
+        score -= 50
+        reasons.append("현재 마감")
+
+    name = ur._norm(policy.get("name"))
+    provider = ur._norm(policy.get("provider"))
+    condition = ur._norm(policy.get("condition"))
+    blob = " ".join([name, provider, condition, ur._norm(policy.get("benefit"))])
+    for k in keywords:
+        k = ur._norm(k)
+        if not k:
+            continue
+        if k in name:
+            score += 10
+            reasons.append(f"키워드 '{k}'가 정책명에 포함")
+        elif k in blob:
+            score += 5
+            reasons.append(f"키워드 '{k}'가 조건/혜택/기관에 포함")
+
+    for rk in RESTRICTED_GROUPS:
+        if rk in f"{name} {condition}":
+            score -= 100
+            reasons.append(f"대상 제한({rk}) → 제외")
+            break
+
+    if user.get("region"):
+        blob_region = f"{provider} {name} {condition}"
+        user_region = user["region"]
+        matched = False
+        for sigungu in SIGUNGU_LIST:
+            if sigungu in blob_region:
+                matched = True
+                user_sido = user_region.split()[0] if user_region else ""
+                if sigungu not in user_region and user_sido not in blob_region:
+                    score -= 100
+                    reasons.append(f"지역 불일치({sigungu}) → 제외")
+                break
+        if not matched:
+            for sido in SIDO_LIST:
+                if sido in blob_region:
+                    if sido not in user_region:
+                        score -= 100
+                        reasons.append(f"지역 불일치({sido}) → 제외")
+                    break
+    return score, reasons[:6]
+
+
+def reference_snippets(policy, keywords, window):
+    sources = [(f, ur._norm(policy.get(f))) for f in FIELDS]
+    out = []
+    for kw in keywords:
+        k = ur._norm(kw)
+        if not k:
+            continue
+        for source_name, text in sources:
+            snip = ur._find_snippet(text, k, window)
+            if snip:
+                out.append({"keyword": k, "source": source_name, "snippet": snip})
+                break
+        if len(out) >= 6:
+            break
+    return out
+
+
+def check_extraction():
+    ok = True
+    for cond in SAMPLE_CONDITIONS:
+        e = enrich_policy("정책", "기관", cond, "")
+        evidence = json.loads(e["text_evidence_json"])
+        for items in evidence.values():
+            for it in items:
+                text = cond if it["field"] == "condition" else "정책"
+                ok &= text[it["start"]:it["end"]] == it["text"]
+        print(f"  {cond[:28]:<28} → age {e['text_min_age']}~{e['text_max_age']} | student {e['text_student_required']} "
+              f"| restricted {e['restricted_group']} | region {e['region_sigungu'] or e['region_sido']}")
+
+    rng = random.Random(0)
+    pieces = TERMS + ["청년층청년", "대학원생", " ", "가나다", "학", "생"]
+    for _ in range(2000):
+        fields = {f: "".join(rng.choice(pieces) for _ in range(rng.randint(0, 6))) for f in FIELDS}
+        offsets = json.loads(enrich_policy(fields["name"], fields["provider"], fields["condition"], fields["benefit"])["term_offsets_json"])
+        for t in TERMS:
+            expect = {f: fields[f].strip().find(t) for f in FIELDS if t in fields[f].strip()}
+            ok &= offsets.get(t, {}) == expect
+    print(f"[{'OK' if ok else 'FAIL'}] extraction: evidence offset 이 원문과 일치, term offset == str.find (2000 texts)")
+    return ok
+
+
+def check_parity():
+    with db.db_conn() as conn:
+        rows = conn.execute(f"""
+            SELECT {", ".join("p." + c for c in ur.POLICY_FIELDS)}, {", ".join("e." + c for c in ur.ONLINE_COLUMNS)}
+            FROM policies p LEFT JOIN policy_eligibility e ON e.policy_id = p.id
+        """).fetchall()
+    rng = random.Random(1)
+    cases = [
+        ({"region": rng.choice(["서울", "부산 해운대구", "제주", "서울시 마포구", None])},
+         rng.sample(TOPICS + TERMS + ["없는키워드", "지원"], rng.randint(0, 6)))
+        for _ in range(20)
+    ]
+    fail = total = 0
+    for user, keywords in cases:
+        for r in rows:
+            p = ur._row_to_policy(r)
+            enrichment = ur._row_enrichment(r)
+            total += 1
+            if (ur._score(p, user, keywords, enrichment) != reference_score(p, user, keywords)
+                    or ur._collect_snippets(p, keywords, 40, enrichment) != reference_snippets(p, keywords, 40)):
+                fail += 1
+                if fail <= 3:
+                    print(f"[FAIL] policy={p['id']} user={user} keywords={keywords}")
+    print(f"[{'OK' if not fail else 'FAIL'}] parity: {total - fail:,}/{total:,} (요청 x 정책) 점수/사유/스니펫 동일")
+    return fail == 0
+
+
+def bench():
+    rng = random.Random(2)
+    cases = [dict(user_id=uid, top_n=10, exclude_closed=True, include_snippets=True, snippet_window=40,
+                  keyword=rng.sample(TOPICS, 1)) for uid in (1, 2, 3) for _ in range(3)]
+
+    def run():
+        times = []
+        for case in cases:
+            t0 = time.perf_counter()
+            ur.recommend_for_user(**case)
+            times.append((time.perf_counter() - t0) * 1000)
+        return statistics.median(times)
+
+    score, snippets = ur._score, ur._collect_snippets
+    t_new = run()
+    ur._score = lambda p, user, keywords, enrichment=None: reference_score(p, user, keywords)
+    ur._collect_snippets = lambda p, keywords, window, enrichment=None: reference_snippets(p, keywords, window)
+    try:
+        t_ref = run()
+    finally:
+        ur._score, ur._collect_snippets = score, snippets
+    print(f"\n/users/{{id}}/recommendations ({N_POLICIES:,} policies) p50 | 텍스트 검사 {t_ref:7.1f} ms | enrichment 조회 {t_new:7.1f} ms")
+
+
+def main():
+    print("extraction samples")
+    passed = check_extraction()
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "bench.db")
+        db.init_db()
+        t0 = time.perf_counter()
+        build_corpus(N_POLICIES)
+        print(f"corpus: {N_POLICIES:,} policies + enrichment in {time.perf_counter() - t0:.1f}s")
+
+        passed = check_parity() and passed
+        bench()
+        db.get_pool().close_all()
+
+    print("\nPOLICY ENRICHMENT TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
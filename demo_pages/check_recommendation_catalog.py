@@ -0,0 +1,230 @@
+import os
+import sys
+import time
+import random
+import tempfile
+import statistics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import app.db as db
+from app.catalog import policy_catalog, POLICY_FIELDS
+from app.routers.recommendations import (
+    RecommendationRequest,
+    recommend,
+    _find_snippet,
+    _all_keywords,
+    _norm,
+)
+
+N_POLICIES = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+
+REGIONS = ["서울", "부산", "경기", "전남", "제주", "전국"]
+TOPICS = ["월세", "전세자금", "취업", "창업", "교통비", "학자금", "마음건강", "자산형성"]
+TARGETS = ["청년", "청년층", "대학생", "대학원생", "재학생", "학부생", "신혼부부", "구직자", "중장년"]
+CATEGORIES = ["scholarship", "housing", "employment", "subsidy"]
+
+
+def make_policy(i, rng):
+    region = rng.choice(REGIONS)
+    name = f"{rng.choice(['', region + ' '])}{rng.choice(TOPICS)} {rng.choice(['지원', '바우처', '장학금'])} {i}"
+    condition = f"{rng.choice(TARGETS)} 대상, {rng.choice(REGIONS)} 거주자 {rng.choice(TOPICS)} 필요 시"
+    benefit = f"{rng.choice(TOPICS)} 월 최대 {rng.randint(1, 50)}만원" if rng.random() < 0.9 else None
+    status = rng.choice(["진행중", "예정", "마감", "정보없음", None, " 진행중 "])
+    start = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" if rng.random() < 0.9 else None
+    provider = rng.choice([f"{region}시청", "한국장학재단", None])
+    return (f"bench:{i}", name, rng.choice(CATEGORIES), provider, start, status, condition, benefit, "bench")
+
+
+def build_corpus(n):
+    rng = random.Random(0)
+    conn = db.get_conn()
+    conn.executemany(
+        """
+        INSERT INTO policies (policy_key, name, category, provider, start_date, status, condition, benefit, source)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (make_policy(i, rng) for i in range(n)),
+    )
+    db.bump_catalog_version(conn)
+    conn.commit()
+    conn.close()
+
+
+# ──────────────────────────────
+# 기존 구현 (요청마다 DB 조회 + 전 정책 blob 스캔) — parity 비교용
+# LIMIT 800 은 빼고 전체를 본다 (카탈로그도 전체를 대상으로 함)
+# ──────────────────────────────
+
+def reference_score(p, req):
+    name = _norm(p.get("name"))
+    category = _norm(p.get("category"))
+    provider = _norm(p.get("provider"))
+    status = _norm(p.get("status"))
+    condition = _norm(p.get("condition"))
+    benefit = _norm(p.get("benefit"))
+    blob = " ".join([name, category, provider, status, condition, benefit])
+
+    score = 0
+    reasons = []
+    if status == "진행중":
+        score += 30
+        reasons.append("현재 신청 가능(진행중)")
+    elif status == "예정":
+        score += 10
+        reasons.append("곧 신청 시작(예정)")
+    elif status == "마감":
+        score -= 50
+        reasons.append("현재 마감")
+    if req.category_preference and category == req.category_preference.strip():
+        score += 40
+        reasons.append(f"선호 카테고리 일치({category})")
+    if req.region:
+        r = req.region.strip()
+        if r and (r in blob or ("전국" in blob)):
+            score += 15
+            reasons.append(f"지역 관련 키워드 매칭({r}/전국)")
+    if req.student is True:
+        if any(t in blob for t in ["대학생", "재학생", "학부", "대학원", "학생"]):
+            score += 20
+            reasons.append("대학생/학생 대상 키워드 매칭")
+    if req.age is not None:
+        if 19 <= req.age <= 34 and ("청년" in blob or "청년층" in blob):
+            score += 10
+            reasons.append("청년 대상 키워드 매칭")
+    for kw in req.keywords:
+        k = _norm(kw)
+        if not k:
+            continue
+        if k in name:
+            score += 10
+            reasons.append(f"키워드 '{k}'가 정책명에 포함")
+        elif k in blob:
+            score += 5
+            reasons.append(f"키워드 '{k}'가 조건/혜택/기관에 포함")
+    return {"score": score, "reasons": reasons[:6]}
+
+
+def reference_snippets(p, req):
+    if not req.include_snippets:
+        return []
+    sources = [("name", _norm(p.get("name"))), ("condition", _norm(p.get("condition"))),
+               ("benefit", _norm(p.get("benefit"))), ("provider", _norm(p.get("provider")))]
+    snippets = []
+    for kw in _all_keywords(req):
+        for source_name, text in sources:
+            snip = _find_snippet(text, kw, req.snippet_window)
+            if snip:
+                snippets.append({"keyword": kw, "source": source_name, "snippet": snip})
+                break
+        if len(snippets) >= 6:
+            break
+    return snippets
+
+
+def reference_recommend(req):
+    with db.db_conn() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT {", ".join(POLICY_FIELDS)} FROM policies
+            ORDER BY CASE status WHEN '진행중' THEN 1 WHEN '예정' THEN 2 WHEN '마감' THEN 3 ELSE 4 END,
+                     start_date DESC, id DESC
+            """
+        ).fetchall()
+    candidates = []
+    for r in rows:
+        p = dict(zip(POLICY_FIELDS, r))
+        if req.exclude_closed and _norm(p.get("status")) == "마감":
+            continue
+        sc = reference_score(p, req)
+        p["score"] = sc["score"]
+        p["reasons"] = sc["reasons"]
+        p["snippets"] = reference_snippets(p, req)
+        candidates.append(p)
+    candidates.sort(key=lambda x: x["score"], reverse=True)
+    top = [p for p in candidates if p["score"] > -20][: req.top_n]
+    return {"top_n": req.top_n, "returned": len(top), "exclude_closed": req.exclude_closed,
+            "include_snippets": req.include_snippets, "items": top}
+
+
+def random_request(rng):
+    return RecommendationRequest(
+        age=rng.choice([None, 17, 20, 27, 34, 40]),
+        student=rng.choice([None, True, False]),
+        region=rng.choice([None, "", "서울", "제주", "전국", " 경기 ", "없는지역"]),
+        category_preference=rng.choice([None, "housing", "scholarship", "nothing"]),
+        keywords=rng.sample(TOPICS + ["지원", "월", "만원 ", "청년 대상", "없는키워드", "", "장"], rng.randint(0, 4)),
+        top_n=rng.choice([1, 5, 10, 50]),
+        exclude_closed=rng.choice([True, False]),
+        include_snippets=rng.choice([True, False]),
+        snippet_window=rng.choice([10, 40]),
+    )
+
+
+def check_parity(n_cases=300):
+    rng = random.Random(1)
+    fail = 0
+    for i in range(n_cases):
+        req = random_request(rng)
+        got, expect = recommend(req), reference_recommend(req)
+        if got != expect:
+            fail += 1
+            if fail <= 3:
+                print(f"[FAIL] case {i}: {req}")
+    print(f"[{'OK' if not fail else 'FAIL'}] parity: {n_cases - fail}/{n_cases} requests identical to reference")
+    return fail == 0
+
+
+def check_refresh():
+    before = policy_catalog.get().version
+    conn = db.get_conn()
+    conn.execute("UPDATE policies SET name = '새로고침검증 정책' WHERE id = 1")
+    db.bump_catalog_version(conn)
+    conn.commit()
+    conn.close()
+    policy_catalog.invalidate()
+    snap = policy_catalog.get()
+    assert snap.version == before + 1 and snap.find("새로고침검증").tolist() == [snap.names.index("새로고침검증 정책")]
+    print(f"[OK] refresh: version {before} → {snap.version}, rebuild {policy_catalog.build_ms} ms")
+
+
+def bench(n_req=200):
+    rng = random.Random(2)
+    reqs = [random_request(rng) for _ in range(n_req)]
+    policy_catalog.get()
+
+    def run(fn):
+        times = []
+        for req in reqs:
+            t0 = time.perf_counter()
+            fn(req)
+            times.append((time.perf_counter() - t0) * 1000)
+        return statistics.median(times), sorted(times)[int(len(times) * 0.95)]
+
+    ref = run(reference_recommend)
+    cat = run(recommend)
+    print(f"\n{N_POLICIES:,} policies, {n_req} requests")
+    print(f"reference (DB + full scan) | p50 {ref[0]:7.2f} ms | p95 {ref[1]:7.2f} ms")
+    print(f"catalog (memory index)     | p50 {cat[0]:7.2f} ms | p95 {cat[1]:7.2f} ms")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "bench.db")
+        db.init_db()
+        build_corpus(N_POLICIES)
+        policy_catalog.invalidate()
+        policy_catalog.get()
+        print(f"catalog: {policy_catalog.stats()}")
+
+        passed = check_parity()
+        check_refresh()
+        bench()
+        db.get_pool().close_all()
+
+    print("\nRECOMMENDATION CATALOG TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+import os
+import sys
+import time
+import random
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import app.db as db
+import app.routers.user_recommendations as ur
+from utils.aho_corasick import AhoCorasick
+from utils.region_matcher import SIDO_LIST, SIGUNGU_LIST, GAZETTEER, extract_policy_regions
+from utils.policy_enricher import enrich_policy
+
+sys.path.insert(0, os.path.join(ROOT_DIR, "demo_pages"))
+from check_user_recommendations_topk import build_corpus  # noqa: E402
+
+N_POLICIES = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+
+USER_REGIONS = [
+    "서울", "서울 강남구", "부산 해운대구", "부산 중구", "경기 수원시", "경기도", "제주", "제주특별자치도 제주시",
+    "전남 순천시", "강원 강릉시", "세종", "서울시 마포구", "부산광역시 강서구", "없는지역",
+    # 첫 토큰이 사전에 없는 지역명 (시/구 생략) → 저장된 지역 판단 텍스트에서 substring 검사
+    "수원 영통구", "강남 역삼동", "해운대 우동", "서귀포 중문동",
+]
+
+
+# ──────────────────────────────
+# 기존 구현 (요청마다 SIGUNGU_LIST / SIDO_LIST 를 정책 텍스트에 순서대로 substring 검사) — parity 비교용
+# ──────────────────────────────
+
+def reference_region(policy, user_region):
+    provider = ur._norm(policy.get("provider"))
+    name = ur._norm(policy.get("name"))
+    condition = ur._norm(policy.get("condition"))
+    blob_region = f"{provider} {name} {condition}"
+    for sigungu in SIGUNGU_LIST:
+        if sigungu in blob_region:
+            user_sido = user_region.split()[0] if user_region else ""
+            if sigungu not in user_region and user_sido not in blob_region:
+                return sigungu
+            return None
+    for sido in SIDO_LIST:
+        if sido in blob_region:
+            if sido not in user_region:
+                return sido
+            return None
+    return None
+
+
+_score = ur._score
+
+
+def reference_score(policy, user, keywords):
+    score, reasons = _score(policy, {**user, "region": None}, keywords)
+    if user.get("region"):
+        conflict = reference_region(policy, user["region"])
+        if conflict:
+            score -= 100
+            reasons = (reasons + [f"지역 불일치({conflict}) → 제외"])[:6]
+    return score, reasons
+
+
+def check_automaton():
+    rng = random.Random(0)
+    terms = list(dict.fromkeys(SIGUNGU_LIST + SIDO_LIST))
+    ac = AhoCorasick(terms)
+    alphabet = "".join(set("".join(terms))) + " 가나다청년"
+    fail = 0
+    for _ in range(3000):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 30)))
+        text += rng.choice(["", rng.choice(terms), rng.choice(terms) + rng.choice(terms)])
+        if ac.find_ids(text) != {i for i, t in enumerate(terms) if t in text}:
+            fail += 1
+    print(f"[{'OK' if not fail else 'FAIL'}] automaton: 3000 texts, 매칭 집합 == substring 검사 ({len(terms)} 지역명, 시도 {len(GAZETTEER)}개)")
+    return fail == 0
+
+
+def load_rows():
+    with db.db_conn() as conn:
+        return conn.execute(f"""
+            SELECT {", ".join("p." + c for c in ur.POLICY_FIELDS)},
+                   {", ".join("e." + c for c in ur.ONLINE_COLUMNS)}
+            FROM policies p LEFT JOIN policy_eligibility e ON e.policy_id = p.id
+        """).fetchall()
+
+
+def check_parity(rows):
+    fail = 0
+    total = 0
+    keywords = ["월세", "청년"]
+    for user_region in USER_REGIONS:
+        user = {"region": user_region}
+        for r in rows:
+            p = ur._row_to_policy(r)
+            expect = reference_score(p, user, keywords)
+            stored = ur._score(p, user, keywords, ur._row_enrichment(r))
+            fallback = ur._score(p, user, keywords)
+            total += 1
+            if stored != expect or fallback != expect:
+                fail += 1
+                if fail <= 3:
+                    print(f"[FAIL] region={user_region!r} policy={p['id']} {expect} / {stored} / {fallback}")
+    print(f"[{'OK' if not fail else 'FAIL'}] parity: {total - fail:,}/{total:,} (사용자 지역 x 정책) 점수/사유 동일")
+    return fail == 0
+
+
+def check_unlisted_user_region():
+    # 사용자 지역 "수원 영통구" × 수원시청 정책: 기존 '수원' in 정책텍스트 → 통과 (지역 불일치 아님)
+    policy = {"id": 1, "name": "청년 월세 지원", "provider": "수원시청", "condition": "만 19~34세", "status": "진행중"}
+    enrichment = ur.enrichment_from_row(*[
+        e[c] for e in [enrich_policy(policy["name"], policy["provider"], policy["condition"], None)]
+        for c in ur.ONLINE_COLUMNS if c != "enriched_at"
+    ], "2025-01-01T00:00:00")
+    ok = True
+    for user_region, expect in [("수원 영통구", None), ("성남 분당구", "수원시"), ("경기 수원시", None)]:
+        got = ur.region_conflict(enrichment, user_region)
+        ok &= got == expect == reference_region(policy, user_region)
+        ok &= ur._score(policy, {"region": user_region}, [], enrichment) == reference_score(policy, {"region": user_region}, [])
+    print(f"[{'OK' if ok else 'FAIL'}] 사전에 없는 사용자 지역 토큰: '수원 영통구' × 수원시청 정책 → 불일치 아님 (기존과 동일)")
+    return ok
+
+
+def bench_score(rows):
+    parsed = [(ur._row_to_policy(r), ur._row_enrichment(r)) for r in rows]
+    user = {"region": "부산 해운대구"}
+
+    def run(fn):
+        t0 = time.perf_counter()
+        for p, regions in parsed:
+            fn(p, regions)
+        return (time.perf_counter() - t0) * 1000
+
+    t_ref = run(lambda p, _: reference_region(p, user["region"]))
+    t_new = run(lambda p, regions: ur.region_conflict(regions, user["region"]))
+    print(f"\n지역 판단 {len(rows):,}건 | 기존 substring 스캔 {t_ref:7.1f} ms | 저장된 지역 집합 {t_new:7.1f} ms")
+
+
+def main():
+    passed = check_automaton()
+    passed = check_unlisted_user_region() and passed
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "bench.db")
+        db.init_db()
+        build_corpus(N_POLICIES)
+
+        # build_corpus 가 수집 스크립트와 같이 enrichment 단계(지역 정보 계산)까지 실행
+        print(f"corpus: {N_POLICIES:,} policies")
+
+        rows = load_rows()
+        assert all(r[-1] is not None for r in rows)
+        p = ur._row_to_policy(rows[0])
+        regions = extract_policy_regions(p['provider'], p['name'], p['condition'])
+        print(f"sample: {p['name']} → { {k: v for k, v in regions.items() if k != 'text'} }")
+
+        passed = check_parity(rows) and passed
+        bench_score(rows)
+        db.get_pool().close_all()
+
+    print("\nREGION MATCHER TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import tempfile
+import statistics
+from urllib.parse import quote
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.testclient import TestClient
+
+import app.db as db
+from app.response_cache import ResponseCacheMiddleware, cache_key, response_cache
+from app.routers.policies import router as policies_router
+from app.routers.scholarships import router as scholarships_router
+from app.routers.eligibility import router as eligibility_router
+
+sys.path.insert(0, os.path.join(ROOT_DIR, "demo_pages"))
+from check_keyset_pagination import build_corpus  # noqa: E402
+
+N_POLICIES = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+REPEAT = 200
+CHECK_INTERVAL = 0.05
+ORIGIN = {"Origin": "https://app.example"}
+
+REQUESTS = [
+    "/policies",
+    "/policies?category=housing&limit=50",
+    "/policies?q=마음건강&status=진행중",
+    "/policies?q=월세&include_total=false&limit=200",
+    "/policies?offset=1000",
+    "/policies/123",
+    "/scholarships?status=예정",
+    "/scholarships?q=학자금&limit=5",
+    "/scholarships/77",
+]
+
+
+def make_app(cache=None):
+    app = FastAPI()
+    if cache is not None:
+        app.add_middleware(ResponseCacheMiddleware, cache=cache)
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    app.include_router(policies_router)
+    app.include_router(scholarships_router)
+    app.include_router(eligibility_router)
+    return app
+
+
+def external_update(sql):
+    """수집 스크립트처럼 다른 연결에서 정책 수정 + catalog_version 증가"""
+    conn = db.get_conn()
+    conn.execute(sql)
+    db.bump_catalog_version(conn)
+    conn.commit()
+    conn.close()
+
+
+def check_parity(plain, cached, cache):
+    ok = True
+    for url in REQUESTS:
+        expect = plain.get(url)
+        first = cached.get(url)
+        second = cached.get(url)
+        ok &= first.status_code == second.status_code == 200
+        ok &= first.content == second.content == expect.content
+        ok &= first.headers["etag"] == second.headers["etag"] and first.headers["cache-control"] == "no-cache"
+    ok &= cache.hits == len(REQUESTS) and cache.misses == len(REQUESTS)
+    return ok
+
+
+def check_normalization(cached, cache):
+    """같은 결과를 내는 다른 표기 → 같은 캐시 항목 / 결과가 다른 요청 → 다른 항목"""
+    base = cached.get("/policies?category=housing&status=진행중")
+    hits = cache.hits
+    same = [
+        "/policies?status=진행중&category=housing",
+        "/policies?category=%20housing%20&status=진행중&limit=20&offset=0",
+        "/policies?category=housing&status=진행중&include_total=yes&_=1712345678",
+        "/policies?category=employment&category=housing&status=진행중",
+    ]
+    ok = all(cached.get(url).headers["etag"] == base.headers["etag"] for url in same)
+    ok &= cache.hits == hits + len(same)
+    misses = cache.misses
+    different = ["/policies?category=housing&status=진행중&include_total=false",
+                 "/policies?category=housing&status=진행중&limit=21"]
+    ok &= all(cached.get(url).headers["etag"] != base.headers["etag"] for url in different)
+    ok &= cache.misses == misses + len(different)
+    return ok
+
+
+def check_conditional(cached, cache):
+    url = "/policies?category=welfare"
+    res = cached.get(url, headers=ORIGIN)
+    etag = res.headers["etag"]
+    n304 = cache.not_modified
+    ok = True
+    for inm in [etag, f"W/{etag}", f'"abc", {etag}', "*"]:
+        r = cached.get(url, headers={**ORIGIN, "If-None-Match": inm})
+        ok &= r.status_code == 304 and r.content == b"" and r.headers["etag"] == etag
+        ok &= r.headers.get("access-control-allow-origin") == "*"
+    r = cached.get(url, headers={"If-None-Match": '"stale"'})
+    ok &= r.status_code == 200 and r.content == res.content
+    ok &= cache.not_modified == n304 + 4 and res.headers.get("access-control-allow-origin") == "*"
+    return ok
+
+
+def check_invalidation(plain, cached, cache):
+    ok = True
+    # eligibility PUT → 같은 프로세스에서 바로 무효
+    before = cached.get("/policies/123")
+    r = cached.put("/policies/123/eligibility", json={"min_age": 19, "max_age": 34, "region": "서울"})
+    ok &= r.status_code == 200 and cache.stats()["version"] is not None
+    misses = cache.misses
+    cached.get("/policies/123")
+    ok &= cache.misses == misses + 1
+
+    # 수집(다른 연결) → check_interval 안에 새 내용
+    before = cached.get("/policies/123").content
+    external_update("UPDATE policies SET name = name || ' (개정)' WHERE id = 123")
+    time.sleep(CHECK_INTERVAL * 2)
+    after = cached.get("/policies/123")
+    ok &= after.content != before and after.content == plain.get("/policies/123").content
+    ok &= "(개정)" in after.json()["name"]
+
+    # 목록도 같이 무효 (304 로 옛 ETag 를 재검증해도 새 본문)
+    old = cached.get("/policies?q=개정")
+    external_update("UPDATE policies SET name = name || ' (개정)' WHERE id = 124")
+    time.sleep(CHECK_INTERVAL * 2)
+    new = cached.get("/policies?q=개정", headers={"If-None-Match": old.headers["etag"]})
+    ok &= new.status_code == 200 and new.json()["total_count"] == old.json()["total_count"] + 1
+
+    # 버전 확인(SQLite 조회)은 이벤트 루프 밖(threadpool)에서
+    loop_calls = []
+    original = cache.version
+
+    def version():
+        if cache.check_due():
+            try:
+                asyncio.get_running_loop()
+                loop_calls.append(True)
+            except RuntimeError:
+                loop_calls.append(False)
+        return original()
+
+    cache.version = version
+    for _ in range(3):
+        time.sleep(CHECK_INTERVAL * 2)
+        cached.get("/policies/123")
+    del cache.version
+    ok &= len(loop_calls) == 3 and not any(loop_calls)
+
+    # 오류 응답은 캐시하지 않음
+    size = len(cache._data)
+    for url in ["/policies/999999999", "/policies?cursor=bad", "/policies?limit=0", "/scholarships/999999999"]:
+        ok &= cached.get(url).status_code in (400, 404, 422)
+    ok &= len(cache._data) == size
+    return ok
+
+
+async def asgi_get(app, path, headers=()):
+    """HTTP 클라이언트 없이 ASGI 앱 직접 호출 → 서버 쪽 처리 시간만 측정"""
+    path, _, query = path.partition("?")
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+             "query_string": quote(query, safe="=&").encode(), "headers": list(headers),
+             "client": ("127.0.0.1", 1), "server": ("testserver", 80)}
+    out = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        out.append(message)
+
+    await app(scope, receive, send)
+    return out[0]["status"]
+
+
+async def bench(plain_app, cached_app, cache):
+    print(f"\n정책 {N_POLICIES:,}건, 요청당 서버 처리 시간 (µs, median of {REPEAT}, HTTP 전송 제외)")
+    print(f"{'요청':<48} | {'캐시 없음':>9} | {'miss':>9} | {'hit':>9} | {'304':>9} | {'본문':>8}")
+    urls = ["/policies", "/policies?category=housing&limit=200", "/policies?q=마음건강",
+            "/policies?offset=20000", "/policies/123", "/scholarships?status=진행중"]
+
+    async def timed(app, url, headers=(), before=None):
+        times = []
+        for _ in range(REPEAT):
+            if before:
+                before()
+            t0 = time.perf_counter()
+            status = await asgi_get(app, url, headers)
+            times.append((time.perf_counter() - t0) * 1e6)
+        return statistics.median(times), status
+
+    for url in urls:
+        t_plain, _ = await timed(plain_app, url)
+        t_miss, _ = await timed(cached_app, url, before=cache.clear)
+        t_hit, _ = await timed(cached_app, url)
+        path, _, query = url.partition("?")
+        entry = cache._data[cache_key(path, quote(query, safe="=&").encode())]
+        t_304, status = await timed(cached_app, url, [(b"if-none-match", entry.etag)])
+        assert status == 304
+        print(f"{url:<48} | {t_plain:9.0f} | {t_miss:9.0f} | {t_hit:9.0f} | {t_304:9.0f} | "
+              f"{len(entry.body) / 1024:6.1f}KB")
+
+
+def main():
+    passed = True
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "bench.db")
+        db.init_db()
+        build_corpus(N_POLICIES, N_POLICIES // 4)
+
+        # eligibility PUT 이 무효화하는 전역 캐시 그대로 사용 (수집 반영 확인 간격만 짧게)
+        cache = response_cache
+        cache.check_interval = CHECK_INTERVAL
+        plain_app, cached_app = make_app(), make_app(cache)
+        plain, cached = TestClient(plain_app), TestClient(cached_app)
+
+        ok = check_parity(plain, cached, cache)
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] 캐시 응답 본문 == 캐시 없는 응답 (목록/검색/상세 {len(REQUESTS)}종, "
+              f"두 번째 요청은 hit), ETag + Cache-Control: no-cache")
+
+        ok = check_normalization(cached, cache)
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] 쿼리 정규화: 순서·공백·기본값·bool 표기·모르는 파라미터·중복 이름 → 같은 항목, "
+              f"결과가 다른 요청은 다른 항목")
+
+        ok = check_conditional(cached, cache)
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] If-None-Match 일치(강한/W//목록/*) → 304 본문 없음 + CORS 헤더, 불일치 → 200")
+
+        ok = check_invalidation(plain, cached, cache)
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] 무효화: eligibility PUT 즉시, 수집(catalog_version 증가) {CHECK_INTERVAL}s 안에 "
+              f"새 본문 / 옛 ETag 재검증 → 200, 버전 확인은 threadpool, 오류 응답은 저장 안 함")
+
+        asyncio.run(bench(plain_app, cached_app, cache))
+        print("\n" + json.dumps(cache.stats(), ensure_ascii=False))
+        db.get_pool().close_all()
+
+    print("\nRESPONSE CACHE TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
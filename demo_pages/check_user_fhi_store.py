@@ -0,0 +1,193 @@
+import os
+import sys
+import time
+import math
+import random
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import app.db as db
+import app.routers.fhi as fhi
+from app.fhi_store import UserFHIStore, user_fhi_store
+from app.routers.users import create_user, UserCreate, add_user_transactions, get_user_fhi
+from ml.ml_runtime.feature_builder import build_features_from_transactions
+from utils.fhi_calculator import calculate_fhi, calculate_fhi_from_transactions
+from utils.impulsive_detector import detect_impulsive
+from utils.spending_spike import detect_spending_spike
+from utils.transaction_batch import TransactionBatch
+
+HISTORY_SIZES = [int(x) for x in sys.argv[1:]] or [1_000, 10_000, 100_000]
+
+CATEGORIES = ["cafe", "food", "transport", "shopping", "convenience", "Cafe ", None, "subscription"]
+MERCHANTS = ["스타벅스 강남점", "GS25", "쿠팡", "카카오T", "넷플릭스", "알수없는가게"]
+
+
+# ──────────────────────────────
+# 기준값: 매 요청 전체 이력을 다시 계산하는 기존 방식 (/fhi/analyze 와 같은 함수)
+# ──────────────────────────────
+
+def reference(txs, asof):
+    batch = TransactionBatch.from_transactions(txs)
+    # 무효 거래는 저장되지 않으므로 "유효 거래 0건" = 거래 없음
+    if not len(batch):
+        return {"fhi": 0.0, "impulsive_score": 0.0, "spike_score": 0.0, "features": {}}
+    impulsive = detect_impulsive(batch)["impulsive_score"]
+    spike = detect_spending_spike(batch, asof=asof)["spike_score"]
+    return {
+        "fhi": calculate_fhi(max(0.0, min(1.0, impulsive)), max(0.0, spike)),
+        "impulsive_score": impulsive,
+        "spike_score": spike,
+        "features": build_features_from_transactions(batch, asof=asof),
+    }
+
+
+def close(a, b):
+    return a == b or math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+
+
+def same(got, expect):
+    if got["features"].keys() != expect["features"].keys():
+        return False
+    return (got["fhi"] == expect["fhi"] and got["impulsive_score"] == expect["impulsive_score"]
+            and got["spike_score"] == expect["spike_score"]
+            and all(close(got["features"][k], v) for k, v in expect["features"].items()))
+
+
+def make_txs(rng, n, start, end):
+    span = (end - start).total_seconds()
+    out = []
+    for _ in range(n):
+        dt = start + timedelta(seconds=rng.random() * span)
+        amount = rng.choice([rng.randint(1, 300) * 100, rng.randint(1000, 9000), round(rng.random() * 50000, 2), 0.5])
+        out.append({"datetime": dt.isoformat(), "amount": amount, "merchant": rng.choice(MERCHANTS),
+                    "category": rng.choice(CATEGORIES)})
+    return out
+
+
+def new_user():
+    return create_user(UserCreate(nickname="fhi"))["id"]
+
+
+def check_parity():
+    rng = random.Random(0)
+    now = datetime.now()
+    fail = total = replays = 0
+    for _ in range(40):
+        uid = new_user()
+        history = []
+        # 시간순 묶음 + 가끔 과거 시각이 섞인 늦은 묶음
+        cursor = now - timedelta(days=rng.randint(10, 90))
+        for _ in range(rng.randint(1, 8)):
+            if history and rng.random() < 0.25:
+                chunk = make_txs(rng, rng.randint(1, 20), now - timedelta(days=60), now)
+            else:
+                nxt = cursor + timedelta(days=rng.random() * 15)
+                chunk = make_txs(rng, rng.randint(0, 40), cursor, nxt)
+                cursor = nxt
+            chunk += [{"datetime": "없는 날짜", "amount": 1000}, {"datetime": now.isoformat(), "amount": -5}][:rng.randint(0, 2)]
+            res = add_user_transactions(uid, fhi.TransactionRequest(transactions=chunk))
+            replays += res["replayed"]
+            # 라우터와 같은 카테고리 재분류 (요청 모델이 dict 를 복사하므로 여기서 따로 적용)
+            history += fhi._categorize_transactions([dict(t) for t in chunk])
+
+            got = get_user_fhi(uid)
+            asof = datetime.fromisoformat(got["asof"])
+            total += 1
+            if not same(got, reference(history, asof)):
+                fail += 1
+                if fail <= 3:
+                    print(f"[FAIL] user={uid} got={got}\n  expect={reference(history, asof)}")
+
+        # 기존 /fhi/analyze 경로(calculate_fhi_from_transactions)의 rule FHI 와도 같은지
+        total += 1
+        got = get_user_fhi(uid)
+        if got["fhi"] != calculate_fhi_from_transactions(history, asof=datetime.fromisoformat(got["asof"]))["fhi"]:
+            fail += 1
+
+        # 기준 시각이 지나 윈도우에서 빠지는 거래 (expire)
+        with db.db_conn() as conn:
+            for days in (3, 8, 20, 31, 45):
+                asof = now + timedelta(days=days)
+                total += 1
+                if not same(user_fhi_store.snapshot(conn, uid, asof=asof), reference(history, asof)):
+                    fail += 1
+                    if fail <= 3:
+                        print(f"[FAIL] expire user={uid} asof=+{days}d")
+    print(f"[{'OK' if not fail else 'FAIL'}] parity: {total - fail}/{total} 조회 == 전체 이력 재계산 "
+          f"(늦게 도착한 묶음 재생 {replays}회, 기준 시각 +3~45일 expire 포함)")
+    return fail == 0
+
+
+def check_reload():
+    # 재시작(메모리 상태 없음) / 다른 worker 가 거래 추가 → 저장 상태 + 최근 30일만 읽어서 같은 값
+    rng = random.Random(1)
+    now = datetime.now()
+    uid = new_user()
+    history = make_txs(rng, 500, now - timedelta(days=80), now)
+    add_user_transactions(uid, fhi.TransactionRequest(transactions=history))
+    history = fhi._categorize_transactions(history)
+    before = get_user_fhi(uid)
+
+    user_fhi_store.clear()
+    ok = same(get_user_fhi(uid), before)
+
+    other = UserFHIStore()
+    more = make_txs(rng, 30, now + timedelta(minutes=1), now + timedelta(hours=30))
+    with db.db_conn() as conn:
+        other.add_transactions(conn, uid, fhi._categorize_transactions(more))
+    history += more
+    got = get_user_fhi(uid)
+    ok &= same(got, reference(history, datetime.fromisoformat(got["asof"])))
+    print(f"[{'OK' if ok else 'FAIL'}] reload: 메모리 초기화 후 / 다른 worker 쓰기 후 조회 결과 동일")
+    return ok
+
+
+def bench():
+    rng = random.Random(2)
+    now = datetime.now()
+    print(f"\n{'history':>8} | {'ingest':>12} | {'GET (warm) p50':>14} | {'GET (cold) p50':>14} | {'재계산 p50':>10}")
+    for n in HISTORY_SIZES:
+        uid = new_user()
+        txs = make_txs(rng, n, now - timedelta(days=365), now)
+        txs.sort(key=lambda t: t["datetime"])
+        t0 = time.perf_counter()
+        for i in range(0, n, 1000):
+            add_user_transactions(uid, fhi.TransactionRequest(transactions=txs[i:i + 1000]))
+        t_ingest = time.perf_counter() - t0
+
+        def p50(fn, reps=20):
+            times = []
+            for _ in range(reps):
+                t0 = time.perf_counter()
+                fn()
+                times.append((time.perf_counter() - t0) * 1000)
+            return statistics.median(times)
+
+        warm = p50(lambda: get_user_fhi(uid))
+
+        def cold():
+            user_fhi_store.clear()
+            get_user_fhi(uid)
+        t_cold = p50(cold, reps=5)
+        full = p50(lambda: reference(txs, datetime.now()), reps=3)
+        print(f"{n:>8,} | {n / t_ingest:9,.0f}/s | {warm:11.3f} ms | {t_cold:11.2f} ms | {full:7.1f} ms")
+    print(f"store: {user_fhi_store.stats()}")
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "fhi.db")
+        db.init_db()
+        passed = check_parity()
+        passed = check_reload() and passed
+        bench()
+        db.get_pool().close_all()
+    print("\nUSER FHI STORE TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
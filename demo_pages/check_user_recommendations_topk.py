@@ -0,0 +1,185 @@
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+import statistics
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+import app.db as db
+from app.routers.user_recommendations import (
+    recommend_for_user,
+    _score,
+    _collect_snippets,
+    _row_to_policy,
+    POLICY_FIELDS,
+)
+
+N_POLICIES = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+
+REGIONS = ["서울", "부산", "경기", "전남", "제주"]
+PLACES = ["강남구", "수원시", "해운대구", "제주시", "서귀포시", "중구", ""]
+TOPICS = ["월세", "전세자금", "취업", "창업", "교통비", "학자금", "마음건강", "자산형성"]
+TARGETS = ["청년", "대학생", "재학생", "신혼부부", "구직자", "한부모 가정", "누구나"]
+
+
+def make_policy(i, rng):
+    region = rng.choice(REGIONS + ["전국", ""])
+    place = rng.choice(PLACES)
+    name = f"{region} {place} {rng.choice(TOPICS)} 지원 {i}".strip()
+    condition = f"{rng.choice(TARGETS)} 대상, {rng.choice(REGIONS)} {rng.choice(PLACES)} 거주 " + "세부 조건 " * rng.randint(5, 40)
+    benefit = f"{rng.choice(TOPICS)} 월 최대 {rng.randint(1, 50)}만원"
+    status = rng.choice(["진행중", "예정", "마감", "정보없음", None])
+    start = f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}" if rng.random() < 0.9 else None
+    provider = rng.choice([f"{region}시청", f"{place}청", "한국장학재단", None])
+    return (f"bench:{i}", name, "subsidy", provider, start, status, condition, benefit, "bench")
+
+
+def make_eligibility(pid, rng):
+    return (
+        pid,
+        rng.choice([None, 15, 19, 25]),
+        rng.choice([None, 29, 34, 39]),
+        rng.choice([None, "전국", "서울", "부산", "제주"]),
+        rng.choice([None, None, 0, 1]),
+    )
+
+
+def build_corpus(n):
+    rng = random.Random(0)
+    conn = db.get_conn()
+    cur = conn.cursor()
+    cur.executemany(
+        """
+        INSERT INTO policies (policy_key, name, category, provider, start_date, status, condition, benefit, source)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+        (make_policy(i, rng) for i in range(n)),
+    )
+    cur.executemany(
+        "INSERT INTO policy_eligibility (policy_id, min_age, max_age, region, student_required) VALUES (?, ?, ?, ?, ?)",
+        [make_eligibility(pid, rng) for pid in range(1, n + 1) if rng.random() < 0.7],
+    )
+    users = [
+        ("2002-05-01", "서울", 1, ["주거", "월세"]),
+        ("1995-01-01", "부산 해운대구", 0, ["취업"]),
+        ("2001-03-03", "제주", None, []),
+        (None, None, None, ["학자금"]),
+    ]
+    cur.executemany(
+        "INSERT INTO users (birthdate, region, student, keywords_json) VALUES (?, ?, ?, ?)",
+        [(b, r, s, json.dumps(k, ensure_ascii=False)) for b, r, s, k in users],
+    )
+    db.enrich_policies(conn)  # 수집 스크립트와 같이 enrichment 단계까지
+    conn.commit()
+    conn.close()
+    return len(users)
+
+
+def reference_recommend(user_id, top_n, exclude_closed, include_snippets, snippet_window, keyword, limit=None):
+    """
+    기존 구현: SQL ORDER BY 후 전체를 Python 에서 채점/정렬.
+    limit=800 이면 기존 LIMIT 800 동작 그대로.
+    """
+    res = recommend_for_user(user_id, top_n=1, exclude_closed=exclude_closed, include_snippets=False,
+                             snippet_window=snippet_window, keyword=keyword)
+    user = res["user"]
+    keywords = []
+    for k in (user["keywords"] + keyword):
+        k = (k or "").strip()
+        if k and k not in keywords:
+            keywords.append(k)
+    if user["student"] is True:
+        keywords += [t for t in ["대학생", "재학생", "학부", "대학원", "학생"] if t not in keywords]
+    if user["age"] is not None and 19 <= user["age"] <= 34:
+        keywords += [t for t in ["청년", "청년층"] if t not in keywords]
+
+    where, params = [], []
+    if exclude_closed:
+        where.append("(p.status IS NULL OR p.status != '마감')")
+    if user["region"]:
+        where.append("(e.region IS NULL OR e.region='전국' OR e.region=?)")
+        params.append(user["region"])
+    if user["age"] is not None:
+        where.append("(e.min_age IS NULL OR e.min_age <= ?)")
+        where.append("(e.max_age IS NULL OR e.max_age >= ?)")
+        params += [user["age"], user["age"]]
+    if user["student"] is not None:
+        where.append("(e.student_required IS NULL OR e.student_required = ?)")
+        params.append(1 if user["student"] else 0)
+    where_sql = ("WHERE " + " AND ".join(where)) if where else ""
+
+    with db.db_conn() as conn:
+        rows = conn.execute(f"""
+            SELECT {", ".join("p." + c for c in POLICY_FIELDS)}
+            FROM policies p LEFT JOIN policy_eligibility e ON e.policy_id = p.id
+            {where_sql}
+            ORDER BY CASE p.status WHEN '진행중' THEN 1 WHEN '예정' THEN 2 WHEN '마감' THEN 3 ELSE 4 END,
+                     p.start_date DESC, p.id DESC
+            {f"LIMIT {limit}" if limit else ""}
+        """, params).fetchall()
+
+    items = []
+    for r in rows:
+        p = _row_to_policy(r)
+        p["score"], p["reasons"] = _score(p, user, keywords)
+        p["snippets"] = _collect_snippets(p, keywords, snippet_window) if include_snippets else []
+        items.append(p)
+    items.sort(key=lambda x: x["score"], reverse=True)
+    top = [p for p in items if p["score"] > -20][:top_n]
+    return {"user": user, "top_n": top_n, "returned": len(top), "exclude_closed": exclude_closed,
+            "include_snippets": include_snippets, "items": top}
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "bench.db")
+        db.init_db()
+        t0 = time.perf_counter()
+        n_users = build_corpus(N_POLICIES)
+        print(f"corpus: {N_POLICIES:,} policies in {time.perf_counter() - t0:.1f}s")
+
+        rng = random.Random(1)
+        cases = []
+        for uid in range(1, n_users + 1):
+            for _ in range(3):
+                cases.append(dict(
+                    user_id=uid,
+                    top_n=rng.choice([1, 10, 50]),
+                    exclude_closed=rng.choice([True, False]),
+                    include_snippets=rng.choice([True, False]),
+                    snippet_window=40,
+                    keyword=rng.sample(TOPICS + ["없는키워드"], rng.randint(0, 2)),
+                ))
+
+        fail = 0
+        missed = 0
+        t_new, t_ref = [], []
+        for case in cases:
+            t0 = time.perf_counter()
+            got = recommend_for_user(**case)
+            t_new.append((time.perf_counter() - t0) * 1000)
+            t0 = time.perf_counter()
+            expect = reference_recommend(**case)
+            t_ref.append((time.perf_counter() - t0) * 1000)
+            if got != expect:
+                fail += 1
+                print(f"[FAIL] {case}")
+            capped = reference_recommend(**case, limit=800)
+            if [p["id"] for p in capped["items"]] != [p["id"] for p in expect["items"]]:
+                missed += 1
+
+        print(f"[{'OK' if not fail else 'FAIL'}] parity: {len(cases) - fail}/{len(cases)} identical to full-scan reference")
+        print(f"기존 LIMIT 800 은 {missed}/{len(cases)} 요청에서 결과가 달랐음 (801번째 이후 정책 누락)")
+        print(f"heap top-k   | p50 {statistics.median(t_new):7.1f} ms | max {max(t_new):7.1f} ms")
+        print(f"full sort    | p50 {statistics.median(t_ref):7.1f} ms | max {max(t_ref):7.1f} ms")
+        db.get_pool().close_all()
+
+    print("\nUSER RECOMMENDATION TOP-K TEST", "PASS" if not fail else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
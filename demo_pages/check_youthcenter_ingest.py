@@ -0,0 +1,299 @@
+import os
+import io
+import sys
+import json
+import time
+import random
+import sqlite3
+import tempfile
+import threading
+import contextlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+# 실제 키 없이 로컬 stub 서버로만 요청, 재시도 대기는 짧게
+os.environ.setdefault("YOUTHCENTER_API_KEY", "stub-key")
+os.environ["INGEST_BACKOFF_SEC"] = "0.01"
+os.environ["INGEST_MAX_RETRIES"] = "3"
+
+import app.db as db
+from scripts import ingest_youthcenter as yc
+
+N_RECORDS = int(sys.argv[1]) if len(sys.argv) > 1 else 2_350
+LATENCY_SEC = 0.08
+
+LCLSF = list(yc.LCLSF_TO_CATEGORY) + ["기타", ""]
+KEYWORDS = ["청년", "대학생", "주거지원", "취업", "창업", "장학금", "북한이탈주민", "다문화"]
+REGIONS = ["서울특별시", "부산광역시 해운대구", "경기도 수원시", "전라남도", ""]
+
+
+# ──────────────────────────────
+# 응답 기록: 온통청년 getPlcy 응답 필드 모양 그대로 (plcyNo 중복·누락, 날짜 형식 섞임)
+# ──────────────────────────────
+
+def make_records(n, seed=0):
+    rng = random.Random(seed)
+    out = []
+    for i in range(n):
+        if i and rng.random() < 0.02:
+            # 같은 정책이 다른 페이지에 다시 나옴 (내용 일부 변경)
+            row = dict(rng.choice(out))
+            row["plcyExplnCn"] = f"변경된 설명 {i}"
+            out.append(row)
+            continue
+        start = f"2025{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"
+        end = f"2026{rng.randint(1, 12):02d}{rng.randint(1, 28):02d}"
+        region = rng.choice(REGIONS)
+        out.append({
+            "plcyNo": "" if rng.random() < 0.03 else f"2025{i:08d}",
+            "plcyNm": f"{region} 청년 정책 {i}",
+            "lclsfNm": rng.choice(LCLSF),
+            "mclsfNm": rng.choice(["취업지원", "주거비", "장학", ""]),
+            "plcyKywdNm": ",".join(rng.sample(KEYWORDS, rng.randint(0, 3))),
+            "plcyExplnCn": f"{region} 거주 청년 대상 지원 {i}",
+            "plcySprtCn": rng.choice(["월 20만원 지원", "", "등록금 전액"]),
+            "sprvsnInstCdNm": rng.choice(["고용노동부", "서울특별시", "국토교통부", "한국장학재단"]),
+            "aplyYmd": rng.choice([f"{start} ~ {end}", "", "상시"]),
+            "bizPrdBgngYmd": start,
+            "bizPrdEndYmd": end,
+            "aplyPrdSeCd": rng.choice(["0057001", "0057002", "0057003", ""]),
+            "sprtTrgtMinAge": str(rng.choice([0, 15, 19])),
+            "sprtTrgtMaxAge": str(rng.choice([0, 29, 34, 39])),
+            "addAplyQlfcCndCn": rng.choice(["해당없음", "대학 재학생", "만 19세 ~ 34세 미취업자", "-"]),
+            "earnEtcCn": rng.choice(["", "중위소득 150% 이하"]),
+            "earnCndSeCd": rng.choice(["0043001", "0043002"]),
+            "schoolCd": rng.choice(["0049001", "0049002", "0049005", ""]),
+            "jobCd": "0013001", "sbizCd": "0014001", "mrgSttsCd": "0055003", "zipCd": "11110",
+            "aplyUrlAddr": f"https://example.go.kr/plcy/{i}",
+            "refUrlAddr1": "",
+        })
+    return out
+
+
+class StubAPI:
+    """
+    녹화한 페이지를 돌려주는 로컬 HTTP 서버
+    faults[page] = [상태코드, ...] 순서대로 먼저 실패 응답 ("always" 면 계속 500)
+    """
+
+    def __init__(self, records, latency=0.0):
+        self.records = records
+        self.latency = latency
+        self.faults = {}
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                qs = parse_qs(urlparse(self.path).query)
+                page, size = int(qs["pageNum"][0]), int(qs["pageSize"][0])
+                with api._lock:
+                    api.calls[page] += 1
+                    fault = api.faults.get(page)
+                    status = None
+                    if fault == "always":
+                        status = 500
+                    elif fault:
+                        status = fault.pop(0)
+                time.sleep(api.latency)
+                if status:
+                    self.send_response(status)
+                    if status == 429:
+                        self.send_header("Retry-After", "0")
+                    self.end_headers()
+                    return
+                body = json.dumps({"resultCode": 200, "result": {
+                    "pagging": {"totCount": len(api.records), "pageNum": page, "pageSize": size},
+                    "youthPolicyList": api.records[(page - 1) * size: page * size],
+                }}, ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/go/ythip/getPlcy"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ──────────────────────────────
+# 기준값: 기존 구현 (페이지 순차 요청 + 고정 sleep, 정책마다 INSERT + SELECT id + 자격 조건 upsert)
+# ──────────────────────────────
+
+def reference_ingest(url, sleep_sec=0.0):
+    import requests
+    db.init_db()
+    fetched_at = db.now_iso()
+    total_pages = None
+    page = 1
+    while total_pages is None or page <= total_pages:
+        if page > 1:
+            time.sleep(sleep_sec)
+        resp = requests.get(url, params={"apiKeyNm": "k", "pageNum": page, "pageSize": yc.PAGE_SIZE, "rtnType": "json"},
+                            timeout=30)
+        result = resp.json()["result"]
+        total_pages = -(-result["pagging"]["totCount"] // yc.PAGE_SIZE)
+        items = result["youthPolicyList"]
+        conn = db.get_conn()
+        cur = conn.cursor()
+        saved_ids = []
+        rows_map = {}
+        policies = []
+        for row in items:
+            p = yc._convert_row(row, fetched_at)
+            policies.append(p)
+            rows_map[p["policy_key"]] = row
+        for p in policies:
+            cur.execute(f"""
+                INSERT INTO policies ({", ".join(yc.POLICY_COLUMNS)}) VALUES ({", ".join("?" * len(yc.POLICY_COLUMNS))})
+                ON CONFLICT(policy_key) DO UPDATE SET
+                {", ".join(f"{c}=excluded.{c}" for c in yc.POLICY_COLUMNS[1:])};
+            """, [p[c] for c in yc.POLICY_COLUMNS])
+            cur.execute("SELECT id FROM policies WHERE policy_key=?", (p["policy_key"],))
+            row_id = cur.fetchone()[0]
+            elig = yc._build_eligibility(row_id, rows_map.get(p["policy_key"], {}), fetched_at)
+            cols = yc.ELIGIBILITY_COLUMNS
+            cur.execute(f"""
+                INSERT INTO policy_eligibility ({", ".join(cols)}) VALUES ({", ".join("?" * len(cols))})
+                ON CONFLICT(policy_id) DO UPDATE SET {", ".join(f"{c}=excluded.{c}" for c in cols[1:])};
+            """, [elig[c] for c in cols])
+            saved_ids.append(row_id)
+        db.enrich_policies(conn, saved_ids)
+        db.bump_catalog_version(conn)
+        conn.commit()
+        conn.close()
+        page += 1
+
+
+def dump(path):
+    """policy_key 기준 내용 비교 (AUTOINCREMENT id 는 기존 row 별 upsert 가 충돌마다 번호를 건너뛰어서 제외)"""
+    conn = sqlite3.connect(path)
+    policies = conn.execute(f"SELECT {', '.join(c for c in yc.POLICY_COLUMNS if c != 'fetched_at')} "
+                            f"FROM policies ORDER BY policy_key").fetchall()
+    elig_cols = [r[1] for r in conn.execute("PRAGMA table_info(policy_eligibility)")
+                 if r[1] not in ("policy_id", "updated_at", "enriched_at")]
+    elig = conn.execute(f"SELECT p.policy_key, {', '.join('e.' + c for c in elig_cols)} "
+                        f"FROM policy_eligibility e JOIN policies p ON p.id = e.policy_id ORDER BY p.policy_key").fetchall()
+    fetched = {r[0] for r in conn.execute("SELECT DISTINCT fetched_at FROM policies")}
+    conn.close()
+    return policies, elig, fetched
+
+
+def use_db(tmp, name):
+    db.DB_PATH = os.path.join(tmp, f"{name}.db")
+    return db.DB_PATH
+
+
+def run_quiet(**kwargs):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        yc.run(**kwargs)
+    return out.getvalue()
+
+
+def main():
+    records = make_records(N_RECORDS)
+    api = StubAPI(records)
+    yc.BASE_URL = api.url
+    yc.RATE_PER_SEC = 0
+    n_pages = -(-len(records) // yc.PAGE_SIZE)
+    passed = True
+
+    with tempfile.TemporaryDirectory() as tmp:
+        yc.CHECKPOINT_PATH = os.path.join(tmp, "youthcenter.checkpoint.json")
+        use_db(tmp, "ref")
+        reference_ingest(api.url)
+        expect = dump(db.DB_PATH)
+
+        # 1) parity + 일시 실패(500/429/503) 재시도
+        use_db(tmp, "new")
+        api.faults = {3: [500, 500], 7: [429], 12: [503]}
+        api.calls.clear()
+        log = run_quiet()
+        got = dump(db.DB_PATH)
+        ok = got[:2] == expect[:2] and len(got[2]) == 1 and not os.path.exists(yc.CHECKPOINT_PATH)
+        ok &= api.calls[3] == 3 and api.calls[7] == 2 and api.calls[12] == 2
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] parity: policies {len(got[0]):,} / eligibility {len(got[1]):,} rows == 기존 순차 저장 "
+              f"(페이지 {n_pages}, 일시 실패 4회 재시도 후 성공)")
+
+        # 2) 저장 중 죽음 → 다시 실행하면 마지막 commit 페이지 다음부터
+        use_db(tmp, "crash")
+        api.faults = {}
+        api.calls.clear()
+        original = yc._save_policies
+        saved_pages = []
+
+        def crashing_save(conn, policies, rows_map, ts):
+            if len(saved_pages) == 8:
+                raise RuntimeError("simulated crash")
+            saved_pages.append(1)
+            return original(conn, policies, rows_map, ts)
+
+        yc._save_policies = crashing_save
+        try:
+            log = run_quiet()
+        finally:
+            yc._save_policies = original
+        state = json.load(open(yc.CHECKPOINT_PATH, encoding="utf-8"))
+        n_after_crash = len(dump(db.DB_PATH)[0])
+        api.calls.clear()
+        log2 = run_quiet()
+        got = dump(db.DB_PATH)
+        ok = state["last_page"] == 8 and "9페이지부터 이어서" in log
+        ok &= sorted(api.calls) == [1] + list(range(9, n_pages + 1))
+        ok &= got[:2] == expect[:2] and len(got[2]) == 1 and not os.path.exists(yc.CHECKPOINT_PATH)
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] resume (crash): 9페이지 저장 중 중단 → 체크포인트 last_page={state['last_page']} "
+              f"(저장 {n_after_crash:,}건), 재실행은 1(건수) + 9~{n_pages}페이지만 요청, 결과 동일·fetched_at 하나")
+
+        # 3) 재시도로도 안 되는 페이지 → 그 앞까지 저장하고 멈춤, 서버 복구 후 재실행
+        use_db(tmp, "outage")
+        api.faults = {15: "always"}
+        log = run_quiet()
+        state = json.load(open(yc.CHECKPOINT_PATH, encoding="utf-8"))
+        api.faults = {}
+        run_quiet()
+        got = dump(db.DB_PATH)
+        ok = state["last_page"] == 14 and "페이지 15 실패" in log and got[:2] == expect[:2]
+        passed &= ok
+        print(f"[{'OK' if ok else 'FAIL'}] resume (outage): 15페이지 계속 500 → last_page={state['last_page']} 에서 멈춤, "
+              f"복구 후 재실행 결과 동일")
+
+        # 4) 처리 시간 (요청마다 지연이 있는 stub)
+        api.latency = LATENCY_SEC
+        print(f"\n{len(records):,}건 / {n_pages}페이지, 요청당 지연 {LATENCY_SEC * 1000:.0f}ms")
+        use_db(tmp, "bench_ref")
+        t0 = time.perf_counter()
+        reference_ingest(api.url, sleep_sec=0.3)
+        t_ref = time.perf_counter() - t0
+        print(f"{'기존 (순차 + SLEEP_SEC=0.3, 정책별 INSERT/SELECT)':<40} | {t_ref:6.2f} s | {len(records) / t_ref:6.0f}건/s")
+        for workers, rate in [(1, 3), (4, 3), (4, 10), (8, 0)]:
+            use_db(tmp, f"bench_{workers}_{rate}")
+            yc.WORKERS, yc.RATE_PER_SEC = workers, rate
+            t0 = time.perf_counter()
+            run_quiet(fresh=True)
+            t = time.perf_counter() - t0
+            label = f"엔진 (동시 {workers}, {f'초당 {rate}건' if rate else 'rate 제한 없음'})"
+            print(f"{label:<40} | {t:6.2f} s | {len(records) / t:6.0f}건/s")
+
+    api.close()
+    db.get_pool().close_all()
+    print("\nYOUTHCENTER INGEST TEST", "PASS" if passed else "FAIL")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+card_engine.py
+--------------
+코칭카드 생성 엔진 (서비스용)
+- 카드 3장을 동시에(asyncio.gather) 생성하고, 슬롯별 timeout/실패 시 FALLBACK_CARDS 로 대체
+- (FHI 구간, 주요 카테고리, 충동/급증 구간, 주제) 시그니처 기준 TTL + LRU 캐시
+"""
+
+import os
+import time
+import random
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from ml.src.coaching_card import (
+    CARD_TOPICS,
+    agenerate_coaching_card,
+    fhi_grade,
+    get_async_client,
+    get_top_category,
+)
+
+CARD_TIMEOUT_SEC = float(os.getenv("COACHING_CARD_TIMEOUT_SEC", "8"))
+CARD_CACHE_TTL_SEC = float(os.getenv("COACHING_CARD_CACHE_TTL_SEC", "600"))
+CARD_CACHE_SIZE = int(os.getenv("COACHING_CARD_CACHE_SIZE", "512"))
+
+FALLBACK_CARDS = [
+    {
+        "title": "텀블러 챙기기",
+        "diagnosis": "카페 지출을 조금만 줄여도 차이가 생겨요.",
+        "coaching": "오늘은 음료를 사기 전에 집에서 물이나 커피를 챙겨보세요.",
+        "mission": "오늘 카페 음료 1회 참기",
+    },
+    {
+        "title": "간식 쉬어가기",
+        "diagnosis": "소액 지출이 반복되면 생각보다 크게 쌓여요.",
+        "coaching": "편의점 간식을 바로 사기보다 집에 있는 음식부터 확인해보세요.",
+        "mission": "오늘 편의점 방문 1번 줄이기",
+    },
+    {
+        "title": "배달 대신 한 끼",
+        "diagnosis": "식비가 새는 순간은 생각보다 자주 와요.",
+        "coaching": "배달 대신 간단한 집밥이나 학교 식당을 선택해보면 부담이 줄어요.",
+        "mission": "오늘 한 끼는 배달 대신 다른 선택하기",
+    },
+    {
+        "title": "이동비 아끼기",
+        "diagnosis": "짧은 거리 이동도 쌓이면 부담이 돼요.",
+        "coaching": "가까운 거리는 걷거나 자전거를 타면 지출도 줄고 기분도 환기돼요.",
+        "mission": "오늘 1회는 걸어서 이동하기",
+    },
+    {
+        "title": "오늘 지출 멈춤",
+        "diagnosis": "지출 흐름을 잠깐 끊는 것만으로도 조절감이 생겨요.",
+        "coaching": "오늘은 꼭 필요한 것 외에는 결제하지 않는 하루를 만들어보세요.",
+        "mission": "오늘 충동 결제 0회 도전",
+    },
+]
+
+
+class TTLCache:
+    """thread-safe TTL + LRU 캐시 (hit/miss 카운터 포함)"""
+
+    def __init__(self, maxsize: int = CARD_CACHE_SIZE, ttl: float = CARD_CACHE_TTL_SEC):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+def card_signature(
+    fhi: float,
+    features: Dict[str, Any],
+    impulsive_score: float,
+    spike_score: float,
+    topic: str,
+) -> tuple:
+    """
+    캐시 키. 프롬프트에 들어가는 값을 구간화해서 비슷한 사용자끼리 카드를 공유한다.
+    - FHI: 10점 단위 / 충동: 0.25 단위 / 급증: <0, 0~0.5, 0.5~1, 1 이상
+    """
+    fhi_bucket = int(max(0.0, min(100.0, float(fhi))) // 10)
+    imp_bucket = int(max(0.0, min(1.0, float(impulsive_score))) * 4)
+    spike = float(spike_score)
+    spike_bucket = 0 if spike < 0 else 1 if spike < 0.5 else 2 if spike < 1.0 else 3
+    return (fhi_bucket, get_top_category(features or {}), imp_bucket, spike_bucket, topic)
+
+
+class CardEngine:
+    def __init__(self, client=None, timeout: float = CARD_TIMEOUT_SEC, cache: Optional[TTLCache] = None):
+        self.client = client
+        self.timeout = timeout
+        self.cache = cache if cache is not None else TTLCache()
+
+    async def generate_cards(
+        self,
+        fhi: float,
+        features: Dict[str, Any],
+        impulsive_score: float = 0.0,
+        spike_score: float = 0.0,
+        n: int = 3,
+        current_titles: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        카드 n장을 슬롯별 서로 다른 주제로 동시에 생성.
+        슬롯별로 실패/timeout/중복 제목이면 FALLBACK_CARDS 에서 채운다.
+        """
+        current_titles = list(current_titles or [])
+        topics = _pick_topics(n, current_titles)
+        generated = await asyncio.gather(*(
+            self._generate_slot(fhi, features, impulsive_score, spike_score, current_titles, topic)
+            for topic in topics
+        ))
+
+        cards = []
+        used_titles = list(current_titles)
+        for card in generated:
+            if card is None or card["title"] in used_titles:
+                card = _fallback_card(fhi, used_titles)
+            used_titles.append(card["title"])
+            cards.append(card)
+        return cards
+
+    async def generate_card(
+        self,
+        fhi: float,
+        features: Dict[str, Any],
+        impulsive_score: float = 0.0,
+        spike_score: float = 0.0,
+        current_titles: Optional[List[str]] = None,
+    ) -> Dict[str, Any]:
+        cards = await self.generate_cards(
+            fhi, features, impulsive_score, spike_score, n=1, current_titles=current_titles
+        )
+        return cards[0]
+
+    async def _generate_slot(
+        self,
+        fhi: float,
+        features: Dict[str, Any],
+        impulsive_score: float,
+        spike_score: float,
+        current_titles: List[str],
+        topic: str,
+    ) -> Optional[Dict[str, Any]]:
+        key = card_signature(fhi, features, impulsive_score, spike_score, topic)
+        cached = self.cache.get(key)
+        # 새로고침: 캐시 카드가 지금 보고 있는 카드면 다시 생성 (그대로 주면 중복 제목 → fallback 으로 바뀜)
+        if cached is not None and cached["title"] not in current_titles:
+            return _with_fhi(cached, fhi)
+
+        try:
+            card = await asyncio.wait_for(
+                agenerate_coaching_card(
+                    fhi=fhi,
+                    features=features,
+                    impulsive_score=impulsive_score,
+                    spike_score=spike_score,
+                    current_titles=current_titles,
+                    forced_category=topic,
+                    client=self.client or get_async_client(),
+                ),
+                timeout=self.timeout,
+            )
+        except Exception as e:
+            print(f"[CardEngine] {topic} 카드 생성 실패 → fallback: {type(e).__name__}: {e}")
+            return None
+
+        if not card.get("title"):
+            return None
+        self.cache.set(key, card)
+        return _with_fhi(card, fhi)
+
+
+def _pick_topics(n: int, current_titles: List[str]) -> List[str]:
+    # 슬롯끼리 주제가 겹치지 않게 (현재 카드 제목에 들어간 주제는 제외)
+    joined = " ".join(current_titles)
+    candidates = [t for t in CARD_TOPICS if t not in joined] or list(CARD_TOPICS)
+    topics = random.sample(candidates, min(n, len(candidates)))
+    while len(topics) < n:
+        topics.append(random.choice(CARD_TOPICS))
+    return topics
+
+
+def _with_fhi(card: Dict[str, Any], fhi: float) -> Dict[str, Any]:
+    # 캐시된 카드는 구간 내 다른 FHI 로도 쓰이므로 fhi/grade 는 요청 값으로 덮어씀
+    card = dict(card)
+    card["fhi"] = fhi
+    card["grade"] = fhi_grade(fhi)
+    return card
+
+
+def _fallback_card(fhi: float, exclude_titles: List[str]) -> Dict[str, Any]:
+    candidates = [c for c in FALLBACK_CARDS if c["title"] not in exclude_titles]
+    if not candidates:
+        candidates = FALLBACK_CARDS
+    card = random.choice(candidates).copy()
+    card["fhi"] = fhi
+    card["grade"] = fhi_grade(fhi)
+    card["raw"] = "fallback"
+    return card
+
+
+card_engine = CardEngine()
@@ -1,8 +1,8 @@
 from __future__ import annotations
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import datetime
 import numpy as np
-import pandas as pd
+
+from utils.transaction_batch import TransactionBatch, epoch_us, DAY_US
 
 
 # val.csv 의 고정 카테고리 컬럼명과 매핑
@@ -20,88 +20,70 @@ CATEGORY_COLS = {
 }
 
 
-def _to_dt(x) -> datetime | None:
-    if isinstance(x, datetime):
-        return x
-    try:
-        return pd.to_datetime(x).to_pydatetime()
-    except Exception:
-        return None
+def _window_stats(amts: np.ndarray) -> tuple:
+    # returns: (sum, mean, std, max) — 기존 list 기반 구현과 비트 단위로 같은 값
+    n = len(amts)
+    if n == 0:
+        return 0.0, 0.0, 0.0, 0.0
+    # builtin sum() 과 같은 순차 합산 (np.sum 은 pairwise 라 소수점 금액에서 미세하게 다를 수 있음)
+    total = float(np.cumsum(amts)[-1])
+    mean = float(np.mean(amts))
+    std = float(np.std(amts)) if n > 1 else 0.0
+    return total, mean, std, float(amts.max())
 
 
 def build_features_from_transactions(
-    transactions: list[dict],
+    transactions: list[dict] | TransactionBatch,
     asof: datetime | None = None
 ) -> dict:
     """
-    FINNUT normalized transactions → ML feature dict.
+    FINNUT normalized transactions (또는 미리 파싱한 TransactionBatch) → ML feature dict.
     모든 컬럼이 val.csv (학습 feature) 와 일치하도록 맞춤.
+
+    batch 의 int64 epoch(us)/float64 금액 컬럼 위에서 계산:
+    윈도우 경계는 searchsorted, 카테고리 합계는 bincount.
     """
     if not transactions:
         return {}
 
-    # 유효 tx 필터링
-    txs = []
-    for tx in transactions:
-        if not isinstance(tx, dict):
-            continue
-        dt = _to_dt(tx.get("datetime"))
-        if dt is None:
-            continue
-        try:
-            amt = float(tx.get("amount", 0))
-        except Exception:
-            continue
-        if amt <= 0:
-            continue
-        txs.append({
-            "dt":       dt,
-            "amt":      amt,
-            "category": (tx.get("category") or "other").lower().strip(),
-        })
-
-    if not txs:
+    # 유효 tx 필터링 (datetime 파싱 가능 + amount > 0, 시간순 정렬)
+    batch = TransactionBatch.from_transactions(transactions)
+    if not len(batch):
         return {}
 
-    asof = asof or max(t["dt"] for t in txs)
+    ts   = batch.ts
+    amts = batch.amounts
 
-    w7  = asof - timedelta(days=7)
-    w30 = asof - timedelta(days=30)
+    asof_us = epoch_us(asof) if asof is not None else int(ts[-1])
 
-    amt_7  = [t["amt"] for t in txs if t["dt"] >= w7]
-    amt_30 = [t["amt"] for t in txs if t["dt"] >= w30]
+    # 시간순 정렬이므로 윈도우 시작 위치만 찾으면 됨 (dt >= asof - N일)
+    i7  = int(np.searchsorted(ts, asof_us - 7 * DAY_US, side="left"))
+    i30 = int(np.searchsorted(ts, asof_us - 30 * DAY_US, side="left"))
 
-    days_7  = list({t["dt"].date() for t in txs if t["dt"] >= w7})
-    days_30 = list({t["dt"].date() for t in txs if t["dt"] >= w30})
+    amt_7  = amts[i7:]
+    amt_30 = amts[i30:]
 
     # ── spend features (7d) ──
-    spend_sum_7d  = float(sum(amt_7))
-    spend_mean_7d = float(np.mean(amt_7))  if amt_7  else 0.0
-    spend_std_7d  = float(np.std(amt_7))   if len(amt_7) > 1 else 0.0
-    spend_max_7d  = float(max(amt_7))      if amt_7  else 0.0
-    day_count_7d  = float(len(days_7))
+    spend_sum_7d, spend_mean_7d, spend_std_7d, spend_max_7d = _window_stats(amt_7)
+    day_count_7d  = float(len(np.unique(batch.days[i7:])))
 
     # ── spend features (30d) ──
-    spend_sum_30d  = float(sum(amt_30))
-    spend_mean_30d = float(np.mean(amt_30)) if amt_30 else 0.0
-    spend_std_30d  = float(np.std(amt_30))  if len(amt_30) > 1 else 0.0
-    spend_max_30d  = float(max(amt_30))     if amt_30 else 0.0
-    day_count_30d  = float(len(days_30))
+    spend_sum_30d, spend_mean_30d, spend_std_30d, spend_max_30d = _window_stats(amt_30)
+    day_count_30d  = float(len(np.unique(batch.days[i30:])))
 
     # ── category ratio (30d) ──
-    cat_sum: dict[str, float] = defaultdict(float)
-    for t in txs:
-        if t["dt"] >= w30:
-            cat_sum[t["category"]] += t["amt"]
+    codes_30 = batch.category_codes[i30:]
+    n_cats = len(batch.categories)
+    cat_sum = np.bincount(codes_30, weights=amt_30, minlength=n_cats)
     total_30 = spend_sum_30d if spend_sum_30d > 0 else 1.0
 
+    cat_pos = {cat: i for i, cat in enumerate(batch.categories)}
     cat_ratios = {}
     for col, cat_key in CATEGORY_COLS.items():
-        cat_ratios[col] = cat_sum.get(cat_key, 0.0) / total_30
+        i = cat_pos.get(cat_key)
+        cat_ratios[col] = (float(cat_sum[i]) if i is not None else 0.0) / total_30
 
-    unique_category_count_30d = float(len(set(
-        t["category"] for t in txs if t["dt"] >= w30
-    )))
+    unique_category_count_30d = float(np.count_nonzero(np.bincount(codes_30, minlength=n_cats)))
 
     features = {
         # 7d
@@ -1,7 +1,8 @@
 import os
-import pandas as pd
+import time
+import threading
+import numpy as np
 import lightgbm as lgb
-from functools import lru_cache
 
 DEFAULT_MODEL_PATH = "ml/artifacts/models/lgbm_fhi_v2_grid_best.txt"
 
@@ -10,7 +11,15 @@ class FHIModel:
         if not os.path.exists(model_path):
             raise FileNotFoundError(f"Model file not found: {model_path}")
         self.model_path = model_path
+
+        t0 = time.perf_counter()
         self.booster = lgb.Booster(model_file=model_path)
+        self.load_time_ms = round((time.perf_counter() - t0) * 1000, 2)
+        self.size_bytes = os.path.getsize(model_path)
+        self.num_trees = self.booster.num_trees()
+
+        # model feature names (training-time) — 요청마다 조회하지 않도록 한 번만
+        self.feature_names = self.booster.feature_name()
 
     def predict_one(self, features: dict) -> float:
         """
@@ -20,27 +29,120 @@ class FHIModel:
         This aligns input features to the model's training feature list.
         Missing features are filled with 0.0.
         """
-        # model feature names (training-time)
-        feat_names = self.booster.feature_name()
+        return float(self.predict_many([features])[0])
 
-        # build row with exact columns
-        row = {name: features.get(name, 0.0) for name in feat_names}
+    def predict_many(self, features_list: list[dict]) -> np.ndarray:
+        """
+        features_list: list of feature dicts (한 유저당 1개)
+        returns: np.ndarray of predicted label_fhi (0~100 clamp)
 
-        df = pd.DataFrame([row]).apply(pd.to_numeric, errors="coerce").fillna(0.0)
+        학습 시 feature 순서대로 미리 할당한 float32 행렬을 채운 뒤 booster.predict 1회로 일괄 예측.
+        누락/숫자 변환 불가 값은 0.0 으로 채운다.
+        """
+        X = np.zeros((len(features_list), len(self.feature_names)), dtype=np.float32)
+        for i, features in enumerate(features_list):
+            if not features:
+                continue
+            row = X[i]
+            for j, name in enumerate(self.feature_names):
+                v = features.get(name)
+                if v is not None:
+                    row[j] = _to_float(v)
+        return self.predict_matrix(X)
 
-        pred = float(self.booster.predict(df)[0])
+    def predict_matrix(self, X: np.ndarray) -> np.ndarray:
+        """
+        X: (n_rows, n_features) 행렬, 컬럼 순서는 self.feature_names 와 동일해야 함
+        """
+        if X.ndim != 2 or X.shape[1] != len(self.feature_names):
+            raise ValueError(
+                f"expected shape (n, {len(self.feature_names)}), got {X.shape}"
+            )
+        if len(X) == 0:
+            return np.zeros(0, dtype=np.float64)
+
+        pred = self.booster.predict(X)
 
         # clamp to 0~100 for safety (FHI score range)
-        if pred < 0.0:
-            pred = 0.0
-        elif pred > 100.0:
-            pred = 100.0
+        return np.clip(pred, 0.0, 100.0)
+
+
+def _to_float(v) -> float:
+    # pd.to_numeric(errors="coerce").fillna(0.0) 와 동일한 의미
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if f != f else f
+
+
+class ModelRegistry:
+    """
+    프로세스 전역 모델 레지스트리.
+    model_path 별로 FHIModel 을 한 번만 로드해서 모든 요청 핸들러가 같은 인스턴스를 공유한다.
+    - warm(): 서버 시작 시 미리 로드 (실패해도 서버는 뜨고 /health 에 에러로 노출)
+    - reload(): 모델 파일 교체 후 명시적으로 다시 로드
+    """
+
+    def __init__(self):
+        self._models: dict[str, FHIModel] = {}
+        self._errors: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model_path: str = DEFAULT_MODEL_PATH) -> FHIModel:
+        model = self._models.get(model_path)
+        if model is not None:
+            return model
+        with self._lock:
+            # 다른 스레드가 먼저 로드했을 수 있음
+            model = self._models.get(model_path)
+            if model is None:
+                model = self._load(model_path)
+        return model
+
+    def reload(self, model_path: str = DEFAULT_MODEL_PATH) -> FHIModel:
+        with self._lock:
+            return self._load(model_path)
+
+    def warm(self, model_paths: tuple = (DEFAULT_MODEL_PATH,)) -> None:
+        for path in model_paths:
+            try:
+                self.get(path)
+            except Exception as e:
+                print(f"[ModelRegistry] warm 실패 ({path}): {e}")
+
+    def stats(self) -> dict:
+        models = {
+            path: {
+                "loaded": True,
+                "load_time_ms": m.load_time_ms,
+                "size_bytes": m.size_bytes,
+                "num_trees": m.num_trees,
+            }
+            for path, m in self._models.items()
+        }
+        for path, err in self._errors.items():
+            if path not in models:
+                models[path] = {"loaded": False, "error": err}
+        return models
+
+    def _load(self, model_path: str) -> FHIModel:
+        # lock 안에서만 호출. 로드 실패 시 기존 인스턴스는 유지
+        try:
+            model = FHIModel(model_path=model_path)
+        except Exception as e:
+            self._errors[model_path] = str(e)
+            raise
+        self._models[model_path] = model
+        self._errors.pop(model_path, None)
+        return model
+
+
+registry = ModelRegistry()
 
-        return pred
 
-@lru_cache(maxsize=1)
 def load_model(model_path: str = DEFAULT_MODEL_PATH) -> FHIModel:
     """
-    Load FHIModel once and cache it.
+    Load FHIModel once (process-wide) and return the shared instance.
     """
-    return FHIModel(model_path=model_path)
\ No newline at end of file
+    return registry.get(model_path)
@@ -5,11 +5,42 @@ FHI + 소비 패턴 기반 3분 코칭카드 생성 (ChatGPT API)
 """
 
 import os
+import random
 from dotenv import load_dotenv
-from openai import OpenAI
 
 load_dotenv()
-client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+
+MODEL = "gpt-4o-mini"
+SYSTEM_PROMPT = "당신은 대학생 재정 관리를 돕는 친근한 금융 코치입니다."
+CARD_TOPICS = ["쇼핑/충동구매", "카페/음료", "배달/식비", "교통", "저축/절약 습관"]
+
+_client = None
+_async_client = None
+
+
+def get_client():
+    # import 시점이 아니라 처음 쓸 때 생성 (API 키 없어도 모듈 import 는 가능)
+    global _client
+    if _client is None:
+        from openai import OpenAI
+        _client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    return _client
+
+
+def get_async_client():
+    global _async_client
+    if _async_client is None:
+        from openai import AsyncOpenAI
+        _async_client = AsyncOpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+    return _async_client
+
+
+def fhi_grade(fhi: float) -> str:
+    if fhi >= 80:
+        return "양호 🟢"
+    elif fhi >= 60:
+        return "주의 🟡"
+    return "위험 🔴"
 
 
 def generate_coaching_card(
@@ -18,11 +49,45 @@ def generate_coaching_card(
     impulsive_score: float = 0.0,
     spike_score: float = 0.0,
     current_titles: list = [],
+    forced_category: str = None,
+    client=None,
 ) -> dict:
+    request, grade = build_card_request(
+        fhi, features, impulsive_score, spike_score, current_titles, forced_category
+    )
+    response = (client or get_client()).chat.completions.create(**request)
+    return _to_card(response, fhi, grade)
+
 
+async def agenerate_coaching_card(
+    fhi: float,
+    features: dict,
+    impulsive_score: float = 0.0,
+    spike_score: float = 0.0,
+    current_titles: list = [],
+    forced_category: str = None,
+    client=None,
+) -> dict:
+    """generate_coaching_card 의 async 버전 (AsyncOpenAI 호환 client)"""
+    request, grade = build_card_request(
+        fhi, features, impulsive_score, spike_score, current_titles, forced_category
+    )
+    response = await (client or get_async_client()).chat.completions.create(**request)
+    return _to_card(response, fhi, grade)
+
+
+def build_card_request(
+    fhi: float,
+    features: dict,
+    impulsive_score: float = 0.0,
+    spike_score: float = 0.0,
+    current_titles: list = [],
+    forced_category: str = None,
+) -> tuple:
+    """returns: (chat.completions.create kwargs, grade)"""
     spend_sum_7d   = features.get("spend_sum_7d", 0)
     spend_mean_30d = features.get("spend_mean_30d", 0)
-    top_category   = _get_top_category(features)
+    top_category   = get_top_category(features)
 
     status_summary = f"""
 - 금융건강지수(FHI): {fhi}점 / 100점
@@ -33,21 +98,15 @@ def generate_coaching_card(
 - 주요 소비 카테고리: {top_category}
 """.strip()
 
-    if fhi >= 80:
-        grade = "양호 🟢"
-    elif fhi >= 60:
-        grade = "주의 🟡"
-    else:
-        grade = "위험 🔴"
+    grade = fhi_grade(fhi)
 
     exclude_clause = ""
     if current_titles:
         titles_str = ", ".join(f'"{t}"' for t in current_titles)
         exclude_clause = f"\n5. 다음 제목과 완전히 다른 주제로 작성할 것: {titles_str}"
     
-    categories = ["쇼핑/충동구매", "카페/음료", "배달/식비", "교통", "저축/절약 습관"]
-    import random
-    forced_category = random.choice([c for c in categories if c not in " ".join(current_titles)])
+    if not forced_category:
+        forced_category = random.choice([c for c in CARD_TOPICS if c not in " ".join(current_titles)])
 
     prompt = f"""
 당신은 대학생 전용 금융 코치입니다.
@@ -71,16 +130,19 @@ FHI 등급: {grade}
 미션: (오늘 당장 할 수 있는 행동 1가지)
 """.strip()
 
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
+    request = dict(
+        model=MODEL,
         messages=[
-            {"role": "system", "content": "당신은 대학생 재정 관리를 돕는 친근한 금융 코치입니다."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user",   "content": prompt}
         ],
         max_tokens=300,
         temperature=0.7,
     )
+    return request, grade
+
 
+def _to_card(response, fhi: float, grade: str) -> dict:
     raw = response.choices[0].message.content.strip()
     card = _parse_card(raw)
     card["fhi"]   = fhi
@@ -89,7 +151,7 @@ FHI 등급: {grade}
     return card
 
 
-def _get_top_category(features: dict) -> str:
+def get_top_category(features: dict) -> str:
     cat_features = {
         k.replace("cat_spend_ratio_", "").replace("_30d", ""): v
         for k, v in features.items()
@@ -15,8 +15,10 @@ import pandas as pd
 import lightgbm as lgb
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 
+from table_io import read_table
+
 # ── 경로 설정 ──────────────────────────────────────────────
-VAL_PATH   = "ml/data/features/val.csv"
+VAL_PATH   = "ml/data/features/val.parquet"
 MODEL_PATH = "ml/artifacts/models/lgbm_fhi_v2_grid_best.txt"
 REPORT_OUT = "ml/artifacts/reports/rule_vs_ml_report.json"
 
@@ -85,7 +87,7 @@ def label_scenarios(df: pd.DataFrame) -> pd.DataFrame:
 def main():
     # 1. 데이터 로드
     print("[1/4] 데이터 로드 중...")
-    df = pd.read_csv(VAL_PATH)
+    df = read_table(VAL_PATH)
     print(f"      val rows: {len(df):,}")
 
     # 2. 모델 로드 & ML 예측
@@ -20,7 +20,9 @@ import pandas as pd
 import lightgbm as lgb
 from sklearn.metrics import mean_absolute_error
 
-VAL_PATH   = "ml/data/features/val.csv"
+from table_io import read_table
+
+VAL_PATH   = "ml/data/features/val.parquet"
 MODEL_PATH = "ml/artifacts/models/lgbm_fhi_v2_grid_best.txt"
 REPORT_OUT = "ml/artifacts/reports/rule_vs_ml_v2_report.json"
 
@@ -86,7 +88,7 @@ def label_scenarios(df):
 
 def main():
     print("[1/4] 데이터 로드 중...")
-    df = pd.read_csv(VAL_PATH)
+    df = read_table(VAL_PATH)
     print(f"      val rows: {len(df):,}")
 
     print("[2/4] LightGBM 예측 중...")
@@ -1,7 +1,13 @@
 import pandas as pd
 
-NORMALIZED_PATH = "ml/data/processed/normalized.csv"
-OUT_PATH = "ml/data/features/features_category_mix_30d.csv"
+from rolling_window import grouped_rolling
+from table_io import fillna_numeric, read_table, write_table
+
+NORMALIZED_PATH = "ml/data/processed/normalized.parquet"
+OUT_PATH = "ml/data/features/features_category_mix_30d.parquet"
+
+# normalized 에서 읽을 컬럼
+INPUT_COLS = ["user_id", "datetime", "amount", "category"]
 
 WINDOW_DAYS = 30
 
@@ -19,8 +25,8 @@ FIXED_CATS = [
 ]
 
 
-def main():
-    df = pd.read_csv(NORMALIZED_PATH)
+def build_category_mix_features(df):
+    """normalized 거래 → user-day 별 카테고리 소비 비율 + 최근 30일 카테고리 수"""
 
     df["datetime"] = pd.to_datetime(df["datetime"], errors="coerce")
     df = df.dropna(subset=["user_id", "datetime", "amount"])
@@ -28,7 +34,8 @@ def main():
     df = df.dropna(subset=["amount"])
     df = df[df["amount"] > 0]
 
-    df["category"] = df["category"].fillna("other").astype(str)
+    # categorical(parquet) 이면 "other" 가 카테고리 목록에 없을 수 있어서 object 로 바꾼 뒤 채움
+    df["category"] = df["category"].astype(object).fillna("other").astype(str)
 
     # reference date (daily)
     df["date"] = df["datetime"].dt.date
@@ -39,14 +46,14 @@ def main():
 
     # user-day로 집계
     daily_cat = (
-        df.groupby(["user_id", "date", "cat_bucket"], as_index=False)["amount"]
+        df.groupby(["user_id", "date", "cat_bucket"], as_index=False, observed=True)["amount"]
         .sum()
         .rename(columns={"amount": "cat_spend"})
     )
 
     # total daily spend (for ratio)
     daily_total = (
-        df.groupby(["user_id", "date"], as_index=False)["amount"]
+        df.groupby(["user_id", "date"], as_index=False, observed=True)["amount"]
         .sum()
         .rename(columns={"amount": "daily_total"})
     )
@@ -61,7 +68,8 @@ def main():
         columns="cat_bucket",
         values="cat_ratio",
         aggfunc="sum",
-        fill_value=0.0
+        fill_value=0.0,
+        observed=True,
     ).reset_index()
 
     # 누락된 카테고리 컬럼 보정 (데이터에 없는 카테고리는 0으로 채움)
@@ -72,36 +80,34 @@ def main():
 
     # unique_category_count_30d
     daily_unique = (
-        df.groupby(["user_id", "date"])["category"]
+        df.groupby(["user_id", "date"], observed=True)["category"]
         .nunique()
         .reset_index()
         .rename(columns={"category": "unique_cat_count_day"})
     )
     daily_unique = daily_unique.sort_values(["user_id", "date"]).reset_index(drop=True)
 
-    out_rows = []
-    for uid, g in daily_unique.groupby("user_id"):
-        g = g.sort_values("date").set_index("date")
-        g[f"unique_category_count_{WINDOW_DAYS}d"] = (
-            g["unique_cat_count_day"].rolling(f"{WINDOW_DAYS}D").sum()
-        )
-        g = g.reset_index()
-        g["user_id"] = uid
-        out_rows.append(g[["user_id", "date", f"unique_category_count_{WINDOW_DAYS}d"]])
-
-    uniq_feat = pd.concat(out_rows, ignore_index=True).fillna(0.0)
+    # user 별 최근 30일 합 — user 루프 없이 전체 행을 한 번에 (rolling_window.py)
+    daily_unique[f"unique_category_count_{WINDOW_DAYS}d"] = (
+        grouped_rolling(daily_unique, "unique_cat_count_day", WINDOW_DAYS).sum()
+    )
+    uniq_feat = fillna_numeric(daily_unique[["user_id", "date", f"unique_category_count_{WINDOW_DAYS}d"]].copy())
 
     # merge pivot + unique
-    feat = pivot.merge(uniq_feat, on=["user_id", "date"], how="left").fillna(0.0)
+    feat = fillna_numeric(pivot.merge(uniq_feat, on=["user_id", "date"], how="left"))
 
     # rename cat columns → cat_spend_ratio_{cat}_30d
     for c in all_cats:
         if c in feat.columns:
             feat.rename(columns={c: f"cat_spend_ratio_{c}_{WINDOW_DAYS}d"}, inplace=True)
+    return feat
+
 
-    feat.to_csv(OUT_PATH, index=False)
-    print(f"[OK] saved -> {OUT_PATH} (rows={len(feat)})")
-    print("fixed categories:", all_cats)
+def main():
+    feat = build_category_mix_features(read_table(NORMALIZED_PATH, columns=INPUT_COLS))
+    written = write_table(feat, OUT_PATH)
+    print(f"[OK] saved -> {', '.join(written)} (rows={len(feat)})")
+    print("fixed categories:", FIXED_CATS + ["other"])
 
 
 if __name__ == "__main__":
@@ -1,13 +1,19 @@
 import pandas as pd
 
-NORMALIZED_PATH = "ml/data/processed/normalized.csv"
-FEATURES_OUT = "ml/data/features/features_basic.csv"
+from rolling_window import grouped_rolling
+from table_io import read_table, write_table
+
+NORMALIZED_PATH = "ml/data/processed/normalized.parquet"
+FEATURES_OUT = "ml/data/features/features_basic.parquet"
+
+# normalized 에서 읽을 컬럼
+INPUT_COLS = ["user_id", "datetime", "amount"]
 
 WINDOWS = [7, 30]  # days
 
 
-def main():
-    df = pd.read_csv(NORMALIZED_PATH)
+def build_basic_features(df):
+    """normalized 거래 → user-day 별 최근 7/30일 소비 feature"""
 
     # parse datetime
     df["datetime"] = pd.to_datetime(df["datetime"], errors="coerce")
@@ -21,43 +27,35 @@ def main():
 
     # daily spend per user (reduce size)
     daily = (
-        df.groupby(["user_id", "date"], as_index=False)["amount"]
+        df.groupby(["user_id", "date"], as_index=False, observed=True)["amount"]
         .sum()
         .rename(columns={"amount": "daily_spend"})
     )
 
-    # per user rolling features
     daily["date"] = pd.to_datetime(daily["date"])
     daily = daily.sort_values(["user_id", "date"]).reset_index(drop=True)
 
-    rows = []
-    for uid, g in daily.groupby("user_id"):
-        g = g.sort_values("date").reset_index(drop=True)
-        g = g.set_index("date")
-
-        for w in WINDOWS:
-            # rolling window sum/mean/std/max/count on daily_spend
-            roll = g["daily_spend"].rolling(f"{w}D")
+    # per user rolling features — user 루프 없이 전체 행을 한 번에 (rolling_window.py)
+    for w in WINDOWS:
+        # rolling window sum/mean/std/max/count on daily_spend
+        roll = grouped_rolling(daily, "daily_spend", w)
 
-            g[f"spend_sum_{w}d"] = roll.sum()
-            g[f"spend_mean_{w}d"] = roll.mean()
-            g[f"spend_std_{w}d"] = roll.std().fillna(0.0)
-            g[f"spend_max_{w}d"] = roll.max()
-            g[f"day_count_{w}d"] = roll.count()
-
-        # keep final daily feature rows
-        g = g.reset_index()
-        g["user_id"] = uid
-        rows.append(g)
-
-    feat = pd.concat(rows, ignore_index=True)
+        daily[f"spend_sum_{w}d"] = roll.sum()
+        daily[f"spend_mean_{w}d"] = roll.mean()
+        daily[f"spend_std_{w}d"] = roll.std().fillna(0.0)
+        daily[f"spend_max_{w}d"] = roll.max()
+        daily[f"day_count_{w}d"] = roll.count()
 
     # select output columns
-    keep_cols = ["user_id", "date"] + [c for c in feat.columns if c.startswith(("spend_", "day_count_"))]
-    feat = feat[keep_cols].dropna()
+    keep_cols = ["user_id", "date"] + [c for c in daily.columns if c.startswith(("spend_", "day_count_"))]
+    feat = daily[keep_cols].dropna()
+    return feat
 
-    feat.to_csv(FEATURES_OUT, index=False)
-    print(f"[OK] saved -> {FEATURES_OUT} (rows={len(feat)})")
+
+def main():
+    feat = build_basic_features(read_table(NORMALIZED_PATH, columns=INPUT_COLS))
+    written = write_table(feat, FEATURES_OUT)
+    print(f"[OK] saved -> {', '.join(written)} (rows={len(feat)})")
     print("columns:", feat.columns.tolist()[:20])
 
 
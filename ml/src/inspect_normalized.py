@@ -1,9 +1,11 @@
 import pandas as pd
 
-NORMALIZED_PATH = "ml/data/processed/normalized.csv"
+from table_io import read_table, write_table
+
+NORMALIZED_PATH = "ml/data/processed/normalized.parquet"
 
 def main():
-    df = pd.read_csv(NORMALIZED_PATH)
+    df = read_table(NORMALIZED_PATH)
 
     print("== Basic Info ==")
     print("rows:", len(df))
@@ -31,8 +33,8 @@ def main():
     print(df[["datetime", "amount", "merchant", "category", "payment_method", "source"]].head(5))
 
     # save cleaned overwrite (선택: 덮어쓰기)
-    df.to_csv(NORMALIZED_PATH, index=False)
-    print(f"\n[OK] cleaned overwrite -> {NORMALIZED_PATH}")
+    written = write_table(df, NORMALIZED_PATH)
+    print(f"\n[OK] cleaned overwrite -> {', '.join(written)}")
 
 if __name__ == "__main__":
     main()
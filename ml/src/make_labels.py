@@ -1,13 +1,15 @@
 import pandas as pd
 
-IN_PATH = "ml/data/features/features.csv"
-OUT_PATH = "ml/data/features/features_labeled.csv"
+from table_io import read_table, write_table
+
+IN_PATH = "ml/data/features/features.parquet"
+OUT_PATH = "ml/data/features/features_labeled.parquet"
 
 def clamp(x, lo=0.0, hi=100.0):
     return max(lo, min(hi, x))
 
 def main():
-    df = pd.read_csv(IN_PATH)
+    df = read_table(IN_PATH)
 
     # label = rule-based proxy (no ground truth)
     # 간단 proxy:
@@ -32,8 +34,8 @@ def main():
     label = 100.0 - alpha * positive_spike
     df["label_fhi"] = label.apply(lambda x: clamp(float(x), 0.0, 100.0))
 
-    df.to_csv(OUT_PATH, index=False)
-    print(f"[OK] saved -> {OUT_PATH} (rows={len(df)})")
+    written = write_table(df, OUT_PATH)
+    print(f"[OK] saved -> {', '.join(written)} (rows={len(df)})")
     print("label_fhi stats:", df["label_fhi"].describe())
 
 if __name__ == "__main__":
@@ -1,12 +1,14 @@
 import pandas as pd
 
-BASIC_PATH = "ml/data/features/features_basic.csv"
-CAT_PATH = "ml/data/features/features_category_mix_30d.csv"
-OUT_PATH = "ml/data/features/features.csv"
+from table_io import fillna_numeric, read_table, write_table
+
+BASIC_PATH = "ml/data/features/features_basic.parquet"
+CAT_PATH = "ml/data/features/features_category_mix_30d.parquet"
+OUT_PATH = "ml/data/features/features.parquet"
 
 def main():
-    basic = pd.read_csv(BASIC_PATH)
-    cat = pd.read_csv(CAT_PATH)
+    basic = read_table(BASIC_PATH)
+    cat = read_table(CAT_PATH)
 
     # date type unify
     basic["date"] = pd.to_datetime(basic["date"], errors="coerce")
@@ -15,10 +17,10 @@ def main():
     basic = basic.dropna(subset=["user_id", "date"])
     cat = cat.dropna(subset=["user_id", "date"])
 
-    merged = basic.merge(cat, on=["user_id", "date"], how="left").fillna(0.0)
+    merged = fillna_numeric(basic.merge(cat, on=["user_id", "date"], how="left"))
 
-    merged.to_csv(OUT_PATH, index=False)
-    print(f"[OK] merged saved -> {OUT_PATH} (rows={len(merged)}, cols={len(merged.columns)})")
+    written = write_table(merged, OUT_PATH)
+    print(f"[OK] merged saved -> {', '.join(written)} (rows={len(merged)}, cols={len(merged.columns)})")
     print("sample cols:", merged.columns.tolist()[:20])
     print("sample head:\n", merged.head(3))
 
@@ -1,6 +1,8 @@
 import os
 import pandas as pd
 
+from table_io import write_table
+
 # Kaggle fraud_detection 원본 category → FINNUT 새 카테고리 매핑
 KAGGLE_CATEGORY_MAP = {
     # convenience (편의점·다이소)
@@ -38,11 +40,14 @@ KAGGLE_CATEGORY_MAP = {
     "health_fitness":     "other",
 }
 
-def normalize_raw_dataset(input_csv: str, output_csv: str, source_name: str) -> None:
-    df = pd.read_csv(input_csv)
+# Kaggle fraud_detection 원본에서 실제로 쓰는 컬럼 (나머지 컬럼은 읽지 않음)
+KAGGLE_FRAUD_COLS = ["cc_num", "trans_date_trans_time", "amt", "merchant", "category"]
+
 
+def normalize_raw_dataset(input_csv: str, output_path: str, source_name: str) -> None:
     # Candidate A: kartik2112/fraud_detection (credit card transactions)
     if source_name == "kaggle_fraud_detection":
+        df = pd.read_csv(input_csv, usecols=KAGGLE_FRAUD_COLS)
         out = pd.DataFrame({
             "user_id":         df["cc_num"].astype(str),
             "datetime":        pd.to_datetime(df["trans_date_trans_time"], errors="coerce"),
@@ -55,6 +60,7 @@ def normalize_raw_dataset(input_csv: str, output_csv: str, source_name: str) ->
 
     # Candidate B: retail transactional dataset
     elif source_name == "kaggle_retail_tx":
+        df = pd.read_csv(input_csv)
         dt = pd.to_datetime(
             df.get("datetime", df.get("date", "")), errors="coerce"
         )
@@ -72,11 +78,11 @@ def normalize_raw_dataset(input_csv: str, output_csv: str, source_name: str) ->
     # basic cleaning
     out = out.dropna(subset=["datetime", "amount"])
     out = out[out["amount"] > 0]
-    out.to_csv(output_csv, index=False)
-    print(f"[OK] normalized saved -> {output_csv} (rows={len(out)})")
+    written = write_table(out, output_path)
+    print(f"[OK] normalized saved -> {', '.join(written)} (rows={len(out)})")
 
 
 if __name__ == "__main__":
     raw = "ml/data/raw/transactions.csv"
-    out = "ml/data/processed/normalized.csv"
+    out = "ml/data/processed/normalized.parquet"
     normalize_raw_dataset(raw, out, source_name="kaggle_fraud_detection")
\ No newline at end of file
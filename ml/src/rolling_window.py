@@ -0,0 +1,44 @@
+"""
+rolling_window.py
+user 별 시간 기반 rolling (최근 N일) 을 user 루프 없이 한 번에 계산
+
+- (user_id, date) 로 정렬된 일별 행 전체에 대해 window 경계를 searchsorted 한 번으로 구함
+  (key = user 번호 * stride + 날짜(일) → 다른 user 의 날짜와 겹치지 않음)
+- 경계를 pandas rolling 에 BaseIndexer 로 넘기므로 sum/mean/std/max/count 계산은
+  user 별 g.rolling("7D") 와 같은 kernel → 결과 값이 동일
+"""
+
+import numpy as np
+import pandas as pd
+from pandas.api.indexers import BaseIndexer
+
+
+class _FixedBounds(BaseIndexer):
+    """미리 계산한 start/end 를 그대로 돌려주는 indexer"""
+
+    def get_window_bounds(self, num_values=0, min_periods=None, center=None, closed=None, step=None):
+        return self.start, self.end
+
+
+def window_bounds(user_codes, days, window_days):
+    """
+    user_codes: 정렬된 user 번호 (0,0,1,1,1,...), days: 날짜(일 단위 정수)
+    returns: (start, end) — 행 i 의 window = 같은 user 이면서 date > date_i - window_days 인 행
+    """
+    days = days - days.min() if len(days) else days
+    stride = (int(days.max()) if len(days) else 0) + window_days + 1
+    key = user_codes.astype(np.int64) * stride + days
+    start = np.searchsorted(key, key - window_days, side="right").astype(np.int64)
+    end = np.arange(1, len(key) + 1, dtype=np.int64)
+    return start, end
+
+
+def grouped_rolling(daily, value_col, window_days, user_col="user_id", date_col="date"):
+    """
+    daily: (user_col, date_col) 로 정렬, (user, date) 유일한 일별 DataFrame
+    returns: daily[value_col] 의 Rolling — user 별 .rolling(f"{window_days}D") 와 같은 window
+    """
+    codes = pd.factorize(daily[user_col])[0]
+    days = daily[date_col].to_numpy("datetime64[D]").astype(np.int64)
+    start, end = window_bounds(codes, days, window_days)
+    return daily[value_col].rolling(_FixedBounds(start=start, end=end), min_periods=1)
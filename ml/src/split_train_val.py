@@ -1,22 +1,24 @@
 import pandas as pd
 import numpy as np
 
-IN_PATH = "ml/data/features/features_labeled.csv"
-TRAIN_OUT = "ml/data/features/train.csv"
-VAL_OUT = "ml/data/features/val.csv"
+from table_io import read_table, write_table
+
+IN_PATH = "ml/data/features/features_labeled.parquet"
+TRAIN_OUT = "ml/data/features/train.parquet"
+VAL_OUT = "ml/data/features/val.parquet"
 
 VAL_RATIO = 0.2
 SEED = 42
 
 def main():
-    df = pd.read_csv(IN_PATH)
+    df = read_table(IN_PATH)
 
     if "user_id" not in df.columns:
         raise ValueError("Missing user_id column")
     if "label_fhi" not in df.columns:
         raise ValueError("Missing label_fhi column")
 
-    users = df["user_id"].astype(str).unique()
+    users = np.asarray(df["user_id"].astype(str).unique(), dtype=object)
     rng = np.random.default_rng(SEED)
     rng.shuffle(users)
 
@@ -30,8 +32,8 @@ def main():
     inter = set(train["user_id"].astype(str)).intersection(set(val["user_id"].astype(str)))
     assert len(inter) == 0, f"Leak detected: {len(inter)} overlapping users"
 
-    train.to_csv(TRAIN_OUT, index=False)
-    val.to_csv(VAL_OUT, index=False)
+    write_table(train, TRAIN_OUT)
+    write_table(val, VAL_OUT)
 
     print(f"[OK] train rows={len(train)} users={train['user_id'].nunique()} -> {TRAIN_OUT}")
     print(f"[OK] val   rows={len(val)} users={val['user_id'].nunique()} -> {VAL_OUT}")
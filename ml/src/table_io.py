@@ -0,0 +1,81 @@
+"""
+table_io.py
+학습 파이프라인 중간 파일 읽기/쓰기 (normalize → feature → merge → label → split → train)
+
+- 기본은 Parquet: datetime/float 타입이 그대로 저장돼서 단계마다 CSV 를 다시 파싱하지 않음
+  user_id / category 같은 반복 문자열은 categorical(dictionary) 로 저장 → 파일 크기 감소
+- 읽을 때 columns 로 필요한 컬럼만 읽음 (column projection)
+- ML_EXPORT_CSV=1 이면 같은 이름의 .csv 도 함께 저장 (확인/공유용)
+- ML_TABLE_FORMAT=csv 이면 기존처럼 CSV 로만 주고받음 (pyarrow 가 설치돼 있지 않아도 자동으로 CSV)
+- parquet 파일이 없으면 같은 이름의 .csv 를 읽음 (예전에 만든 데이터 호환)
+- 읽은 user_id 는 categorical → groupby / pivot_table 은 observed=True 로
+  (pandas 2.x 기본값 observed=False 면 모든 user × 모든 날짜 조합이 0 으로 채워져 생김)
+"""
+
+import os
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+TABLE_FORMAT = os.getenv("ML_TABLE_FORMAT", "parquet")  # parquet | csv
+if TABLE_FORMAT == "parquet" and importlib.util.find_spec("pyarrow") is None:
+    print("[table_io] pyarrow 미설치 → 중간 파일을 CSV 로 저장 (pip install -r requirements.txt)")
+    TABLE_FORMAT = "csv"
+EXPORT_CSV = os.getenv("ML_EXPORT_CSV", "0") == "1"
+PARQUET_COMPRESSION = os.getenv("ML_PARQUET_COMPRESSION", "zstd")
+
+# 반복 값이 많은 문자열 컬럼 → categorical
+CATEGORICAL_COLS = ["user_id", "merchant", "category", "payment_method", "source"]
+
+
+def table_path(path, fmt=None):
+    """확장자만 바꾼 경로 (ml/data/features/train.parquet → train.csv)"""
+    stem, _ = os.path.splitext(path)
+    return f"{stem}.{fmt or TABLE_FORMAT}"
+
+
+def read_table(path, columns=None):
+    pq = table_path(path, "parquet")
+    if TABLE_FORMAT == "parquet" and os.path.exists(pq):
+        return pd.read_parquet(pq, columns=columns)
+    return pd.read_csv(table_path(path, "csv"), usecols=columns)
+
+
+def _categories(s):
+    cats = pd.Index(s.dropna().unique())
+    # 숫자 문자열(cc_num 등)은 CSV 로 다시 읽었을 때(int)와 같은 정렬 순서가 되도록 숫자 순
+    # → 이후 단계의 sort/groupby 행 순서와 train/val 분할이 CSV 파이프라인과 같음
+    num = pd.to_numeric(pd.Series(cats, dtype=object), errors="coerce")
+    if len(cats) and not num.isna().any():
+        return cats[np.argsort(num.to_numpy(), kind="stable")]
+    return cats.sort_values()
+
+
+def to_categorical(df):
+    for c in CATEGORICAL_COLS:
+        if c in df.columns and not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = pd.Categorical(df[c], categories=_categories(df[c]))
+    return df
+
+
+def fillna_numeric(df, value=0.0):
+    """숫자 컬럼만 채움 — categorical(user_id 등) 에 fillna(0.0) 하면 새 카테고리라 TypeError"""
+    cols = df.select_dtypes("number").columns
+    df[cols] = df[cols].fillna(value)
+    return df
+
+
+def write_table(df, path):
+    """returns: 저장한 경로 목록"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    written = []
+    if TABLE_FORMAT == "parquet":
+        out = table_path(path, "parquet")
+        to_categorical(df).to_parquet(out, index=False, compression=PARQUET_COMPRESSION)
+        written.append(out)
+    if TABLE_FORMAT == "csv" or EXPORT_CSV:
+        out = table_path(path, "csv")
+        df.to_csv(out, index=False)
+        written.append(out)
+    return written
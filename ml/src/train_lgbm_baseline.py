@@ -7,8 +7,10 @@ import numpy as np
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 import lightgbm as lgb
 
-TRAIN_PATH = "ml/data/features/train.csv"
-VAL_PATH = "ml/data/features/val.csv"
+from table_io import read_table
+
+TRAIN_PATH = "ml/data/features/train.parquet"
+VAL_PATH = "ml/data/features/val.parquet"
 
 MODEL_OUT = "ml/artifacts/models/lgbm_fhi_v2_baseline.txt"
 REPORT_OUT = "ml/artifacts/reports/baseline_report.json"
@@ -17,8 +19,8 @@ FI_OUT = "ml/artifacts/reports/feature_importance.csv"
 TARGET = "label_fhi"
 
 def main():
-    train = pd.read_csv(TRAIN_PATH)
-    val = pd.read_csv(VAL_PATH)
+    train = read_table(TRAIN_PATH)
+    val = read_table(VAL_PATH)
 
     # drop non-features
     for c in ["user_id", "date"]:
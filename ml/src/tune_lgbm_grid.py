@@ -1,23 +1,77 @@
+"""
+tune_lgbm_grid.py
+LightGBM 하이퍼파라미터 탐색 (grid / random / successive halving)
+
+[실행]
+    python ml/src/tune_lgbm_grid.py            # GRID 전체
+    python ml/src/tune_lgbm_grid.py random     # GRID 에서 TUNE_N_TRIALS 개 무작위 추출
+    python ml/src/tune_lgbm_grid.py halving    # successive halving (boosting round 를 예산으로)
+
+[속도]
+- trial 은 process pool 에서 병렬 실행 (TUNE_WORKERS x TUNE_THREADS_PER_TRIAL ≈ 코어 수)
+- lgb.Dataset binning 은 부모 프로세스에서 한 번만 하고 binary 로 저장 → worker 는 읽기만
+- validation l1 기준 early stopping (TUNE_EARLY_STOPPING_ROUNDS, 0 이면 끔)
+- n_estimators 만 다른 조합은 가장 큰 값으로 한 번만 학습하고, 작은 값의 결과는 같은 학습 기록의 앞부분에서 계산
+- subsample_freq=0 (LGBMRegressor 기본값) 이면 subsample 은 학습에 영향이 없어서 같은 학습 결과를 재사용
+
+[출력] (기존과 동일)
+    ml/artifacts/reports/grid_search_report.json, grid_search_results.csv
+    ml/artifacts/models/lgbm_fhi_v2_grid_best.txt, reports/grid_best_feature_importance.csv
+"""
+
 import os
+import sys
 import json
+import time
+import random
+import shutil
+import tempfile
 import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
 
 from sklearn.metrics import mean_absolute_error, mean_squared_error
 import lightgbm as lgb
 
-TRAIN_PATH = "ml/data/features/train.csv"
-VAL_PATH = "ml/data/features/val.csv"
+from table_io import read_table
+
+TRAIN_PATH = "ml/data/features/train.parquet"
+VAL_PATH = "ml/data/features/val.parquet"
 
 OUT_REPORT = "ml/artifacts/reports/grid_search_report.json"
+OUT_RESULTS = "ml/artifacts/reports/grid_search_results.csv"
 OUT_BEST_MODEL = "ml/artifacts/models/lgbm_fhi_v2_grid_best.txt"
 OUT_BEST_FI = "ml/artifacts/reports/grid_best_feature_importance.csv"
 
 TARGET = "label_fhi"
+SEED = int(os.getenv("TUNE_SEED", "42"))
+
+GRID = {
+    "num_leaves": [31, 63, 127],
+    "learning_rate": [0.03, 0.05, 0.1],
+    "subsample": [0.7, 0.9],
+    "colsample_bytree": [0.7, 0.9],
+    "min_child_samples": [20, 50],
+    "n_estimators": [400, 800],
+}
+
+# 코어 수 = TUNE_WORKERS x TUNE_THREADS_PER_TRIAL 정도로 맞춘다 (32코어 → 8 x 4)
+THREADS_PER_TRIAL = int(os.getenv("TUNE_THREADS_PER_TRIAL", "4"))
+WORKERS = int(os.getenv("TUNE_WORKERS", str(max(1, (os.cpu_count() or 1) // THREADS_PER_TRIAL))))
+EARLY_STOPPING_ROUNDS = int(os.getenv("TUNE_EARLY_STOPPING_ROUNDS", "50"))
+N_RANDOM_TRIALS = int(os.getenv("TUNE_N_TRIALS", "60"))
+HALVING_ETA = int(os.getenv("TUNE_HALVING_ETA", "3"))
+HALVING_MIN_ROUNDS = int(os.getenv("TUNE_HALVING_MIN_ROUNDS", "50"))
+
+# binning 관련 설정은 Dataset 에 고정 (trial 마다 바뀌는 min_child_samples 때문에 pre-filter 는 끔)
+DATASET_PARAMS = {"max_bin": 255, "feature_pre_filter": False, "verbose": -1}
+
 
 def load_xy(path):
-    df = pd.read_csv(path)
+    df = read_table(path)
     for c in ["user_id", "date"]:
         if c in df.columns:
             df = df.drop(columns=[c])
@@ -26,73 +80,281 @@ def load_xy(path):
     X = X.apply(pd.to_numeric, errors="coerce").fillna(0.0)
     return X, y
 
-def main():
-    X_train, y_train = load_xy(TRAIN_PATH)
-    X_val, y_val = load_xy(VAL_PATH)
 
-    grid = {
-        "num_leaves": [31, 63, 127],
-        "learning_rate": [0.03, 0.05, 0.1],
-        "subsample": [0.7, 0.9],
-        "colsample_bytree": [0.7, 0.9],
-        "min_child_samples": [20, 50],
-        "n_estimators": [400, 800],
+def to_native_params(params, threads=THREADS_PER_TRIAL):
+    """LGBMRegressor(random_state=SEED, **params) 와 같은 학습이 되는 lgb.train 파라미터"""
+    native = {
+        "objective": "regression",
+        "metric": "l1",
+        "num_leaves": params["num_leaves"],
+        "learning_rate": params["learning_rate"],
+        "bagging_fraction": params["subsample"],
+        "bagging_freq": params.get("subsample_freq", 0),
+        "feature_fraction": params["colsample_bytree"],
+        "min_data_in_leaf": params["min_child_samples"],
+        "seed": SEED,
+        "num_threads": threads,
+        "verbose": -1,
+        **DATASET_PARAMS,
     }
+    return native
 
-    keys = list(grid.keys())
-    combos = list(itertools.product(*[grid[k] for k in keys]))
 
-    best = {"mae": 1e9, "rmse": 1e9, "params": None}
+def training_key(params):
+    # 학습 결과를 결정하는 값 (n_estimators 제외, bagging 이 꺼져 있으면 subsample 제외)
+    key = {k: v for k, v in params.items() if k != "n_estimators"}
+    if not key.get("subsample_freq", 0):
+        key.pop("subsample", None)
+    return tuple(sorted(key.items()))
 
-    results = []
-    for i, vals in enumerate(combos, 1):
-        params = dict(zip(keys, vals))
-        model = lgb.LGBMRegressor(random_state=42, **params)
-
-        model.fit(
-            X_train, y_train,
-            eval_set=[(X_val, y_val)],
-            eval_metric="l1",
-            callbacks=[lgb.log_evaluation(period=0)]  # silent
-        )
-
-        pred = model.predict(X_val)
+
+def stop_iteration(history, n_rounds, patience):
+    """
+    l1 기록에서 n_rounds 로 학습했을 때 early stopping 이 고르는 best iteration (1-based).
+    lgb.early_stopping 과 같은 규칙: 더 작아져야 개선, patience 동안 개선 없으면 중단.
+    """
+    best_i, best = 0, float("inf")
+    for i, score in enumerate(history[:n_rounds]):
+        if score < best:
+            best_i, best = i, score
+        elif patience and i - best_i >= patience:
+            break
+    return best_i + 1
+
+
+# ──────────────────────────────
+# worker (process pool) — Dataset binary 를 한 번 읽어서 모든 trial 에 재사용
+# ──────────────────────────────
+
+_WORKER = {}
+
+
+def _init_worker(train_bin, val_bin, X_val, y_val):
+    train_ds = lgb.Dataset(train_bin, params=DATASET_PARAMS).construct()
+    val_ds = lgb.Dataset(val_bin, reference=train_ds, params=DATASET_PARAMS).construct()
+    _WORKER.update(train=train_ds, val=val_ds, X_val=X_val, y_val=y_val)
+
+
+def _run_group(params, n_list, patience, threads):
+    """
+    같은 training_key 의 trial 묶음을 max(n_list) round 로 한 번 학습
+    returns: [(n_estimators, best_iteration, mae, rmse)], 학습 시간(초)
+    """
+    t0 = time.perf_counter()
+    history = {}
+    booster = lgb.train(
+        to_native_params(params, threads),
+        _WORKER["train"],
+        num_boost_round=max(n_list),
+        valid_sets=[_WORKER["val"]],
+        valid_names=["val"],
+        callbacks=[lgb.record_evaluation(history)]
+        + ([lgb.early_stopping(patience, first_metric_only=True, verbose=False)] if patience else []),
+    )
+    l1 = history["val"]["l1"]
+    X_val, y_val = _WORKER["X_val"], _WORKER["y_val"]
+    rows = []
+    for n in n_list:
+        best_it = stop_iteration(l1, n, patience) if patience else n
+        pred = booster.predict(X_val, num_iteration=best_it)
         mae = float(mean_absolute_error(y_val, pred))
         rmse = float(np.sqrt(mean_squared_error(y_val, pred)))
+        rows.append((n, best_it, mae, rmse))
+    return rows, time.perf_counter() - t0
+
+
+class TrialRunner:
+    """
+    Dataset 을 한 번 binning 해서 binary 로 저장하고 worker 들이 공유.
+    workers=1 이면 pool 없이 현재 프로세스에서 실행.
+    """
+
+    def __init__(self, X_train, y_train, X_val, y_val, workers=WORKERS, threads=THREADS_PER_TRIAL):
+        self.workers = max(1, workers)
+        self.threads = max(1, threads)
+        self.columns = list(X_train.columns)
+        self._tmp = tempfile.mkdtemp(prefix="lgbm_tune_")
+
+        t0 = time.perf_counter()
+        train_ds = lgb.Dataset(X_train, y_train, params=DATASET_PARAMS, free_raw_data=False).construct()
+        val_ds = lgb.Dataset(X_val, y_val, reference=train_ds, params=DATASET_PARAMS).construct()
+        self.train_bin = os.path.join(self._tmp, "train.bin")
+        self.val_bin = os.path.join(self._tmp, "val.bin")
+        train_ds.save_binary(self.train_bin)
+        val_ds.save_binary(self.val_bin)
+        self.binning_sec = time.perf_counter() - t0
 
-        row = {"mae": mae, "rmse": rmse, **params}
-        results.append(row)
+        initargs = (self.train_bin, self.val_bin, np.asarray(X_val, dtype=np.float64), np.asarray(y_val, dtype=np.float64))
+        if self.workers > 1:
+            # LightGBM(OpenMP) 은 fork 후 사용하면 멈출 수 있어서 spawn
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=initargs,
+            )
+        else:
+            self._pool = None
+            _init_worker(*initargs)
+        self.n_trained = 0
+        self.train_sec = 0.0
 
-        if mae < best["mae"]:
-            best = {"mae": mae, "rmse": rmse, "params": params}
-            # save best model snapshot
-            os.makedirs(os.path.dirname(OUT_BEST_MODEL), exist_ok=True)
-            model.booster_.save_model(OUT_BEST_MODEL)
+    def run(self, trials, patience):
+        """
+        trials: [params(sklearn 이름, n_estimators 포함)] → 같은 순서의 결과 row 목록
+        """
+        groups = {}
+        for i, params in enumerate(trials):
+            groups.setdefault(training_key(params), []).append(i)
 
-            fi = pd.DataFrame({
-                "feature": X_train.columns,
-                "importance": model.booster_.feature_importance(importance_type="gain")
-            }).sort_values("importance", ascending=False)
-            os.makedirs(os.path.dirname(OUT_BEST_FI), exist_ok=True)
-            fi.to_csv(OUT_BEST_FI, index=False)
+        jobs = []
+        for idx in groups.values():
+            params = trials[idx[0]]
+            n_list = sorted({trials[i]["n_estimators"] for i in idx})
+            jobs.append((idx, (params, n_list, patience, self.threads)))
 
-        print(f"[{i}/{len(combos)}] MAE={mae:.4f} RMSE={rmse:.4f} params={params}")
+        if self._pool is not None:
+            futures = [self._pool.submit(_run_group, *args) for _, args in jobs]
+            outputs = [f.result() for f in futures]
+        else:
+            outputs = [_run_group(*args) for _, args in jobs]
+
+        rows = [None] * len(trials)
+        for (idx, _), (group_rows, sec) in zip(jobs, outputs):
+            self.n_trained += 1
+            self.train_sec += sec
+            by_n = {n: r for n, *r in group_rows}
+            for i in idx:
+                best_it, mae, rmse = by_n[trials[i]["n_estimators"]]
+                rows[i] = {"mae": mae, "rmse": rmse, **trials[i], "best_iteration": best_it}
+        return rows
+
+    def fit_final(self, params, best_iteration):
+        # best trial 을 같은 설정(스레드 수 포함)으로 다시 학습 → 저장용 booster (trial 결과와 같은 모델)
+        train_ds = lgb.Dataset(self.train_bin, params=DATASET_PARAMS)
+        return lgb.train(to_native_params(params, self.threads), train_ds, num_boost_round=best_iteration)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+        shutil.rmtree(self._tmp, ignore_errors=True)
+
+
+# ──────────────────────────────
+# 탐색 전략
+# ──────────────────────────────
+
+def grid_trials(grid):
+    keys = list(grid.keys())
+    return [dict(zip(keys, vals)) for vals in itertools.product(*[grid[k] for k in keys])]
+
+
+def random_trials(grid, n_trials, seed=SEED):
+    combos = grid_trials(grid)
+    return random.Random(seed).sample(combos, min(n_trials, len(combos)))
+
+
+def successive_halving(runner, grid, eta=HALVING_ETA, min_rounds=HALVING_MIN_ROUNDS, patience=EARLY_STOPPING_ROUNDS):
+    """
+    n_estimators 를 제외한 모든 조합으로 시작 → 작은 round 예산으로 학습해서 상위 1/eta 만 남기고
+    예산을 eta 배로 늘려 반복. 마지막 단계는 max(n_estimators) 예산.
+    returns: 단계별 전체 결과 row (n_estimators = 그 단계 예산)
+    """
+    base = {k: v for k, v in grid.items() if k != "n_estimators"}
+    max_rounds = max(grid["n_estimators"])
+    candidates = grid_trials(base)
+
+    rounds = max_rounds
+    n_rungs = 1
+    while rounds // eta >= min_rounds and len(candidates) > eta ** n_rungs:
+        rounds //= eta
+        n_rungs += 1
+
+    results = []
+    for rung in range(n_rungs):
+        budget = max_rounds if rung == n_rungs - 1 else rounds * eta ** rung
+        rows = runner.run([{**c, "n_estimators": budget} for c in candidates], patience)
+        results += rows
+        print(f"[halving {rung + 1}/{n_rungs}] {len(candidates)} configs x {budget} rounds "
+              f"→ best MAE={min(r['mae'] for r in rows):.4f}")
+        keep = max(1, len(candidates) // eta)
+        order = sorted(range(len(rows)), key=lambda i: rows[i]["mae"])
+        candidates = [candidates[i] for i in order[:keep]]
+    return results
+
+
+def run_search(X_train, y_train, X_val, y_val, search="grid", grid=GRID, workers=WORKERS,
+               threads=THREADS_PER_TRIAL, patience=EARLY_STOPPING_ROUNDS, n_trials=N_RANDOM_TRIALS):
+    """
+    returns: (results, best, runner_stats)
+      results: trial 별 {"mae", "rmse", **params, "best_iteration"}
+      best: {"mae", "rmse", "params", "best_iteration"}
+    """
+    t0 = time.perf_counter()
+    runner = TrialRunner(X_train, y_train, X_val, y_val, workers=workers, threads=threads)
+    try:
+        if search == "grid":
+            results = runner.run(grid_trials(grid), patience)
+        elif search == "random":
+            results = runner.run(random_trials(grid, n_trials), patience)
+        elif search == "halving":
+            results = successive_halving(runner, grid, patience=patience)
+        else:
+            raise ValueError(f"unknown search: {search} (grid | random | halving)")
+
+        best_row = min(results, key=lambda r: r["mae"])
+        params = {k: best_row[k] for k in grid}
+        best = {"mae": best_row["mae"], "rmse": best_row["rmse"], "params": params,
+                "best_iteration": best_row["best_iteration"]}
+        booster = runner.fit_final(params, best_row["best_iteration"])
+        stats = {
+            "search": search,
+            "workers": runner.workers,
+            "threads_per_trial": runner.threads,
+            "early_stopping_rounds": patience,
+            "n_trained": runner.n_trained,
+            "binning_sec": round(runner.binning_sec, 3),
+            "train_sec_total": round(runner.train_sec, 3),
+            "elapsed_sec": round(time.perf_counter() - t0, 3),
+        }
+    finally:
+        runner.close()
+    return results, best, booster, stats
+
+
+def main(search="grid"):
+    X_train, y_train = load_xy(TRAIN_PATH)
+    X_val, y_val = load_xy(VAL_PATH)
+
+    results, best, booster, stats = run_search(X_train, y_train, X_val, y_val, search=search)
+
+    # save best model (탐색이 끝난 뒤 한 번만)
+    os.makedirs(os.path.dirname(OUT_BEST_MODEL), exist_ok=True)
+    booster.save_model(OUT_BEST_MODEL)
+
+    fi = pd.DataFrame({
+        "feature": X_train.columns,
+        "importance": booster.feature_importance(importance_type="gain")
+    }).sort_values("importance", ascending=False)
+    os.makedirs(os.path.dirname(OUT_BEST_FI), exist_ok=True)
+    fi.to_csv(OUT_BEST_FI, index=False)
 
     # save report
     os.makedirs(os.path.dirname(OUT_REPORT), exist_ok=True)
-    report = {"best": best, "n_trials": len(combos)}
+    report = {"best": best, "n_trials": len(results), **stats}
     with open(OUT_REPORT, "w", encoding="utf-8") as f:
         json.dump(report, f, ensure_ascii=False, indent=2)
 
-    # save full grid results
-    pd.DataFrame(results).sort_values("mae").to_csv(
-        "ml/artifacts/reports/grid_search_results.csv", index=False
-    )
+    # save full results
+    pd.DataFrame(results).sort_values("mae", kind="stable").to_csv(OUT_RESULTS, index=False)
 
     print("\n[OK] Grid search done")
     print("best:", best)
+    print(f"search={stats['search']} trials={len(results)} trained={stats['n_trained']} "
+          f"workers={stats['workers']}x{stats['threads_per_trial']} threads elapsed={stats['elapsed_sec']}s")
     print("best model:", OUT_BEST_MODEL)
     print("report:", OUT_REPORT)
 
+
 if __name__ == "__main__":
-    main()
+    main(sys.argv[1] if len(sys.argv) > 1 else "grid")
@@ -14,11 +14,13 @@ import matplotlib.pyplot as plt
 import matplotlib.patches as mpatches
 from matplotlib import rcParams
 
+from table_io import read_table
+
 # 한글 폰트 설정
 rcParams['font.family'] = 'Malgun Gothic'
 rcParams['axes.unicode_minus'] = False
 
-VAL_PATH   = "ml/data/features/val.csv"
+VAL_PATH   = "ml/data/features/val.parquet"
 MODEL_PATH = "ml/artifacts/models/lgbm_fhi_v2_grid_best.txt"
 OUT_DIR    = "ml/artifacts/reports/"
 
@@ -53,7 +55,7 @@ def label_scenarios(df):
 
 def main():
     # ── 데이터 준비 ──
-    df        = pd.read_csv(VAL_PATH)
+    df        = read_table(VAL_PATH)
     model     = lgb.Booster(model_file=MODEL_PATH)
     feat_cols = [c for c in df.columns if c not in NON_FEATURE_COLS]
 
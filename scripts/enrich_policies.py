@@ -0,0 +1,58 @@
+"""
+정책 enrichment 단계: policies 텍스트 → policy_eligibility 구조화 컬럼
+
+ingest_youthcenter.py / ingest_scholarships.py 는 저장한 정책에 대해 이 단계를 자동으로 돌린다.
+이 스크립트는 전체를 다시 계산할 때(추출 규칙/지역 사전 변경 후, 직접 DB 수정 후) 사용.
+
+[실행]
+    python scripts/enrich_policies.py            # 전체 재계산
+    python scripts/enrich_policies.py --missing  # 아직 계산 안 된 정책만
+
+[저장 컬럼] (utils/policy_enricher.py)
+    region_sido / region_sigungu / region_mentions_json : 정책 텍스트의 시도·시군구
+    restricted_group / target_groups_json               : 대상 제한(북한이탈주민, 다문화, ...) / 대상 키워드
+    term_offsets_json                                   : 대상 키워드별 필드·첫 등장 위치 (추천 스니펫용)
+    text_min_age / text_max_age / text_student_required : 조건 문구에서 읽은 나이·재학 조건 (+ text_evidence_json)
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from app.db import get_conn, init_db, bump_catalog_version, enrich_policies
+
+
+def run(only_missing=False):
+    print("=== FINNUT 정책 enrichment 시작 ===")
+    init_db()
+
+    conn = get_conn()
+    t0 = time.perf_counter()
+    n = enrich_policies(conn, only_missing=only_missing)
+    bump_catalog_version(conn)
+    conn.commit()
+
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT
+            COUNT(*),
+            COUNT(restricted_group),
+            COUNT(region_sigungu),
+            COUNT(region_sido),
+            SUM(text_min_age IS NOT NULL OR text_max_age IS NOT NULL),
+            COUNT(text_student_required)
+        FROM policy_eligibility
+        WHERE enriched_at IS NOT NULL
+    """)
+    total, restricted, sigungu, sido, age, student = cur.fetchone()
+    conn.close()
+
+    print(f"  → {n}건 계산 ({time.perf_counter() - t0:.2f}s)")
+    print(f"  대상 제한 {restricted or 0} | 시군구 {sigungu or 0} | 시도 {sido or 0} | "
+          f"나이 조건 {age or 0} | 재학 조건 {student or 0} (enrichment 완료 {total}건)")
+    print("=== 완료! ===")
+
+
+if __name__ == "__main__":
+    run(only_missing="--missing" in sys.argv[1:])
@@ -1,10 +1,29 @@
+"""
+한국장학재단(odcloud) 장학금 API → policies 테이블 수집 스크립트
+
+[실행]
+    python scripts/ingest_scholarships.py
+
+[수집 방식] (utils/ingest_engine.py)
+    - UDDI 마다 1페이지로 totalCount 확인 → 나머지 페이지를 KOSAF_PER_PAGE 건씩 요청 (1500건에서 잘리지 않음)
+    - 여러 UDDI 의 페이지를 KOSAF_WORKERS 개씩 동시에 요청, 초당 KOSAF_RATE_PER_SEC 건 이하, 실패는 backoff 후 재시도
+    - 받아 둔 페이지는 최대 workers*2 개 → 응답 전체를 메모리에 들고 있지 않음
+    - 페이지마다 변환 → diff(content_hash) → 새/바뀐 정책만 bulk upsert 후 commit
+    - 재시도로도 못 받은 페이지가 있으면 나머지는 저장하되 제거 표시는 생략
+"""
+
 import os
+import sys
 import json
+import math
+import time
 import hashlib
-import requests
 from dotenv import load_dotenv
 from datetime import datetime
-from app.db import get_conn, init_db, now_iso
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from app.db import get_conn, init_db, now_iso, bump_catalog_version, enrich_policies, record_policy_changes
+from utils.ingest_engine import ChangeLog, HttpFetcher, content_hash, diff_upsert, fetch_in_order, mark_removed
 
 # ============================
 # 환경변수 로드
@@ -19,6 +38,20 @@ if not SERVICE_KEY:
 # 설정
 # ============================
 BASE_URL = "https://api.odcloud.kr/api/15028252/v1"
+SOURCE = "odcloud-kosaf"
+
+# 페이지 크기 / 동시 요청 수 / 초당 요청 수
+PER_PAGE = int(os.getenv("KOSAF_PER_PAGE", "500"))
+WORKERS = int(os.getenv("KOSAF_WORKERS", "4"))
+RATE_PER_SEC = float(os.getenv("KOSAF_RATE_PER_SEC", "10"))
+
+POLICY_COLUMNS = [
+    "policy_key", "name", "category", "provider", "period", "start_date", "end_date",
+    "status", "link", "condition", "benefit", "source", "source_id", "fetched_at",
+    "raw_json", "content_hash",
+]
+# content_hash 대상 (fetched_at 은 매번 바뀌므로 제외)
+HASH_COLUMNS = [c for c in POLICY_COLUMNS if c not in ("fetched_at", "content_hash")]
 
 # 월별 UDDI 엔드포인트 목록
 KOSAF_UDDIS = [
@@ -124,20 +157,46 @@ def build_policy_key(name: str, provider: str, link: str):
 
 
 # ============================
-# API 호출
+# API 호출 (페이지 단위)
 # ============================
-def fetch_api(uddi, page=1, perPage=1500):
-    url = f"{BASE_URL}/{uddi}"
-    params = {
-        "page": page,
-        "perPage": perPage,
-        "serviceKey": SERVICE_KEY
-    }
+def fetch_api(fetcher, uddi, page=1, per_page=PER_PAGE):
+    """returns: {"totalCount": 전체 건수, "data": 이 페이지 rows}"""
+    data = fetcher.get_json(
+        f"{BASE_URL}/{uddi}",
+        params={
+            "page": page,
+            "perPage": per_page,
+            "serviceKey": SERVICE_KEY
+        },
+    )
+    return {"totalCount": int(data.get("totalCount") or 0), "data": data.get("data") or []}
+
+
+def fetch_pages(fetcher, uddis, per_page=PER_PAGE, workers=WORKERS):
+    """
+    모든 UDDI 의 모든 페이지를 (uddi, page, rows, error) 로 yield (UDDI 순, 페이지 순)
+    - 1페이지를 UDDI 별로 동시에 받아 totalCount 로 페이지 수 계산 → 나머지 페이지도 동시에
+    - 실패한 페이지는 rows=None, error=예외 (다른 페이지는 계속)
+    """
+    def fetch(item):
+        uddi, page = item
+        try:
+            return fetch_api(fetcher, uddi, page, per_page), None
+        except Exception as e:
+            return None, e
 
-    r = requests.get(url, params=params, timeout=30)
-    r.raise_for_status()
+    rest = []
+    for (uddi, _), (first, error) in fetch_in_order(fetch, [(u, 1) for u in uddis], workers=workers):
+        if error is not None:
+            yield uddi, 1, None, error
+            continue
+        n_pages = math.ceil(first["totalCount"] / per_page)
+        print(f"[UDDI] {uddi}: 총 {first['totalCount']}건, {max(n_pages, 1)}페이지")
+        yield uddi, 1, first["data"], None
+        rest += [(uddi, page) for page in range(2, n_pages + 1)]
 
-    return r.json().get("data", [])
+    for (uddi, page), (result, error) in fetch_in_order(fetch, rest, workers=workers):
+        yield uddi, page, result["data"] if result else None, error
 
 
 # ============================
@@ -153,7 +212,7 @@ def convert_to_policies(rows, source_uddi: str, fetched_at: str):
         provider = row.get("운영기관명", "") or ""
         link = row.get("홈페이지 주소", "") or ""
 
-        out.append({
+        policy = {
             "policy_key": build_policy_key(name, provider, link),
             "name": name,
             "category": "scholarship",
@@ -165,64 +224,45 @@ def convert_to_policies(rows, source_uddi: str, fetched_at: str):
             "link": link,
             "condition": build_condition(row),
             "benefit": build_benefit(row),
-            "source": "odcloud-kosaf",
+            "source": SOURCE,
             "source_id": source_uddi,
             "fetched_at": fetched_at,
             "raw_json": json.dumps(row, ensure_ascii=False)
-        })
+        }
+        policy["content_hash"] = content_hash(policy, HASH_COLUMNS)
+        out.append(policy)
 
     return out
 
 
 # ============================
-# DB 저장 (policies upsert)
+# DB 저장 (diff → 새/바뀐 정책만 upsert)
 # ============================
-def save_to_db(policies):
-    conn = get_conn()
-    cur = conn.cursor()
-
-    for p in policies:
-        cur.execute("""
-            INSERT INTO policies
-            (policy_key, name, category, provider, period, start_date, end_date, status, link,
-             condition, benefit, source, source_id, fetched_at, raw_json)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(policy_key)
-            DO UPDATE SET
-                name = excluded.name,
-                category = excluded.category,
-                provider = excluded.provider,
-                period = excluded.period,
-                start_date = excluded.start_date,
-                end_date = excluded.end_date,
-                status = excluded.status,
-                link = excluded.link,
-                condition = excluded.condition,
-                benefit = excluded.benefit,
-                source = excluded.source,
-                source_id = excluded.source_id,
-                fetched_at = excluded.fetched_at,
-                raw_json = excluded.raw_json;
-        """, (
-            p["policy_key"],
-            p["name"],
-            p["category"],
-            p["provider"],
-            p["period"],
-            p["start_date"],
-            p["end_date"],
-            p["status"],
-            p["link"],
-            p["condition"],
-            p["benefit"],
-            p["source"],
-            p["source_id"],
-            p["fetched_at"],
-            p["raw_json"]
-        ))
+def save_to_db(conn, policies):
+    """
+    한 페이지를 한 트랜잭션으로: content_hash 를 DB 값과 비교해서 새 정책/바뀐 정책만 쓰고, 같은 정책은 건드리지 않음
+    returns: {"inserted" | "updated" | "unchanged": {policy_key: id}}
+    """
+    changes = diff_upsert(conn, "policies", "policy_key", POLICY_COLUMNS, policies)
+    changed = {**changes["inserted"], **changes["updated"]}
+
+    if changed:
+        # enrichment 단계: 정책 텍스트 → 지역/대상/나이 구조화 컬럼 (추천은 이 값만 조회)
+        enrich_policies(conn, list(changed.values()))
+        bump_catalog_version(conn)
+        record_policy_changes(conn, SOURCE, {"inserted": changes["inserted"], "updated": changes["updated"]})
+    conn.commit()
+    return changes
+
 
+def mark_vanished(conn, changes, ts):
+    """모든 UDDI 를 받은 뒤: 이번에 안 나온 장학금 정책 → removed_at 표시 (삭제하지 않음)"""
+    removed = mark_removed(conn, "policies", "policy_key", {"source": SOURCE}, changes.seen_keys(), ts)
+    if removed:
+        bump_catalog_version(conn)
+        record_policy_changes(conn, SOURCE, {"removed": removed})
     conn.commit()
-    conn.close()
+    changes.add("removed", removed)
 
 
 # ============================
@@ -233,25 +273,43 @@ def run():
     init_db()
 
     fetched_at = now_iso()
+    fetcher = HttpFetcher(rate_per_sec=RATE_PER_SEC)
     total = 0
+    changes = ChangeLog()
+    failed = 0
 
-    for uddi in KOSAF_UDDIS:
-        try:
-            print(f"[UDDI] {uddi} 수집 중...")
-            rows = fetch_api(uddi)
-            print(f" → {len(rows)}건 수집")
+    conn = get_conn()
+    t0 = time.perf_counter()
+    try:
+        for uddi, page, rows, error in fetch_pages(fetcher, KOSAF_UDDIS):
+            if error is not None:
+                print(f"⚠️ {uddi} {page}페이지 실패: {error}")
+                failed += 1
+                continue
 
             policies = convert_to_policies(rows, source_uddi=uddi, fetched_at=fetched_at)
-            save_to_db(policies)
-
+            page_changes = save_to_db(conn, policies)
+            for kind, ids in page_changes.items():
+                changes.add(kind, ids)
             total += len(policies)
-
-        except Exception as e:
-            print(f"⚠️ {uddi} 실패:", e)
-            continue
-
+            print(f" → {uddi} {page}페이지: {len(policies)}건 (추가 {len(page_changes['inserted'])}, "
+                  f"변경 {len(page_changes['updated'])}, 동일 {len(page_changes['unchanged'])})")
+
+        # 실패한 페이지가 있거나 받은 게 없으면 목록이 불완전하므로 제거 표시 생략
+        complete = not failed and total > 0
+        if complete:
+            mark_vanished(conn, changes, fetched_at)
+    finally:
+        conn.close()
+
+    elapsed = time.perf_counter() - t0
+    counts = changes.counts()
+    print(f"({elapsed:.1f}s, {total / max(elapsed, 1e-9):.0f}건/s, 요청 {fetcher.stats()})")
+    print(f"변경 내역: 추가 {counts['inserted']} / 변경 {counts['updated']} / 동일 {counts['unchanged']} / "
+          f"제거 {counts['removed']}{'' if complete else ' (목록이 불완전해서 제거 표시 생략)'}")
     print(f"=== 완료! 총 {total}건 처리됨 (policies 저장) ===")
+    return changes.summary()
 
 
 if __name__ == "__main__":
-    run()
\ No newline at end of file
+    run()
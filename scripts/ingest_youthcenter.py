@@ -9,7 +9,18 @@
       API_KEY = "발급받은키값"
 
 [실행]
-    python scripts/ingest_youthcenter.py
+    python scripts/ingest_youthcenter.py           # 중단된 수집이 있으면 이어서
+    python scripts/ingest_youthcenter.py --fresh   # 체크포인트 무시하고 처음부터
+
+[수집 방식] (utils/ingest_engine.py)
+    - 페이지를 YOUTHCENTER_WORKERS 개씩 동시에 요청, 초당 YOUTHCENTER_RATE_PER_SEC 건 이하
+    - 실패(연결 오류 / 429 / 5xx)는 backoff 후 재시도, 그래도 실패하면 그 페이지에서 멈춤
+    - 저장은 페이지 순서대로 페이지당 한 트랜잭션 (bulk upsert), commit 후 체크포인트 기록
+      → 중단되면 다시 실행했을 때 마지막 commit 페이지 다음부터 수집
+    - 증분 저장: 정책마다 content_hash (수집 시각 제외 내용 hash) 를 DB 값과 비교해서
+      새 정책/바뀐 정책만 쓰고 (자격 조건·enrichment 도 그 정책만), 같은 정책은 건드리지 않음
+      전체 목록을 끝까지 받으면 이번에 안 나온 온통청년 정책은 removed_at 표시
+      변경 내역(추가/변경/동일/제거 건수·id)은 policy_changes 테이블에 카탈로그 버전과 함께 기록
 
 [온통청년 API 실제 스펙]
     GET https://www.youthcenter.go.kr/go/ythip/getPlcy
@@ -26,12 +37,14 @@ import sys
 import json
 import math
 import time
-import requests
 from datetime import datetime
 from dotenv import load_dotenv
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
-from app.db import get_conn, init_db, now_iso
+from app.db import DATA_DIR, get_conn, init_db, now_iso, bump_catalog_version, enrich_policies, record_policy_changes
+from utils.ingest_engine import (
+    ChangeLog, Checkpoint, HttpFetcher, content_hash, diff_upsert, fetch_in_order, mark_removed, upsert_many,
+)
 
 load_dotenv(dotenv_path=".env")
 API_KEY = os.getenv("YOUTHCENTER_API_KEY", "")
@@ -44,9 +57,29 @@ if not API_KEY:
     )
 
 BASE_URL  = "https://www.youthcenter.go.kr/go/ythip/getPlcy"
+SOURCE    = "youthcenter"
 PAGE_SIZE = 100
 MAX_PAGES = 300
-SLEEP_SEC = 0.3
+
+# 동시 요청 수 / 초당 요청 수 (예전 고정 SLEEP_SEC=0.3 ≈ 초당 3건)
+WORKERS      = int(os.getenv("YOUTHCENTER_WORKERS", "4"))
+RATE_PER_SEC = float(os.getenv("YOUTHCENTER_RATE_PER_SEC", "3"))
+CHECKPOINT_PATH = os.getenv(
+    "YOUTHCENTER_CHECKPOINT", os.path.join(DATA_DIR, "ingest_youthcenter.checkpoint.json")
+)
+
+POLICY_COLUMNS = [
+    "policy_key", "name", "category", "provider", "period", "start_date", "end_date",
+    "status", "link", "condition", "benefit", "source", "source_id", "fetched_at",
+    "source_meta", "raw_json", "content_hash",
+]
+# content_hash 대상 (fetched_at 은 매번 바뀌므로 제외)
+HASH_COLUMNS = [c for c in POLICY_COLUMNS if c not in ("fetched_at", "content_hash")]
+ELIGIBILITY_COLUMNS = [
+    "policy_id", "min_age", "max_age", "region", "student_required",
+    "income_type", "income_max_percent", "income_max_quintile",
+    "keywords_json", "evidence_json", "updated_at",
+]
 
 LCLSF_TO_CATEGORY = {
     "일자리":         "employment",
@@ -156,7 +189,7 @@ def _convert_row(row, fetched_at):
         start_date = _parse_date(row.get("bizPrdBgngYmd") or "")
         end_date   = _parse_date(row.get("bizPrdEndYmd") or "")
 
-    return {
+    policy = {
         "policy_key":  _build_policy_key(row),
         "name":        (row.get("plcyNm") or "").strip(),
         "category":    category,
@@ -168,12 +201,14 @@ def _convert_row(row, fetched_at):
         "link":        (row.get("aplyUrlAddr") or row.get("refUrlAddr1") or "").strip(),
         "condition":   _build_condition(row),
         "benefit":     (row.get("plcySprtCn") or row.get("plcyExplnCn") or "").strip(),
-        "source":      "youthcenter",
+        "source":      SOURCE,
         "source_id":   (row.get("plcyNo") or "").strip(),
         "fetched_at":  fetched_at,
         "source_meta": json.dumps(_build_source_meta(row), ensure_ascii=False),
         "raw_json":    json.dumps(row, ensure_ascii=False),
     }
+    policy["content_hash"] = content_hash(policy, HASH_COLUMNS)
+    return policy
 
 
 def _build_eligibility(policy_id, row, ts):
@@ -217,8 +252,8 @@ def _build_eligibility(policy_id, row, ts):
     }
 
 
-def _fetch_page(page_index, display):
-    resp = requests.get(
+def _fetch_page(fetcher, page_index, display):
+    data = fetcher.get_json(
         BASE_URL,
         params={
             "apiKeyNm": API_KEY,
@@ -226,83 +261,54 @@ def _fetch_page(page_index, display):
             "pageSize": display,
             "rtnType":  "json",
         },
-        timeout=30,
     )
-    resp.raise_for_status()
-    data   = resp.json()
     result = data.get("result", {})
     total  = result.get("pagging", {}).get("totCount", 0)
     items  = result.get("youthPolicyList", [])
     return {"totalCount": total, "youthPolicyList": items}
 
 
-def _save_policies(policies, rows_map, ts):
-    conn = get_conn()
-    cur  = conn.cursor()
-
-    for p in policies:
-        cur.execute("""
-            INSERT INTO policies
-            (policy_key, name, category, provider, period, start_date, end_date,
-             status, link, condition, benefit, source, source_id, fetched_at,
-             source_meta, raw_json)
-            VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)
-            ON CONFLICT(policy_key) DO UPDATE SET
-                name=excluded.name, category=excluded.category,
-                provider=excluded.provider, period=excluded.period,
-                start_date=excluded.start_date, end_date=excluded.end_date,
-                status=excluded.status, link=excluded.link,
-                condition=excluded.condition, benefit=excluded.benefit,
-                source=excluded.source, source_id=excluded.source_id,
-                fetched_at=excluded.fetched_at,
-                source_meta=excluded.source_meta, raw_json=excluded.raw_json;
-        """, (
-            p["policy_key"], p["name"],       p["category"],  p["provider"],
-            p["period"],     p["start_date"], p["end_date"],  p["status"],
-            p["link"],       p["condition"],  p["benefit"],
-            p["source"],     p["source_id"],  p["fetched_at"],
-            p["source_meta"], p["raw_json"],
+def _save_policies(conn, policies, rows_map, ts):
+    """
+    한 페이지를 한 트랜잭션으로 저장: diff(content_hash) → 새/바뀐 정책만 bulk upsert → 자격 조건 → enrichment
+    returns: {"inserted" | "updated" | "unchanged": {policy_key: id}}
+    """
+    changes = diff_upsert(conn, "policies", "policy_key", POLICY_COLUMNS, policies)
+    changed = {**changes["inserted"], **changes["updated"]}
+    if changed:
+        upsert_many(conn, "policy_eligibility", "policy_id", ELIGIBILITY_COLUMNS, (
+            _build_eligibility(policy_id, rows_map.get(key, {}), ts) for key, policy_id in changed.items()
         ))
 
-        cur.execute("SELECT id FROM policies WHERE policy_key=?", (p["policy_key"],))
-        row_id = cur.fetchone()
-        if row_id:
-            elig = _build_eligibility(row_id[0], rows_map.get(p["policy_key"], {}), ts)
-            cur.execute("""
-                INSERT INTO policy_eligibility
-                (policy_id, min_age, max_age, region, student_required,
-                 income_type, income_max_percent, income_max_quintile,
-                 keywords_json, evidence_json, updated_at)
-                VALUES (?,?,?,?,?,?,?,?,?,?,?)
-                ON CONFLICT(policy_id) DO UPDATE SET
-                    min_age=excluded.min_age, max_age=excluded.max_age,
-                    region=excluded.region, student_required=excluded.student_required,
-                    income_type=excluded.income_type,
-                    income_max_percent=excluded.income_max_percent,
-                    income_max_quintile=excluded.income_max_quintile,
-                    keywords_json=excluded.keywords_json,
-                    evidence_json=excluded.evidence_json,
-                    updated_at=excluded.updated_at;
-            """, (
-                elig["policy_id"], elig["min_age"], elig["max_age"],
-                elig["region"], elig["student_required"], elig["income_type"],
-                elig["income_max_percent"], elig["income_max_quintile"],
-                elig["keywords_json"], elig["evidence_json"], elig["updated_at"],
-            ))
+        # enrichment 단계: 정책 텍스트 → 지역/대상/나이 구조화 컬럼 (추천은 이 값만 조회)
+        enrich_policies(conn, list(changed.values()))
+        # 바뀐 게 있을 때만 버전 증가 → 아무것도 안 바뀐 수집은 서버 캐시를 무효화하지 않음
+        bump_catalog_version(conn)
+        record_policy_changes(conn, SOURCE, {"inserted": changes["inserted"], "updated": changes["updated"]})
+    conn.commit()
+    return changes
+
 
+def _mark_vanished(conn, changes, ts):
+    """전체 목록을 끝까지 받은 뒤: 이번에 안 나온 온통청년 정책 → removed_at 표시 (삭제하지 않음)"""
+    removed = mark_removed(conn, "policies", "policy_key", {"source": SOURCE}, changes.seen_keys(), ts)
+    if removed:
+        bump_catalog_version(conn)
+        record_policy_changes(conn, SOURCE, {"removed": removed})
     conn.commit()
-    conn.close()
+    changes.add("removed", removed)
 
 
-def run():
+def run(fresh=False):
     print("=== FINNUT 온통청년 정책 수집 시작 ===")
     init_db()
-    fetched_at  = now_iso()
-    total_saved = 0
+    fetcher    = HttpFetcher(rate_per_sec=RATE_PER_SEC)
+    checkpoint = Checkpoint(CHECKPOINT_PATH, key=f"{BASE_URL}|pageSize={PAGE_SIZE}")
+    state      = None if fresh else checkpoint.load()
 
     print("[1/2] 전체 건수 확인 중...")
     try:
-        first = _fetch_page(1, PAGE_SIZE)
+        first = _fetch_page(fetcher, 1, PAGE_SIZE)
     except Exception as e:
         print(f"❌ API 호출 실패: {e}")
         return
@@ -316,19 +322,36 @@ def run():
         return
 
     total_pages = min(math.ceil(total_count / PAGE_SIZE), MAX_PAGES)
-    print(f"[2/2] {total_pages}페이지 수집 시작...")
+    if state:
+        # 이어서 수집: 같은 fetched_at 으로 마지막 commit 페이지 다음부터
+        fetched_at  = state["fetched_at"]
+        start_page  = state["last_page"] + 1
+        total_saved = state["saved"]
+        changes     = ChangeLog.from_state(state.get("changes"))
+        print(f"[2/2] 체크포인트에서 이어서 수집: {start_page}/{total_pages}페이지부터 (저장 {total_saved}건)")
+    else:
+        fetched_at  = now_iso()
+        start_page  = 1
+        total_saved = 0
+        changes     = ChangeLog()
+        print(f"[2/2] {total_pages}페이지 수집 시작... (동시 {WORKERS}, 초당 {RATE_PER_SEC:g}건)")
 
-    for page in range(1, total_pages + 1):
-        try:
-            if page == 1:
-                items = items_first
-            else:
-                time.sleep(SLEEP_SEC)
-                data  = _fetch_page(page, PAGE_SIZE)
-                items = data.get("youthPolicyList") or []
+    def fetch(page):
+        if page == 1:
+            return items_first
+        return _fetch_page(fetcher, page, PAGE_SIZE).get("youthPolicyList") or []
 
+    conn = get_conn()
+    t0   = time.perf_counter()
+    n_new     = 0
+    last_page = start_page - 1
+    # 제거 표시는 목록 전체를 받았을 때만 (MAX_PAGES 로 잘렸거나 중간에 빈 페이지면 건너뜀)
+    complete  = total_count <= total_pages * PAGE_SIZE
+    try:
+        for page, items in fetch_in_order(fetch, range(start_page, total_pages + 1), workers=WORKERS):
             if not items:
                 print(f"  페이지 {page}: 데이터 없음, 종료")
+                complete = False
                 break
 
             policies = []
@@ -338,16 +361,37 @@ def run():
                 policies.append(p)
                 rows_map[p["policy_key"]] = row
 
-            _save_policies(policies, rows_map, fetched_at)
+            page_changes = _save_policies(conn, policies, rows_map, fetched_at)
+            for kind, ids in page_changes.items():
+                changes.add(kind, ids)
             total_saved += len(policies)
-            print(f"  페이지 {page}/{total_pages}: {len(policies)}건 저장 (누계 {total_saved}건)")
+            n_new += len(policies)
+            last_page = page
+            checkpoint.save(fetched_at=fetched_at, last_page=page, total_pages=total_pages, saved=total_saved,
+                            changes=changes.to_state())
+            print(f"  페이지 {page}/{total_pages}: {len(policies)}건 (추가 {len(page_changes['inserted'])}, "
+                  f"변경 {len(page_changes['updated'])}, 동일 {len(page_changes['unchanged'])}) "
+                  f"누계 {total_saved}건")
 
-        except Exception as e:
-            print(f"  ⚠️ 페이지 {page} 실패: {e}")
-            continue
+        if complete:
+            _mark_vanished(conn, changes, fetched_at)
 
+    except Exception as e:
+        print(f"  ⚠️ 페이지 {last_page + 1} 실패: {e}")
+        print(f"  → 다시 실행하면 {last_page + 1}페이지부터 이어서 수집합니다 ({CHECKPOINT_PATH})")
+        return
+    finally:
+        conn.close()
+
+    checkpoint.clear()
+    elapsed = time.perf_counter() - t0
+    print(f"  ({elapsed:.1f}s, {n_new / max(elapsed, 1e-9):.0f}건/s, 요청 {fetcher.stats()})")
+    counts = changes.counts()
+    print(f"  변경 내역: 추가 {counts['inserted']} / 변경 {counts['updated']} / 동일 {counts['unchanged']} / "
+          f"제거 {counts['removed']}{'' if complete else ' (목록 일부만 받아서 제거 표시 생략)'}")
     print(f"\n=== 완료! 총 {total_saved}건 수집 → policies + policy_eligibility 저장 ===")
+    return changes.summary()
 
 
 if __name__ == "__main__":
-    run()
+    run(fresh="--fresh" in sys.argv[1:])
@@ -1,5 +1,5 @@
 import sqlite3
-from app.db import DB_PATH, init_db, now_iso
+from app.db import DB_PATH, init_db, now_iso, bump_catalog_version, enrich_policies
 
 def migrate():
     init_db()
@@ -58,6 +58,8 @@ def migrate():
         ))
         moved += 1
 
+    enrich_policies(conn)
+    bump_catalog_version(conn)
     conn.commit()
     conn.close()
 
@@ -0,0 +1,86 @@
+"""
+aho_corasick.py
+Input: 패턴 문자열 목록
+Output: 텍스트 한 번 훑어서 모든 패턴 등장 위치 찾기 (겹치는 매칭 포함)
+
+패턴 수와 무관하게 텍스트 길이에 비례하는 시간으로 동작 — 지역명 사전, 가맹점 키워드 사전처럼
+"많은 키워드 중 무엇이 들어있나" 를 반복해서 묻는 곳에서 import 시 한 번 만들어 재사용한다.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+
+class AhoCorasick:
+    def __init__(self, patterns: Iterable[str]):
+        # patterns: 등록 순서가 곧 pattern id (중복/빈 문자열은 무시)
+        self.patterns: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[Tuple[int, ...]] = [()]
+
+        for p in patterns:
+            if not p or p in self._ids:
+                continue
+            pid = len(self.patterns)
+            self._ids[p] = pid
+            self.patterns.append(p)
+            self._insert(p, pid)
+        self._build_fail()
+
+    def _insert(self, pattern: str, pid: int) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            node = nxt
+        self._out[node] = self._out[node] + (pid,)
+
+    def _build_fail(self) -> None:
+        # BFS 로 실패 링크 계산, 출력은 실패 링크 쪽 출력까지 합쳐 둔다
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                cand = self._goto[f].get(ch, 0)
+                self._fail[nxt] = cand if cand != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int]]:
+        """(끝 인덱스(포함), pattern id) 를 텍스트 순서대로 yield (겹치는 매칭 포함)"""
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pid in out[node]:
+                yield i, pid
+
+    def find_ids(self, text: str) -> Set[int]:
+        """텍스트에 한 번이라도 등장하는 pattern id 집합 (= {id for p in patterns if p in text})"""
+        return {pid for _, pid in self.iter(text)}
+
+    def first_by_order(self, text: str) -> int:
+        """
+        등록 순서상 가장 앞선, 텍스트에 등장하는 pattern id (없으면 -1).
+        `for p in patterns: if p in text: return p` 와 같은 결과.
+        """
+        ids = self.find_ids(text)
+        return min(ids) if ids else -1
@@ -1,10 +1,20 @@
+import os
 import re
+from functools import lru_cache
+
+from utils.aho_corasick import AhoCorasick
+
+# 정규화된 가맹점명 → 카테고리 캐시 크기 (가맹점명은 반복이 많음)
+CATEGORY_CACHE_SIZE = int(os.getenv("CATEGORY_CACHE_SIZE", "4096"))
+
+_WHITESPACE = re.compile(r'\s+')
+_BRANCH_SUFFIX = re.compile(r'(지점|점|센터|마트|몰|샵|스토어)$')
 
 def _norm(merchant: str) -> str:
     """가맹점명 정규화: 소문자 변환, 공백 제거, 지점 접미사 제거"""
     s = merchant.lower().strip()
-    s = re.sub(r'\s+', '', s)
-    s = re.sub(r'(지점|점|센터|마트|몰|샵|스토어)$', '', s)
+    s = _WHITESPACE.sub('', s)
+    s = _BRANCH_SUFFIX.sub('', s)
     return s
 
 CATEGORY_LABELS = {
@@ -89,10 +99,22 @@ CATEGORY_KEYWORDS = {
     ],
 }
 
+# 전체 키워드를 카테고리 순서 → 키워드 순서로 등록한 자동자 (import 시 1회)
+# pattern id 가 작을수록 앞 카테고리 → 매칭된 id 중 최솟값의 카테고리 = 기존 "먼저 나온 카테고리 우선" 결과
+# (여러 카테고리에 있는 키워드는 앞 카테고리로)
+_KEYWORD_CATEGORY = {}
+for _category, _keywords in CATEGORY_KEYWORDS.items():
+    for _kw in _keywords:
+        _KEYWORD_CATEGORY.setdefault(_kw, _category)
+_AUTOMATON = AhoCorasick(_KEYWORD_CATEGORY)
+_PATTERN_CATEGORY = [_KEYWORD_CATEGORY[p] for p in _AUTOMATON.patterns]
+
+
+@lru_cache(maxsize=CATEGORY_CACHE_SIZE)
+def _categorize_normalized(norm: str) -> str:
+    pid = _AUTOMATON.first_by_order(norm)
+    return _PATTERN_CATEGORY[pid] if pid >= 0 else "other"
+
+
 def categorize_store(merchant: str) -> str:
-    norm = _norm(merchant)
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        for kw in keywords:
-            if kw in norm:
-                return category
-    return "other"
\ No newline at end of file
+    return _categorize_normalized(_norm(merchant))
\ No newline at end of file
@@ -1,14 +1,22 @@
 #from turtle import mode
-from typing import Optional
-from ml.ml_runtime.feature_builder import build_features_from_transactions
-from ml.ml_runtime.model_loader import FHIModel
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
 from ml.ml_runtime.feature_builder import build_features_from_transactions
+from ml.ml_runtime.model_loader import FHIModel, load_model
+from utils.transaction_batch import TransactionBatch, resolve_asof
 """
 fhi_calculator.py
-Input: transactions (list[dict]) from parser normalized schema
+Input: transactions (list[dict]) from parser normalized schema, asof (기준 시각)
 Output: {"fhi": float, "impulsive": dict, "spike": dict}
+
+같은 거래 + 같은 asof 면 항상 같은 결과 (spike 윈도우·ML feature 모두 asof 기준).
 """
 
+FHI_RESULT_CACHE_SIZE = int(os.getenv("FHI_RESULT_CACHE_SIZE", "1024"))
+
 
 def calculate_fhi(impulsive: float, spike: float) -> float:
     """
@@ -20,27 +28,16 @@ def calculate_fhi(impulsive: float, spike: float) -> float:
 from utils.impulsive_detector import detect_impulsive
 from utils.spending_spike import detect_spending_spike
 
-#def calculate_fhi_from_transactions(transactions, mode: str = "rule", model: FHIModel | None = None) -> dict:
-def calculate_fhi_from_transactions(transactions, mode: str = "rule", model: Optional[FHIModel] = None) -> dict:
-    """
-    transactions: list[dict] normalized by parser
-    returns:
-      {
-        "fhi": float,
-        "impulsive": {...},
-        "spike": {...}
-      }
-    """
-    # input guard
-    if not transactions:
-        return {
-            "fhi": 0.0,
-            "impulsive": {"impulsive_score": 0.0, "impulsive_flags": []},
-            "spike": {"spike_score": 0.0, "spike_flags": []},
-        }
-    impulsive = detect_impulsive(transactions)
-    spike = detect_spending_spike(transactions)
+def _empty_result() -> dict:
+    return {
+        "fhi": 0.0,
+        "impulsive": {"impulsive_score": 0.0, "impulsive_flags": []},
+        "spike": {"spike_score": 0.0, "spike_flags": []},
+    }
 
+
+def _fhi_for_mode(batch: TransactionBatch, impulsive: dict, spike: dict, mode: str, model: Optional[FHIModel],
+                  asof: datetime) -> dict:
     imp_score = float(impulsive.get("impulsive_score", 0.0))
     spike_score = float(spike.get("spike_score", 0.0))
 
@@ -50,12 +47,12 @@ def calculate_fhi_from_transactions(transactions, mode: str = "rule", model: Opt
 
     # mode switch
     if mode == "ml":
-        # 모델 없으면 기본 로드
-        model = model or FHIModel()
+        # 모델 없으면 레지스트리에서 공유 인스턴스 사용 (요청마다 재로드 X)
+        model = model or load_model()
 
         # (Step3에서 더 정교하게 만들지만, 지금은 최소 feature만 넣어서 동작 확인)
         # 최소한 spend_mean_30d 같은 feature들이 없으면 0으로 들어감.
-        features = build_features_from_transactions(transactions)
+        features = build_features_from_transactions(batch, asof=asof)
         fhi = float(model.predict_one(features))
 
         # clamp to 0~100
@@ -66,15 +63,108 @@ def calculate_fhi_from_transactions(transactions, mode: str = "rule", model: Opt
     return {"fhi": round(float(fhi), 2), "impulsive": impulsive, "spike": spike, "mode": mode}
 
 
-def compare_rule_vs_ml(transactions) -> dict:
+#def calculate_fhi_from_transactions(transactions, mode: str = "rule", model: FHIModel | None = None) -> dict:
+def calculate_fhi_from_transactions(
+    transactions,
+    mode: str = "rule",
+    model: Optional[FHIModel] = None,
+    asof: Optional[datetime] = None,
+) -> dict:
+    """
+    transactions: list[dict] normalized by parser (또는 TransactionBatch)
+    asof: spike 윈도우 / ML feature 기준 시각 (None 이면 resolve_asof)
+    returns:
+      {
+        "fhi": float,
+        "impulsive": {...},
+        "spike": {...}
+      }
+    """
+    batch = TransactionBatch.from_transactions(transactions)
+
+    # input guard
+    if not batch.n_input:
+        return _empty_result()
+    asof = resolve_asof(asof)
+    impulsive = detect_impulsive(batch)
+    spike = detect_spending_spike(batch, asof=asof)
+
+    return _fhi_for_mode(batch, impulsive, spike, mode, model, asof)
+
+
+def calculate_fhi_rule_and_ml(transactions, model: Optional[FHIModel] = None, asof: Optional[datetime] = None) -> tuple:
+    """
+    rule / ml 결과를 한 번에 계산. 파싱·충동·급증 탐지는 한 번만 수행하고 공유한다.
+    returns: (rule_result, ml_result)
+    """
+    batch = TransactionBatch.from_transactions(transactions)
+    if not batch.n_input:
+        return _empty_result(), _empty_result()
+    asof = resolve_asof(asof)
+    impulsive = detect_impulsive(batch)
+    spike = detect_spending_spike(batch, asof=asof)
+
+    return (
+        _fhi_for_mode(batch, impulsive, spike, "rule", model, asof),
+        _fhi_for_mode(batch, impulsive, spike, "ml", model, asof),
+    )
+
+
+def compare_rule_vs_ml(transactions, asof: Optional[datetime] = None) -> dict:
     """
     Returns both rule-based and ML-based FHI results for the same transactions.
     """
-    rule_res = calculate_fhi_from_transactions(transactions, mode="rule")
-    ml_res = calculate_fhi_from_transactions(transactions, mode="ml")
+    rule_res, ml_res = calculate_fhi_rule_and_ml(transactions, asof=asof)
 
     return {
         "rule": rule_res,
         "ml": ml_res,
         "delta": round(float(ml_res["fhi"]) - float(rule_res["fhi"]), 2),
     }
+
+
+class FHIResultCache:
+    """
+    (batch fingerprint, asof) → FHI 분석 결과 LRU 캐시 (thread-safe, hit/miss 카운터)
+    asof 가 키에 들어가므로 같은 키의 결과는 바뀌지 않는다 → TTL 없음. 모델 교체 시 clear()
+    """
+
+    def __init__(self, maxsize: int = FHI_RESULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Any, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(batch: TransactionBatch, asof: datetime) -> tuple:
+        return batch.fingerprint(), asof.isoformat()
+
+    def get(self, key) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value: Dict[str, Any]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+
+result_cache = FHIResultCache()
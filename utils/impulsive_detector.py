@@ -5,35 +5,53 @@ Output: {"impulsive_score": float, "impulsive_flags": list}
 """
 
 
+from bisect import insort
+from collections import deque
 from datetime import datetime, timedelta
 from typing import Optional
 
+from utils.transaction_batch import TransactionBatch, parse_datetime
+
+WINDOW = timedelta(hours=24)
+SMALL_AMOUNT = 10000
+FLAG_THRESHOLD = 0.7
+
+
 class ImpulsiveDetector:
     """
     충동 소비 지표 계산:
     - 야간 소비(21~02)
     - 24시간 내 2회 이상 소비
     - 소액다건(1만원 이하 3회 이상)
+
+    거래 1건당 O(1) (시간순 입력 기준):
+    - 24h 윈도우는 결제시각 deque 로 유지하고, 가장 최근 시각 - 24h 보다 오래된 건 왼쪽에서 제거
+    - 소액 건수는 누적 카운터로 유지
+    유저별로 오래 살아있는 detector 에 push(tx) 로 한 건씩 넣어도 된다.
     """
 
     def __init__(self):
-        self.history = []  # (datetime, amount)
+        self.window = deque()  # 최근 24h 결제시각 (오름차순)
+        self.max_dt: Optional[datetime] = None
+        self.small_count = 0
+        self.score_sum = 0.0
+        self.n_scored = 0
 
     def compute_score(self, current_dt: datetime, amount: int) -> float:
-        self.history.append((current_dt, amount))
-
         # 규칙 1: 야간 소비
         hour = current_dt.hour
         night_flag = (hour >= 21 or hour <= 2)
         night_score = 1.0 if night_flag else 0.0
 
         # 규칙 2: 24시간내 2회 이상
-        recent = [t for t, a in self.history if current_dt - t <= timedelta(hours=24)]
-        freq_score = 1.0 if len(recent) >= 2 else 0.0
+        # 이전 거래 중 current_dt - t <= 24h 인 게 하나라도 있으면 충족.
+        # 늦게 도착한 거래(current_dt <= max_dt)는 max_dt 거래가 항상 조건을 만족함.
+        freq_score = 1.0 if self._push_window(current_dt) >= 2 else 0.0
 
         # 규칙 3: 소액다건
-        small = [a for t, a in self.history if a <= 10000]
-        small_score = 1.0 if len(small) >= 3 else 0.0
+        if amount <= SMALL_AMOUNT:
+            self.small_count += 1
+        small_score = 1.0 if self.small_count >= 3 else 0.0
 
         # 가중합
         impulsive_score = round(
@@ -43,23 +61,67 @@ class ImpulsiveDetector:
             2
         )
 
+        self.score_sum += impulsive_score
+        self.n_scored += 1
         return impulsive_score
 
+    def push(self, tx: dict) -> Optional[float]:
+        """
+        거래 1건을 반영하고 점수 반환. 유효하지 않은 거래면 None (상태 변화 없음).
+        """
+        parsed = _parse_tx(tx)
+        if parsed is None:
+            return None
+        return self.compute_score(*parsed)
+
+    @property
+    def impulsive_score(self) -> float:
+        """지금까지 push 된 거래의 평균 점수 (detect_impulsive 의 impulsive_score 와 동일)"""
+        return round(self.score_sum / self.n_scored, 2) if self.n_scored else 0.0
+
+    def _push_window(self, current_dt: datetime) -> int:
+        # returns: 윈도우 안 거래 수 (현재 거래 포함)
+        if self.max_dt is None or current_dt >= self.max_dt:
+            self.max_dt = current_dt
+            self.window.append(current_dt)
+            horizon = current_dt - WINDOW
+            while self.window[0] < horizon:
+                self.window.popleft()
+        else:
+            # 시간 역순으로 들어온 거래: 정렬 위치에 끼워넣기 (max_dt 거래가 윈도우에 남아 있음)
+            if current_dt >= self.max_dt - WINDOW:
+                insort(self.window, current_dt)
+            return max(len(self.window), 2)
+        return len(self.window)
+
+
+def _parse_tx(tx: dict) -> Optional[tuple]:
+    # returns: (datetime, amount:int) or None
+    dt = parse_datetime(tx.get("datetime"))
+    amt = tx.get("amount", 0)
+
+    if dt is None:
+        return None
+    try:
+        amt_int = int(float(amt))
+    except Exception:
+        return None
+    if amt_int <= 0:
+        return None
+    return dt, amt_int
+
 
 def detect_impulsive(transactions, detector: Optional["ImpulsiveDetector"] = None) -> dict:
     """
-    transactions: list[dict] (parser normalized schema)
+    transactions: list[dict] (parser normalized schema) 또는 TransactionBatch
       expected keys: datetime, amount, merchant, ...
     returns:
       {"impulsive_score": float, "impulsive_flags": list}
+    거래는 시간순으로 평가된다.
     """
     # ✅ Input guard
-    if not transactions:
-        return {"impulsive_score": 0.0, "impulsive_flags": []}
-    if isinstance(transactions, dict):
-        transactions = [transactions]
-    transactions = [tx for tx in transactions if isinstance(tx, dict)]
-    if not transactions:
+    batch = TransactionBatch.from_transactions(transactions)
+    if not len(batch):
         return {"impulsive_score": 0.0, "impulsive_flags": []}
 
     detector = detector or ImpulsiveDetector()
@@ -67,28 +129,19 @@ def detect_impulsive(transactions, detector: Optional["ImpulsiveDetector"] = Non
     scores = []
     flags = []
 
-    for tx in transactions:
-        dt = tx.get("datetime")
-        amt = tx.get("amount", 0)
-
-        if not isinstance(dt, datetime):
-            continue
-        try:
-            amt_int = int(float(amt))
-        except Exception:
-            continue
+    for dt, amt, merchant in zip(batch.datetimes, batch.amounts.tolist(), batch.merchants):
+        amt_int = int(amt)
         if amt_int <= 0:
             continue
-    
 
         s = detector.compute_score(dt, amt_int)
         scores.append(s)
 
-        if s >= 0.7:
+        if s >= FLAG_THRESHOLD:
             flags.append({
                 "datetime": dt,
                 "amount": amt_int,
-                "merchant": tx.get("merchant"),
+                "merchant": merchant,
                 "score": s
             })
 
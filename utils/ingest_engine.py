@@ -0,0 +1,348 @@
+"""
+ingest_engine.py
+정책 수집 스크립트 공용 엔진 (scripts/ingest_youthcenter.py 등)
+
+- RateLimiter: 초당 요청 수 제한 — 고정 sleep 대신 동시 요청 전체의 간격을 맞춤
+- HttpFetcher: JSON GET + 재시도 (연결 오류 / timeout / 429 / 5xx, 지수 backoff + jitter, Retry-After 준수)
+- fetch_in_order: 여러 thread 로 동시에 받아오되 결과는 입력 순서대로 (받아 둔 결과 개수 제한)
+- Checkpoint: 마지막으로 commit 한 페이지 기록 → 중단된 수집을 다음 페이지부터 재개
+- upsert_returning_ids / upsert_many: 페이지 단위 bulk upsert (한 커넥션, 페이지당 문장 몇 개)
+- content_hash / diff_upsert / mark_removed / ChangeLog: 증분 수집
+  내용 hash 가 같은 row 는 쓰지 않고, 새로/바뀐 row 만 upsert, 소스에서 사라진 row 는 제거 표시
+"""
+
+import os
+import json
+import time
+import hashlib
+import random
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "4"))
+INGEST_RATE_PER_SEC = float(os.getenv("INGEST_RATE_PER_SEC", "5"))
+INGEST_MAX_RETRIES = int(os.getenv("INGEST_MAX_RETRIES", "4"))
+INGEST_BACKOFF_SEC = float(os.getenv("INGEST_BACKOFF_SEC", "0.5"))
+INGEST_TIMEOUT_SEC = float(os.getenv("INGEST_TIMEOUT_SEC", "30"))
+
+# 재시도하는 HTTP 상태 (나머지 4xx 는 요청 자체가 잘못된 것이라 바로 실패)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# 한 문장에 넣는 바인딩 변수 상한 (SQLite 3.32+ 기본 SQLITE_MAX_VARIABLE_NUMBER=32766)
+SQLITE_MAX_VARS = 32766
+
+
+class FetchError(RuntimeError):
+    """재시도를 다 써도 받아오지 못함"""
+
+
+class RateLimiter:
+    """
+    thread-safe 요청 간격 제한 (GCRA). burst 만큼은 쉬고 있던 동안 몰아서 보낼 수 있음
+    rate_per_sec <= 0 이면 제한 없음
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int = 1):
+        self.interval = 1.0 / rate_per_sec if rate_per_sec > 0 else 0.0
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def acquire(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._next = max(self._next, now - self.interval * (self.burst - 1))
+            wait = self._next - now
+            self._next += self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _retry_after(resp) -> Optional[float]:
+    try:
+        return max(0.0, float(resp.headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpFetcher:
+    """
+    rate limit + 재시도가 붙은 JSON GET. thread 마다 requests.Session (keep-alive) 재사용
+    """
+
+    def __init__(
+        self,
+        rate_per_sec: float = INGEST_RATE_PER_SEC,
+        max_retries: int = INGEST_MAX_RETRIES,
+        backoff_sec: float = INGEST_BACKOFF_SEC,
+        timeout: float = INGEST_TIMEOUT_SEC,
+    ):
+        self.limiter = RateLimiter(rate_per_sec)
+        self.max_retries = max_retries
+        self.backoff_sec = backoff_sec
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            with self._lock:
+                self.requests += 1
+                self.retries += attempt > 0
+            retry_after = None
+            try:
+                resp = self._session().get(url, params=params, timeout=self.timeout)
+                if resp.status_code not in RETRY_STATUS:
+                    resp.raise_for_status()
+                    return resp.json()
+                error = f"HTTP {resp.status_code}"
+                retry_after = _retry_after(resp)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.JSONDecodeError) as e:
+                # API 키가 들어 있는 URL 은 메시지에 넣지 않음
+                error = type(e).__name__
+            if attempt == self.max_retries:
+                raise FetchError(f"{error} ({attempt + 1}회 시도)")
+            if retry_after is None:
+                retry_after = self.backoff_sec * (2 ** attempt) * random.uniform(0.5, 1.0)
+            time.sleep(retry_after)
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "retries": self.retries}
+
+
+def fetch_in_order(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    workers: int = INGEST_WORKERS,
+    window: Optional[int] = None,
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    fn(item) 을 workers 개 thread 로 실행, (item, 결과) 를 items 순서대로 yield.
+    - 동시에 진행/대기 중인 결과는 최대 window 개 (기본 workers*2) → 저장이 느려도 메모리 일정
+    - 다음 요청은 yield 전에 넣어 두므로 호출하는 쪽이 저장하는 동안에도 받아오기는 계속됨
+    - fn 예외는 그 item 차례에 raise, 아직 시작 안 한 요청은 취소
+    """
+    window = max(1, window or workers * 2)
+    it = iter(items)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        pending = deque((item, pool.submit(fn, item)) for item in itertools.islice(it, window))
+        try:
+            while pending:
+                item, future = pending.popleft()
+                result = future.result()
+                for nxt in itertools.islice(it, 1):
+                    pending.append((nxt, pool.submit(fn, nxt)))
+                yield item, result
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+class Checkpoint:
+    """
+    수집 진행 상태 파일 (JSON). key 가 다르면 (다른 소스/페이지 크기) 무시
+    저장은 임시 파일 + os.replace 라서 쓰는 도중 죽어도 이전 상태가 남음
+    """
+
+    def __init__(self, path: str, key: str):
+        self.path = path
+        self.key = key
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return state if state.get("key") == self.key else None
+
+    def save(self, **state: Any) -> None:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": self.key, **state}, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _upsert_sql(table: str, key_col: str, columns: List[str], n_rows: int = 1) -> str:
+    values = ", ".join([f"({', '.join('?' * len(columns))})"] * n_rows)
+    updates = ", ".join(f"{c}=excluded.{c}" for c in columns if c != key_col)
+    return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES {values} "
+            f"ON CONFLICT({key_col}) DO UPDATE SET {updates}")
+
+
+def upsert_returning_ids(conn, table: str, key_col: str, columns: List[str], rows: List[Dict[str, Any]]) -> Dict[Any, int]:
+    """
+    rows 를 multi-row INSERT ... ON CONFLICT DO UPDATE ... RETURNING 으로 upsert → {key: id}
+    (sqlite3 executemany 는 RETURNING 결과를 버리므로 VALUES 여러 개인 문장 하나로 실행)
+    같은 key 가 여러 번 오면 처음 위치에 마지막 값 (row 별 upsert 를 순서대로 한 것과 같은 결과/id)
+    commit 은 호출하는 쪽에서
+    """
+    rows = list({r[key_col]: r for r in rows}.values())
+    step = max(1, SQLITE_MAX_VARS // len(columns))
+    ids: Dict[Any, int] = {}
+    for i in range(0, len(rows), step):
+        chunk = rows[i:i + step]
+        cur = conn.execute(
+            _upsert_sql(table, key_col, columns, len(chunk)) + f" RETURNING {key_col}, id;",
+            [r[c] for r in chunk for c in columns],
+        )
+        ids.update((r[0], r[1]) for r in cur.fetchall())
+    return ids
+
+
+def upsert_many(conn, table: str, key_col: str, columns: List[str], rows: Iterable[Dict[str, Any]]) -> None:
+    """executemany 로 upsert (id 가 필요 없는 자식 테이블용). commit 은 호출하는 쪽에서"""
+    conn.executemany(_upsert_sql(table, key_col, columns) + ";", ([r[c] for c in columns] for r in rows))
+
+
+def content_hash(row: Dict[str, Any], columns: List[str]) -> str:
+    """columns 값으로 만든 sha1. 수집 시각(fetched_at) 처럼 매번 바뀌는 컬럼은 빼고 넘김"""
+    payload = json.dumps([row.get(c) for c in columns], ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class ChangeLog:
+    """
+    수집 1회의 변경 내역: key → (inserted | updated | unchanged | removed, id)
+    같은 key 가 여러 페이지에 나오면 inserted > updated > unchanged 순으로 남김
+    체크포인트에 넣을 수 있게 to_state / from_state (JSON)
+    """
+
+    KINDS = ("inserted", "updated", "unchanged", "removed")
+    _RANK = {"unchanged": 0, "updated": 1, "inserted": 2, "removed": 3}
+
+    def __init__(self):
+        self.entries: Dict[Any, Tuple[str, int]] = {}
+
+    def add(self, kind: str, ids: Dict[Any, int]) -> None:
+        for key, row_id in ids.items():
+            prev = self.entries.get(key)
+            if prev is None or self._RANK[kind] > self._RANK[prev[0]]:
+                self.entries[key] = (kind, row_id)
+
+    def seen_keys(self) -> List[Any]:
+        return [k for k, (kind, _) in self.entries.items() if kind != "removed"]
+
+    def ids(self, kind: str) -> Dict[Any, int]:
+        return {k: row_id for k, (c, row_id) in self.entries.items() if c == kind}
+
+    def counts(self) -> Dict[str, int]:
+        counts = dict.fromkeys(self.KINDS, 0)
+        for kind, _ in self.entries.values():
+            counts[kind] += 1
+        return counts
+
+    def summary(self) -> Dict[str, Any]:
+        """{"counts": {...}, "inserted": [id], "updated": [id], "unchanged": [id], "removed": [id]}"""
+        out: Dict[str, Any] = {"counts": self.counts()}
+        for kind in self.KINDS:
+            out[kind] = sorted(self.ids(kind).values())
+        return out
+
+    def to_state(self) -> List[List[Any]]:
+        return [[k, kind, row_id] for k, (kind, row_id) in self.entries.items()]
+
+    @classmethod
+    def from_state(cls, state: Optional[List[List[Any]]]) -> "ChangeLog":
+        log = cls()
+        for key, kind, row_id in state or []:
+            log.entries[key] = (kind, row_id)
+        return log
+
+
+def _lookup(conn, table: str, key_col: str, cols: List[str], keys: List[Any]) -> Dict[Any, tuple]:
+    found: Dict[Any, tuple] = {}
+    step = SQLITE_MAX_VARS
+    for i in range(0, len(keys), step):
+        chunk = keys[i:i + step]
+        cur = conn.execute(
+            f"SELECT {key_col}, {', '.join(cols)} FROM {table} WHERE {key_col} IN ({','.join('?' * len(chunk))});",
+            chunk,
+        )
+        found.update((r[0], tuple(r[1:])) for r in cur.fetchall())
+    return found
+
+
+def diff_upsert(
+    conn,
+    table: str,
+    key_col: str,
+    columns: List[str],
+    rows: List[Dict[str, Any]],
+    hash_col: str = "content_hash",
+    removed_col: str = "removed_at",
+) -> Dict[str, Dict[Any, int]]:
+    """
+    diff 단계 + 변경분만 upsert. rows 에는 hash_col 값이 들어 있어야 함 (content_hash)
+    - DB 에 없는 key → inserted
+    - hash 가 다르거나 제거 표시된 key → updated (removed_col 해제)
+    - 같으면 unchanged: 아무것도 쓰지 않음 (WAL/트리거/하위 캐시 그대로)
+    returns: {"inserted": {key: id}, "updated": {key: id}, "unchanged": {key: id}}. commit 은 호출하는 쪽에서
+    """
+    rows = list({r[key_col]: r for r in rows}.values())
+    existing = _lookup(conn, table, key_col, ["id", hash_col, removed_col], [r[key_col] for r in rows])
+    changed = [
+        r for r in rows
+        if r[key_col] not in existing or existing[r[key_col]][1:] != (r[hash_col], None)
+    ]
+    cols = columns + [removed_col] if removed_col not in columns else columns
+    ids = upsert_returning_ids(conn, table, key_col, cols, [{**r, removed_col: None} for r in changed])
+    out: Dict[str, Dict[Any, int]] = {"inserted": {}, "updated": {}, "unchanged": {}}
+    for r in rows:
+        key = r[key_col]
+        if key in ids:
+            out["updated" if key in existing else "inserted"][key] = ids[key]
+        else:
+            out["unchanged"][key] = existing[key][0]
+    return out
+
+
+def mark_removed(
+    conn,
+    table: str,
+    key_col: str,
+    scope: Dict[str, Any],
+    seen_keys: Iterable[Any],
+    ts: str,
+    removed_col: str = "removed_at",
+) -> Dict[Any, int]:
+    """
+    scope(예: {"source": "youthcenter"}) 안에서 이번 수집에 안 나온 row 에 removed_col=ts 표시 (삭제하지 않음)
+    전체 목록을 끝까지 받은 경우에만 호출할 것. returns: {key: id} (새로 제거 표시된 것만). commit 은 호출하는 쪽에서
+    """
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS _ingest_seen (k PRIMARY KEY) WITHOUT ROWID;")
+    conn.execute("DELETE FROM _ingest_seen;")
+    conn.executemany("INSERT OR IGNORE INTO _ingest_seen (k) VALUES (?);", ((k,) for k in seen_keys))
+    where = " AND ".join(f"{c} = ?" for c in scope) or "1"
+    cur = conn.execute(
+        f"UPDATE {table} SET {removed_col} = ? "
+        f"WHERE {removed_col} IS NULL AND {where} AND {key_col} NOT IN (SELECT k FROM _ingest_seen) "
+        f"RETURNING {key_col}, id;",
+        [ts, *scope.values()],
+    )
+    removed = {r[0]: r[1] for r in cur.fetchall()}
+    conn.execute("DELETE FROM _ingest_seen;")
+    return removed
@@ -3,25 +3,68 @@ parser.py
 Input: push notification text (str)
 Output: list[dict] normalized transactions with keys:
   datetime, amount, merchant, category, source, payment_method, raw_text
+
+카드사/간편결제별 차이는 ISSUER_SPECS 표에만 둔다 (새 카드사 추가 = 표에 한 줄 추가).
+표는 import 시 한 번 컴파일되어, 출처 판별은 소문자 본문 1회 + 키워드 표 조회로, 필드 추출은 미리 컴파일된 정규식으로 처리.
 """
 
 import re
 from datetime import datetime
 
+# 공통 패턴
+AMOUNT_PATTERN = r"([\d,]+)\s*원"
+DATE_DASH = r"(\d{4})-(\d{2})-(\d{2})\s*(\d{2}):(\d{2})"              # 2025-01-01 12:30
+DATE_ANY_SEP = r"(\d{4})[./-](\d{2})[./-](\d{2})\s*(\d{2}):(\d{2})"    # 2025.01.01 12:30 / 2025/01/01 ...
+MERCHANT_LABEL = r"(가맹점|사용처)[:\s]*([^\n]+)"                        # "가맹점: ○○" 라벨이 있으면 우선
+
+# 카드사/간편결제 스펙 (위에 있을수록 출처 판별 우선순위 높음)
+#   detect          : 본문에 이 문구 중 하나가 있으면 해당 출처 (대소문자 무시)
+#   date            : 승인 일시 패턴 (연/월/일/시/분 그룹)
+#   merchant_label  : 라벨 패턴 — 있으면 "2번째 줄 = 가맹점" 보다 우선
+#   payment_method  : card / wallet (None 이면 unknown)
+#   wallet_marker   : 이 문구가 있으면 payment_method 를 wallet 으로
+ISSUER_SPECS = [
+    {"source": "kakaopay", "detect": ["카카오페이", "kakaopay"], "date": DATE_DASH, "payment_method": "wallet"},
+    {"source": "shinhan", "detect": ["신한"], "date": DATE_DASH, "payment_method": "card"},
+    {"source": "kb", "detect": ["kb", "국민"], "date": DATE_ANY_SEP, "merchant_label": MERCHANT_LABEL,
+     "payment_method": "card"},
+    {"source": "hyundai", "detect": ["현대"], "date": DATE_DASH},
+    {"source": "samsung", "detect": ["삼성"], "date": DATE_ANY_SEP, "merchant_label": MERCHANT_LABEL,
+     "payment_method": "card", "wallet_marker": "삼성페이"},
+]
+# 어느 출처에도 해당하지 않을 때
+UNKNOWN_SPEC = {"source": "unknown", "date": DATE_DASH}
+
+
+def _compile_spec(spec: dict) -> dict:
+    label = spec.get("merchant_label")
+    return {
+        "source": spec["source"],
+        "amount": re.compile(spec.get("amount", AMOUNT_PATTERN)),
+        "date": re.compile(spec["date"]),
+        "merchant_label": re.compile(label) if label else None,
+        "payment_method": spec.get("payment_method"),
+        "wallet_marker": spec.get("wallet_marker"),
+    }
 
-def _detect_source(text: str) -> str:
+
+_SPECS = [_compile_spec(s) for s in ISSUER_SPECS]
+_UNKNOWN = _compile_spec(UNKNOWN_SPEC)
+# 출처 판별 표: (소문자 키워드들, 컴파일된 스펙) — 우선순위 순
+_DISPATCH = [(tuple(k.lower() for k in s["detect"]), c) for s, c in zip(ISSUER_SPECS, _SPECS)]
+
+
+def _detect_spec(text: str) -> dict:
     t = text.lower()
-    if "카카오페이" in text or "kakaopay" in t:
-        return "kakaopay"
-    if "신한" in text:
-        return "shinhan"
-    if "kb" in t or "국민" in text:
-        return "kb"
-    if "현대" in text:
-        return "hyundai"
-    if "삼성" in text:
-        return "samsung"
-    return "unknown"
+    for keywords, spec in _DISPATCH:
+        for k in keywords:
+            if k in t:
+                return spec
+    return _UNKNOWN
+
+
+def _detect_source(text: str) -> str:
+    return _detect_spec(text)["source"]
 
 
 def _normalize_tx(tx: dict, raw_text: str) -> dict:
@@ -58,176 +101,62 @@ def _normalize_tx(tx: dict, raw_text: str) -> dict:
 
 
 
-def _parse_unknown(text: str) -> dict:
-    # 기존 기본 파싱 로직을 unknown fallback으로 사용
-    amount_pattern = r"([\d,]+)\s*원"
-    amount_match = re.search(amount_pattern, text)
-    amount = int(amount_match.group(1).replace(",", "")) if amount_match else 0
-
-    lines = [line.strip() for line in text.split("\n") if line.strip()]
-    store = lines[1] if len(lines) >= 2 else "알수없음"
-
-    datetime_pattern = r"(\d{4}-\d{2}-\d{2})\s*(\d{2}:\d{2})"
-    dt_match = re.search(datetime_pattern, text)
-    if dt_match:
-        dt_str = f"{dt_match.group(1)} {dt_match.group(2)}"
-        dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M")
-    else:
-        dt = datetime.now()
-
-    return {"store": store, "amount": amount, "datetime": dt}
+def _second_line(text: str):
+    # 비어있지 않은 2번째 줄 (보통 가맹점명)
+    seen = 0
+    for line in text.split("\n"):
+        line = line.strip()
+        if line:
+            seen += 1
+            if seen == 2:
+                return line
+    return None
 
 
-def _parse_shinhan(text: str) -> dict:
-    lines = [line.strip() for line in text.split("\n") if line.strip()]
-
-    # 1) amount: 어디 있든 "숫자원" 패턴으로 검색 (1줄째에 붙는 경우 대응)
+def _parse_with_spec(spec: dict, text: str) -> dict:
+    # 1) amount: 어디 있든 "숫자원" 패턴 (1줄째에 붙는 경우 대응)
     amount = 0
-    m = re.search(r"([\d,]+)\s*원", text)
+    m = spec["amount"].search(text)
     if m:
         amount = int(m.group(1).replace(",", ""))
 
-    # 2) datetime: 보통 마지막 줄에 있음 (없으면 현재시간)
-    dt = datetime.now()
-    mdt = re.search(r"(\d{4}-\d{2}-\d{2})\s*(\d{2}:\d{2})", text)
+    # 2) datetime: 없으면 현재시간
+    mdt = spec["date"].search(text)
     if mdt:
-        dt = datetime.strptime(f"{mdt.group(1)} {mdt.group(2)}", "%Y-%m-%d %H:%M")
-
-    # 3) store/merchant: 보통 2번째 줄이 매장명
-    store = "알수없음"
-    if len(lines) >= 2:
-        store = lines[1]
+        y, mo, d, hh, mm = mdt.groups()
+        dt = datetime(int(y), int(mo), int(d), int(hh), int(mm))
     else:
-        # fallback: 그래도 없으면 unknown 로직 사용
-        fallback = _parse_unknown(text)
-        store = fallback.get("store", store)
-
-    return {
-        "store": store,
-        "amount": amount,
-        "datetime": dt,
-        "payment_method": "card",  # 신한카드 푸시는 카드 결제로 간주
-    }
-
-def _parse_kakaopay(text: str) -> dict:
-    lines = [line.strip() for line in text.split("\n") if line.strip()]
-
-    # amount
-    amount = 0
-    m = re.search(r"([\d,]+)\s*원", text)
-    if m:
-        amount = int(m.group(1).replace(",", ""))
-
-    # datetime (있는 경우만)
-    dt = datetime.now()
-    mdt = re.search(r"(\d{4}-\d{2}-\d{2})\s*(\d{2}:\d{2})", text)
-    if mdt:
-        dt = datetime.strptime(f"{mdt.group(1)} {mdt.group(2)}", "%Y-%m-%d %H:%M")
-
-    # merchant: 보통 2번째 줄
-    store = "알수없음"
-    if len(lines) >= 2:
-        store = lines[1]
-
-    return {
-        "store": store,
-        "amount": amount,
-        "datetime": dt,
-        "payment_method": "wallet",  # 카카오페이는 지갑/간편결제로
-    }
-
-
-def _parse_kb(text: str) -> dict:
-    lines = [line.strip() for line in text.split("\n") if line.strip()]
-
-    # amount
-    amount = 0
-    m = re.search(r"([\d,]+)\s*원", text)
-    if m:
-        amount = int(m.group(1).replace(",", ""))
-
-    # datetime
-    dt = datetime.now()
-    mdt = re.search(r"(\d{4}[./-]\d{2}[./-]\d{2})\s*(\d{2}:\d{2})", text)
-    if mdt:
-        date_str = mdt.group(1).replace(".", "-").replace("/", "-")
-        dt = datetime.strptime(f"{date_str} {mdt.group(2)}", "%Y-%m-%d %H:%M")
-
-    # merchant: 보통 2번째 줄이거나, "가맹점" 라벨 뒤에 올 수도 있어서 fallback
-    store = "알수없음"
-    if len(lines) >= 2:
-        store = lines[1]
-    # 라벨 패턴 fallback
-    mstore = re.search(r"(가맹점|사용처)[:\s]*([^\n]+)", text)
-    if mstore:
-        store = mstore.group(2).strip()
-
-    return {
-        "store": store,
-        "amount": amount,
-        "datetime": dt,
-        "payment_method": "card",
-    }
-
-
-def _parse_samsung(text: str) -> dict:
-    lines = [line.strip() for line in text.split("\n") if line.strip()]
-
-    # amount
-    amount = 0
-    m = re.search(r"([\d,]+)\s*원", text)
-    if m:
-        amount = int(m.group(1).replace(",", ""))
-
-    # datetime (YYYY-MM-DD HH:MM 또는 YYYY.MM.DD HH:MM 등)
-    dt = datetime.now()
-    mdt = re.search(r"(\d{4}[./-]\d{2}[./-]\d{2})\s*(\d{2}:\d{2})", text)
-    if mdt:
-        date_str = mdt.group(1).replace(".", "-").replace("/", "-")
-        dt = datetime.strptime(f"{date_str} {mdt.group(2)}", "%Y-%m-%d %H:%M")
-
-    # merchant: 보통 2번째 줄 / 또는 "가맹점:" 라벨 뒤
-    store = "알수없음"
-    if len(lines) >= 2:
-        store = lines[1]
-
-    mstore = re.search(r"(가맹점|사용처)[:\s]*([^\n]+)", text)
-    if mstore:
-        store = mstore.group(2).strip()
-
-    # 삼성페이면 wallet, 삼성카드면 card로(초간단 휴리스틱)
-    payment_method = "wallet" if "삼성페이" in text else "card"
+        dt = datetime.now()
 
-    return {
-        "store": store,
-        "amount": amount,
-        "datetime": dt,
-        "payment_method": payment_method,
-    }
+    # 3) store/merchant: 보통 2번째 줄, 라벨("가맹점:")이 있는 스펙은 라벨 우선
+    store = _second_line(text) or "알수없음"
+    if spec["merchant_label"] is not None:
+        mstore = spec["merchant_label"].search(text)
+        if mstore:
+            store = mstore.group(2).strip()
 
+    tx = {"store": store, "amount": amount, "datetime": dt}
+    payment_method = spec["payment_method"]
+    if spec["wallet_marker"] and spec["wallet_marker"] in text:
+        payment_method = "wallet"
+    if payment_method:
+        tx["payment_method"] = payment_method
+    return tx
 
 
-def parse_push_notification(text: str) -> list[dict]:
+def parse_push_notification(text: str, raise_errors: bool = False) -> list[dict]:
+    """
+    raise_errors=False: 파싱 실패 시 [ParserError] 출력 후 빈 리스트 (기존 동작)
+    raise_errors=True : 예외를 그대로 올림 (일괄 파싱에서 항목별 오류를 보고할 때)
+    """
     try:
-        source = _detect_source(text)
-
-        if source == "shinhan":
-            tx = _parse_shinhan(text)
-        elif source == "kakaopay":
-            tx = _parse_kakaopay(text)
-        elif source == "kb":
-            tx = _parse_kb(text)
-        elif source == "samsung":
-            tx = _parse_samsung(text)
-        else:
-            tx = _parse_unknown(text)
-
-        if not tx:
-            return []
-
-        tx["source"] = source
+        spec = _detect_spec(text)
+        tx = _parse_with_spec(spec, text)
+        tx["source"] = spec["source"]
         return [_normalize_tx(tx, raw_text=text)]
 
     except Exception as e:
+        if raise_errors:
+            raise
         print("[ParserError]", e)
         return []
@@ -0,0 +1,194 @@
+"""
+policy_enricher.py
+Input: 정책 텍스트 (name / provider / condition / benefit)
+Output: policy_eligibility 에 저장할 구조화 자격 정보 + 근거 위치(offset)
+
+수집 후 오프라인 단계(scripts/enrich_policies.py)에서 한 번 계산해 두고,
+추천 요청 시에는 이 값만 읽는다 (정책 텍스트 재검색 없음).
+- 지역: region_sido / region_sigungu / region_mentions_json / region_text (utils/region_matcher)
+- 대상 제한: restricted_group (RESTRICTED_GROUPS 순서상 첫 매칭, name + condition)
+- 대상 키워드 위치: term_offsets_json = {용어: {필드: 첫 등장 위치}}
+- 나이/재학 조건: text_min_age / text_max_age / text_student_required (+ evidence)
+"""
+
+import re
+import json
+from typing import Any, Dict, List, Optional
+
+from utils.aho_corasick import AhoCorasick
+from utils.region_matcher import extract_policy_regions, regions_to_row
+
+# 특정 대상 제한 정책 (추천 점수 -100)
+RESTRICTED_GROUPS = ["북한이탈주민", "탈북", "다문화", "장애인", "한부모"]
+# 추천에서 자동으로 붙는 대상 키워드 (학생 / 청년)
+STUDENT_TOKENS = ["대학생", "재학생", "학부", "대학원", "학생"]
+YOUTH_TOKENS = ["청년", "청년층"]
+TERMS: List[str] = RESTRICTED_GROUPS + STUDENT_TOKENS + YOUTH_TOKENS
+
+# 근거 위치를 기록하는 필드 (추천 스니펫 검색 순서와 동일)
+FIELDS = ["name", "condition", "benefit", "provider"]
+
+_TERM_AUTOMATON = AhoCorasick(TERMS)
+
+# "만 19세 ~ 34세", "19~34세", "만19세~만39세"
+_AGE_RANGE = re.compile(r"(?:만\s*)?(\d{1,2})\s*세?\s*[~∼\-]\s*(?:만\s*)?(\d{1,2})\s*세")
+# "만 19세 이상", "34세 이하", "39세 미만"
+_AGE_BOUND = re.compile(r"(?:만\s*)?(\d{1,2})\s*세\s*(이상|이하|미만|초과)")
+_STUDENT_REQUIRED = re.compile(r"재학\s*중|재학생")
+
+ENRICHMENT_COLUMNS = [
+    "region_sido", "region_sigungu", "region_mentions_json", "region_text",
+    "restricted_group", "target_groups_json", "term_offsets_json",
+    "text_min_age", "text_max_age", "text_student_required", "text_evidence_json",
+]
+
+
+def _norm(s: Optional[str]) -> str:
+    return (s or "").strip()
+
+
+def term_offsets(fields: Dict[str, str]) -> Dict[str, Dict[str, int]]:
+    """{용어: {필드: 첫 등장 위치}} — text.find(용어) 와 같은 값"""
+    out: Dict[str, Dict[str, int]] = {}
+    patterns = _TERM_AUTOMATON.patterns
+    for field in FIELDS:
+        for end, pid in _TERM_AUTOMATON.iter(fields[field]):
+            term = patterns[pid]
+            hit = out.setdefault(term, {})
+            if field not in hit:
+                hit[field] = end - len(term) + 1
+    return out
+
+
+def _fields(name, provider, condition, benefit) -> Dict[str, str]:
+    return {"name": _norm(name), "provider": _norm(provider), "condition": _norm(condition), "benefit": _norm(benefit)}
+
+
+def _restricted_group(offsets: Dict[str, Dict[str, int]]) -> Optional[str]:
+    # 기존 추천 로직과 같이 name + condition 에서 RESTRICTED_GROUPS 순서상 첫 매칭
+    return next(
+        (g for g in RESTRICTED_GROUPS if "name" in offsets.get(g, {}) or "condition" in offsets.get(g, {})),
+        None,
+    )
+
+
+def _extract_age(condition: str) -> Dict[str, Any]:
+    min_age = max_age = None
+    evidence = []
+    for m in _AGE_RANGE.finditer(condition):
+        lo, hi = int(m.group(1)), int(m.group(2))
+        if lo <= hi:
+            min_age = lo if min_age is None else min(min_age, lo)
+            max_age = hi if max_age is None else max(max_age, hi)
+            evidence.append({"field": "condition", "start": m.start(), "end": m.end(), "text": m.group(0)})
+    if min_age is None and max_age is None:
+        for m in _AGE_BOUND.finditer(condition):
+            age, kind = int(m.group(1)), m.group(2)
+            if kind in ("이상", "초과"):
+                min_age = age if kind == "이상" else age + 1
+            else:
+                max_age = age if kind == "이하" else age - 1
+            evidence.append({"field": "condition", "start": m.start(), "end": m.end(), "text": m.group(0)})
+    return {"min_age": min_age, "max_age": max_age, "evidence": evidence}
+
+
+def enrich_policy(
+    name: Optional[str],
+    provider: Optional[str],
+    condition: Optional[str],
+    benefit: Optional[str],
+) -> Dict[str, Any]:
+    """정책 1건 → ENRICHMENT_COLUMNS 값 dict"""
+    fields = _fields(name, provider, condition, benefit)
+    offsets = term_offsets(fields)
+    restricted = _restricted_group(offsets)
+    targets = [t for t in TERMS if t in offsets]
+
+    age = _extract_age(fields["condition"])
+    evidence: Dict[str, Any] = {}
+    if age["evidence"]:
+        evidence["age"] = age["evidence"]
+    m = _STUDENT_REQUIRED.search(fields["condition"])
+    if m:
+        evidence["student"] = [{"field": "condition", "start": m.start(), "end": m.end(), "text": m.group(0)}]
+    if restricted:
+        field = "name" if "name" in offsets[restricted] else "condition"
+        start = offsets[restricted][field]
+        evidence["restricted"] = [{"field": field, "start": start, "end": start + len(restricted), "text": restricted}]
+
+    sido, sigungu, mentions_json, region_text = regions_to_row(
+        extract_policy_regions(fields["provider"], fields["name"], fields["condition"])
+    )
+    return {
+        "region_sido": sido,
+        "region_sigungu": sigungu,
+        "region_mentions_json": mentions_json,
+        "region_text": region_text,
+        "restricted_group": restricted,
+        "target_groups_json": json.dumps(targets, ensure_ascii=False),
+        "term_offsets_json": json.dumps(offsets, ensure_ascii=False),
+        "text_min_age": age["min_age"],
+        "text_max_age": age["max_age"],
+        "text_student_required": 1 if m else None,
+        "text_evidence_json": json.dumps(evidence, ensure_ascii=False),
+    }
+
+
+# ──────────────────────────────
+# 추천 요청 시 읽는 쪽 (policy_eligibility row → 조회용 dict)
+# ──────────────────────────────
+
+# 추천 SQL 에서 정책 컬럼 뒤에 붙여 읽는 컬럼 (순서 고정)
+ONLINE_COLUMNS = [
+    "region_sido", "region_sigungu", "region_mentions_json", "region_text",
+    "restricted_group", "term_offsets_json", "enriched_at",
+]
+
+
+def enrichment_from_row(
+    region_sido: Optional[str],
+    region_sigungu: Optional[str],
+    region_mentions_json: Optional[str],
+    region_text: Optional[str],
+    restricted_group: Optional[str],
+    term_offsets_json: Optional[str],
+    enriched_at: Optional[str],
+) -> Optional[Dict[str, Any]]:
+    # 아직 enrichment 안 된 정책이면 None. JSON 컬럼은 필요할 때만 파싱 (region_matcher._mentions / offsets_of)
+    if enriched_at is None:
+        return None
+    return {
+        "sido": region_sido,
+        "sigungu": region_sigungu,
+        "mentions": region_mentions_json,
+        "text": region_text,
+        "restricted": restricted_group,
+        "offsets": term_offsets_json,
+    }
+
+
+def enrichment_for_policy(
+    name: Optional[str],
+    provider: Optional[str],
+    condition: Optional[str],
+    benefit: Optional[str],
+) -> Dict[str, Any]:
+    # enrichment 안 된 정책(수집 경로 밖에서 추가된 정책 등)은 요청 시 같은 규칙으로 계산 (조회에 필요한 값만)
+    fields = _fields(name, provider, condition, benefit)
+    offsets = term_offsets(fields)
+    regions = extract_policy_regions(fields["provider"], fields["name"], fields["condition"])
+    return {
+        "sido": regions["sido"],
+        "sigungu": regions["sigungu"],
+        "mentions": regions["mentions"],
+        "text": regions["text"],
+        "restricted": _restricted_group(offsets),
+        "offsets": offsets,
+    }
+
+
+def offsets_of(enrichment: Dict[str, Any]) -> Dict[str, Dict[str, int]]:
+    m = enrichment["offsets"]
+    if isinstance(m, str):
+        m = enrichment["offsets"] = json.loads(m)
+    return m
@@ -0,0 +1,150 @@
+"""
+region_matcher.py
+Input: 정책 텍스트 (provider + name + condition)
+Output: 텍스트에 등장하는 시도/시군구 집합 + 대표 시도/시군구
+
+- 시도 → 시군구 사전(GAZETTEER)을 import 시 한 번 Aho-Corasick 자동자로 컴파일
+- 정책별 지역 정보는 수집 시점에 계산해 policy_eligibility 에 저장 (region_sido / region_sigungu / region_mentions_json / region_text)
+- 추천 요청 시에는 저장된 집합만 보고 판단 (정책 텍스트 재검색 없음)
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from utils.aho_corasick import AhoCorasick
+
+# 시도 → 시군구 (순서 = 기존 SIGUNGU_LIST 검사 순서. "중구", "강서구" 처럼 여러 시도에 있는 이름은 첫 등장만 의미 있음)
+GAZETTEER: Dict[str, List[str]] = {
+    "서울": [
+        "강남구", "강동구", "강북구", "강서구", "관악구", "광진구", "구로구", "금천구",
+        "노원구", "도봉구", "동대문구", "동작구", "마포구", "서대문구", "서초구",
+        "성동구", "성북구", "송파구", "양천구", "영등포구", "용산구", "은평구",
+        "종로구", "중구", "중랑구",
+    ],
+    "경기": [
+        "수원시", "성남시", "의정부시", "안양시", "부천시", "광명시", "평택시",
+        "동두천시", "안산시", "고양시", "과천시", "구리시", "남양주시", "오산시",
+        "시흥시", "군포시", "의왕시", "하남시", "용인시", "파주시", "이천시",
+        "안성시", "김포시", "화성시", "광주시", "양주시", "포천시", "여주시",
+    ],
+    "부산": [
+        "중구", "서구", "동구", "영도구", "부산진구", "동래구", "남구", "북구",
+        "해운대구", "사하구", "금정구", "강서구", "연제구", "수영구", "사상구", "기장군",
+    ],
+    "대구": ["수성구", "달서구", "달성군"],
+    "인천": ["미추홀구", "연수구", "남동구", "부평구", "계양구", "강화군", "옹진군"],
+    "광주": ["광산구"],
+    "대전": ["유성구", "대덕구"],
+    "울산": ["울주군"],
+    "경남": [
+        "창원시", "진주시", "통영시", "사천시", "김해시", "밀양시", "거제시", "양산시",
+        "의령군", "함안군", "창녕군", "고성군", "남해군", "하동군", "산청군", "함양군",
+        "거창군", "합천군",
+    ],
+    "경북": [
+        "포항시", "경주시", "김천시", "안동시", "구미시", "영주시", "영천시",
+        "상주시", "문경시", "경산시",
+    ],
+    "전남": ["목포시", "여수시", "순천시", "나주시", "광양시"],
+    "전북": ["전주시", "군산시", "익산시", "정읍시", "남원시", "김제시"],
+    "충남": ["천안시", "공주시", "보령시", "아산시", "서산시", "논산시", "계룡시", "당진시"],
+    "충북": ["청주시", "충주시", "제천시"],
+    "강원": ["춘천시", "원주시", "강릉시", "동해시", "태백시", "속초시", "삼척시"],
+    "제주": ["제주시", "서귀포시"],
+}
+
+# 정식 명칭 → 약칭 시도
+SIDO_FULL_NAMES: Dict[str, str] = {
+    "경상남도": "경남", "경상북도": "경북", "전라남도": "전남", "전라북도": "전북",
+    "충청남도": "충남", "충청북도": "충북", "강원도": "강원", "경기도": "경기",
+    "제주도": "제주", "제주특별자치도": "제주",
+}
+
+SIDO_ORDER = [
+    "서울", "부산", "대구", "인천", "광주", "대전", "울산", "세종",
+    "경기", "강원", "충북", "충남", "전북", "전남", "경북", "경남", "제주",
+]
+SIDO_LIST: List[str] = SIDO_ORDER + list(SIDO_FULL_NAMES)
+SIGUNGU_LIST: List[str] = [sg for sigungu in GAZETTEER.values() for sg in sigungu]
+
+# 사용자 지역 입력에 흔한 시도 표기 ("서울시 마포구", "부산광역시 ...") — 대표 지역 판단에는 안 쓰고 언급 여부만 기록
+SIDO_VARIANTS: List[str] = [s + "시" for s in SIDO_ORDER] + [
+    "서울특별시", "부산광역시", "대구광역시", "인천광역시", "광주광역시", "대전광역시", "울산광역시",
+    "세종특별자치시", "강원특별자치도", "전북특별자치도",
+]
+
+# 시군구 → 시도 → 표기 변형 순서로 등록: pattern id 가 작을수록 "먼저 검사하는" 이름 (각 목록 순서 유지)
+_AUTOMATON = AhoCorasick(SIGUNGU_LIST + SIDO_LIST + SIDO_VARIANTS)
+_N_SIGUNGU = len(dict.fromkeys(SIGUNGU_LIST))
+_N_REGION = len(dict.fromkeys(SIGUNGU_LIST + SIDO_LIST))
+_TERMS = frozenset(_AUTOMATON.patterns)
+
+
+def extract_regions(text: str) -> Dict[str, Any]:
+    """
+    정책 텍스트 → {"sigungu": 첫 시군구, "sido": 첫 시도, "mentions": 등장한 지역명 전체(정렬)}
+    "첫" 은 텍스트 위치가 아니라 SIGUNGU_LIST / SIDO_LIST 순서 기준 (기존 추천 로직과 동일)
+    """
+    ids = _AUTOMATON.find_ids(text or "")
+    sigungu_ids = [i for i in ids if i < _N_SIGUNGU]
+    sido_ids = [i for i in ids if _N_SIGUNGU <= i < _N_REGION]
+    patterns = _AUTOMATON.patterns
+    return {
+        "sigungu": patterns[min(sigungu_ids)] if sigungu_ids else None,
+        "sido": patterns[min(sido_ids)] if sido_ids else None,
+        "mentions": sorted(patterns[i] for i in ids),
+    }
+
+
+def policy_region_text(provider: Optional[str], name: Optional[str], condition: Optional[str]) -> str:
+    # 추천 점수에서 지역 판단에 쓰는 텍스트 (provider → name → condition)
+    return f"{(provider or '').strip()} {(name or '').strip()} {(condition or '').strip()}"
+
+
+def extract_policy_regions(provider: Optional[str], name: Optional[str], condition: Optional[str]) -> Dict[str, Any]:
+    text = policy_region_text(provider, name, condition)
+    return {**extract_regions(text), "text": text}
+
+
+def regions_to_row(regions: Dict[str, Any]) -> tuple:
+    # policy_eligibility (region_sido, region_sigungu, region_mentions_json, region_text) 저장용
+    return regions["sido"], regions["sigungu"], json.dumps(regions["mentions"], ensure_ascii=False), regions["text"]
+
+
+def _mentions(regions: Dict[str, Any]):
+    m = regions["mentions"]
+    if isinstance(m, str):
+        m = regions["mentions"] = frozenset(json.loads(m))
+    return m
+
+
+def _user_sido_mentioned(user_sido: str, regions: Dict[str, Any]) -> bool:
+    """
+    `user_sido in 정책텍스트` 를 저장된 지역명 집합으로 판단.
+    - 빈 문자열은 항상 포함 (기존 동작)
+    - 사전(시군구/시도/표기 변형)에 있는 이름이면 집합 조회
+    - 사전에 없는 입력("수원", "강남" 처럼 시/구를 뺀 이름 등)은 저장된 지역 판단 텍스트에서 substring 검사
+    """
+    if not user_sido:
+        return True
+    if user_sido in _TERMS:
+        return user_sido in _mentions(regions)
+    return user_sido in (regions.get("text") or "")
+
+
+def region_conflict(regions: Dict[str, Any], user_region: str) -> Optional[str]:
+    """
+    정책 지역이 사용자 지역과 맞지 않으면 불일치한 지역명, 아니면 None
+    - 시군구가 있으면: 사용자 지역에 그 시군구가 없고, 사용자 시도도 정책에 언급되지 않으면 불일치
+    - 시군구가 없고 시도가 있으면: 사용자 지역에 그 시도가 없으면 불일치
+    """
+    sigungu = regions["sigungu"]
+    if sigungu:
+        user_sido = user_region.split()[0] if user_region else ""
+        if sigungu not in user_region and not _user_sido_mentioned(user_sido, regions):
+            return sigungu
+        return None
+    sido = regions["sido"]
+    if sido and sido not in user_region:
+        return sido
+    return None
@@ -1,40 +1,59 @@
+from bisect import bisect_left
 from datetime import datetime, timedelta
+from typing import Optional
 
-def detect_spending_spike(transactions, detector=None) -> dict:
-    if not transactions:
-        return {"spike_score": 0.0, "spike_flags": []}
-    if isinstance(transactions, dict):
-        transactions = [transactions]
-    transactions = [tx for tx in transactions if isinstance(tx, dict)]
-    if not transactions:
+import numpy as np
+
+from utils.transaction_batch import TransactionBatch, resolve_asof
+
+
+def detect_spending_spike(transactions, detector=None, asof: Optional[datetime] = None) -> dict:
+    """
+    transactions: list[dict] (parser normalized schema) 또는 TransactionBatch
+    asof: 윈도우 기준 시각 (None 이면 resolve_asof — 현재 시각 내림)
+    returns:
+      {"spike_score": float, "spike_flags": list}
+    """
+    batch = TransactionBatch.from_transactions(transactions)
+    if not len(batch):
         return {"spike_score": 0.0, "spike_flags": []}
 
-    # 날짜 파싱
-    parsed = []
-    for tx in transactions:
-        try:
-            dt = datetime.fromisoformat(str(tx.get("datetime", "")))
-            amt = int(float(tx.get("amount", 0)))
-            if amt > 0:
-                parsed.append((dt, amt))
-        except Exception:
-            continue
-
-    if not parsed:
+    # 금액은 원 단위 정수 기준
+    amounts = batch.amounts.astype(np.int64)
+    valid = amounts > 0
+    if not valid.all():
+        amounts = amounts[valid]
+        datetimes = [dt for dt, ok in zip(batch.datetimes, valid.tolist()) if ok]
+    else:
+        datetimes = batch.datetimes
+
+    if not len(amounts):
         return {"spike_score": 0.0, "spike_flags": []}
 
-    asof = datetime.now()
+    asof = resolve_asof(asof)
     w7 = asof - timedelta(days=7)
     w30 = asof - timedelta(days=30)
 
-    recent7 = [amt for dt, amt in parsed if dt >= w7]
-    prev30 = [amt for dt, amt in parsed if w30 <= dt < w7]
+    # batch 는 시간순 정렬이라 윈도우 경계는 이진탐색
+    i7 = bisect_left(datetimes, w7)
+    i30 = bisect_left(datetimes, w30)
+
+    recent7 = amounts[i7:]
+    prev30 = amounts[i30:i7]
+
+    return spike_from_sums(int(recent7.sum()), len(recent7), int(prev30.sum()), len(prev30))
+
 
-    if not recent7 or not prev30:
+def spike_from_sums(recent_sum: int, recent_n: int, prev_sum: int, prev_n: int) -> dict:
+    """
+    최근 7일 / 그 이전 23일(30일 윈도우 - 7일) 구간의 (원 단위 정수 합, 건수) → spike 결과.
+    윈도우 합계를 따로 유지하는 쪽(app/fhi_store.py 롤링 집계)도 같은 규칙을 쓴다.
+    """
+    if not recent_n or not prev_n:
         return {"spike_score": 0.0, "spike_flags": []}
 
-    avg_recent = sum(recent7) / len(recent7)
-    avg_prev = sum(prev30) / len(prev30)
+    avg_recent = recent_sum / recent_n
+    avg_prev = prev_sum / prev_n
 
     if avg_prev == 0:
         return {"spike_score": 0.0, "spike_flags": []}
@@ -45,4 +64,4 @@ def detect_spending_spike(transactions, detector=None) -> dict:
     if spike_ratio >= 0.5:
         spike_flags.append({"reason": "spike_ratio>=0.5", "score": spike_ratio})
 
-    return {"spike_score": spike_ratio, "spike_flags": spike_flags}
\ No newline at end of file
+    return {"spike_score": spike_ratio, "spike_flags": spike_flags}
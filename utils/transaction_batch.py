@@ -0,0 +1,172 @@
+"""
+transaction_batch.py
+Input: transactions (list[dict]) from parser normalized schema
+Output: TransactionBatch — 한 번만 파싱/검증한 시간순 컬럼 데이터
+
+rule FHI / ML FHI / feature builder / 충동·급증 탐지기가 모두 이 batch 를 공유해서
+요청마다 같은 datetime·amount 파싱을 여러 번 반복하지 않도록 한다.
+"""
+
+import os
+import time
+import hashlib
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+EPOCH = datetime(1970, 1, 1)
+US = timedelta(microseconds=1)
+EPOCH_ORDINAL = EPOCH.toordinal()
+DAY_US = 24 * 60 * 60 * 1_000_000
+
+# asof 를 지정하지 않은 요청의 기준 시각 단위 (초). 같은 구간 안의 반복 조회는 같은 asof → 결과 캐시 재사용
+FHI_ASOF_GRANULARITY_SEC = int(os.getenv("FHI_ASOF_GRANULARITY_SEC", "60"))
+
+
+def parse_datetime(x) -> Optional[datetime]:
+    if isinstance(x, datetime):
+        return x
+    if x is None:
+        return None
+    try:
+        return datetime.fromisoformat(str(x))
+    except ValueError:
+        pass
+    try:
+        dt = pd.to_datetime(x).to_pydatetime()
+    except Exception:
+        return None
+    return dt if isinstance(dt, datetime) else None
+
+
+def resolve_asof(asof: Optional[datetime] = None) -> datetime:
+    """
+    FHI 파이프라인 전체(spike 윈도우, rule/ML feature)가 공유하는 기준 시각.
+    - 지정하면 그대로 (aware 는 로컬 벽시계 naive 로 변환 — 거래 시각과 같은 기준)
+    - 없으면 현재 시각을 FHI_ASOF_GRANULARITY_SEC 단위로 내림
+    """
+    if asof is not None:
+        if asof.tzinfo is not None:
+            asof = asof.astimezone().replace(tzinfo=None)
+        return asof
+    now = time.time()
+    if FHI_ASOF_GRANULARITY_SEC > 0:
+        now -= now % FHI_ASOF_GRANULARITY_SEC
+    return datetime.fromtimestamp(now)
+
+
+def epoch_us(dt: datetime) -> int:
+    """
+    datetime → epoch microseconds (정수, 손실 없음).
+    naive 는 그대로, aware 는 UTC 로 환산 — datetime 끼리 비교한 결과와 대소관계가 같다.
+    """
+    offset = dt.utcoffset()
+    if offset is not None:
+        dt = dt.replace(tzinfo=None) - offset
+    return (dt - EPOCH) // US
+
+
+class TransactionBatch:
+    """
+    유효 거래만 남겨 시간순(안정 정렬)으로 정리한 컬럼 데이터.
+    - datetimes: list[datetime]
+    - ts: int64 epoch microseconds (epoch_us 참고)
+    - days: int32 벽시계 기준 날짜 ordinal (dt.date().toordinal())
+    - amounts: float64 (> 0)
+    - category_codes: int32, categories[code] 가 실제 카테고리 문자열 (소문자/strip, 기본 "other")
+    - merchants: list
+    n_input 은 검증 전 입력 건수 (빈 입력과 "전부 무효" 입력 구분용)
+    """
+
+    __slots__ = ("datetimes", "ts", "days", "amounts", "categories", "category_codes", "merchants", "n_input",
+                 "_fingerprint")
+
+    def __init__(self, datetimes, ts, days, amounts, categories, category_codes, merchants, n_input):
+        self.datetimes = datetimes
+        self.ts = ts
+        self.days = days
+        self.amounts = amounts
+        self.categories = categories
+        self.category_codes = category_codes
+        self.merchants = merchants
+        self.n_input = n_input
+        self._fingerprint: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self.datetimes)
+
+    def fingerprint(self) -> str:
+        """
+        FHI 계산에 쓰이는 컬럼(시각·날짜·금액·카테고리, 입력 건수)의 해시 — 결과 캐시 키.
+        merchant 처럼 점수에 영향 없는 필드는 제외. 한 번 계산하면 재사용.
+        """
+        if self._fingerprint is None:
+            h = hashlib.blake2b(digest_size=16)
+            h.update(np.int64(self.n_input).tobytes())
+            h.update(np.ascontiguousarray(self.ts, dtype=np.int64).tobytes())
+            h.update(np.ascontiguousarray(self.days, dtype=np.int32).tobytes())
+            h.update(np.ascontiguousarray(self.amounts, dtype=np.float64).tobytes())
+            h.update(np.ascontiguousarray(self.category_codes, dtype=np.int32).tobytes())
+            h.update("\x00".join(self.categories).encode("utf-8"))
+            self._fingerprint = h.hexdigest()
+        return self._fingerprint
+
+    @classmethod
+    def from_transactions(cls, transactions) -> "TransactionBatch":
+        if isinstance(transactions, cls):
+            return transactions
+        if not transactions:
+            transactions = []
+        elif isinstance(transactions, dict):
+            transactions = [transactions]
+
+        rows = []
+        cat_index: dict[str, int] = {}
+        aware = False
+        for tx in transactions:
+            if not isinstance(tx, dict):
+                continue
+            dt = parse_datetime(tx.get("datetime"))
+            if dt is None:
+                continue
+            try:
+                amt = float(tx.get("amount", 0))
+            except Exception:
+                continue
+            if not amt > 0:
+                continue
+            category = (tx.get("category") or "other").lower().strip()
+            code = cat_index.setdefault(category, len(cat_index))
+            aware = aware or dt.tzinfo is not None
+            rows.append((dt, amt, code, tx.get("merchant")))
+
+        # 시간순 정렬 (같은 시각은 입력 순서 유지)
+        rows.sort(key=lambda r: r[0])
+
+        n = len(rows)
+        datetimes = [r[0] for r in rows]
+        ts = None
+        if not aware and n:
+            # naive 만 있으면 pandas 로 한 번에 변환 (벽시계 = epoch 기준)
+            try:
+                ts = pd.DatetimeIndex(datetimes).as_unit("us").asi8
+            except (OverflowError, ValueError):
+                ts = None  # 범위 밖 날짜 → 아래 per-row 변환
+        if ts is not None:
+            days = (ts // DAY_US + EPOCH_ORDINAL).astype(np.int32)
+        else:
+            ts = np.fromiter((epoch_us(dt) for dt in datetimes), dtype=np.int64, count=n)
+            days = np.fromiter((dt.toordinal() for dt in datetimes), dtype=np.int32, count=n)
+
+        return cls(
+            datetimes=datetimes,
+            ts=ts,
+            days=days,
+            amounts=np.fromiter((r[1] for r in rows), dtype=np.float64, count=n),
+            categories=list(cat_index),
+            category_codes=np.fromiter((r[2] for r in rows), dtype=np.int32, count=n),
+            merchants=[r[3] for r in rows],
+            n_input=len(transactions),
+        )